@@ -0,0 +1,6 @@
+"""
+Performance benchmark suite.
+
+Deterministic benchmarks for market data, indicators, serialization, logging and
+the OMS repository, run against a stubbed Binance client. See benchmarks/run.py.
+"""
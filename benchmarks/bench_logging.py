@@ -0,0 +1,129 @@
+"""
+Logging benchmarks: formatter throughput, end-to-end StructuredLogger calls,
+exception construction cost on error paths and trace ID generation.
+"""
+
+import io
+import logging
+import sys
+import threading
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from src.infrastructure.exceptions import ErrorContext, RateLimitError
+from src.logging_system import json_formatter
+from src.logging_system.json_formatter import FastJSONFormatter, StructuredLogger, create_formatter
+from src.logging_system.trace_generator import TraceGenerator
+
+from .harness import measure
+
+RECORDS_PER_SAMPLE = 1000
+TRACE_IDS_PER_THREAD = 5000
+
+
+class _LockedTraceGenerator:
+    """Reference: previous trace ID generator (global lock + strftime per ID)."""
+
+    def __init__(self, session_id: str = "001"):
+        self.session_id = session_id
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def generate_trace_id(self, parent_trace_id=None) -> str:
+        with self._lock:
+            self._counter += 1
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+            return f"trd_{self.session_id}_{timestamp}{self._counter:05d}"
+
+
+def _record() -> logging.LogRecord:
+    record = logging.LogRecord("benchmark", logging.INFO, __file__, 1, "rsi_calculation completed successfully",
+                               None, None)
+    record.service_name = "MarketDataService"
+    record.operation = "rsi_calculation"
+    record.context = {"symbol": "BTCUSDT", "rsi_value": 61.37, "period": 14, "processing_time_ms": 0.412}
+    record.tags = ["flow_complete", "rsicalculation", "success"]
+    record.flow = {}
+    record.trace_id = "trd_001_20240101000000001"
+    return record
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    results = []
+    repeat = 5 if quick else 20
+    record = _record()
+
+    for name in ("standard", "fast"):
+        formatter = create_formatter(name)
+
+        def format_batch(formatter=formatter):
+            for _ in range(RECORDS_PER_SAMPLE):
+                formatter.format(record)
+        results.append(measure("logging.formatter", format_batch, repeat=repeat,
+                               params={"formatter": name}, items=RECORDS_PER_SAMPLE))
+
+        logger = StructuredLogger(f"benchmark_logging_{name}", "MarketDataService")
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatter)
+        logger.logger.handlers = [handler]
+        logger.logger.propagate = False
+        logger.logger.setLevel(logging.INFO)
+
+        def log_batch(logger=logger, stream=stream):
+            for i in range(RECORDS_PER_SAMPLE):
+                logger.info("rsi_calculation completed successfully", operation="rsi_calculation",
+                            context={"symbol": "BTCUSDT", "rsi_value": 61.37, "step": i},
+                            trace_id="trd_001_20240101000000001")
+            stream.seek(0)
+            stream.truncate()
+        results.append(measure("logging.structured_logger", log_batch, repeat=repeat,
+                               params={"formatter": name}, items=RECORDS_PER_SAMPLE))
+
+    if json_formatter.orjson is not None:
+        # "fast" picks orjson when installed; also record its stdlib json fallback
+        formatter = FastJSONFormatter(use_orjson=False)
+
+        def format_stdlib_batch():
+            for _ in range(RECORDS_PER_SAMPLE):
+                formatter.format(record)
+        results.append(measure("logging.formatter", format_stdlib_batch, repeat=repeat,
+                               params={"formatter": "fast_stdlib_json"}, items=RECORDS_PER_SAMPLE))
+
+    # Exception construction on error-heavy paths (rate-limit storms): stack and
+    # system info are formatted lazily, the eager reference is what was paid before
+    def eager_context():
+        for _ in range(RECORDS_PER_SAMPLE):
+            traceback.format_stack()
+            {"python_version": sys.version, "platform": sys.platform}
+
+    def rate_limit_errors():
+        for _ in range(RECORDS_PER_SAMPLE):
+            RateLimitError("Rate limit exceeded", retry_after=1, endpoint="/api/v3/klines")
+
+    def error_contexts():
+        for _ in range(RECORDS_PER_SAMPLE):
+            ErrorContext(trace_id="bench", operation="symbol_validation")
+    for name, func in (("eager_reference", eager_context), ("RateLimitError", rate_limit_errors),
+                       ("ErrorContext", error_contexts)):
+        results.append(measure("logging.error_construction", func, repeat=repeat,
+                               params={"exception": name}, items=RECORDS_PER_SAMPLE))
+
+    # Trace ID generation from 1 and 8 threads, lock-free vs the previous locked generator
+    for name, factory in (("locked", _LockedTraceGenerator), ("lock_free", TraceGenerator)):
+        for threads in (1, 8):
+            generator = factory()
+
+            def generate(generator=generator, threads=threads):
+                workers = [threading.Thread(target=lambda: [generator.generate_trace_id()
+                                                            for _ in range(TRACE_IDS_PER_THREAD)])
+                           for _ in range(threads)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            results.append(measure("logging.trace_id", generate, repeat=repeat,
+                                   params={"generator": name, "threads": threads},
+                                   items=threads * TRACE_IDS_PER_THREAD))
+    return results
@@ -0,0 +1,128 @@
+"""
+MarketDataService benchmarks: get_market_data at several symbol counts, every
+indicator step, get_enhanced_context, MarketDataSet construction/serialization
+(cold, cached and the legacy to_dict path) and indicator-path logging overhead
+per log level.
+"""
+
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+from src.logging_system import MarketDataLogger
+from src.logging_system.json_formatter import AIOptimizedJSONFormatter
+from src.market_data.market_data_service import MarketDataService, MarketDataSet
+
+from .data import StubBinanceClient, benchmark_symbols
+from .harness import measure
+
+
+def _service(log_level: int = logging.INFO) -> Tuple[MarketDataService, io.StringIO]:
+    """Service with the stub client and a real JSON logger writing to an in-memory stream."""
+    logger = MarketDataLogger("benchmark_market_data", service_name="benchmark_market_data")
+    stdlib_logger = logger.logger.logger
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(AIOptimizedJSONFormatter())
+    stdlib_logger.handlers = [handler]
+    stdlib_logger.propagate = False
+    stdlib_logger.setLevel(log_level)
+    return MarketDataService(api_client=StubBinanceClient(), logger=logger), handler.stream
+
+
+def _clear(stream: io.StringIO):
+    stream.seek(0)
+    stream.truncate()
+
+
+def _repeat_for(symbols: int) -> int:
+    return max(1, min(20, 200 // symbols))
+
+
+def run(symbol_counts: Sequence[int], quick: bool = False) -> List[Dict[str, Any]]:
+    results = []
+    service, log_stream = _service()
+    repeat = 5 if quick else 50
+
+    # get_market_data for 1..N symbols per cycle
+    for count in symbol_counts:
+        symbols = benchmark_symbols(count)
+
+        def cycle(symbols=symbols):
+            for symbol in symbols:
+                service.get_market_data(symbol, trace_id="trd_benchmark")
+            _clear(log_stream)
+        results.append(measure("market_data.get_market_data", cycle, repeat=_repeat_for(count),
+                               warmup=1 if count <= 10 else 0, params={"symbols": count}, items=count))
+
+    market_data = service.get_market_data("ETHUSDT", trace_id="trd_benchmark")
+    h1 = market_data.h1_candles
+
+    indicators = {
+        "rsi_14": lambda: service._calculate_rsi("ETHUSDT", h1, 14, trace_id="trd_benchmark"),
+        "macd_signal": lambda: service._calculate_macd_signal("ETHUSDT", h1, trace_id="trd_benchmark"),
+        "ma_20": lambda: service._calculate_ma("ETHUSDT", h1, 20, trace_id="trd_benchmark"),
+        "ma_50": lambda: service._calculate_ma("ETHUSDT", h1, 50, trace_id="trd_benchmark"),
+        "btc_correlation": lambda: service._calculate_btc_correlation("ETHUSDT", h1, trace_id="trd_benchmark"),
+        "volume_profile": lambda: service._analyze_volume_profile("ETHUSDT", h1, trace_id="trd_benchmark"),
+        "bollinger_bands": lambda: service._calculate_bollinger_bands(h1),
+    }
+    for indicator, func in indicators.items():
+        results.append(measure("market_data.indicator", func, repeat=repeat * 4,
+                               params={"indicator": indicator}))
+    _clear(log_stream)
+
+    results.append(measure("market_data.get_enhanced_context",
+                           lambda: service.get_enhanced_context(market_data), repeat=repeat))
+
+    fields = {name: getattr(market_data, name) for name in (
+        "symbol", "daily_candles", "h4_candles", "h1_candles", "rsi_14", "macd_signal", "ma_20", "ma_50",
+        "ma_trend", "btc_correlation", "fear_greed_index", "volume_profile", "support_level",
+        "resistance_level", "trace_id")}
+    results.append(measure("market_data.dataset_construction",
+                           lambda: MarketDataSet(timestamp=datetime.now(timezone.utc), **fields), repeat=repeat))
+
+    def serialize():
+        # Drop memoized results to measure a cold serialization
+        market_data._context_dict_cache = None
+        market_data._json_context_cache = None
+        market_data.to_context_dict()
+        return market_data.to_json_context()
+    results.append(measure("market_data.dataset_serialization", serialize, repeat=repeat))
+    results.append(measure("market_data.dataset_serialization_cached",
+                           lambda: (market_data.to_context_dict(), market_data.to_json_context()), repeat=repeat))
+
+    def serialize_legacy():
+        # Previous DataFrame.to_dict based candle serialization, as the comparison baseline
+        candles = []
+        for df in (market_data.daily_candles, market_data.h4_candles, market_data.h1_candles):
+            df = df.copy()
+            df['unix_timestamp'] = (df['timestamp'] - pd.Timestamp("1970-01-01", tz='UTC')) // pd.Timedelta('1s')
+            formatted = df[['unix_timestamp', 'open', 'high', 'low', 'close', 'volume']].copy()
+            formatted.columns = ['t', 'o', 'h', 'l', 'c', 'v']
+            candles.append(formatted.to_dict(orient='records'))
+        return json.dumps({"raw_candles": candles})
+    results.append(measure("market_data.dataset_serialization_legacy", serialize_legacy, repeat=repeat))
+    _clear(log_stream)
+
+    # Indicator-path logging overhead: disabled levels should cost close to nothing
+    for level in ("WARNING", "INFO", "DEBUG", "none"):
+        if level == "none":
+            level_service, level_stream = MarketDataService(api_client=StubBinanceClient(), logger=None), None
+        else:
+            level_service, level_stream = _service(getattr(logging, level))
+
+        def indicator_path(level_service=level_service, level_stream=level_stream):
+            level_service._calculate_rsi("ETHUSDT", h1, 14, trace_id="trd_benchmark")
+            level_service._calculate_macd_signal("ETHUSDT", h1, trace_id="trd_benchmark")
+            level_service._calculate_ma("ETHUSDT", h1, 20, trace_id="trd_benchmark")
+            level_service._calculate_ma("ETHUSDT", h1, 50, trace_id="trd_benchmark")
+            level_service._analyze_volume_profile("ETHUSDT", h1, trace_id="trd_benchmark")
+            if level_stream:
+                _clear(level_stream)
+        results.append(measure("market_data.indicator_logging", indicator_path, repeat=repeat * 2,
+                               params={"log_level": level}))
+    return results
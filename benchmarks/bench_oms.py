@@ -0,0 +1,110 @@
+"""
+OMS benchmarks: repository save (single, bulk, write-behind and event log), load, startup with
+history, symbol lookup and order placement (per order vs bulk) at several order counts
+(one active order per symbol), on a file-backed SQLite database.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Dict, List, Sequence
+
+from src.trading.event_store import OrderEventStore
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.write_behind import WriteBehindPersister
+
+from .data import benchmark_symbols
+from .harness import measure
+
+
+# Terminal orders per active order in the startup benchmark
+HISTORY_FACTOR = 10
+
+
+def _order(symbol: str, status: str = "PENDING") -> Dict[str, Any]:
+    return {
+        "order_id": str(uuid.uuid4()), "symbol": symbol, "status": status, "order_type": "BUY",
+        "margin": 100.0, "leverage": 10, "entry_price": 50000.0, "exit_price": None,
+        "stop_loss": 49000.0, "take_profit": 52000.0,
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00",
+    }
+
+
+def run(symbol_counts: Sequence[int], quick: bool = False) -> List[Dict[str, Any]]:
+    results = []
+    directory = tempfile.mkdtemp(prefix="oms_benchmark_")
+    try:
+        for count in symbol_counts:
+            symbols = benchmark_symbols(count)
+            orders = [_order(symbol) for symbol in symbols]
+            repository = OmsRepository(os.path.join(directory, f"oms_{count}.db"))
+            repeat = 3 if quick else max(3, min(20, 2000 // count))
+
+            def save_all(repository=repository, orders=orders):
+                for order in orders:
+                    repository.save(order)
+            results.append(measure("oms.repository_save", save_all, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+            results.append(measure("oms.repository_save_many", lambda repository=repository, orders=orders:
+                                   repository.save_many(orders), repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+
+            persister = WriteBehindPersister(repository, max_delay_ms=2)
+
+            def save_all_write_behind(persister=persister, orders=orders):
+                for order in orders:
+                    persister.save(order)
+                persister.flush()
+            results.append(measure("oms.write_behind_save", save_all_write_behind, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+            persister.close()
+
+            # High churn: every save is a status transition of an existing order
+            events = OrderEventStore(os.path.join(directory, f"events_{count}.db"))
+            events.save_many(orders)
+
+            def churn_event_log(events=events, orders=orders, step=itertools.count()):
+                updated_at = f"2024-01-01T00:00:{next(step) % 60:02d}+00:00"
+                for order in orders:
+                    events.save(dict(order, updated_at=updated_at))
+            results.append(measure("oms.event_log_save", churn_event_log, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+            events.close()
+            results.append(measure("oms.repository_load", repository.load, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+
+            # Startup loads only active orders, however long the history is
+            repository.write_batch([_order(symbols[i % count], "FILLED") for i in range(count * HISTORY_FACTOR)])
+            results.append(measure("oms.startup", lambda repository=repository: OrderManagementSystem(repository),
+                                   repeat=repeat, warmup=1,
+                                   params={"symbols": count, "history": count * HISTORY_FACTOR}, items=count))
+
+            oms = OrderManagementSystem(repository)
+
+            def lookup_all(oms=oms, symbols=symbols):
+                for symbol in symbols:
+                    oms.get_order_by_symbol(symbol)
+            results.append(measure("oms.get_order_by_symbol", lookup_all, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+            repository.close()
+
+            # Placing one order per symbol: per-order calls vs one bulk call
+            requests = [{"symbol": symbol, "order_type": "BUY", "margin": 100.0, "leverage": 10,
+                         "entry_price": 50000.0} for symbol in symbols]
+            placing = OmsRepository(os.path.join(directory, f"place_{count}.db"))
+            oms = OrderManagementSystem(placing)
+
+            def place_each(oms=oms, requests=requests):
+                for request in requests:
+                    oms.place_order(**request)
+            results.append(measure("oms.place_order", place_each, repeat=repeat, warmup=1,
+                                   params={"symbols": count}, items=count))
+            results.append(measure("oms.place_orders", lambda oms=oms, requests=requests: oms.place_orders(requests),
+                                   repeat=repeat, warmup=1, params={"symbols": count}, items=count))
+            placing.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
@@ -0,0 +1,107 @@
+"""
+Benchmark input data: synthetic and fixture-seeded klines plus a stub API client.
+
+Klines use the Binance REST layout
+[open_time, open, high, low, close, volume, close_time, quote_volume, trades,
+ taker_base_volume, taker_quote_volume, ignore], so they go through the same
+DataFrame conversion as live responses.
+"""
+
+import itertools
+import json
+import os
+import random
+import string
+from datetime import datetime
+from typing import Dict, List, Optional
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "market_data_samples.json")
+
+INTERVAL_MS = {
+    "1m": 60_000, "5m": 5 * 60_000, "15m": 15 * 60_000, "30m": 30 * 60_000,
+    "1h": 3600_000, "4h": 4 * 3600_000, "1d": 24 * 3600_000,
+}
+
+# Fixed end time so every run sees identical data
+END_TIME_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+
+
+def load_fixture_candles() -> Dict[str, List[dict]]:
+    """Return fixture 1h candles by symbol (tests/fixtures/market_data_samples.json)."""
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        samples = json.load(f)
+    return {
+        sample["symbol"]: sample["data"]
+        for key, sample in samples.items()
+        if key.endswith("_1h") and sample.get("data")
+    }
+
+
+def _fixture_to_kline(candle: dict, interval_ms: int) -> list:
+    open_time = int(datetime.fromisoformat(candle["timestamp"].replace("Z", "+00:00")).timestamp() * 1000)
+    return [open_time, candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"],
+            open_time + interval_ms - 1, "0", 100, "0", "0", "0"]
+
+
+def synthetic_klines(symbol: str, interval: str, limit: int, seed_candles: Optional[List[dict]] = None,
+                     end_time_ms: int = END_TIME_MS) -> List[list]:
+    """
+    Deterministic random-walk klines ending at end_time_ms.
+
+    When fixture candles are given they become the first bars and set the
+    starting price; the walk continues from their last close.
+    """
+    interval_ms = INTERVAL_MS[interval]
+    rng = random.Random(f"{symbol}:{interval}")
+    klines = [_fixture_to_kline(c, interval_ms) for c in (seed_candles or [])][:limit]
+    price = float(klines[-1][4]) if klines else rng.uniform(1, 50000)
+    start = end_time_ms - end_time_ms % interval_ms - limit * interval_ms
+    for i in range(len(klines), limit):
+        open_time = start + i * interval_ms
+        open_price = price
+        close = max(open_price * (1 + rng.gauss(0, 0.01)), 0.0001)
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.004)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.004)))
+        volume = rng.uniform(100, 5000)
+        klines.append([open_time, f"{open_price:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}",
+                       f"{volume:.8f}", open_time + interval_ms - 1, f"{volume * close:.8f}",
+                       rng.randint(100, 5000), f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", "0"])
+        price = close
+    if seed_candles:
+        # Re-time fixture bars so the series stays contiguous
+        for i, kline in enumerate(klines):
+            kline[0] = start + i * interval_ms
+            kline[6] = kline[0] + interval_ms - 1
+    return klines
+
+
+def benchmark_symbols(count: int) -> List[str]:
+    """Valid XXXUSDT symbols; BTC and ETH (fixture-seeded) come first."""
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    for letters in itertools.product(string.ascii_uppercase, repeat=3):
+        if len(symbols) >= count:
+            break
+        symbol = "".join(letters) + "USDT"
+        if symbol not in symbols:
+            symbols.append(symbol)
+    return symbols[:count]
+
+
+class StubBinanceClient:
+    """
+    Offline stand-in for BinanceApiClient.get_klines.
+
+    Responses are generated once per (symbol, interval, limit) and served from
+    memory, so benchmarks measure processing rather than data generation.
+    """
+
+    def __init__(self, use_fixtures: bool = True):
+        self._fixtures = load_fixture_candles() if use_fixtures else {}
+        self._responses: Dict[tuple, List[list]] = {}
+
+    def get_klines(self, symbol: str, interval: str, limit: int, trace_id: Optional[str] = None) -> list:
+        key = (symbol, interval, limit)
+        if key not in self._responses:
+            seed = self._fixtures.get(symbol) if interval == "1h" else None
+            self._responses[key] = synthetic_klines(symbol, interval, limit, seed)
+        return self._responses[key]
@@ -0,0 +1,335 @@
+"""
+Local Binance REST stand-in for load and latency testing.
+
+Serves deterministic synthetic klines (benchmarks/data.py) on /api/v3/klines,
+plus /api/v3/time and /api/v3/ping, with the behaviour the market data stack
+has to survive in production:
+
+- configurable per-request latency distributions
+- request weight accounting with X-MBX-USED-WEIGHT-1M headers
+- 429 when the per-minute weight limit is exceeded, 418 (ban) when a client
+  keeps sending during the Retry-After window, both with Retry-After
+- random 429/418 injection
+- deterministic gap injection (missing candles)
+
+Usage:
+    python -m benchmarks.fake_binance --port 8081 --latency lognormal:25:0.5 --weight-limit 1200
+
+    with FakeBinanceServer(latency="uniform:5:20", gap_rate=0.01) as server:
+        client = BinanceApiClient(logger=logger, base_url=server.base_url)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .data import INTERVAL_MS, load_fixture_candles, synthetic_klines
+
+API_PREFIX = "/api/v3"
+MAX_KLINES_LIMIT = 1000
+
+
+class LatencyModel:
+    """
+    Per-request delay in milliseconds.
+
+    Specs:
+        "0" or "fixed:<ms>"
+        "uniform:<low_ms>:<high_ms>"
+        "normal:<mean_ms>:<stdev_ms>"         (clamped at 0)
+        "lognormal:<median_ms>:<sigma>"       (long right tail, like real RTTs)
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        parts = str(spec).split(":")
+        if len(parts) == 1:
+            parts = ["fixed", parts[0]]
+        self.kind, args = parts[0], parts[1:]
+        expected = 1 if self.kind == "fixed" else 2
+        if self.kind not in self.KINDS or len(args) != expected:
+            raise ValueError(f"Invalid latency spec {spec!r}; expected one of {', '.join(self.KINDS)}")
+        self.args = [float(a) for a in args]
+        self.spec = spec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                return self.args[0]
+            if self.kind == "uniform":
+                return self._rng.uniform(*self.args)
+            if self.kind == "normal":
+                return max(0.0, self._rng.gauss(*self.args))
+            median, sigma = self.args
+            return median * self._rng.lognormvariate(0, sigma)
+
+
+def klines_weight(limit: int) -> int:
+    """Request weight of /klines by limit, as documented by Binance."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightLimiter:
+    """
+    Per-minute request weight with Binance's escalation.
+
+    Exceeding the limit answers 429 until the minute rolls over; requests sent
+    while a 429 Retry-After is pending get the IP banned (418) for ban_seconds.
+    """
+
+    def __init__(self, limit: Optional[int] = 1200, ban_seconds: float = 120, clock=time.time):
+        self.limit = limit
+        self.ban_seconds = ban_seconds
+        self._clock = clock
+        self._minute = None
+        self._used = 0
+        self._retry_at = 0.0
+        self._banned_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int) -> Tuple[Optional[int], int, int]:
+        """
+        Charge a request.
+
+        Returns:
+            (error status or None, used weight this minute, Retry-After seconds)
+        """
+        with self._lock:
+            now = self._clock()
+            minute = int(now // 60)
+            if minute != self._minute:
+                self._minute, self._used = minute, 0
+            if now < self._banned_until:
+                return 418, self._used, _ceil_seconds(self._banned_until - now)
+            if now < self._retry_at:
+                self._banned_until = now + self.ban_seconds
+                return 418, self._used, _ceil_seconds(self.ban_seconds)
+            self._used += weight
+            if self.limit is not None and self._used > self.limit:
+                self._retry_at = (minute + 1) * 60
+                return 429, self._used, _ceil_seconds(self._retry_at - now)
+            return None, self._used, 0
+
+
+def _ceil_seconds(seconds: float) -> int:
+    return max(1, int(seconds + 0.999))
+
+
+class FakeBinanceServer:
+    """Threaded HTTP server emulating the Binance market data endpoints."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "0",
+                 weight_limit: Optional[int] = 1200, ban_seconds: float = 120,
+                 error_429_rate: float = 0.0, error_418_rate: float = 0.0, injected_retry_after: int = 1,
+                 gap_rate: float = 0.0, end_time_ms: Optional[int] = None, use_fixtures: bool = True,
+                 seed: int = 0):
+        """
+        Args:
+            host, port: Bind address (port 0 picks a free port)
+            latency: LatencyModel spec applied to every request
+            weight_limit: Request weight allowed per minute (None disables limiting)
+            ban_seconds: Retry-After of 418 bans
+            error_429_rate, error_418_rate: Probability of injecting these errors per request
+            injected_retry_after: Retry-After seconds of injected errors
+            gap_rate: Fraction of candles dropped from kline responses (deterministic per candle)
+            end_time_ms: Close of the newest candle when the request has no endTime
+                         (default: current time, so data looks live)
+            use_fixtures: Seed BTC/ETH 1h series from tests/fixtures/market_data_samples.json
+            seed: Seed of latency and error injection
+        """
+        self.latency = LatencyModel(latency, seed=seed)
+        self.limiter = WeightLimiter(weight_limit, ban_seconds)
+        self.error_429_rate = error_429_rate
+        self.error_418_rate = error_418_rate
+        self.injected_retry_after = injected_retry_after
+        self.gap_rate = gap_rate
+        self.end_time_ms = end_time_ms
+        self._fixtures = load_fixture_candles() if use_fixtures else {}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakeBinanceServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-binance", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeBinanceServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        """Responses served, keyed "<endpoint> <status>"."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    # --- Request handling ---
+
+    def handle(self, path: str, query: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        """Return (status, JSON body, extra headers) for a GET request."""
+        endpoint = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path
+        if endpoint == "/klines":
+            status, body, headers = self._klines(query)
+        elif endpoint == "/time":
+            status, body, headers = self._charged(1, lambda: {"serverTime": int(time.time() * 1000)})
+        elif endpoint == "/ping":
+            status, body, headers = self._charged(1, lambda: {})
+        else:
+            status, body, headers = 404, {"code": -1000, "msg": f"Unknown endpoint {path}"}, {}
+        with self._stats_lock:
+            self._stats[f"{endpoint} {status}"] += 1
+        return status, body, headers
+
+    def _klines(self, query: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        symbol = query.get("symbol", "")
+        interval = query.get("interval", "")
+        try:
+            limit = int(query.get("limit", 500))
+            end_time = int(query["endTime"]) if "endTime" in query else None
+        except ValueError:
+            return 400, {"code": -1100, "msg": "Illegal characters found in a parameter."}, {}
+        if not symbol.isalnum() or not symbol.isupper():
+            return 400, {"code": -1121, "msg": "Invalid symbol."}, {}
+        if interval not in INTERVAL_MS:
+            return 400, {"code": -1120, "msg": "Invalid interval."}, {}
+        if not 1 <= limit <= MAX_KLINES_LIMIT:
+            return 400, {"code": -1130, "msg": "Invalid data sent for a parameter: limit."}, {}
+        return self._charged(klines_weight(limit), lambda: self._kline_rows(symbol, interval, limit, end_time))
+
+    def _charged(self, weight: int, build) -> Tuple[int, Any, Dict[str, str]]:
+        status, used, retry_after = self.limiter.acquire(weight)
+        if status is None:
+            status = self._injected_error()
+            retry_after = self.injected_retry_after
+        headers = {"X-MBX-USED-WEIGHT-1M": str(used), "X-MBX-USED-WEIGHT": str(used)}
+        if status == 429:
+            headers["Retry-After"] = str(retry_after)
+            return 429, {"code": -1003, "msg": "Too many requests; current limit is exceeded."}, headers
+        if status == 418:
+            headers["Retry-After"] = str(retry_after)
+            return 418, {"code": -1003, "msg": "Way too many requests; IP banned."}, headers
+        return 200, build(), headers
+
+    def _injected_error(self) -> Optional[int]:
+        if not (self.error_429_rate or self.error_418_rate):
+            return None
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.error_418_rate:
+            return 418
+        if roll < self.error_418_rate + self.error_429_rate:
+            return 429
+        return None
+
+    def _kline_rows(self, symbol: str, interval: str, limit: int, end_time: Optional[int]) -> list:
+        if end_time is None:
+            end_time = self.end_time_ms if self.end_time_ms is not None else int(time.time() * 1000)
+        seed = self._fixtures.get(symbol) if interval == "1h" else None
+        rows = synthetic_klines(symbol, interval, limit, seed, end_time_ms=end_time)
+        if self.gap_rate:
+            rows = [row for row in rows if not self._is_gap(symbol, interval, row[0])]
+        return rows
+
+    def _is_gap(self, symbol: str, interval: str, open_time: int) -> bool:
+        key = f"{symbol}:{interval}:{open_time}".encode()
+        return zlib.crc32(key) / 0xFFFFFFFF < self.gap_rate
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    fake: FakeBinanceServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients with a requests.Session reuse connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        fake = self.server.fake
+        delay_ms = fake.latency.sample_ms()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, body, headers = fake.handle(url.path, query)
+        data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # thousands of requests per second; use stats() instead
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local Binance REST stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", default="0", help="fixed:<ms> | uniform:<lo>:<hi> | normal:<mean>:<sd> | "
+                                                        "lognormal:<median>:<sigma>")
+    parser.add_argument("--weight-limit", type=int, default=1200, help="Weight per minute (0 disables)")
+    parser.add_argument("--ban-seconds", type=float, default=120)
+    parser.add_argument("--error-429-rate", type=float, default=0.0)
+    parser.add_argument("--error-418-rate", type=float, default=0.0)
+    parser.add_argument("--gap-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakeBinanceServer(
+        host=args.host, port=args.port, latency=args.latency, weight_limit=args.weight_limit or None,
+        ban_seconds=args.ban_seconds, error_429_rate=args.error_429_rate,
+        error_418_rate=args.error_418_rate, gap_rate=args.gap_rate, seed=args.seed
+    )
+    print(f"Fake Binance serving {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
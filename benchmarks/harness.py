@@ -0,0 +1,50 @@
+"""
+Timing harness shared by the benchmark modules.
+"""
+
+import gc
+import statistics
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int = 20, warmup: int = 2,
+            params: Optional[Dict[str, Any]] = None, items: int = 1) -> Dict[str, Any]:
+    """
+    Run func repeatedly and summarize wall time per call.
+
+    Args:
+        name: Benchmark name (dotted, e.g. "market_data.get_market_data")
+        func: Zero-argument callable; one call is one measured sample
+        repeat: Number of measured samples
+        warmup: Unmeasured calls before sampling (imports, caches)
+        params: Parameters recorded with the result (e.g. {"symbols": 100})
+        items: Work items per call (symbols, records) for the throughput figure
+    """
+    for _ in range(warmup):
+        func()
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    mean_ms = statistics.fmean(samples)
+    return {
+        "name": name,
+        "params": params or {},
+        "repeat": repeat,
+        "mean_ms": round(mean_ms, 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "items_per_sec": round(items * 1000 / mean_ms, 2) if mean_ms else None,
+    }
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Stable identifier of a benchmark result across runs."""
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]" if params else result["name"]
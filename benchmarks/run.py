@@ -0,0 +1,147 @@
+"""
+Benchmark runner.
+
+Runs the market data, logging and OMS benchmarks against the stub API client
+and writes the results as JSON (one file per commit) for comparison between
+commits.
+
+Usage:
+    python -m benchmarks.run                                  # full suite
+    python -m benchmarks.run --quick --symbols 1,10           # smoke run
+    python -m benchmarks.run --only market_data,oms
+    python -m benchmarks.run --compare benchmarks/results/<commit>.json --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import bench_logging, bench_market_data, bench_oms
+from .harness import result_key
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SUITES = ("market_data", "logging", "oms")
+DEFAULT_SYMBOL_COUNTS = (1, 10, 100, 1000)
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and interpreter details stored with every result file."""
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def run_suites(suites: List[str], symbol_counts: List[int], quick: bool = False) -> List[Dict[str, Any]]:
+    results = []
+    for suite in suites:
+        start = time.perf_counter()
+        if suite == "market_data":
+            results.extend(bench_market_data.run(symbol_counts, quick))
+        elif suite == "logging":
+            results.extend(bench_logging.run(quick))
+        elif suite == "oms":
+            results.extend(bench_oms.run(symbol_counts, quick))
+        print(f"  {suite}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare median times of benchmarks present in both runs.
+
+    A ratio above 1 + threshold is a regression, below 1 - threshold an improvement.
+    """
+    baseline_by_key = {result_key(r): r for r in baseline}
+    rows = []
+    for result in current:
+        key = result_key(result)
+        previous = baseline_by_key.get(key)
+        if not previous or not previous["median_ms"]:
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "same"
+        rows.append({"benchmark": key, "baseline_ms": previous["median_ms"],
+                     "current_ms": result["median_ms"], "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def _print_results(results: List[Dict[str, Any]]):
+    print(f"{'benchmark':<60} {'median ms':>12} {'p95 ms':>12} {'items/s':>12}")
+    for result in results:
+        print(f"{result_key(result):<60} {result['median_ms']:>12.4f} {result['p95_ms']:>12.4f} "
+              f"{result['items_per_sec'] or 0:>12.1f}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]):
+    print(f"\n{'benchmark':<60} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for row in rows:
+        marker = {"regression": " !", "improvement": " +"}.get(row["status"], "")
+        print(f"{row['benchmark']:<60} {row['baseline_ms']:>10.4f} {row['current_ms']:>10.4f} "
+              f"{row['ratio']:>7.3f}{marker}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite")
+    parser.add_argument("--only", help=f"Comma-separated suites ({','.join(SUITES)})")
+    parser.add_argument("--symbols", help="Comma-separated symbol counts (default 1,10,100,1000)")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions (smoke run)")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 on regressions")
+    args = parser.parse_args(argv)
+
+    suites = args.only.split(",") if args.only else list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+    symbol_counts = [int(n) for n in args.symbols.split(",")] if args.symbols else list(DEFAULT_SYMBOL_COUNTS)
+
+    meta = environment()
+    meta.update({"suites": suites, "symbol_counts": symbol_counts, "quick": args.quick})
+    print(f"Running benchmarks at {meta['commit']}{' (dirty)' if meta['dirty'] else ''}", file=sys.stderr)
+    results = run_suites(suites, symbol_counts, args.quick)
+    _print_results(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{meta['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline["results"], args.threshold)
+        _print_comparison(rows)
+        if args.fail_on_regression and any(row["status"] == "regression" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Soak test of the market data stack against the local Binance stand-in.
+
+Worker threads call MarketDataService.get_market_data with a real
+BinanceApiClient pointed at benchmarks.fake_binance, at a target request
+rate, and report throughput, latency percentiles and errors by type.
+
+Usage:
+    python -m benchmarks.soak --duration 60 --workers 8 --rate 20 --latency lognormal:30:0.6
+    python -m benchmarks.soak --url http://127.0.0.1:8081/api/v3    # external fake server
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system.json_formatter import StructuredLogger
+from src.logging_system.metrics import Histogram, MetricsRegistry
+from src.logging_system.trace_generator import get_trace_id
+from src.market_data.market_data_service import MarketDataService
+
+from .data import benchmark_symbols
+from .fake_binance import FakeBinanceServer
+
+
+def soak(base_url: str, duration_seconds: float = 30, workers: int = 4, rate: Optional[float] = None,
+         symbols: int = 10) -> Dict[str, Any]:
+    """
+    Run get_market_data from worker threads for duration_seconds.
+
+    Args:
+        base_url: REST root of the server under test
+        duration_seconds: Test length
+        workers: Concurrent worker threads (each with its own client session)
+        rate: Target get_market_data calls per second across workers (None = as fast as possible)
+        symbols: Number of distinct symbols cycled through
+    """
+    names = benchmark_symbols(symbols)
+    registry = MetricsRegistry()
+    latency = Histogram()
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration_seconds
+    interval = workers / rate if rate else 0.0
+
+    def worker(index: int):
+        client = BinanceApiClient(logger=StructuredLogger("soak.client", "SoakClient"),
+                                  metrics=registry, base_url=base_url)
+        service = MarketDataService(api_client=client, logger=None, metrics=registry)
+        next_at = time.perf_counter() + interval * index / workers
+        call = index
+        while True:
+            if interval:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += interval
+            if time.perf_counter() >= deadline:
+                break
+            symbol = names[call % len(names)]
+            call += workers
+            start = time.perf_counter()
+            try:
+                service.get_market_data(symbol, trace_id=get_trace_id())
+                outcome = "ok"
+            except Exception as e:
+                outcome = type(e).__name__
+            latency.observe((time.perf_counter() - start) * 1000)
+            with lock:
+                outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"soak-{i}") for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    snapshot = latency.snapshot()
+    api = [h for h in registry.snapshot()["histograms"] if h["name"] == "api_request_duration_ms"]
+    return {
+        "duration_seconds": round(elapsed, 2),
+        "workers": workers,
+        "target_rate": rate,
+        "calls": latency.count,
+        "calls_per_sec": round(latency.count / elapsed, 2) if elapsed else None,
+        "outcomes": dict(outcomes),
+        "latency_ms": {k: snapshot[k] for k in ("min", "p50", "p90", "p99", "max")},
+        "api_requests": api[0]["count"] if api else 0,
+        "api_latency_ms": {k: api[0][k] for k in ("p50", "p90", "p99")} if api else {},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Soak-test get_market_data against a fake Binance server")
+    parser.add_argument("--url", help="Use a running server instead of starting one in-process")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, help="Target get_market_data calls per second")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--latency", default="lognormal:20:0.5")
+    parser.add_argument("--weight-limit", type=int, default=0, help="Weight per minute (0 disables)")
+    parser.add_argument("--error-429-rate", type=float, default=0.0)
+    parser.add_argument("--gap-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    # Client request logs would dominate the measurement; failures are counted in outcomes
+    logging.getLogger("soak.client").setLevel(logging.CRITICAL)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = FakeBinanceServer(latency=args.latency, weight_limit=args.weight_limit or None,
+                                   error_429_rate=args.error_429_rate, gap_rate=args.gap_rate).start()
+        base_url = server.base_url
+    try:
+        report = soak(base_url, args.duration, args.workers, args.rate, args.symbols)
+        if server:
+            report["server"] = server.stats()
+    finally:
+        if server:
+            server.stop()
+    print(json.dumps(report, indent=2))
+    return 0 if report["calls"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
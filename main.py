@@ -15,9 +15,16 @@ from pathlib import Path
 from src.infrastructure.binance_client import BinanceApiClient
 from src.infrastructure.sentiment_client import SentimentApiClient
 from src.market_data.market_data_service import MarketDataService
-from src.logging_system.logger_config import configure_ai_logging, get_ai_logger, MarketDataLogger
+from src.market_data.context_diff import ContextDiffTracker
+from src.logging_system.logger_config import configure_ai_logging, get_ai_logger, shutdown_logging, MarketDataLogger
+from src.logging_system.metrics import MetricsExporter
+from src.logging_system.profiling import configure_profiling
 from src.trading.oms import OrderManagementSystem
 from src.trading.oms_repository import OmsRepository
+from src.trading.event_store import OrderEventStore
+from src.trading.archive import OrderArchive
+from src.trading.write_behind import WriteBehindPersister
+from src.trading.paper_exchange import PaperExchange
 from src.trading.trading_cycle import TradingCycle
 
 
@@ -45,16 +52,45 @@ def create_data_directories():
 
 def main():
     """Main application entry point."""
+    metrics_exporter = None
+    write_behind = None
+    order_archive = None
     try:
         # Load configuration
         config = load_config()
         
         # Setup advanced logging
         log_config = config.get('logging', {})
+        trace_store_config = dict(log_config.get('trace_store') or {})
+        if not trace_store_config.pop('enabled', False):
+            trace_store_config = None
         configure_ai_logging(
             log_level="DEBUG",  # Always use DEBUG for demo and development
             log_file=log_config.get('file', 'logs/trading_system.log'),
-            console_output=True
+            console_output=True,
+            async_mode=log_config.get('async_mode', False),
+            queue_size=log_config.get('queue_size', 10000),
+            overflow_policy=log_config.get('overflow_policy', 'drop_debug'),
+            formatter=log_config.get('formatter', 'standard'),
+            payload_limits=log_config.get('payload'),
+            trace_store=trace_store_config,
+            compression=log_config.get('compression'),
+            rotate_interval_seconds=log_config.get('rotate_interval_seconds')
+        )
+
+        # Export stage latency histograms and counters
+        metrics_config = log_config.get('metrics') or {}
+        if metrics_config.get('snapshot_file') or metrics_config.get('http_port') is not None:
+            metrics_exporter = MetricsExporter(
+                snapshot_file=metrics_config.get('snapshot_file'),
+                interval_seconds=metrics_config.get('snapshot_interval_seconds', 60),
+                http_port=metrics_config.get('http_port')
+            ).start()
+
+        profiling_config = log_config.get('profiling') or {}
+        configure_profiling(
+            enabled=profiling_config.get('enabled', False),
+            trace_allocations=profiling_config.get('trace_allocations', False)
         )
 
         # Create a dedicated logger for the main application
@@ -96,16 +132,45 @@ def main():
 
         # 4. OMS Repository (In-memory DB for demo)
         repo_logger = MarketDataLogger("OmsRepository", service_name="OmsRepository")
-        oms_repository = OmsRepository(db_path=":memory:", logger=repo_logger)
-        print("   - OmsRepository (in-memory) initialized.")
+        oms_config = config['execution'].get('oms') or {}
+        event_log_config = dict(oms_config.get('event_log') or {})
+        if event_log_config.pop('enabled', False):
+            oms_repository = OrderEventStore(db_path=":memory:", logger=repo_logger, **event_log_config)
+            print("   - OrderEventStore (in-memory) initialized.")
+        else:
+            oms_repository = OmsRepository(db_path=":memory:", logger=repo_logger)
+            print("   - OmsRepository (in-memory) initialized.")
 
         # 5. Order Management System
         oms_logger = MarketDataLogger("OMS", service_name="OMS")
-        oms = OrderManagementSystem(repository=oms_repository, logger=oms_logger)
+        write_behind_config = dict(oms_config.get('write_behind') or {})
+        if write_behind_config.pop('enabled', False):
+            write_behind = WriteBehindPersister(oms_repository, logger=oms_logger, **write_behind_config)
+        archive_config = dict(oms_config.get('archive') or {})
+        if archive_config.pop('enabled', False):
+            order_archive = OrderArchive(oms_repository, logger=oms_logger, **archive_config)
+            order_archive.archive(trace_id="oms_startup")
+        paper_exchange = None
+        if config['execution'].get('paper_trading'):
+            paper_exchange = PaperExchange(
+                slippage_tolerance=config['execution'].get('slippage_tolerance', 0.001),
+                logger=MarketDataLogger("PaperExchange", service_name="PaperExchange")
+            )
+        oms = OrderManagementSystem(repository=oms_repository, logger=oms_logger, write_behind=write_behind,
+                                    archive=order_archive, exchange=paper_exchange)
         print("   - OrderManagementSystem initialized.")
 
-        # 6. Trading Cycle
-        trading_cycle = TradingCycle(oms=oms, market_data_service=market_data_service)
+        # 6. Trading Cycle (optionally with delta context mode)
+        context_config = config['llm'].get('context', {})
+        context_tracker = None
+        if context_config.get('mode') == 'delta':
+            context_tracker = ContextDiffTracker(
+                full_snapshot_interval=context_config.get('full_snapshot_interval', 24),
+                logger=MarketDataLogger("ContextDiffTracker", service_name="ContextDiffTracker"),
+                debug_stats=context_config.get('debug_stats', False)
+            )
+        trading_cycle = TradingCycle(oms=oms, market_data_service=market_data_service, context_tracker=context_tracker,
+                                     paper_exchange=paper_exchange)
         print("   - TradingCycle initialized.")
         print("✅ All components are ready.")
         print("-" * 30)
@@ -118,6 +183,17 @@ def main():
     except Exception as e:
         logging.getLogger(__name__).critical(f"Application startup failed: {e}", exc_info=True)
         raise
+    finally:
+        # Commit queued order writes
+        if write_behind:
+            write_behind.close()
+        if order_archive:
+            order_archive.close()
+        # Write the final metrics snapshot
+        if metrics_exporter:
+            metrics_exporter.stop()
+        # Flush records still queued in async logging mode
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
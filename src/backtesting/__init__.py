@@ -0,0 +1,17 @@
+"""
+Backtesting - replay of historical klines through the trading pipeline.
+
+- Incremental indicators matching MarketDataService (RSI, MACD, MA20/50)
+- Pluggable decision function (basic_trading_decision by default)
+- Fills simulated by PaperExchange through the OMS
+- Equity curve and trade log per run
+"""
+
+from .data import iter_klines, iter_klines_csv, write_klines_csv
+from .engine import Backtester, BacktestResult, Trade
+from .indicators import IncrementalIndicators, IndicatorSnapshot
+
+__all__ = [
+    "Backtester", "BacktestResult", "Trade", "IncrementalIndicators", "IndicatorSnapshot",
+    "iter_klines", "iter_klines_csv", "write_klines_csv",
+]
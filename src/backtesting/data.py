@@ -0,0 +1,44 @@
+"""
+Historical kline sources for the backtester.
+
+Klines are streamed as DataFrame chunks in the MarketDataService layout
+(timestamp, open, high, low, close, volume), so a year of history never has
+to be converted in one piece.
+"""
+
+from typing import Iterator, Sequence
+
+import pandas as pd
+
+from src.market_data.market_data_service import klines_to_dataframe
+
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+
+
+def iter_klines(klines_data: Sequence[list], chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+    """Raw Binance kline rows (as returned by get_klines) in DataFrame chunks."""
+    for start in range(0, len(klines_data), chunk_size):
+        yield klines_to_dataframe(klines_data[start:start + chunk_size])
+
+
+def iter_klines_csv(path: str, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+    """
+    Klines stored as CSV in the Binance kline layout (the 12 get_klines
+    columns, as in Binance public data dumps), with or without a header row.
+    """
+    with open(path) as f:
+        has_header = not f.readline().split(",")[0].strip().isdigit()
+    reader = pd.read_csv(path, header=None, names=KLINE_COLUMNS, skiprows=1 if has_header else 0,
+                         usecols=range(6), chunksize=chunk_size)
+    for chunk in reader:
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'], unit='ms').dt.tz_localize('UTC')
+        yield chunk.reset_index(drop=True)
+
+
+def write_klines_csv(klines_data: Sequence[list], path: str):
+    """Stores raw kline rows as a headerless Binance-layout CSV readable by iter_klines_csv."""
+    pd.DataFrame(list(klines_data), columns=KLINE_COLUMNS).to_csv(path, header=False, index=False)
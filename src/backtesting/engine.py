@@ -0,0 +1,239 @@
+"""
+Event-driven backtester.
+
+Replays historical bars one at a time through the same components the live
+pipeline uses: indicators (updated incrementally), a decision function
+(basic_trading_decision by default), the OrderManagementSystem and the
+PaperExchange that fills its orders. Orders are stamped with the simulated
+bar close time, so an order placed on a bar can only fill on later bars.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry
+from src.market_data.market_data_service import basic_trading_decision
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.paper_exchange import ENTRY, Fill, PaperExchange
+
+from .indicators import IncrementalIndicators, IndicatorSnapshot
+
+
+@dataclass
+class Trade:
+    """One closed round trip."""
+    order_id: str
+    entry_time: str
+    exit_time: str
+    entry_price: float
+    exit_price: float
+    quantity: float
+    exit_reason: str   # STOP_LOSS | TAKE_PROFIT | MARKET_EXIT fill kind
+    pnl: float         # net of fees
+    fees: float
+    return_pct: float  # pnl relative to the margin committed
+
+
+@dataclass
+class BacktestResult:
+    """Equity curve (marked to market at every bar close) and trade log of a run."""
+    symbol: str
+    initial_equity: float
+    equity_curve: pd.Series
+    trades: pd.DataFrame
+
+    def summary(self) -> Dict[str, Any]:
+        equity = self.equity_curve.to_numpy()
+        final = float(equity[-1]) if len(equity) else self.initial_equity
+        drawdown = 0.0
+        if len(equity):
+            peaks = np.maximum.accumulate(np.concatenate([[self.initial_equity], equity]))[1:]
+            drawdown = float(((peaks - equity) / peaks).max() * 100)
+        wins = int((self.trades["pnl"] > 0).sum()) if len(self.trades) else 0
+        return {
+            "symbol": self.symbol,
+            "bars": len(equity),
+            "final_equity": final,
+            "total_return_pct": (final / self.initial_equity - 1) * 100,
+            "max_drawdown_pct": drawdown,
+            "trades": len(self.trades),
+            "win_rate_pct": wins / len(self.trades) * 100 if len(self.trades) else 0.0,
+        }
+
+
+class Backtester:
+    """
+    Long-only single-symbol backtest.
+
+    On every bar the exchange first matches resting orders against the bar,
+    then indicators are updated with its close and the decision is taken:
+    "buy" with no position places a limit entry at the close (filled on a
+    later bar that trades through it), "sell" closes an open position at the
+    next bar's open or cancels an unfilled entry. Margin is
+    ``position_fraction`` of current equity; fees are charged on both legs.
+    """
+
+    def __init__(self, symbol: str, decision: Callable[[IndicatorSnapshot], str] = basic_trading_decision,
+                 interval: str = "1h", initial_equity: float = 10000.0, position_fraction: float = 0.1,
+                 leverage: int = 10, slippage_tolerance: float = 0.001, fee_rate: float = 0.0004,
+                 stop_loss_pct: Optional[float] = None, take_profit_pct: Optional[float] = None,
+                 warmup_bars: int = 50, logger: Optional[MarketDataLogger] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Args:
+            symbol: Traded symbol.
+            decision: Maps an IndicatorSnapshot to "buy", "sell" or "hold".
+            interval: Bar length (Binance interval such as "1h"); orders are stamped at bar close.
+            initial_equity: Starting account equity.
+            position_fraction: Share of equity committed as margin per trade.
+            leverage: Position leverage.
+            slippage_tolerance: Slippage of stop-loss and market exits (see PaperExchange).
+            fee_rate: Fee per leg as a share of notional.
+            stop_loss_pct: Optional stop loss distance from entry, e.g. 0.02.
+            take_profit_pct: Optional take profit distance from entry.
+            warmup_bars: Bars fed to the indicators before the first decision.
+            logger: Logger instance.
+            metrics: Metrics registry (a private one by default, so runs do not pollute the global registry).
+        """
+        self.symbol = symbol
+        self.decision = decision
+        self.interval_ns = pd.Timedelta(interval).value
+        self.initial_equity = initial_equity
+        self.position_fraction = position_fraction
+        self.leverage = leverage
+        self.slippage_tolerance = slippage_tolerance
+        self.fee_rate = fee_rate
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.warmup_bars = warmup_bars
+        self.logger = logger
+        self.metrics = metrics or MetricsRegistry()
+
+    def run(self, bars: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> BacktestResult:
+        """
+        Replays bars (timestamp, open, high, low, close), given as one
+        DataFrame or as an iterable of consecutive chunks (see iter_klines).
+        """
+        start = time.perf_counter()
+        chunks = [bars] if isinstance(bars, pd.DataFrame) else bars
+        run = _Run(self)
+        try:
+            for chunk in chunks:
+                if not chunk.empty:
+                    run.feed(chunk)
+        finally:
+            run.close()
+        result = run.result()
+        self.metrics.observe_ms("backtest_run_duration_ms", start)
+        self.metrics.counter("backtest_bars_total").inc(len(result.equity_curve))
+        if self.logger:
+            self.logger.log_operation_complete("backtest", context=result.summary())
+        return result
+
+
+class _Run:
+    """State of one Backtester.run(): simulated OMS/exchange, cash, open position and outputs."""
+
+    def __init__(self, config: Backtester):
+        self.config = config
+        self.indicators = IncrementalIndicators()
+        self.exchange = PaperExchange(config.slippage_tolerance, metrics=config.metrics)
+        self.repository = OmsRepository(":memory:", metrics=config.metrics)
+        self.now_ns = 0
+        self.oms = OrderManagementSystem(self.repository, exchange=self.exchange, clock=self._clock)
+        # Registered after the OMS, so order statuses are already updated when fills arrive here
+        self.exchange.add_listener(self._on_fills)
+        self.cash = config.initial_equity
+        self.order_id: Optional[str] = None
+        self.position: Optional[Dict[str, Any]] = None
+        self.bars_seen = 0
+        self.times: List[np.ndarray] = []
+        self.equity: List[np.ndarray] = []
+        self.trades: List[Trade] = []
+
+    def _clock(self) -> datetime:
+        return pd.Timestamp(self.now_ns, tz="UTC").to_pydatetime()
+
+    def feed(self, chunk: pd.DataFrame):
+        times = chunk["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        opens = chunk["open"].to_numpy(dtype=float)
+        highs = chunk["high"].to_numpy(dtype=float)
+        lows = chunk["low"].to_numpy(dtype=float)
+        closes = chunk["close"].to_numpy(dtype=float)
+        equity = np.empty(len(times))
+        config, symbol = self.config, self.config.symbol
+        for i in range(len(times)):
+            if self.order_id is not None:
+                self.exchange.on_bar_arrays(symbol, times[i:i + 1], opens[i:i + 1], highs[i:i + 1], lows[i:i + 1])
+            close = float(closes[i])
+            snapshot = self.indicators.update(int(times[i]), close)
+            self.bars_seen += 1
+            self.now_ns = int(times[i]) + config.interval_ns
+            if self.bars_seen > config.warmup_bars:
+                self._act(str(config.decision(snapshot)).lower(), close)
+            equity[i] = self._mark(close)
+        self.times.append(times)
+        self.equity.append(equity)
+
+    def _act(self, action: str, close: float):
+        config = self.config
+        if action == "buy" and self.order_id is None:
+            margin = self._mark(close) * config.position_fraction
+            stop_loss = close * (1 - config.stop_loss_pct) if config.stop_loss_pct else None
+            take_profit = close * (1 + config.take_profit_pct) if config.take_profit_pct else None
+            self.order_id = self.oms.place_order_if_no_active(config.symbol, "BUY", margin, config.leverage, close,
+                                                              stop_loss=stop_loss, take_profit=take_profit)
+        elif action == "sell" and self.order_id is not None:
+            if self.position is not None:
+                self.oms.close_position(self.order_id)
+            elif self.oms.cancel_order(self.order_id):
+                self.order_id = None
+
+    def _mark(self, close: float) -> float:
+        """Cash plus unrealized PnL of the open position at the given price."""
+        if self.position is None:
+            return self.cash
+        return self.cash + (close - self.position["entry_price"]) * self.position["quantity"]
+
+    def _on_fills(self, fills: List[Fill]):
+        for fill in fills:
+            if fill.order_id != self.order_id:
+                continue
+            if fill.kind == ENTRY:
+                order = self.oms.get_order(fill.order_id)
+                quantity = order["margin"] * order["leverage"] / fill.price
+                fee = fill.price * quantity * self.config.fee_rate
+                self.cash -= fee
+                self.position = {"entry_time": fill.timestamp, "entry_price": fill.price, "quantity": quantity,
+                                 "margin": order["margin"], "fee": fee}
+                continue
+            position, self.position, self.order_id = self.position, None, None
+            quantity = position["quantity"]
+            exit_fee = fill.price * quantity * self.config.fee_rate
+            gross = (fill.price - position["entry_price"]) * quantity
+            self.cash += gross - exit_fee
+            pnl = gross - exit_fee - position["fee"]
+            self.trades.append(Trade(
+                order_id=fill.order_id, entry_time=position["entry_time"], exit_time=fill.timestamp,
+                entry_price=position["entry_price"], exit_price=fill.price, quantity=quantity,
+                exit_reason=fill.kind, pnl=pnl, fees=position["fee"] + exit_fee,
+                return_pct=pnl / position["margin"] * 100,
+            ))
+
+    def close(self):
+        self.repository.close()
+
+    def result(self) -> BacktestResult:
+        times = np.concatenate(self.times) if self.times else np.array([], dtype=np.int64)
+        equity = np.concatenate(self.equity) if self.equity else np.array([])
+        curve = pd.Series(equity, index=pd.to_datetime(times, utc=True), name="equity")
+        trades = pd.DataFrame([asdict(trade) for trade in self.trades],
+                              columns=list(Trade.__dataclass_fields__))
+        return BacktestResult(self.config.symbol, self.config.initial_equity, curve, trades)
@@ -0,0 +1,137 @@
+"""
+Incremental versions of the MarketDataService indicators.
+
+Each indicator consumes one close at a time in O(1) instead of recomputing
+over the candle window on every bar. Rolling indicators (RSI, moving
+averages) match the service's pandas formulas exactly once the window is
+full; EMAs match pandas ``ewm(span=..., adjust=True)`` over the whole stream.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+class RollingMean:
+    """Mean of the last ``period`` values (mean of all values until the window fills)."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self._window: deque = deque()
+        self._sum = 0.0
+
+    def update(self, value: float) -> float:
+        self._window.append(value)
+        self._sum += value
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+        return self._sum / len(self._window)
+
+    @property
+    def full(self) -> bool:
+        return len(self._window) == self.period
+
+
+class EwmMean:
+    """Exponentially weighted mean equal to pandas ``ewm(span=span, adjust=True).mean()``."""
+
+    def __init__(self, span: int):
+        self._decay = 1 - 2 / (span + 1)
+        self._numerator = 0.0
+        self._denominator = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        self._numerator = value + self._decay * self._numerator
+        self._denominator = 1 + self._decay * self._denominator
+        self.count += 1
+        return self._numerator / self._denominator
+
+
+class RollingRSI:
+    """RSI over simple rolling means of gains and losses, as in MarketDataService._calculate_rsi."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._gains = RollingMean(period)
+        self._losses = RollingMean(period)
+        self._previous: Optional[float] = None
+
+    def update(self, close: float) -> float:
+        previous, self._previous = self._previous, close
+        if previous is None:
+            return 50.0
+        delta = close - previous
+        gain = self._gains.update(delta if delta > 0 else 0.0)
+        loss = self._losses.update(-delta if delta < 0 else 0.0)
+        if not self._gains.full:
+            return 50.0  # neutral until period + 1 closes, like the service
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        if gain == 0:
+            return 0.0
+        return 100 - 100 / (1 + gain / loss)
+
+
+class MacdSignal:
+    """MACD(12, 26) against its 9-period signal line: "bullish", "bearish" or "neutral"."""
+
+    def __init__(self):
+        self._fast = EwmMean(12)
+        self._slow = EwmMean(26)
+        self._signal = EwmMean(9)
+
+    def update(self, close: float) -> str:
+        macd = self._fast.update(close) - self._slow.update(close)
+        signal = self._signal.update(macd)
+        if self._slow.count < 26:
+            return "neutral"
+        if macd > signal:
+            return "bullish"
+        if macd < signal:
+            return "bearish"
+        return "neutral"
+
+
+def ma_trend(ma_20: float, ma_50: float) -> str:
+    """MA20 vs MA50 with the service's 2% band (MarketDataService._determine_ma_trend)."""
+    if ma_20 > ma_50 * 1.02:
+        return "uptrend"
+    if ma_20 < ma_50 * 0.98:
+        return "downtrend"
+    return "sideways"
+
+
+@dataclass
+class IndicatorSnapshot:
+    """Indicator values after one bar; exposes the MarketDataSet fields decision rules read."""
+    timestamp: int      # bar open time, ns since epoch (UTC)
+    close: float
+    rsi_14: float
+    macd_signal: str
+    ma_20: float
+    ma_50: float
+    ma_trend: str
+
+
+class IncrementalIndicators:
+    """RSI(14), MACD signal, MA20/MA50 and MA trend updated bar by bar."""
+
+    def __init__(self):
+        self._rsi = RollingRSI(14)
+        self._macd = MacdSignal()
+        self._ma_20 = RollingMean(20)
+        self._ma_50 = RollingMean(50)
+
+    def update(self, timestamp: int, close: float) -> IndicatorSnapshot:
+        ma_20 = self._ma_20.update(close)
+        ma_50 = self._ma_50.update(close)
+        return IndicatorSnapshot(
+            timestamp=timestamp,
+            close=close,
+            rsi_14=self._rsi.update(close),
+            macd_signal=self._macd.update(close),
+            ma_20=ma_20,
+            ma_50=ma_50,
+            ma_trend=ma_trend(ma_20, ma_50),
+        )
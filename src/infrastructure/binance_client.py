@@ -7,13 +7,15 @@ from typing import Optional
 
 from .exceptions import ApiClientError, RateLimitError, APIResponseError, ErrorContext
 from src.logging_system.json_formatter import StructuredLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
 
 class BinanceApiClient:
     """
     A client for interacting with the Binance API.
     Handles request signing, error handling, and rate limiting.
     """
-    def __init__(self, logger: StructuredLogger, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    def __init__(self, logger: StructuredLogger, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None, base_url: str = "https://api.binance.com/api/v3"):
         """
         Initializes the Binance API client.
 
@@ -21,11 +23,14 @@ class BinanceApiClient:
             logger: A configured StructuredLogger instance.
             api_key: Your Binance API key.
             api_secret: Your Binance API secret.
+            metrics: Metrics registry for request latency/count (global registry by default).
+            base_url: REST API root (e.g. a local benchmarks.fake_binance server).
         """
         self.logger = logger
+        self.metrics = metrics or get_metrics_registry()
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://api.binance.com/api/v3"
+        self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
         if self.api_key:
             self.session.headers.update({"X-MBX-APIKEY": self.api_key})
@@ -54,6 +59,7 @@ class BinanceApiClient:
         )
 
         start_time = time.time()
+        start = time.perf_counter()
         try:
             response = self.session.get(endpoint, timeout=5)
             duration = time.time() - start_time
@@ -61,6 +67,7 @@ class BinanceApiClient:
             
             data = response.json()
             server_time = data.get("serverTime")
+            self._record_request("time", start, "ok")
 
             self.logger.info(
                 "Server time request successful",
@@ -75,6 +82,7 @@ class BinanceApiClient:
             return server_time
 
         except (requests.exceptions.RequestException, ApiClientError) as e:
+            self._record_request("time", start, "error")
             self.logger.error(
                 "Failed to get server time",
                 operation="get_server_time",
@@ -83,6 +91,11 @@ class BinanceApiClient:
             )
             raise
 
+    def _record_request(self, endpoint: str, start: float, status: str):
+        """Record request latency and outcome in the metrics registry."""
+        self.metrics.observe_ms("api_request_duration_ms", start, endpoint=endpoint)
+        self.metrics.counter("api_requests_total", endpoint=endpoint, status=status).inc()
+
     def _handle_response(self, response: requests.Response, trace_id: str):
         """
         Centralized handler for API responses. Checks for errors and raises
@@ -112,6 +125,16 @@ class BinanceApiClient:
                 context=ErrorContext(trace_id=trace_id, operation="api_request"),
             )
 
+        if response.status_code == 418:
+            # IP banned for ignoring 429 Retry-After
+            raise RateLimitError(
+                "IP banned for exceeding rate limits",
+                retry_after=response.headers.get("Retry-After"),
+                limit_type="ip_ban",
+                status_code=418,
+                context=ErrorContext(trace_id=trace_id, operation="api_request"),
+            )
+
         try:
             error_data = response.json()
             error_code = error_data.get("code")
@@ -180,12 +203,14 @@ class BinanceApiClient:
         )
 
         start_time = time.time()
+        start = time.perf_counter()
         try:
             response = self.session.get(endpoint, params=params, timeout=10)
             duration = time.time() - start_time
             self._handle_response(response, trace_id)
 
             data = response.json()
+            self._record_request("klines", start, "ok")
 
             self.logger.info(
                 "Klines request successful",
@@ -200,6 +225,7 @@ class BinanceApiClient:
             return data
 
         except (requests.exceptions.RequestException, ApiClientError) as e:
+            self._record_request("klines", start, "error")
             self.logger.error(
                 "Failed to get klines",
                 operation="get_klines",
@@ -25,11 +25,16 @@ class ErrorContext:
     
     This class collects system information and maintains trace IDs
     to support the logging architecture defined in tasks 24-36.
+    
+    Construction is cheap: only (code, line) pairs of the call stack are
+    captured. The formatted stack trace and system information are built on
+    first access (to_dict(), __str__ or the attributes themselves), so
+    contexts created for errors that never get rendered cost almost nothing.
     """
     
     def __init__(self, trace_id: Optional[str] = None, operation: Optional[str] = None):
         """
-        Initialize error context with trace ID and system information.
+        Initialize error context with trace ID and a lightweight stack snapshot.
         
         Args:
             trace_id: Optional trace ID for logging correlation
@@ -38,8 +43,28 @@ class ErrorContext:
         self.trace_id = trace_id or f"err_{uuid.uuid4().hex[:8]}"
         self.operation = operation
         self.timestamp = datetime.now(timezone.utc).isoformat()
-        self.system_info = self._collect_system_info()
-        self.stack_trace = self._get_stack_trace()
+        self._stack_frames = self._capture_stack()
+        self._system_info: Optional[Dict[str, Any]] = None
+        self._stack_trace: Optional[List[str]] = None
+    
+    @property
+    def system_info(self) -> Dict[str, Any]:
+        """System information, collected on first access."""
+        if self._system_info is None:
+            self._system_info = self._collect_system_info()
+        return self._system_info
+    
+    @property
+    def stack_trace(self) -> List[str]:
+        """Formatted stack trace at construction time, formatted on first access."""
+        if self._stack_trace is None:
+            self._stack_trace = self._get_stack_trace()
+        return self._stack_trace
+    
+    @property
+    def stack_depth(self) -> int:
+        """Number of stack frames captured (no formatting needed)."""
+        return len(self._stack_frames)
     
     def _collect_system_info(self) -> Dict[str, Any]:
         """Collect system information for debugging context."""
@@ -50,9 +75,40 @@ class ErrorContext:
             "timestamp": self.timestamp
         }
     
+    @staticmethod
+    def _capture_stack() -> List[tuple]:
+        """
+        Capture (code, instruction offset) pairs of the caller stack, outermost first.
+        
+        Code objects are kept instead of frames so that no local variables are
+        retained; the offset fixes the position at capture time and is mapped to
+        a line number only when the stack is formatted.
+        """
+        frames = []
+        # Skip only this frame: like the former traceback.format_stack()[:-1],
+        # the stack ends with ErrorContext.__init__ (and any overriding __init__)
+        frame = sys._getframe(1)
+        while frame is not None:
+            frames.append((frame.f_code, frame.f_lasti))
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+    
+    @staticmethod
+    def _line_for_offset(code, offset: int) -> Optional[int]:
+        """Map a bytecode offset to its source line number."""
+        for start, end, line in code.co_lines():
+            if start <= offset < end:
+                return line
+        return code.co_firstlineno
+    
     def _get_stack_trace(self) -> List[str]:
-        """Get current stack trace for debugging context."""
-        return traceback.format_stack()[:-1]  # Exclude current frame
+        """Format the captured stack trace for debugging context."""
+        summary = traceback.StackSummary.from_list([
+            traceback.FrameSummary(code.co_filename, self._line_for_offset(code, offset), code.co_name)
+            for code, offset in self._stack_frames
+        ])
+        return summary.format()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert error context to dictionary for logging."""
@@ -61,8 +117,13 @@ class ErrorContext:
             "operation": self.operation,
             "timestamp": self.timestamp,
             "system_info": self.system_info,
-            "stack_depth": len(self.stack_trace)
+            "stack_depth": self.stack_depth
         }
+    
+    def __str__(self) -> str:
+        """Human-readable context with the formatted stack trace."""
+        header = f"ErrorContext(trace_id={self.trace_id}, operation={self.operation}, timestamp={self.timestamp})"
+        return header + "\n" + "".join(self.stack_trace)
 
 
 class ApiClientError(Exception):
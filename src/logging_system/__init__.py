@@ -26,6 +26,9 @@ from .logger_config import (
     configure_ai_logging,
     get_ai_logger,
     reset_logging_state,
+    shutdown_logging,
+    get_async_logging_stats,
+    get_payload_stats,
     MarketDataLogger
 )
 
@@ -36,7 +39,9 @@ from .flow_context import (
     get_flow_context,
     get_flow_summary,
     complete_current_flow,
-    terminate_current_flow
+    terminate_current_flow,
+    submit_with_flow_context,
+    FlowContextExecutor
 )
 
 from .trace_generator import (
@@ -49,12 +54,30 @@ from .json_formatter import (
     get_logger
 )
 
+from .metrics import (
+    MetricsRegistry,
+    MetricsExporter,
+    get_metrics_registry,
+    reset_metrics
+)
+
+from .profiling import (
+    configure_profiling,
+    profile_operation,
+    profile_stage,
+    profiled,
+    get_recent_profiles
+)
+
 __all__ = [
     # Main configuration
     "configure_ai_logging",
     "get_ai_logger",
     "MarketDataLogger",
     "reset_logging_state",
+    "shutdown_logging",
+    "get_async_logging_stats",
+    "get_payload_stats",
     
     # Flow context management
     "flow_operation",
@@ -64,11 +87,26 @@ __all__ = [
     "get_flow_summary",
     "complete_current_flow",
     "terminate_current_flow",
+    "submit_with_flow_context",
+    "FlowContextExecutor",
     
     # ID generation
     "get_trace_id",
     "reset_trace_counter",
     
+    # Metrics
+    "MetricsRegistry",
+    "MetricsExporter",
+    "get_metrics_registry",
+    "reset_metrics",
+    
+    # Stage profiling
+    "configure_profiling",
+    "profile_operation",
+    "profile_stage",
+    "profiled",
+    "get_recent_profiles",
+    
     # Low-level interfaces
     "StructuredLogger",
     "get_logger"
@@ -0,0 +1,155 @@
+"""
+Asynchronous Log Pipeline
+Moves JSON formatting and file/console I/O off the trading thread
+
+The trading thread only enqueues LogRecords into a bounded queue; a background
+QueueListener formats and writes them. Overflow is handled by a policy so that
+logging never blocks order placement unless explicitly configured to.
+"""
+
+import copy
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Dict, Iterable, Optional
+
+from .flow_context import get_flow_summary
+
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_DEBUG = "drop_debug"
+OVERFLOW_DROP = "drop"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_DEBUG, OVERFLOW_DROP)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler with a bounded queue and an explicit overflow policy.
+
+    Policies:
+    - "block":      wait for free space (optionally up to block_timeout seconds)
+    - "drop_debug": DEBUG/TRACE records are dropped once the queue passes the
+                    high-water mark, keeping headroom for INFO and above; any
+                    record is dropped (and counted) if the queue is full
+    - "drop":       never wait; drop and count records when the queue is full
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = OVERFLOW_DROP_DEBUG,
+                 debug_high_water: float = 0.8, block_timeout: Optional[float] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow_policy: {overflow_policy}. Expected one of {OVERFLOW_POLICIES}")
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self._debug_limit = max(1, int(log_queue.maxsize * debug_high_water)) if log_queue.maxsize > 0 else 0
+        self._stats_lock = threading.Lock()
+        self._dropped: Dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare a record for hand-off without formatting it.
+
+        Unlike the stdlib implementation, no formatting happens here: the message
+        is merged with its args and the thread-bound flow context is captured, the
+        JSON formatting is left to the listener thread. The record is copied so
+        other handlers on the same logger see it unchanged.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if not getattr(record, 'flow', None):
+            # Flow context is thread-local and would be lost in the listener thread
+            record.flow = get_flow_summary()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """Put a record on the queue according to the overflow policy."""
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            try:
+                self.queue.put(record, block=True, timeout=self.block_timeout)
+            except queue.Full:
+                self._count_drop(record)
+            return
+
+        if (self.overflow_policy == OVERFLOW_DROP_DEBUG and record.levelno <= logging.DEBUG
+                and self._debug_limit and self.queue.qsize() >= self._debug_limit):
+            self._count_drop(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_drop(record)
+
+    def _count_drop(self, record: logging.LogRecord):
+        with self._stats_lock:
+            self._dropped[record.levelname] = self._dropped.get(record.levelname, 0) + 1
+
+    def get_dropped_counts(self) -> Dict[str, int]:
+        """Return dropped record counts per level name."""
+        with self._stats_lock:
+            return dict(self._dropped)
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits for space instead of failing on a full queue."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class AsyncLogPipeline:
+    """
+    Owns the bounded queue, the QueueHandler attached to the root logger and the
+    background QueueListener that drives the real (formatting/writing) handlers.
+    """
+
+    def __init__(self, handlers: Iterable[logging.Handler], queue_size: int = 10000,
+                 overflow_policy: str = OVERFLOW_DROP_DEBUG, block_timeout: Optional[float] = None):
+        """
+        Args:
+            handlers: Output handlers (with formatters) run by the listener thread
+            queue_size: Maximum number of pending records
+            overflow_policy: "block", "drop_debug" or "drop"
+            block_timeout: Max seconds to wait in "block" mode (None waits forever)
+        """
+        if queue_size <= 0:
+            raise ValueError(f"queue_size must be positive, got {queue_size}")
+        self.handlers = list(handlers)
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(self.queue, overflow_policy, block_timeout=block_timeout)
+        self._listener = _FlushingQueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self._started = False
+
+    def start(self):
+        """Start the background listener thread."""
+        if not self._started:
+            self._listener.start()
+            self._started = True
+
+    def stop(self):
+        """Flush all pending records, stop the listener and flush/close the handlers."""
+        if not self._started:
+            return
+        # QueueListener.stop() enqueues a sentinel and joins the thread after
+        # every queued record has been handled.
+        self._listener.stop()
+        self._started = False
+        for handler in self.handlers:
+            try:
+                handler.flush()
+                handler.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, object]:
+        """Return queue depth and dropped record counts."""
+        dropped = self.queue_handler.get_dropped_counts()
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "overflow_policy": self.queue_handler.overflow_policy,
+            "dropped": dropped,
+            "dropped_total": sum(dropped.values()),
+        }
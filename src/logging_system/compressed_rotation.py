@@ -0,0 +1,243 @@
+"""
+Compressed Log Rotation
+Size- and time-based rotation with compression on a background thread
+
+At rotation the writer only renames the active file to a timestamped archive
+(trading_system.log.20260101-120000-000) and reopens the log; gzip/zstd compression
+and retention run on a background thread, so the logging call that triggers the
+rollover is not blocked by compressing megabytes of JSON.
+
+Archives sort chronologically by name. iter_log_lines() streams all archives
+(transparently decompressed) followed by the active file, for troubleshooting
+tools and ad-hoc analysis.
+"""
+
+import gzip
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional zstd compression
+    zstandard = None
+
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+_ARCHIVE_STAMP = re.compile(r"^\d{8}-\d{6}-\d{3}(\.gz|\.zst)?$")
+
+
+def list_archives(base_filename: str, include_pending: bool = True) -> List[str]:
+    """
+    Return rotated archives of a log file, oldest first.
+
+    Args:
+        base_filename: Path of the active log file
+        include_pending: Include archives that are not compressed yet
+    """
+    directory = os.path.dirname(os.path.abspath(base_filename))
+    prefix = os.path.basename(base_filename) + "."
+    if not os.path.isdir(directory):
+        return []
+    names = set(os.listdir(directory))
+    archives = []
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        stamp = name[len(prefix):]
+        if not _ARCHIVE_STAMP.match(stamp):
+            continue
+        if not stamp.endswith((".gz", ".zst")):
+            # Skip pending files that were just compressed (removed right after)
+            if not include_pending or name + ".gz" in names or name + ".zst" in names:
+                continue
+        archives.append(os.path.join(directory, name))
+    return sorted(archives)
+
+
+def open_log(path: str):
+    """Open a plain, gzip or zstd log file for reading text lines."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"zstandard is required to read {path}")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+                                encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_log_lines(base_filename: str, include_archives: bool = True) -> Iterator[str]:
+    """
+    Stream log lines oldest first: archives (decompressed on the fly), then the active file.
+
+    Files are read one line at a time, so memory use does not depend on log size.
+    """
+    paths = list_archives(base_filename) if include_archives else []
+    if os.path.exists(base_filename):
+        paths.append(base_filename)
+    for path in paths:
+        try:
+            with open_log(path) as f:
+                for line in f:
+                    yield line.rstrip("\n")
+        except FileNotFoundError:
+            # Compressed or deleted by retention while iterating
+            continue
+
+
+class _BackgroundCompressor:
+    """Single worker thread compressing rotated files and applying retention."""
+
+    def __init__(self, compression: str, base_filename: str, backup_count: int):
+        self.compression = compression
+        self.base_filename = base_filename
+        self.backup_count = backup_count
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="log-compressor", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str):
+        self._queue.put(path)
+
+    def wait(self):
+        """Block until all submitted files are processed."""
+        self._queue.join()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                if path is None:
+                    return
+                self._compress(path)
+                self._apply_retention()
+            except Exception as e:
+                # Compression failure must not stop logging; the plain archive stays readable
+                logging.getLogger(__name__).debug(f"Log compression failed for {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _compress(self, path: str):
+        if self.compression == "none" or not os.path.exists(path):
+            return
+        target = path + COMPRESSION_SUFFIXES[self.compression]
+        temp = target + ".tmp"
+        with open(path, "rb") as source, open(temp, "wb") as raw_target:
+            if self.compression == "gzip":
+                with gzip.GzipFile(fileobj=raw_target, mode="wb", compresslevel=6) as compressed:
+                    shutil.copyfileobj(source, compressed, 1024 * 1024)
+            else:
+                zstandard.ZstdCompressor(level=3).copy_stream(source, raw_target)
+        os.replace(temp, target)
+        os.remove(path)
+
+    def _apply_retention(self):
+        if self.backup_count <= 0:
+            return
+        archives = list_archives(self.base_filename)
+        for path in archives[:max(0, len(archives) - self.backup_count)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class CompressedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    File handler with size- and/or time-based rotation and background compression.
+
+    Rotation only renames the active file; compression and deletion of archives
+    beyond backup_count happen in a background thread.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, rotate_interval_seconds: Optional[int] = None,
+                 backup_count: int = 5, compression: str = "gzip", encoding: Optional[str] = "utf-8"):
+        """
+        Args:
+            filename: Active log file path
+            max_bytes: Rotate once the file reaches this size (0 disables size rotation)
+            rotate_interval_seconds: Rotate after this many seconds (None disables time rotation)
+            backup_count: Number of archives kept (0 keeps all)
+            compression: "gzip", "zstd" (requires zstandard) or "none"
+            encoding: File encoding
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Invalid compression: {compression}. Expected one of {tuple(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is not installed; use compression='gzip'")
+        super().__init__(filename, "a", encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.rotate_interval_seconds = rotate_interval_seconds
+        self.backup_count = backup_count
+        self.compression = compression
+        self._next_rollover_at = self._compute_next_rollover()
+        self._compressor = _BackgroundCompressor(compression, self.baseFilename, backup_count)
+        # Archives left uncompressed by a previous run (e.g. crash during compression)
+        for path in list_archives(self.baseFilename):
+            if not path.endswith((".gz", ".zst")):
+                self._compressor.submit(path)
+
+    def _compute_next_rollover(self) -> Optional[float]:
+        if not self.rotate_interval_seconds:
+            return None
+        return time.time() + self.rotate_interval_seconds
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """
+        Size is checked on the bytes already written (no extra formatting of the
+        record), so a file may exceed max_bytes by at most one record.
+        """
+        if self._next_rollover_at is not None and record.created >= self._next_rollover_at:
+            return True
+        if self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes:
+            return True
+        return False
+
+    def _archive_name(self) -> str:
+        # The sequence number keeps several rollovers within one second in order
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        counter = 0
+        candidate = f"{self.baseFilename}.{stamp}-{counter:03d}"
+        while any(os.path.exists(candidate + suffix) for suffix in ("", ".gz", ".zst")):
+            counter += 1
+            candidate = f"{self.baseFilename}.{stamp}-{counter:03d}"
+        return candidate
+
+    def doRollover(self):
+        """Rename the active file and hand it to the compressor thread."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            archive = self._archive_name()
+            os.rename(self.baseFilename, archive)
+            self._compressor.submit(archive)
+        self.stream = self._open()
+        self._next_rollover_at = self._compute_next_rollover()
+
+    def wait_for_compression(self):
+        """Block until all rotated files are compressed (tests, shutdown)."""
+        self._compressor.wait()
+
+    def close(self):
+        """Close the file and finish pending compression."""
+        try:
+            super().close()
+        finally:
+            if self._compressor is not None:
+                self._compressor.wait()
+                self._compressor.stop()
+                self._compressor = None
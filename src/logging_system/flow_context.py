@@ -3,27 +3,79 @@ Flow Context Management for AI-Optimized Logging
 Tracks flow stages and maintains context throughout operation chains
 """
 
-import threading
-from typing import Dict, Any, Optional, List
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable
 from contextlib import contextmanager
 from .trace_generator import get_trace_id
 
 
+class FlowSummary(dict):
+    """
+    Read-only flow summary attached to log records.
+    
+    A plain dict subclass so that json/orjson serialize it directly; mutation
+    raises TypeError because one instance is shared by all records of a stage.
+    """
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FlowSummary is read-only")
+    
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    
+    def __reduce__(self):
+        return (FlowSummary, (dict(self),))
+
+
+class _FlowState:
+    """Immutable flow snapshot plus its lazily built summary."""
+    
+    __slots__ = ("flow", "_summary")
+    
+    def __init__(self, flow: Dict[str, Any]):
+        self.flow = flow
+        self._summary: Optional[FlowSummary] = None
+    
+    def summary(self) -> FlowSummary:
+        if self._summary is None:
+            flow = self.flow
+            self._summary = FlowSummary({
+                "trace_id": flow["trace_id"],
+                "parent_trace_id": flow.get("parent_trace_id"),
+                "stage": flow["stage"],
+                "previous_stage": flow.get("previous_stage"),
+                "stages_completed": list(flow.get("stages_completed", [])),
+                "flow_completion": flow.get("flow_completion", False),
+                "flow_termination": flow.get("flow_termination", False),
+                "termination_reason": flow.get("termination_reason")
+            })
+        return self._summary
+
+
 class FlowContext:
     """
-    Thread-local context for tracking operation flow stages.
+    Context-local state for tracking operation flow stages.
     
     Maintains flow state throughout operation chains to enable
     AI to understand operation progression and relationships.
+    
+    State lives in a ContextVar, so it follows asyncio tasks and executor
+    submissions made through submit_with_flow_context/FlowContextExecutor,
+    and concurrent symbols never see each other's flow. Updates are
+    copy-on-write: a stage change in a child task does not alter the parent's
+    flow, and the cached summary is rebuilt only when the flow changes.
     """
     
     def __init__(self):
-        self._local = threading.local()
+        self._state: contextvars.ContextVar[Optional[_FlowState]] = contextvars.ContextVar(
+            f"flow_state_{id(self)}", default=None
+        )
     
     @property
     def current_flow(self) -> Optional[Dict[str, Any]]:
         """Get current flow context."""
-        return getattr(self._local, 'flow', None)
+        state = self._state.get()
+        return state.flow if state else None
     
     @property
     def current_stage(self) -> Optional[str]:
@@ -37,6 +89,9 @@ class FlowContext:
         flow = self.current_flow
         return flow.get('trace_id') if flow else None
     
+    def _set_flow(self, flow: Optional[Dict[str, Any]]) -> contextvars.Token:
+        return self._state.set(_FlowState(flow) if flow is not None else None)
+    
     def start_flow(self, symbol: str = "", operation: str = "",
                    initial_stage: str = "initiation", parent_trace_id: Optional[str] = None) -> str:
         """
@@ -53,7 +108,7 @@ class FlowContext:
         """
         trace_id = get_trace_id(parent_trace_id=parent_trace_id)
         
-        self._local.flow = {
+        self._set_flow({
             "trace_id": trace_id,
             "parent_trace_id": parent_trace_id,
             "stage": initial_stage,
@@ -62,7 +117,7 @@ class FlowContext:
             "operation": operation,
             "stages_completed": [],
             "context_data": {}
-        }
+        })
         
         return trace_id
     
@@ -74,61 +129,63 @@ class FlowContext:
             next_stage: Name of the next stage
             context_data: Additional context data for this stage
         """
-        if not self.current_flow:
+        flow = self.current_flow
+        if not flow:
             return
         
-        current_stage = self.current_flow["stage"]
-        self.current_flow["stages_completed"].append(current_stage)
-        self.current_flow["previous_stage"] = current_stage
-        self.current_flow["stage"] = next_stage
-        
+        current_stage = flow["stage"]
+        updated = dict(flow)
+        updated["stages_completed"] = flow["stages_completed"] + [current_stage]
+        updated["previous_stage"] = current_stage
+        updated["stage"] = next_stage
         if context_data:
-            self.current_flow["context_data"].update(context_data)
+            updated["context_data"] = {**flow["context_data"], **context_data}
+        self._set_flow(updated)
     
     def set_stage_context(self, key: str, value: Any):
         """Add context data to current stage."""
-        if self.current_flow:
-            self.current_flow["context_data"][key] = value
+        flow = self.current_flow
+        if flow:
+            updated = dict(flow)
+            updated["context_data"] = {**flow["context_data"], key: value}
+            self._set_flow(updated)
     
     def get_stage_context(self, key: str, default: Any = None) -> Any:
         """Get context data from current flow."""
-        if self.current_flow:
-            return self.current_flow["context_data"].get(key, default)
+        flow = self.current_flow
+        if flow:
+            return flow["context_data"].get(key, default)
         return default
     
     def complete_flow(self, final_stage: str = "completion"):
         """Mark flow as completed."""
-        if self.current_flow:
-            self.current_flow["stages_completed"].append(self.current_flow["stage"])
-            self.current_flow["stage"] = final_stage
-            self.current_flow["flow_completion"] = True
+        flow = self.current_flow
+        if flow:
+            updated = dict(flow)
+            updated["stages_completed"] = flow["stages_completed"] + [flow["stage"]]
+            updated["stage"] = final_stage
+            updated["flow_completion"] = True
+            self._set_flow(updated)
     
     def terminate_flow(self, termination_reason: str = "error"):
         """Mark flow as terminated due to error."""
-        if self.current_flow:
-            self.current_flow["flow_termination"] = True
-            self.current_flow["termination_reason"] = termination_reason
+        flow = self.current_flow
+        if flow:
+            updated = dict(flow)
+            updated["flow_termination"] = True
+            updated["termination_reason"] = termination_reason
+            self._set_flow(updated)
     
     def clear_flow(self):
         """Clear current flow context."""
-        if hasattr(self._local, 'flow'):
-            delattr(self._local, 'flow')
+        self._state.set(None)
     
     def get_flow_summary(self) -> Dict[str, Any]:
-        """Get complete flow summary for logging."""
-        if not self.current_flow:
+        """Get complete flow summary for logging (cached until the flow changes)."""
+        state = self._state.get()
+        if state is None:
             return {}
-        
-        return {
-            "trace_id": self.current_flow["trace_id"],
-            "parent_trace_id": self.current_flow.get("parent_trace_id"),
-            "stage": self.current_flow["stage"],
-            "previous_stage": self.current_flow.get("previous_stage"),
-            "stages_completed": self.current_flow.get("stages_completed", []),
-            "flow_completion": self.current_flow.get("flow_completion", False),
-            "flow_termination": self.current_flow.get("flow_termination", False),
-            "termination_reason": self.current_flow.get("termination_reason")
-        }
+        return state.summary()
 
 
 # Global flow context instance
@@ -147,8 +204,8 @@ def flow_operation(symbol: str = "", operation: str = "",
             advance_to_stage("data_collection")
             # more operation code
     """
-    # Store previous flow for nested operations
-    previous_flow = _flow_context.current_flow
+    # Remember the enclosing flow for nested operations
+    previous_state = _flow_context._state.get()
     
     flow_id = _flow_context.start_flow(symbol, operation, initial_stage)
     try:
@@ -158,10 +215,27 @@ def flow_operation(symbol: str = "", operation: str = "",
         raise
     finally:
         # Restore previous flow instead of clearing (for nested operations)
-        if previous_flow:
-            _flow_context._local.flow = previous_flow
-        else:
-            _flow_context.clear_flow()
+        _flow_context._state.set(previous_state)
+
+
+def submit_with_flow_context(executor, fn: Callable, *args, **kwargs) -> Future:
+    """
+    Submit a callable to any executor so that it runs in a copy of the caller's
+    context (flow state and trace context included).
+    
+    Each submission gets its own copy, so flows started inside one task never
+    leak into another.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+class FlowContextExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that propagates the submitting context into worker threads."""
+    
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
 
 
 def get_current_flow() -> Optional[Dict[str, Any]]:
@@ -11,6 +11,12 @@ from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from .trace_generator import get_trace_id
 from .flow_context import get_flow_summary
+from .payload_guard import PayloadGuard
+
+try:
+    import orjson
+except ImportError:  # optional faster JSON backend
+    orjson = None
 
 # Add custom TRACE level (below DEBUG level)
 TRACE_LEVEL = 5
@@ -109,6 +115,135 @@ class AIOptimizedJSONFormatter(logging.Formatter):
             return f'{{"timestamp":"{datetime.now(timezone.utc).isoformat()}","level":"{record.levelname}","service":"{service_name}","message":"FALLBACK_LOG: {record.getMessage()}","serialization_error":"{str(e)}"}}'
 
 
+_STDLIB_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+_MAX_CACHED_HEADERS = 4096
+
+
+class FastJSONFormatter(AIOptimizedJSONFormatter):
+    """
+    High-throughput variant of AIOptimizedJSONFormatter with the same JSON schema.
+    
+    Differences from the standard formatter:
+    - Timestamp is derived from record.created (the moment the record was created,
+      not when it was formatted) with the "YYYY-MM-DDTHH:MM:SS" part cached per second
+    - The "level"/"service"/"operation" fragment is pre-encoded once per combination
+    - Context is copied only when parent_trace_id has to be extracted
+    - orjson is used for the variable part when installed (stdlib json otherwise)
+    """
+    
+    def __init__(self, use_orjson: Optional[bool] = None):
+        """
+        Args:
+            use_orjson: Force (True) or disable (False) the orjson backend;
+                None uses it when available.
+        """
+        super().__init__()
+        if use_orjson and orjson is None:
+            raise ImportError("orjson is not installed")
+        self.use_orjson = orjson is not None if use_orjson is None else use_orjson
+        self._second_cache = (None, "")
+        self._header_cache: Dict[tuple, str] = {}
+    
+    def format_timestamp(self, created: float) -> str:
+        """Format record.created as UTC ISO-8601, identical to datetime.isoformat()."""
+        second = int(created)
+        micros = int(round((created - second) * 1_000_000))
+        if micros >= 1_000_000:
+            second += 1
+            micros -= 1_000_000
+        cached_second, prefix = self._second_cache
+        if cached_second != second:
+            prefix = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+            self._second_cache = (second, prefix)
+        if micros:
+            return f"{prefix}.{micros:06d}+00:00"
+        return f"{prefix}+00:00"
+    
+    def _header(self, levelname: str, service: str, operation: str) -> str:
+        """Return the pre-encoded level/service/operation fragment."""
+        key = (levelname, service, operation)
+        header = self._header_cache.get(key)
+        if header is None:
+            if len(self._header_cache) >= _MAX_CACHED_HEADERS:
+                self._header_cache.clear()
+            header = (f'"level":{_STDLIB_ENCODER.encode(levelname)},'
+                      f'"service":{_STDLIB_ENCODER.encode(service)},'
+                      f'"operation":{_STDLIB_ENCODER.encode(operation)}')
+            self._header_cache[key] = header
+        return header
+    
+    def _encode(self, obj: Dict[str, Any]) -> str:
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+            except TypeError:
+                pass  # e.g. unsupported type - let the stdlib encoder decide
+        return _STDLIB_ENCODER.encode(obj)
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record as AI-searchable JSON (same schema as the standard formatter)."""
+        # Variable part, in the key order of the standard formatter
+        body: Dict[str, Any] = {"message": record.getMessage()}
+        
+        context = getattr(record, 'context', None)
+        if context:
+            if 'parent_trace_id' in context:
+                context = context.copy()
+                parent_trace_id = context.pop('parent_trace_id')
+                if parent_trace_id:
+                    body['parent_trace_id'] = parent_trace_id
+            if context:
+                body["context"] = context
+        
+        flow_data = getattr(record, 'flow', None) or get_flow_summary() or {}
+        body["flow"] = flow_data
+        
+        tags = getattr(record, 'tags', None)
+        if tags:
+            body["tags"] = tags
+        
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id is None:
+            trace_id = get_trace_id()
+            if flow_data.get("flow_id"):
+                flow_data["trace_id"] = trace_id
+        record.trace_id = trace_id
+        body["trace_id"] = trace_id
+        
+        if record.exc_info:
+            body["exception"] = {
+                "type": record.exc_info[0].__name__ if record.exc_info[0] else None,
+                "message": str(record.exc_info[1]) if record.exc_info[1] else None,
+                "traceback": self.formatException(record.exc_info)
+            }
+        
+        try:
+            encoded_body = self._encode(body)
+        except (TypeError, ValueError):
+            # Same fallback text as the standard formatter
+            return super().format(record)
+        
+        header = self._header(record.levelname,
+                              getattr(record, 'service_name', 'default_service'),
+                              getattr(record, 'operation', 'unknown'))
+        return f'{{"timestamp":"{self.format_timestamp(record.created)}",{header},{encoded_body[1:]}'
+
+
+def create_formatter(name: str = "standard") -> logging.Formatter:
+    """
+    Create a JSON formatter by name.
+    
+    Args:
+        name: "standard" (AIOptimizedJSONFormatter) or "fast" (FastJSONFormatter)
+    """
+    if name == "standard":
+        return AIOptimizedJSONFormatter()
+    if name == "fast":
+        return FastJSONFormatter()
+    raise ValueError(f"Unknown formatter: {name}. Expected 'standard' or 'fast'")
+
+
 class StructuredLogger:
     """
     High-level interface for structured logging with AI optimization.
@@ -118,9 +253,14 @@ class StructuredLogger:
     This class acts as a custom LoggerAdapter.
     """
     
-    def __init__(self, name: str, service_name: str):
+    def __init__(self, name: str, service_name: str, payload_guard: Optional[PayloadGuard] = None):
         self.logger = logging.getLogger(name)
         self.service_name = service_name
+        self.payload_guard = payload_guard
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """Cheap level check (uses the stdlib per-logger level cache)."""
+        return self.logger.isEnabledFor(level)
     
     def _log(self, level: int, message: str, operation: str = "",
              context: Optional[Dict[str, Any]] = None,
@@ -128,6 +268,11 @@ class StructuredLogger:
              flow: Optional[Dict[str, Any]] = None,
              trace_id: Optional[str] = None):
         """Internal logging method with structured data."""
+        # Level check first: a disabled record must not pay for the payload guard walk
+        if not self.logger.isEnabledFor(level):
+            return
+        if self.payload_guard is not None:
+            context = self.payload_guard.apply(context)
         
         extra = {
             'operation': operation,
@@ -187,6 +332,10 @@ class StructuredLogger:
               exc_info: bool = False):
         """Log ERROR level - errors affecting functionality."""
         if exc_info:
+            if not self.logger.isEnabledFor(logging.ERROR):
+                return
+            if self.payload_guard is not None:
+                context = self.payload_guard.apply(context)
             try:
                 self.logger.error(message, extra={
                     'operation': operation,
@@ -212,15 +361,16 @@ class StructuredLogger:
         self._log(logging.CRITICAL, message, operation, context, tags, flow, trace_id)
 
 
-def get_logger(name: str, service_name: str) -> StructuredLogger:
+def get_logger(name: str, service_name: str, payload_guard: Optional[PayloadGuard] = None) -> StructuredLogger:
     """
     Get a structured logger instance for AI-optimized logging.
     
     Args:
         name: Logger name (typically module name)
         service_name: Service name for log identification
+        payload_guard: Optional size limits applied to every log context
         
     Returns:
         StructuredLogger instance configured for AI analysis
     """
-    return StructuredLogger(name, service_name)
\ No newline at end of file
+    return StructuredLogger(name, service_name, payload_guard)
\ No newline at end of file
@@ -8,10 +8,14 @@ import logging.handlers
 import sys
 import threading
 import os
-from typing import Dict, Any, Optional
-from .json_formatter import get_logger, StructuredLogger
+from typing import Dict, Any, Optional, Callable, Union
+from .json_formatter import get_logger, create_formatter, StructuredLogger
 from .flow_context import flow_operation, get_flow_summary
 from .trace_generator import get_trace_id
+from .async_pipeline import AsyncLogPipeline
+from .payload_guard import PayloadGuard
+from .trace_store import TraceStore, TraceStoreHandler
+from .compressed_rotation import CompressedRotatingFileHandler
 
 
 class LoggerConfig:
@@ -28,6 +32,10 @@ class LoggerConfig:
         self._loggers_lock = threading.Lock()
         self._log_level = logging.DEBUG
         self._managed_handlers: list[logging.Handler] = []
+        self._async_pipeline: Optional[AsyncLogPipeline] = None
+        # Shared by all loggers; limits are updated in place on configure
+        self._payload_guard = PayloadGuard()
+        self._trace_store_handler: Optional[TraceStoreHandler] = None
     
     def configure_logging(self,
                          log_level: str = "DEBUG",
@@ -35,7 +43,15 @@ class LoggerConfig:
                          console_output: bool = True,
                          max_bytes: int = 10*1024*1024,  # 10MB
                          backup_count: int = 5,
-                         service_name: Optional[str] = "default_service"):
+                         service_name: Optional[str] = "default_service",
+                         async_mode: bool = False,
+                         queue_size: int = 10000,
+                         overflow_policy: str = "drop_debug",
+                         formatter: str = "standard",
+                         payload_limits: Optional[Dict[str, Any]] = None,
+                         trace_store: Optional[Dict[str, Any]] = None,
+                         compression: Optional[str] = None,
+                         rotate_interval_seconds: Optional[int] = None):
         """
         Configure global logging for AI optimization with file rotation.
         
@@ -46,10 +62,25 @@ class LoggerConfig:
             max_bytes: Maximum file size before rotation (default: 10MB)
             backup_count: Number of backup files to keep (default: 5)
             service_name: Default service name for logs (used if not provided by logger)
+            async_mode: Format and write records on a background thread (default: False)
+            queue_size: Maximum pending records in async mode
+            overflow_policy: Async queue overflow policy: "block", "drop_debug" or "drop"
+            formatter: JSON formatter: "standard" or "fast" (cached timestamps, orjson if installed)
+            payload_limits: PayloadGuard limits (max_string_chars, max_list_items,
+                raw_data_sample_rate, ...); None keeps the defaults
+            trace_store: Optional TraceStore settings (directory, segment_max_bytes,
+                max_segments) enabling the indexed trace_id sink
+            compression: Compress rotated files on a background thread ("gzip", "zstd", "none")
+            rotate_interval_seconds: Additionally rotate after this many seconds
         """
         if self._configured:
             return
         
+        # Shared JSON formatter (validated before touching existing handlers)
+        json_formatter = create_formatter(formatter)
+        if payload_limits:
+            self._payload_guard.configure(**payload_limits)
+        
         # Set logging level
         numeric_level = getattr(logging, log_level.upper(), logging.DEBUG)
         self._log_level = numeric_level
@@ -64,16 +95,16 @@ class LoggerConfig:
             root_logger.removeHandler(handler)
         self._managed_handlers.clear()
         
+        # Output handlers are collected first, then attached either directly to the
+        # root logger or behind the async queue.
+        output_handlers: list[logging.Handler] = []
+        
         # Add console handler if requested (JSON logs go to stderr for AI searchability)
         if console_output:
             console_handler = logging.StreamHandler(sys.stderr)
             console_handler.setLevel(numeric_level)
-            # Ensure console handler uses the correct JSON formatter
-            from .json_formatter import AIOptimizedJSONFormatter
-            json_formatter = AIOptimizedJSONFormatter()
             console_handler.setFormatter(json_formatter)
-            root_logger.addHandler(console_handler)
-            self._managed_handlers.append(console_handler)
+            output_handlers.append(console_handler)
         
         # Add rotating file handler if requested
         if log_file:
@@ -83,29 +114,55 @@ class LoggerConfig:
                 if log_dir:
                     os.makedirs(log_dir, exist_ok=True)
                 
-                # Use RotatingFileHandler for automatic log rotation
-                file_handler = logging.handlers.RotatingFileHandler(
-                    log_file,
-                    maxBytes=max_bytes,
-                    backupCount=backup_count,
-                    encoding='utf-8'
-                )
+                if compression or rotate_interval_seconds:
+                    # Timestamped archives, compressed off the logging thread
+                    file_handler = CompressedRotatingFileHandler(
+                        log_file,
+                        max_bytes=max_bytes,
+                        rotate_interval_seconds=rotate_interval_seconds,
+                        backup_count=backup_count,
+                        compression=compression or "none"
+                    )
+                else:
+                    # Use RotatingFileHandler for automatic log rotation
+                    file_handler = logging.handlers.RotatingFileHandler(
+                        log_file,
+                        maxBytes=max_bytes,
+                        backupCount=backup_count,
+                        encoding='utf-8'
+                    )
                 file_handler.setLevel(numeric_level)
                 
                 # Apply JSON formatter to file handler for structured logs
-                from .json_formatter import AIOptimizedJSONFormatter
-                # Formatter is now service-agnostic
-                json_formatter = AIOptimizedJSONFormatter()
                 file_handler.setFormatter(json_formatter)
-                
-                root_logger.addHandler(file_handler)
-                self._managed_handlers.append(file_handler)
+                output_handlers.append(file_handler)
             except Exception as e:
                 # Логи сломались - останавливаем сервис
                 print(f"CRITICAL: Failed to configure file logging - shutting down service: {e}", file=sys.stderr)
                 # Graceful exit вместо os._exit(1)
                 raise SystemExit(1)
         
+        # Add indexed trace store sink if requested
+        if trace_store:
+            self._trace_store_handler = TraceStoreHandler(TraceStore(**trace_store), level=numeric_level)
+            self._trace_store_handler.setFormatter(json_formatter)
+            output_handlers.append(self._trace_store_handler)
+        
+        if async_mode and output_handlers:
+            # The trading thread only enqueues records; formatting and I/O
+            # happen in the listener thread.
+            self._async_pipeline = AsyncLogPipeline(
+                output_handlers,
+                queue_size=queue_size,
+                overflow_policy=overflow_policy
+            )
+            self._async_pipeline.start()
+            output_handlers = [self._async_pipeline.queue_handler]
+        
+        for handler in output_handlers:
+            root_logger.addHandler(handler)
+            self._managed_handlers.append(handler)
+        
         self._configured = True
     
     def get_logger(self, name: str, service_name: str) -> StructuredLogger:
@@ -123,7 +180,7 @@ class LoggerConfig:
             # Use combination of name and service_name as cache key to support multiple services
             cache_key = f"{name}:{service_name}"
             if cache_key not in self._loggers:
-                logger = get_logger(name, service_name)
+                logger = get_logger(name, service_name, payload_guard=self._payload_guard)
                 # Ensure logger respects the configured log level
                 if self._configured:
                     logger.logger.setLevel(self._log_level)
@@ -134,6 +191,25 @@ class LoggerConfig:
         """Check if logging system is configured."""
         return self._configured
     
+    def get_async_stats(self) -> Optional[Dict[str, Any]]:
+        """Queue depth and drop counters of the async pipeline (None in sync mode)."""
+        if self._async_pipeline is None:
+            return None
+        return self._async_pipeline.get_stats()
+    
+    def get_payload_stats(self) -> Dict[str, int]:
+        """Truncation/summarization/sampling counters and estimated bytes saved."""
+        return self._payload_guard.get_stats()
+    
+    def shutdown(self):
+        """Flush pending async records, stop the listener thread and close the trace store."""
+        if self._async_pipeline is not None:
+            self._async_pipeline.stop()
+            self._async_pipeline = None
+        if self._trace_store_handler is not None:
+            self._trace_store_handler.close()
+            self._trace_store_handler = None
+    
     def reset(self):
         """Reset logger configuration for testing."""
         with self._loggers_lock:
@@ -145,7 +221,12 @@ class LoggerConfig:
             for handler in self._managed_handlers:
                 if handler in root_logger.handlers:
                     root_logger.removeHandler(handler)
+                if isinstance(handler, CompressedRotatingFileHandler):
+                    # Finish pending compression and stop the compressor thread
+                    handler.close()
             self._managed_handlers.clear()
+            self.shutdown()
+            self._payload_guard = PayloadGuard()
             
             root_logger.setLevel(logging.WARNING)  # Reset to default
 
@@ -159,7 +240,15 @@ def configure_ai_logging(log_level: str = "DEBUG",
                         console_output: bool = True,
                         max_bytes: int = 10*1024*1024,
                         backup_count: int = 5,
-                        filter_http_noise: bool = True):
+                        filter_http_noise: bool = True,
+                        async_mode: bool = False,
+                        queue_size: int = 10000,
+                        overflow_policy: str = "drop_debug",
+                        formatter: str = "standard",
+                        payload_limits: Optional[Dict[str, Any]] = None,
+                        trace_store: Optional[Dict[str, Any]] = None,
+                        compression: Optional[str] = None,
+                        rotate_interval_seconds: Optional[int] = None):
     """
     Configure AI-optimized logging system with file rotation and HTTP noise filtering.
     
@@ -170,8 +259,30 @@ def configure_ai_logging(log_level: str = "DEBUG",
         max_bytes: Maximum file size before rotation (default: 10MB)
         backup_count: Number of backup files to keep (default: 5)
         filter_http_noise: Filter out verbose HTTP logs from urllib3/requests (default: True)
+        async_mode: Enqueue records and format/write them on a background thread,
+            so logging adds no I/O jitter to the trading thread (default: False)
+        queue_size: Maximum number of pending records in async mode
+        overflow_policy: What to do when the async queue is full:
+            "block" (wait), "drop_debug" (drop DEBUG first), "drop" (drop and count)
+        formatter: "standard" or "fast" - the fast formatter takes the timestamp from
+            record.created, pre-encodes static fields and uses orjson when installed
+        payload_limits: Size limits for log contexts, e.g. {"max_list_items": 20,
+            "max_string_chars": 2000, "raw_data_sample_rate": 0.1}; long arrays are
+            summarized (length, head/tail, min/max) so record size does not grow
+            with candle counts
+        trace_store: Enables the indexed trace store sink, e.g.
+            {"directory": "logs/trace_store", "max_segments": 20}; query a full
+            trace with `python -m src.logging_system.trace_store <dir> <trace_id>`
+        compression: "gzip" or "zstd" compresses rotated files on a background thread
+            (timestamped archives; read them with compressed_rotation.iter_log_lines)
+        rotate_interval_seconds: Time-based rotation in addition to max_bytes
     """
-    _logger_config.configure_logging(log_level, log_file, console_output, max_bytes, backup_count)
+    _logger_config.configure_logging(
+        log_level, log_file, console_output, max_bytes, backup_count,
+        async_mode=async_mode, queue_size=queue_size, overflow_policy=overflow_policy,
+        formatter=formatter, payload_limits=payload_limits, trace_store=trace_store,
+        compression=compression, rotate_interval_seconds=rotate_interval_seconds
+    )
     
     # Filter HTTP noise for cleaner AI logs
     if filter_http_noise:
@@ -210,6 +321,21 @@ def _configure_http_logging_filters():
         logger.setLevel(logging.ERROR)  # Only critical HTTP errors
 
 
+def shutdown_logging():
+    """Flush pending records of the async pipeline and stop its listener thread."""
+    _logger_config.shutdown()
+
+
+def get_async_logging_stats() -> Optional[Dict[str, Any]]:
+    """Return async queue depth and dropped record counts, or None in sync mode."""
+    return _logger_config.get_async_stats()
+
+
+def get_payload_stats() -> Dict[str, int]:
+    """Return payload guard counters, including estimated bytes saved."""
+    return _logger_config.get_payload_stats()
+
+
 def get_ai_logger(name: str, service_name: Optional[str] = None) -> StructuredLogger:
     """
     Get AI-optimized structured logger.
@@ -226,24 +352,44 @@ def get_ai_logger(name: str, service_name: Optional[str] = None) -> StructuredLo
     return _logger_config.get_logger(name, effective_service_name)
 
 
+# Context values may be passed as zero-argument callables ("context builders").
+# They are only evaluated when the target level is enabled, so disabled DEBUG
+# logging does not pay for dict construction or Decimal -> float conversions.
+ContextArg = Optional[Union[Dict[str, Any], Callable[[], Dict[str, Any]]]]
+
+
+def _resolve(value: Any) -> Any:
+    """Evaluate a lazy context builder; plain values are returned unchanged."""
+    return value() if callable(value) else value
+
+
 class MarketDataLogger:
     """
     Specialized logger for MarketDataService operations.
     
     Provides domain-specific logging methods with semantic tags
     and context preservation for AI analysis.
+    
+    Every method returns immediately when its level is disabled, before any
+    context is built or the flow summary is collected.
     """
     
     def __init__(self, module_name: str, service_name: Optional[str] = None):
         self.logger = get_ai_logger(module_name, service_name=service_name)
         self.module_name = module_name
     
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether records of the given level would be emitted."""
+        return self.logger.is_enabled_for(level)
+    
     def log_operation_start(self, operation: str, symbol: str = "",
-                           context: Optional[Dict[str, Any]] = None,
+                           context: ContextArg = None,
                            trace_id: Optional[str] = None,
                            parent_trace_id: Optional[str] = None):
         """Log start of major operation with flow context and hierarchical tracing."""
-        ctx = context or {}
+        if not self.logger.is_enabled_for(logging.INFO):
+            return
+        ctx = _resolve(context) or {}
         if symbol:
             ctx["symbol"] = symbol
         
@@ -267,11 +413,13 @@ class MarketDataLogger:
     
     def log_operation_complete(self, operation: str,
                               processing_time_ms: Optional[int] = None,
-                              context: Optional[Dict[str, Any]] = None,
+                              context: ContextArg = None,
                               trace_id: Optional[str] = None,
                               parent_trace_id: Optional[str] = None):
         """Log successful completion of operation with hierarchical tracing."""
-        ctx = context or {}
+        if not self.logger.is_enabled_for(logging.INFO):
+            return
+        ctx = _resolve(context) or {}
         if processing_time_ms is not None:
             ctx["processing_time_ms"] = processing_time_ms
         
@@ -294,11 +442,13 @@ class MarketDataLogger:
         )
     
     def log_operation_error(self, operation: str, error: str,
-                             context: Optional[Dict[str, Any]] = None,
+                             context: ContextArg = None,
                              trace_id: Optional[str] = None,
                              parent_trace_id: Optional[str] = None):
         """Log a failed operation with hierarchical tracing."""
-        ctx = context or {}
+        if not self.logger.is_enabled_for(logging.ERROR):
+            return
+        ctx = _resolve(context) or {}
         ctx["error"] = error
 
         if parent_trace_id:
@@ -314,10 +464,12 @@ class MarketDataLogger:
         )
 
     def log_operation_failure(self, operation: str, error: str,
-                               context: Optional[Dict[str, Any]] = None,
+                               context: ContextArg = None,
                                trace_id: Optional[str] = None):
         """Logs a generic, non-validation-related operation failure."""
-        ctx = context or {}
+        if not self.logger.is_enabled_for(logging.ERROR):
+            return
+        ctx = _resolve(context) or {}
         ctx["error_details"] = error
 
         self.logger.error(
@@ -334,6 +486,8 @@ class MarketDataLogger:
                       status_code: Optional[int] = None,
                       trace_id: Optional[str] = None):
         """Log API call with performance metrics."""
+        if not self.logger.is_enabled_for(logging.DEBUG):
+            return
         context = {
             "symbol": symbol,
             "interval": interval,
@@ -354,12 +508,15 @@ class MarketDataLogger:
         )
     
     def log_calculation(self, indicator: str, symbol: str,
-                       input_data: Optional[Dict[str, Any]] = None,
+                       input_data: ContextArg = None,
                        result: Optional[Any] = None,
                        calculation_time_ms: Optional[int] = None,
                        trace_id: Optional[str] = None):
         """Log technical indicator calculation."""
+        if not self.logger.is_enabled_for(logging.DEBUG):
+            return
         context = {"symbol": symbol, "indicator": indicator}
+        input_data = _resolve(input_data)
         if input_data:
             context["input_data"] = input_data
         if result is not None:
@@ -380,6 +537,8 @@ class MarketDataLogger:
                             expected: str, error_msg: str,
                             trace_id: Optional[str] = None):
         """Log validation error with detailed context."""
+        if not self.logger.is_enabled_for(logging.ERROR):
+            return
         context = {
             "failed_field": field,
             "failed_value": str(value),
@@ -399,6 +558,8 @@ class MarketDataLogger:
     def log_fallback_usage(self, operation: str, reason: str,
                           fallback_value: Any, trace_id: Optional[str] = None):
         """Log fallback strategy usage."""
+        if not self.logger.is_enabled_for(logging.WARNING):
+            return
         context = {
             "operation": operation,
             "fallback_reason": reason,
@@ -415,13 +576,24 @@ class MarketDataLogger:
         )
     
     def log_raw_data(self, data_type: str, data_sample: Any,
-                     data_stats: Optional[Dict[str, Any]] = None,
+                     data_stats: ContextArg = None,
                      trace_id: Optional[str] = None):
-        """Log raw data for AI analysis (TRACE level)."""
+        """
+        Log raw data for AI analysis (TRACE level).
+        
+        data_sample and data_stats may be callables; they are evaluated only
+        when DEBUG is enabled and the record survives payload sampling.
+        """
+        if not self.logger.is_enabled_for(logging.DEBUG):
+            return
+        guard = self.logger.payload_guard
+        if guard is not None and not guard.sample_raw_data():
+            return
         context = {
             "data_type": data_type,
-            "data_sample": data_sample
+            "data_sample": _resolve(data_sample)
         }
+        data_stats = _resolve(data_stats)
         if data_stats:
             context.update(data_stats)
             
@@ -436,10 +608,12 @@ class MarketDataLogger:
         )
 
     def log_cache_event(self, cache_name: str, event_type: str,
-                        context: Optional[Dict[str, Any]] = None,
+                        context: ContextArg = None,
                         trace_id: Optional[str] = None):
         """Log cache-related events like hit, miss, or update."""
-        ctx = context or {}
+        if not self.logger.is_enabled_for(logging.DEBUG):
+            return
+        ctx = _resolve(context) or {}
         ctx["cache_name"] = cache_name
         ctx["event_type"] = event_type
         
@@ -0,0 +1,367 @@
+"""
+In-Process Metrics Registry
+Counters, gauges and fixed-bucket latency histograms
+
+Components record latencies and event counts into a shared registry instead of
+only writing duration_ms into individual log lines. Histograms use fixed bucket
+boundaries, so recording is O(log buckets) with constant memory, and p50/p99 per
+stage can be read at any time without parsing logs.
+
+Snapshots can be written periodically to a JSON file and/or served in the
+Prometheus text exposition format by MetricsExporter:
+    exporter = MetricsExporter(snapshot_file="logs/metrics.json", http_port=9108)
+    exporter.start()
+    # curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Milliseconds; covers in-memory indicator steps up to slow API calls
+DEFAULT_LATENCY_BUCKETS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    """Escapes a label value per the Prometheus text format: backslash first, then quote and newline."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in items) + "}"
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down (queue depth, open orders)."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Percentiles are estimated by linear interpolation inside the bucket that
+    contains the requested rank, clamped to the observed min/max.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        if list(buckets) != sorted(buckets) or not buckets:
+            raise ValueError("Histogram buckets must be a non-empty ascending sequence")
+        self.buckets = tuple(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._min = float("inf")
+        self._max = float("-inf")
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the q-th percentile (0..100); None when empty."""
+        with self._lock:
+            counts = list(self._counts)
+            total, low, high = self._count, self._min, self._max
+        if total == 0:
+            return None
+        rank = q / 100.0 * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else low
+                upper = self.buckets[index] if index < len(self.buckets) else high
+                lower, upper = max(lower, low), min(upper, high)
+                fraction = (rank - cumulative) / bucket_count
+                return lower + (upper - lower) * fraction
+            cumulative += bucket_count
+        return high
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, total_sum = self._count, self._sum
+            low, high = self._min, self._max
+        return {
+            "count": total,
+            "sum": round(total_sum, 6),
+            "min": low if total else None,
+            "max": high if total else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], counts)),
+        }
+
+
+class _Timer:
+    """Result of MetricsRegistry.time(); elapsed_ms is set when the block exits."""
+
+    __slots__ = ("elapsed_ms",)
+
+    def __init__(self):
+        self.elapsed_ms = 0.0
+
+
+class MetricsRegistry:
+    """
+    Named, labelled metrics.
+
+    counter()/gauge()/histogram() return the existing instance for the same
+    name and labels, so call sites can look metrics up on every use.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], Any] = {}
+        self._types: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, factory, name: str, labels: Dict[str, Any]):
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is not None and self._types[name] == kind:
+            return metric
+        with self._lock:
+            registered = self._types.setdefault(name, kind)
+            if registered != kind:
+                raise ValueError(f"Metric {name} is already registered as a {registered}")
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = factory()
+            return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get("counter", Counter, name, labels)
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        return self._get("gauge", Gauge, name, labels)
+
+    def histogram(self, name: str, buckets: Optional[Sequence[float]] = None, **labels) -> Histogram:
+        return self._get("histogram", lambda: Histogram(buckets or DEFAULT_LATENCY_BUCKETS_MS), name, labels)
+
+    def observe_ms(self, name: str, start: float, **labels) -> float:
+        """Observe the milliseconds elapsed since a time.perf_counter() start; returns them."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.histogram(name, **labels).observe(elapsed_ms)
+        return elapsed_ms
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[_Timer]:
+        """Time a block into a latency histogram (also on exceptions)."""
+        timer = _Timer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            timer.elapsed_ms = self.observe_ms(name, start, **labels)
+
+    def _items(self) -> List[Tuple[str, LabelKey, Any]]:
+        with self._lock:
+            return sorted(((name, labels, metric) for (name, labels), metric in self._metrics.items()),
+                          key=lambda item: (item[0], item[1]))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict."""
+        result: Dict[str, Any] = {"timestamp": time.time(), "counters": [], "gauges": [], "histograms": []}
+        for name, labels, metric in self._items():
+            entry = {"name": name, "labels": dict(labels)}
+            if isinstance(metric, Histogram):
+                entry.update(metric.snapshot())
+                result["histograms"].append(entry)
+            else:
+                entry["value"] = metric.value
+                result["counters" if isinstance(metric, Counter) else "gauges"].append(entry)
+        return result
+
+    def render_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+        for name, labels, metric in self._items():
+            if name not in typed:
+                lines.append(f"# TYPE {name} {self._types[name]}")
+                typed.add(name)
+            if isinstance(metric, Histogram):
+                snapshot = metric.snapshot()
+                cumulative = 0
+                for bound, bucket_count in snapshot["buckets"].items():
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str):
+        """Atomically write the JSON snapshot to a file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp, path)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+            self._types.clear()
+
+
+class MetricsExporter:
+    """Periodic JSON snapshot file and/or HTTP text exposition endpoint."""
+
+    def __init__(self, registry: Optional["MetricsRegistry"] = None, snapshot_file: Optional[str] = None,
+                 interval_seconds: float = 60, http_port: Optional[int] = None, http_host: str = "127.0.0.1"):
+        """
+        Args:
+            registry: Registry to export (global registry by default)
+            snapshot_file: JSON file rewritten every interval_seconds and on stop
+            interval_seconds: Snapshot interval
+            http_port: Serve /metrics (text) and /metrics.json on this port (0 picks a free port)
+            http_host: Bind address of the HTTP endpoint
+        """
+        self.registry = registry or get_metrics_registry()
+        self.snapshot_file = snapshot_file
+        self.interval_seconds = interval_seconds
+        self.http_port = http_port
+        self.http_host = http_host
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def server_address(self) -> Optional[Tuple[str, int]]:
+        return self._server.server_address if self._server else None
+
+    def start(self) -> "MetricsExporter":
+        if self.snapshot_file:
+            self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+            self._thread.start()
+        if self.http_port is not None:
+            registry = self.registry
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path == "/metrics":
+                        body, content_type = registry.render_text(), "text/plain; version=0.0.4"
+                    elif self.path == "/metrics.json":
+                        body, content_type = json.dumps(registry.snapshot()), "application/json"
+                    else:
+                        self.send_error(404)
+                        return
+                    data = body.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, format, *args):
+                    pass  # keep scrapes out of stderr
+
+            self._server = ThreadingHTTPServer((self.http_host, self.http_port), _Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self._write()
+
+    def _write(self):
+        try:
+            self.registry.write_snapshot(self.snapshot_file)
+        except OSError:
+            pass  # metrics export must never break the trading loop
+
+    def stop(self):
+        """Stop the exporter, writing a final snapshot."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+            self._write()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Global registry shared by all components
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    return _metrics_registry
+
+
+def reset_metrics():
+    """Clear all metrics in the global registry (testing)."""
+    _metrics_registry.reset()
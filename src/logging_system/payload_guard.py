@@ -0,0 +1,200 @@
+"""
+Payload Guard - bounded-size log contexts
+Keeps log record size independent of candle counts and payload sizes
+
+Applied to every StructuredLogger context before the record is emitted:
+- Strings longer than max_string_chars are truncated
+- Lists/tuples/arrays longer than max_list_items are summarized
+  (length, head/tail items, min/max for numeric data)
+- Dicts with more than max_dict_keys keys keep only the first keys
+- Nesting deeper than max_depth is replaced by a short description
+
+log_raw_data records can additionally be sampled with raw_data_sample_rate.
+All savings are counted (estimated bytes of JSON not written).
+"""
+
+import json
+import random
+import threading
+from numbers import Number
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+_ESTIMATE_ENCODER = json.JSONEncoder(separators=(',', ':'), default=str, ensure_ascii=False)
+
+
+class PayloadGuard:
+    """
+    Caps, summarizes and samples log payloads.
+
+    Thread-safe: limits are read-only during apply(), counters are updated under a lock.
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 max_string_chars: int = 2000,
+                 max_list_items: int = 20,
+                 edge_items: int = 3,
+                 max_dict_keys: int = 100,
+                 max_depth: int = 6,
+                 raw_data_sample_rate: float = 1.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            enabled: Disable to log contexts unchanged
+            max_string_chars: Maximum length of a string value
+            max_list_items: Sequences longer than this are summarized
+            edge_items: Number of head/tail items kept in a summary
+            max_dict_keys: Maximum number of keys kept per dict
+            max_depth: Maximum nesting depth kept
+            raw_data_sample_rate: Fraction (0..1) of log_raw_data records emitted
+            seed: Optional seed for the sampling RNG (tests)
+        """
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._stats = self._empty_stats()
+        self.configure(enabled=enabled, max_string_chars=max_string_chars,
+                       max_list_items=max_list_items, edge_items=edge_items,
+                       max_dict_keys=max_dict_keys, max_depth=max_depth,
+                       raw_data_sample_rate=raw_data_sample_rate)
+
+    def configure(self, **limits):
+        """Update limits in place (loggers share the guard instance)."""
+        for key, value in limits.items():
+            if key not in ("enabled", "max_string_chars", "max_list_items", "edge_items",
+                           "max_dict_keys", "max_depth", "raw_data_sample_rate"):
+                raise ValueError(f"Unknown payload limit: {key}")
+            setattr(self, key, value)
+        if not 0.0 <= self.raw_data_sample_rate <= 1.0:
+            raise ValueError(f"raw_data_sample_rate must be within [0, 1], got {self.raw_data_sample_rate}")
+        if self.edge_items * 2 > self.max_list_items:
+            raise ValueError("edge_items * 2 must not exceed max_list_items")
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            "strings_truncated": 0,
+            "sequences_summarized": 0,
+            "dicts_trimmed": 0,
+            "raw_data_sampled_out": 0,
+            "bytes_saved": 0,
+        }
+
+    def apply(self, context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Return a bounded-size version of a log context.
+
+        The input is never mutated; it is returned as-is when nothing exceeds the limits.
+        """
+        if not self.enabled or not context:
+            return context
+        counters = self._empty_stats()
+        try:
+            guarded = self._guard(context, 0, counters)
+        except Exception:
+            # The guard must never break logging; the formatter has its own fallback
+            return context
+        if guarded is not context:
+            with self._lock:
+                for key, value in counters.items():
+                    self._stats[key] += value
+        return guarded
+
+    def sample_raw_data(self) -> bool:
+        """Decide whether a log_raw_data record is emitted (counts skipped records)."""
+        if not self.enabled or self.raw_data_sample_rate >= 1.0:
+            return True
+        with self._lock:
+            keep = self._random.random() < self.raw_data_sample_rate
+            if not keep:
+                self._stats["raw_data_sampled_out"] += 1
+        return keep
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return truncation/summarization counters and estimated bytes saved."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """Reset all counters."""
+        with self._lock:
+            self._stats = self._empty_stats()
+
+    def _guard(self, value: Any, depth: int, counters: Dict[str, int]) -> Any:
+        """Recursively bound a value; returns the same object when unchanged."""
+        if isinstance(value, str):
+            if len(value) <= self.max_string_chars:
+                return value
+            omitted = len(value) - self.max_string_chars
+            counters["strings_truncated"] += 1
+            counters["bytes_saved"] += omitted
+            return f"{value[:self.max_string_chars]}...[truncated {omitted} chars]"
+
+        if isinstance(value, dict):
+            if depth >= self.max_depth:
+                return self._describe(value, counters)
+            items = value.items()
+            trimmed = len(value) > self.max_dict_keys
+            if trimmed:
+                items = list(items)
+                omitted_items = items[self.max_dict_keys:]
+                items = items[:self.max_dict_keys]
+                counters["dicts_trimmed"] += 1
+                counters["bytes_saved"] += len(_ESTIMATE_ENCODER.encode(dict(omitted_items)))
+            result = {}
+            changed = trimmed
+            for key, item in items:
+                guarded = self._guard(item, depth + 1, counters)
+                changed = changed or guarded is not item
+                result[key] = guarded
+            if trimmed:
+                result["_omitted_keys"] = len(value) - self.max_dict_keys
+            return result if changed else value
+
+        if isinstance(value, (list, tuple, np.ndarray)):
+            if depth >= self.max_depth:
+                return self._describe(value, counters)
+            if len(value) > self.max_list_items:
+                return self._summarize(value, depth, counters)
+            if isinstance(value, np.ndarray):
+                return [self._guard(item, depth + 1, counters) for item in value.tolist()]
+            result = [self._guard(item, depth + 1, counters) for item in value]
+            if all(new is old for new, old in zip(result, value)):
+                return value
+            return result
+
+        return value
+
+    def _summarize(self, sequence: Any, depth: int, counters: Dict[str, int]) -> Dict[str, Any]:
+        """Summarize a long sequence: length, head/tail and numeric range."""
+        kind = type(sequence).__name__
+        if isinstance(sequence, np.ndarray):
+            sequence = sequence.tolist()
+        length = len(sequence)
+        head = [self._guard(item, depth + 1, counters) for item in sequence[:self.edge_items]]
+        tail = [self._guard(item, depth + 1, counters) for item in sequence[length - self.edge_items:]]
+        summary: Dict[str, Any] = {"_summarized": kind, "length": length,
+                                   "head": head, "tail": tail}
+        if all(isinstance(item, Number) and not isinstance(item, bool) for item in sequence):
+            summary["min"] = min(sequence)
+            summary["max"] = max(sequence)
+
+        # Estimate omitted bytes from the average size of the kept edge items
+        edges = head + tail
+        kept_size = len(_ESTIMATE_ENCODER.encode(edges)) if edges else 0
+        average_item = kept_size / len(edges) if edges else 0
+        counters["sequences_summarized"] += 1
+        counters["bytes_saved"] += max(0, int(average_item * length) - len(_ESTIMATE_ENCODER.encode(summary)))
+        return summary
+
+    @staticmethod
+    def _describe(value: Any, counters: Dict[str, int]) -> str:
+        """Replace a too-deeply nested container by a short description."""
+        description = f"<{type(value).__name__} len={len(value)}>"
+        try:
+            counters["bytes_saved"] += max(0, len(_ESTIMATE_ENCODER.encode(value)) - len(description))
+        except ValueError:
+            pass  # circular structure - nothing meaningful to estimate
+        return description
@@ -0,0 +1,253 @@
+"""
+Stage-Level Profiling
+Opt-in wall time and allocation breakdown for get_market_data and run_cycle
+
+profile_operation() (or the @profiled decorator) opens a profile for one
+operation; profile_stage() blocks inside it record monotonic timings and, when
+allocation tracing is enabled, net tracemalloc bytes per stage. Nested
+operations (get_market_data inside run_cycle) become stages of the enclosing
+profile. When the outermost operation finishes, its breakdown is logged with
+the operation trace_id and kept in a short history for reports.
+
+Disabled profiling (the default) returns a shared no-op context manager, so
+instrumented stages cost one attribute check.
+
+Usage:
+    configure_profiling(enabled=True, trace_allocations=True)
+
+    with profile_operation("run_cycle", trace_id=trace_id):
+        with profile_stage("network"):
+            ...
+    print(get_recent_profiles()[-1].format_report())
+"""
+
+import contextvars
+import functools
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+_NOOP = nullcontext()
+
+# (active profile, path of the current stage within it)
+_active_profile: contextvars.ContextVar[Optional[Tuple["CycleProfile", str]]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+class CycleProfile:
+    """Stage timings of one profiled operation, aggregated by stage path."""
+
+    def __init__(self, operation: str, trace_id: Optional[str] = None, trace_allocations: bool = False):
+        self.operation = operation
+        self.trace_id = trace_id
+        self.trace_allocations = trace_allocations
+        self.total_ms = 0.0
+        self.peak_bytes: Optional[int] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def open(self, path: str):
+        """Register a stage on entry, so the breakdown lists parents before their sub-stages."""
+        if path not in self.stages:
+            self.stages[path] = {"calls": 0, "total_ms": 0.0}
+
+    def add(self, path: str, elapsed_ms: float, alloc_bytes: Optional[int] = None):
+        stage = self.stages.get(path)
+        if stage is None:
+            stage = self.stages[path] = {"calls": 0, "total_ms": 0.0}
+        stage["calls"] += 1
+        stage["total_ms"] += elapsed_ms
+        if alloc_bytes is not None:
+            stage["alloc_bytes"] = stage.get("alloc_bytes", 0) + alloc_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Breakdown with each stage's share of the operation wall time."""
+        top_level_ms = sum(s["total_ms"] for path, s in self.stages.items() if "/" not in path)
+        stages = []
+        for path, stage in self.stages.items():
+            entry = {"stage": path, "calls": stage["calls"], "total_ms": round(stage["total_ms"], 3),
+                     "share_pct": round(100 * stage["total_ms"] / self.total_ms, 1) if self.total_ms else 0.0}
+            if "alloc_bytes" in stage:
+                entry["alloc_bytes"] = stage["alloc_bytes"]
+            stages.append(entry)
+        result = {
+            "operation": self.operation,
+            "trace_id": self.trace_id,
+            "total_ms": round(self.total_ms, 3),
+            "unaccounted_ms": round(max(0.0, self.total_ms - top_level_ms), 3),
+            "stages": stages,
+        }
+        if self.peak_bytes is not None:
+            result["peak_bytes"] = self.peak_bytes
+        return result
+
+    def format_report(self) -> str:
+        """Human-readable per-stage breakdown."""
+        data = self.to_dict()
+        lines = [f"Profile {self.operation} (trace_id={self.trace_id}): {data['total_ms']:.3f} ms"]
+        header = f"  {'stage':<40} {'calls':>5} {'ms':>10} {'%':>6}"
+        if self.trace_allocations:
+            header += f" {'alloc KiB':>10}"
+        lines.append(header)
+        for stage in data["stages"]:
+            depth = stage["stage"].count("/")
+            name = "  " * depth + stage["stage"].rsplit("/", 1)[-1]
+            line = f"  {name:<40} {stage['calls']:>5} {stage['total_ms']:>10.3f} {stage['share_pct']:>6.1f}"
+            if "alloc_bytes" in stage:
+                line += f" {stage['alloc_bytes'] / 1024:>10.1f}"
+            lines.append(line)
+        lines.append(f"  {'(unaccounted)':<40} {'':>5} {data['unaccounted_ms']:>10.3f}")
+        if self.peak_bytes is not None:
+            lines.append(f"  peak traced memory: {self.peak_bytes / 1024:.1f} KiB")
+        return "\n".join(lines)
+
+
+class _StageScope:
+    """Times one stage of the active profile."""
+
+    __slots__ = ("name", "_profile", "_path", "_token", "_start", "_memory")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._profile = None
+
+    def __enter__(self):
+        active = _active_profile.get()
+        if active is None:
+            return self
+        self._profile, parent = active
+        self._path = f"{parent}/{self.name}" if parent else self.name
+        self._token = _active_profile.set((self._profile, self._path))
+        self._profile.open(self._path)
+        self._memory = tracemalloc.get_traced_memory()[0] if self._profile.trace_allocations else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is None:
+            return False
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        alloc = tracemalloc.get_traced_memory()[0] - self._memory if self._memory is not None else None
+        _active_profile.reset(self._token)
+        self._profile.add(self._path, elapsed_ms, alloc)
+        self._profile = None
+        return False
+
+
+class StageProfiler:
+    """Profiling switch, finished-profile history and trace logging."""
+
+    def __init__(self, enabled: bool = False, trace_allocations: bool = False, history_size: int = 50):
+        self.enabled = False
+        self.trace_allocations = False
+        self._started_tracemalloc = False
+        self._history: deque = deque(maxlen=history_size)
+        self._logger = None
+        self.configure(enabled, trace_allocations)
+
+    def configure(self, enabled: bool = False, trace_allocations: bool = False):
+        """Enable/disable profiling; allocation tracing starts tracemalloc if needed."""
+        self.enabled = enabled
+        self.trace_allocations = enabled and trace_allocations
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not self.trace_allocations and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def finish(self, profile: CycleProfile):
+        self._history.append(profile)
+        try:
+            if self._logger is None:
+                from .json_formatter import StructuredLogger
+                self._logger = StructuredLogger("profiling", "StageProfiler")
+            self._logger.info(
+                f"{profile.operation} profile: {profile.total_ms:.1f} ms",
+                operation="stage_profile",
+                context=profile.to_dict(),
+                tags=["profiling", profile.operation.lower().replace("_", "")],
+                trace_id=profile.trace_id
+            )
+        except Exception:
+            # Graceful degradation: profiling output must not break the operation
+            pass
+
+    def get_recent_profiles(self) -> List[CycleProfile]:
+        return list(self._history)
+
+    def reset(self):
+        self.configure(False, False)
+        self._history.clear()
+
+
+@contextmanager
+def _profile_root(operation: str, trace_id: Optional[str]):
+    profiler = _profiler
+    profile = CycleProfile(operation, trace_id, profiler.trace_allocations and tracemalloc.is_tracing())
+    if profile.trace_allocations:
+        tracemalloc.reset_peak()
+    token = _active_profile.set((profile, ""))
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - start) * 1000
+        if profile.trace_allocations:
+            profile.peak_bytes = tracemalloc.get_traced_memory()[1]
+        _active_profile.reset(token)
+        profiler.finish(profile)
+
+
+def profile_operation(operation: str, trace_id: Optional[str] = None):
+    """
+    Profile an operation. Starts a new profile, or records a stage when an
+    enclosing profile is already active. No-op while profiling is disabled.
+    """
+    if not _profiler.enabled:
+        return _NOOP
+    if _active_profile.get() is not None:
+        return _StageScope(operation)
+    return _profile_root(operation, trace_id)
+
+
+def profile_stage(name: str):
+    """Time a stage of the active profile. No-op when disabled or outside a profile."""
+    if not _profiler.enabled:
+        return _NOOP
+    return _StageScope(name)
+
+
+def profiled(operation: str) -> Callable:
+    """Decorator form of profile_operation; picks up a trace_id keyword argument."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with profile_operation(operation, trace_id=kwargs.get("trace_id")):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Global profiler instance
+_profiler = StageProfiler()
+
+
+def configure_profiling(enabled: bool = False, trace_allocations: bool = False):
+    """Enable or disable stage profiling globally."""
+    _profiler.configure(enabled, trace_allocations)
+
+
+def get_recent_profiles() -> List[CycleProfile]:
+    """Return recently finished operation profiles, oldest first."""
+    return _profiler.get_recent_profiles()
+
+
+def reset_profiling():
+    """Disable profiling and clear history (testing)."""
+    _profiler.reset()
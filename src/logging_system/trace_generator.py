@@ -3,24 +3,39 @@ AI-Optimized Trace ID Generation System
 Generates sequential trace IDs and flow IDs for complete log traceability
 """
 
+import itertools
 import time
-import threading
 from datetime import datetime, timezone
 from typing import Optional
 
 
 class TraceGenerator:
     """
-    Thread-safe, simplified trace ID generator for hierarchical logging.
+    Lock-free, simplified trace ID generator for hierarchical logging.
     
     Generates a unique ID for an entire operation flow.
     The concept of a separate `flow_id` is deprecated and merged into this single `trace_id`.
+    
+    Uniqueness comes from a single process-wide itertools.count (next() on it is
+    atomic under the GIL), so no lock is taken per ID. The "trd_{session}_{timestamp}"
+    prefix is formatted once per second and reused.
     """
     
     def __init__(self, session_id: str = "001"):
         self.session_id = session_id
-        self._counter = 0
-        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._prefix_cache = (None, "")
+
+    def _prefix(self) -> str:
+        """Return the cached "trd_{session}_{YYYYmmddHHMMSS}" prefix for the current second."""
+        second = int(time.time())
+        cached_second, prefix = self._prefix_cache
+        if cached_second != second:
+            timestamp = datetime.fromtimestamp(second, timezone.utc).strftime("%Y%m%d%H%M%S")
+            prefix = f"trd_{self.session_id}_{timestamp}"
+            # Tuple assignment is atomic; concurrent refreshes write identical values
+            self._prefix_cache = (second, prefix)
+        return prefix
 
     def generate_trace_id(self, parent_trace_id: Optional[str] = None) -> str:
         """
@@ -32,16 +47,12 @@ class TraceGenerator:
         Format: trd_{session}_{timestamp}{sequence}
         Example: "trd_001_20250808233800001"
         """
-        with self._lock:
-            self._counter += 1
-            timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-            sequence = f"{self._counter:05d}"
-            return f"trd_{self.session_id}_{timestamp}{sequence}"
+        sequence = next(self._counter)
+        return f"{self._prefix()}{sequence:05d}"
 
     def reset_counter(self):
         """Resets the counter, primarily for testing purposes."""
-        with self._lock:
-            self._counter = 0
+        self._counter = itertools.count(1)
 
 
 # Global singleton instance of the trace generator
@@ -0,0 +1,261 @@
+"""
+Indexed Trace Store
+Append-only JSON log segments with a trace_id -> offset index
+
+Every structured record is appended as one JSON line to the active segment file
+(segment_000001.jsonl, segment_000002.jsonl, ...). A SQLite index maps trace_id
+(and parent_trace_id, so child operations belong to the parent trace) to
+(segment, offset, length). Looking up a trace reads only its own records, so
+query time does not depend on the total log volume.
+
+Retention works by whole segments: when more than max_segments exist, the oldest
+segment file is deleted together with its index rows.
+
+CLI:
+    python -m src.logging_system.trace_store logs/trace_store <trace_id>
+    python -m src.logging_system.trace_store logs/trace_store --stats
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_SEGMENT_PATTERN = re.compile(r"^segment_(\d{6})\.jsonl$")
+_INDEX_FILE = "index.db"
+
+
+class TraceStore:
+    """
+    Segment files plus a SQLite trace index.
+
+    Thread-safe: appends and queries are serialized with a lock. Index rows are
+    committed in batches (every commit_every records, on flush and before queries).
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 16 * 1024 * 1024,
+                 max_segments: int = 20, commit_every: int = 200):
+        """
+        Args:
+            directory: Directory holding segment files and the index
+            segment_max_bytes: Segment size after which a new segment is started
+            max_segments: Number of segments kept (oldest are deleted)
+            commit_every: Number of appended records per index commit
+        """
+        if segment_max_bytes <= 0 or max_segments < 1:
+            raise ValueError("segment_max_bytes must be positive and max_segments >= 1")
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.commit_every = commit_every
+        self._lock = threading.RLock()
+        self._pending = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, _INDEX_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trace_index (
+                trace_id TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trace_index_trace_id ON trace_index (trace_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trace_index_segment ON trace_index (segment)")
+        self._conn.commit()
+
+        segments = self.list_segments()
+        self._segment = segments[-1] if segments else 1
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._offset = self._file.tell()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:06d}.jsonl")
+
+    def list_segments(self) -> List[int]:
+        """Return existing segment numbers, oldest first."""
+        segments = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def append(self, line: str, trace_id: Optional[str], parent_trace_id: Optional[str] = None):
+        """
+        Append one JSON line and index it under trace_id (and parent_trace_id).
+
+        Args:
+            line: Serialized JSON record (without trailing newline)
+            trace_id: Trace the record belongs to
+            parent_trace_id: Optional parent trace, so the record is returned for it as well
+        """
+        data = line.encode("utf-8") + b"\n"
+        with self._lock:
+            if self._offset and self._offset + len(data) > self.segment_max_bytes:
+                self._roll_segment()
+            offset = self._offset
+            self._file.write(data)
+            self._offset += len(data)
+
+            rows = []
+            if trace_id:
+                rows.append((trace_id, self._segment, offset, len(data)))
+            if parent_trace_id and parent_trace_id != trace_id:
+                rows.append((parent_trace_id, self._segment, offset, len(data)))
+            if rows:
+                self._conn.executemany(
+                    "INSERT INTO trace_index (trace_id, segment, offset, length) VALUES (?, ?, ?, ?)", rows
+                )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._commit()
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Return all records of a trace (including child operations) in write order."""
+        with self._lock:
+            self._commit()
+            rows = self._conn.execute(
+                "SELECT segment, offset, length FROM trace_index WHERE trace_id = ? ORDER BY segment, offset",
+                (trace_id,)
+            ).fetchall()
+        return [json.loads(line) for line in self._read_lines(rows)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return segment count, total bytes on disk and indexed trace count."""
+        with self._lock:
+            self._commit()
+            traces = self._conn.execute("SELECT COUNT(DISTINCT trace_id) FROM trace_index").fetchone()[0]
+            segments = self.list_segments()
+            total_bytes = sum(os.path.getsize(self._segment_path(s)) for s in segments)
+        return {
+            "segments": len(segments),
+            "active_segment": self._segment,
+            "bytes": total_bytes,
+            "indexed_traces": traces,
+        }
+
+    def flush(self):
+        """Flush the active segment and commit pending index rows."""
+        with self._lock:
+            self._file.flush()
+            self._commit()
+
+    def close(self):
+        """Flush and close the segment file and the index."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self.flush()
+            self._file.close()
+            self._conn.close()
+
+    def _commit(self):
+        if self._pending:
+            self._file.flush()
+            self._conn.commit()
+            self._pending = 0
+
+    def _roll_segment(self):
+        """Start a new segment and apply retention."""
+        self._commit()
+        self._file.close()
+        self._segment += 1
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._offset = 0
+
+        segments = self.list_segments()
+        for segment in segments[:max(0, len(segments) - self.max_segments)]:
+            self._conn.execute("DELETE FROM trace_index WHERE segment = ?", (segment,))
+            os.remove(self._segment_path(segment))
+        self._conn.commit()
+
+    def _read_lines(self, rows: List[Tuple[int, int, int]]) -> List[str]:
+        """Read indexed records, opening each segment once."""
+        lines = []
+        current_segment, handle = None, None
+        try:
+            for segment, offset, length in rows:
+                if segment != current_segment:
+                    if handle:
+                        handle.close()
+                    path = self._segment_path(segment)
+                    if not os.path.exists(path):
+                        current_segment, handle = None, None
+                        continue
+                    handle = open(path, "rb")
+                    current_segment = segment
+                handle.seek(offset)
+                lines.append(handle.read(length).decode("utf-8"))
+        finally:
+            if handle:
+                handle.close()
+        return lines
+
+
+class TraceStoreHandler(logging.Handler):
+    """
+    Logging handler writing formatted JSON records into a TraceStore.
+
+    Uses the handler formatter (AIOptimizedJSONFormatter or FastJSONFormatter),
+    which also attaches the final trace_id to the record.
+    """
+
+    def __init__(self, store: TraceStore, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.store = store
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)
+            context = getattr(record, "context", None) or {}
+            self.store.append(line, getattr(record, "trace_id", None), context.get("parent_trace_id"))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.store.flush()
+
+    def close(self):
+        try:
+            self.store.close()
+        finally:
+            super().close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print all records of a trace (JSON lines) or store statistics."""
+    parser = argparse.ArgumentParser(description="Query the indexed trace log store")
+    parser.add_argument("directory", help="Trace store directory (e.g. logs/trace_store)")
+    parser.add_argument("trace_id", nargs="?", help="Trace ID to print")
+    parser.add_argument("--stats", action="store_true", help="Print store statistics")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Trace store directory not found: {args.directory}", file=sys.stderr)
+        return 1
+
+    store = TraceStore(args.directory)
+    try:
+        if args.stats or not args.trace_id:
+            print(json.dumps(store.get_stats(), indent=2))
+            return 0
+        records = store.get_trace(args.trace_id)
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False))
+        return 0 if records else 2
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,11 @@ import sys
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 
+try:
+    from .compressed_rotation import list_archives, open_log
+except ImportError:  # запуск как отдельный скрипт: python troubleshooting.py ...
+    from compressed_rotation import list_archives, open_log
+
 
 def check_service_status(service_name: str) -> Dict[str, str]:
     """
@@ -176,6 +181,18 @@ def analyze_log_errors(log_path: str, hours_back: int = 24) -> List[str]:
                                     errors.append(f"trading.log.{i}: {line.strip()}")
                     except:
                         continue
+            
+            # Поиск в архивах CompressedRotatingFileHandler (trading.log.YYYYmmdd-HHMMSS-NNN.gz),
+            # распаковка потоковая - файлы не загружаются в память целиком
+            for archive in list_archives(os.path.join(log_path, 'trading.log')):
+                try:
+                    with open_log(archive) as f:
+                        for line in f:
+                            for pattern in critical_patterns:
+                                if pattern in line:
+                                    errors.append(f"{os.path.basename(archive)}: {line.strip()}")
+                except (OSError, ImportError, EOFError):
+                    continue
                         
     except Exception as e:
         errors.append(f"Error analyzing logs: {e}")
@@ -7,8 +7,10 @@ Provides structured market data for LLM analysis:
 - Level 3: 48 hours 1H candles (short-term signals)
 - Technical indicators: RSI, MACD, MA(20/50)
 - Market context: BTC correlation, Fear & Greed Index
+- Incremental context: full snapshots + deltas for continuous LLM operation
 """
 
 from .market_data_service import MarketDataService, MarketDataSet
+from .context_diff import ContextDiffTracker
 
-__all__ = ["MarketDataService", "MarketDataSet"]
\ No newline at end of file
+__all__ = ["MarketDataService", "MarketDataSet", "ContextDiffTracker"]
\ No newline at end of file
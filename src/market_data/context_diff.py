@@ -0,0 +1,223 @@
+"""
+Context Diff Tracker - incremental LLM context for continuous operation.
+
+Between two hourly cycles only the newest 1H bar (and occasionally a 4H/1D bar)
+changes, yet the full MarketDataSet context re-sends every candle. The tracker
+keeps the last context sent per symbol and emits:
+- a full snapshot for the first cycle, every N cycles, or after invalidation
+- a compact delta otherwise: new/updated bars, changed indicators, crossed levels
+
+Each payload carries a version; a delta names the baseline version it applies to,
+so the consumer can detect a missed payload and request a full snapshot.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.logging_system import MarketDataLogger
+
+
+# Context sections whose scalar values are compared for the delta
+_INDICATOR_SECTIONS = ("primary_indicators", "key_levels", "market_sentiment")
+
+# Price levels checked for crossings: (section, key)
+_PRICE_LEVELS = (
+    ("primary_indicators", "ma_20"),
+    ("primary_indicators", "ma_50"),
+    ("key_levels", "support"),
+    ("key_levels", "resistance"),
+)
+
+_PAYLOAD_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), check_circular=False)
+
+
+@dataclass
+class _SymbolBaseline:
+    """Last context acknowledged as sent for one symbol."""
+    version: int
+    context: dict
+    deltas_since_snapshot: int = 0
+
+
+class ContextDiffTracker:
+    """
+    Builds full or delta context payloads per symbol.
+
+    Thread-safe: payload building for one tracker is serialized with a lock so that
+    versions stay monotonic when several symbols are processed concurrently.
+    """
+
+    def __init__(self, full_snapshot_interval: int = 24, logger: Optional[MarketDataLogger] = None,
+                 debug_stats: bool = False):
+        """
+        Args:
+            full_snapshot_interval: Number of consecutive deltas after which a full
+                snapshot is sent again (bounds drift if a delta was lost).
+            logger: Optional logger for payload statistics.
+            debug_stats: Also serialize the full context on every payload to report
+                bytes_full_equivalent / bytes_saved (costs a full serialization per call).
+        """
+        if full_snapshot_interval < 1:
+            raise ValueError(f"full_snapshot_interval must be >= 1, got {full_snapshot_interval}")
+        self.full_snapshot_interval = full_snapshot_interval
+        self.logger = logger
+        self.debug_stats = debug_stats
+        self._baselines: Dict[str, _SymbolBaseline] = {}
+        self._lock = threading.Lock()
+        self._stats = {"full_snapshots": 0, "deltas": 0, "bytes_sent": 0, "bytes_full_equivalent": 0}
+
+    def build(self, market_data, trace_id: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+        """
+        Build the context payload for a MarketDataSet and record it as the new baseline.
+
+        The baseline moves on as soon as the payload is built: if it does not reach
+        the consumer, call invalidate() so the next payload is a full snapshot.
+
+        Returns:
+            (payload, compact JSON of the payload). The payload dict has "mode"
+            ("full" or "delta"), "symbol", "version" and either "context" (full)
+            or the delta fields with "baseline_version".
+        """
+        symbol = market_data.symbol
+        context = market_data.to_context_dict()
+
+        with self._lock:
+            baseline = self._baselines.get(symbol)
+            if baseline is None or baseline.deltas_since_snapshot >= self.full_snapshot_interval:
+                payload = self._record_full(symbol, context, baseline)
+            else:
+                payload = self._build_delta(symbol, context, baseline)
+                baseline.version += 1
+                baseline.context = context
+                baseline.deltas_since_snapshot += 1
+                payload["version"] = baseline.version
+                self._stats["deltas"] += 1
+
+            encoded = self.encode(payload)
+            full_size = len(market_data.to_json_context()) if self.debug_stats else None
+            self._stats["bytes_sent"] += len(encoded)
+            if full_size is not None:
+                self._stats["bytes_full_equivalent"] += full_size
+
+        if self.logger:
+            self.logger.log_operation_complete(
+                "build_context_payload",
+                context=lambda: {
+                    "symbol": symbol,
+                    "mode": payload["mode"],
+                    "version": payload["version"],
+                    "payload_bytes": len(encoded),
+                    **({"full_context_bytes": full_size} if full_size is not None else {}),
+                },
+                trace_id=trace_id
+            )
+        return payload, encoded
+
+    @staticmethod
+    def encode(payload: Dict[str, Any]) -> str:
+        """Encode a payload as compact JSON."""
+        return _PAYLOAD_JSON_ENCODER.encode(payload)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """
+        Force a full snapshot on the next payload.
+
+        Call this when the consumer did not receive or could not apply the last payload
+        (e.g. the LLM request failed). Without a symbol all baselines are dropped.
+        """
+        with self._lock:
+            if symbol is None:
+                self._baselines.clear()
+            else:
+                self._baselines.pop(symbol, None)
+
+    def get_baseline_version(self, symbol: str) -> Optional[int]:
+        """Return the version of the last payload sent for a symbol, if any."""
+        with self._lock:
+            baseline = self._baselines.get(symbol)
+            return baseline.version if baseline else None
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Return payload counters and total bytes sent vs. full-context bytes
+        (full-context bytes and bytes_saved are only collected with debug_stats).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        if self.debug_stats:
+            stats["bytes_saved"] = stats["bytes_full_equivalent"] - stats["bytes_sent"]
+        return stats
+
+    def _record_full(self, symbol: str, context: dict, baseline: Optional[_SymbolBaseline]) -> Dict[str, Any]:
+        """Record a full snapshot as the new baseline and return its payload."""
+        version = baseline.version + 1 if baseline else 1
+        self._baselines[symbol] = _SymbolBaseline(version=version, context=context)
+        self._stats["full_snapshots"] += 1
+        return {"mode": "full", "symbol": symbol, "version": version, "context": context}
+
+    def _build_delta(self, symbol: str, context: dict, baseline: _SymbolBaseline) -> Dict[str, Any]:
+        """Build a delta payload against the baseline context."""
+        previous = baseline.context
+        payload: Dict[str, Any] = {
+            "mode": "delta",
+            "symbol": symbol,
+            "baseline_version": baseline.version,
+            "current_price": context["current_price"],
+        }
+
+        new_candles = {
+            timeframe: self._diff_candles(previous["raw_candles"].get(timeframe, []), candles)
+            for timeframe, candles in context["raw_candles"].items()
+        }
+        new_candles = {timeframe: candles for timeframe, candles in new_candles.items() if candles}
+        if new_candles:
+            payload["new_candles"] = new_candles
+
+        changed = self._diff_indicators(previous, context)
+        if changed:
+            payload["changed_indicators"] = changed
+
+        crossed = self._find_crossed_levels(previous["current_price"], context)
+        if crossed:
+            payload["crossed_levels"] = crossed
+
+        return payload
+
+    @staticmethod
+    def _diff_candles(previous: List[dict], current: List[dict]) -> List[dict]:
+        """Return candles that are new or whose values changed (e.g. the forming bar)."""
+        if not previous:
+            return list(current)
+        previous_by_time = {candle["t"]: candle for candle in previous}
+        return [candle for candle in current if previous_by_time.get(candle["t"]) != candle]
+
+    @staticmethod
+    def _diff_indicators(previous: dict, current: dict) -> Dict[str, Dict[str, Any]]:
+        """Return changed indicator values grouped by context section."""
+        changed = {}
+        for section in _INDICATOR_SECTIONS:
+            old_values = previous.get(section, {})
+            section_changes = {
+                key: value for key, value in current.get(section, {}).items()
+                if old_values.get(key) != value
+            }
+            if section_changes:
+                changed[section] = section_changes
+        return changed
+
+    @staticmethod
+    def _find_crossed_levels(previous_price: float, current: dict) -> List[Dict[str, Any]]:
+        """Return price levels crossed between the previous and current price."""
+        current_price = current["current_price"]
+        crossed = []
+        for section, key in _PRICE_LEVELS:
+            level = current.get(section, {}).get(key)
+            if level is None:
+                continue
+            if previous_price < level <= current_price:
+                crossed.append({"level": key, "value": level, "direction": "up"})
+            elif previous_price > level >= current_price:
+                crossed.append({"level": key, "value": level, "direction": "down"})
+        return crossed
@@ -12,8 +12,8 @@ Includes technical indicators and market context for comprehensive analysis.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, NamedTuple
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, NamedTuple
+from dataclasses import dataclass, field
 from decimal import Decimal, ROUND_HALF_UP
 import time
 import json
@@ -40,6 +40,95 @@ from src.infrastructure.sentiment_client import SentimentApiClient
 
 # Direct logging imports - simplified approach
 from src.logging_system import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+from src.logging_system.profiling import profile_stage, profiled
+
+
+# Shared compact encoder for LLM context payloads. Reusing a single instance avoids
+# json.dumps() building a new JSONEncoder for every call with non-default options.
+_CONTEXT_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), check_circular=False)
+
+# Short candle keys used in the serialized context (t=unix seconds, o/h/l/c/v=OHLCV)
+_CANDLE_KEYS = ('t', 'o', 'h', 'l', 'c', 'v')
+
+
+def _format_candles(df: pd.DataFrame) -> list:
+    """
+    Build a list of compact candle dicts directly from the DataFrame column arrays.
+
+    The DataFrame is only read, never modified, so the caller's candles keep their
+    original columns.
+    """
+    if df.empty:
+        return []
+
+    # datetime64 (naive or UTC-aware) -> UNIX epoch seconds without touching the frame
+    unix_seconds = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype('datetime64[s]').astype(np.int64)
+
+    columns = (
+        unix_seconds.tolist(),
+        df['open'].to_numpy().tolist(),
+        df['high'].to_numpy().tolist(),
+        df['low'].to_numpy().tolist(),
+        df['close'].to_numpy().tolist(),
+        df['volume'].to_numpy().tolist(),
+    )
+    return [dict(zip(_CANDLE_KEYS, row)) for row in zip(*columns)]
+
+
+def klines_to_dataframe(klines_data: list) -> pd.DataFrame:
+    """Converts raw Binance kline rows to a DataFrame (timestamp, open, high, low, close, volume)."""
+    if not klines_data:
+        return pd.DataFrame()
+        
+    df = pd.DataFrame(klines_data, columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_asset_volume', 'number_of_trades',
+        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+    ])
+    
+    numeric_columns = ['open', 'high', 'low', 'close', 'volume']
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col])
+        
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.tz_localize('UTC')
+    
+    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+
+
+def basic_trading_decision(indicators) -> str:
+    """
+    Rule-based decision from rsi_14, macd_signal and ma_trend of any object
+    exposing them (MarketDataSet, or a backtest indicator snapshot).
+    """
+    bullish_signals = 0
+    bearish_signals = 0
+    
+    # RSI signals
+    if indicators.rsi_14 < Decimal('30'):
+        bullish_signals += 1  # Oversold
+    elif indicators.rsi_14 > Decimal('70'):
+        bearish_signals += 1  # Overbought
+    
+    # MACD signals
+    if indicators.macd_signal == "bullish":
+        bullish_signals += 1
+    elif indicators.macd_signal == "bearish":
+        bearish_signals += 1
+    
+    # MA trend signals
+    if indicators.ma_trend == "uptrend":
+        bullish_signals += 1
+    elif indicators.ma_trend == "downtrend":
+        bearish_signals += 1
+    
+    # Decision logic
+    if bullish_signals > bearish_signals:
+        return "buy"
+    elif bearish_signals > bullish_signals:
+        return "sell"
+    else:
+        return "hold"
 
 
 @dataclass
@@ -72,6 +161,10 @@ class MarketDataSet:
     # Hierarchical tracing support
     trace_id: Optional[str] = None
     
+    # Memoized serialization results (computed lazily, never part of equality/repr)
+    _context_dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _json_context_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         """Comprehensive validation of all MarketDataSet fields."""
         self._validate_symbol()
@@ -258,23 +351,19 @@ class MarketDataSet:
                 raise ValueError(f"Recent price ({recent_price}) too far from MA20 ({self.ma_20}), ratio: {price_diff_ratio}")
     
     def to_context_dict(self) -> dict:
-        """Serializes the dataset to a structured dictionary for consumption."""
-        
-        def format_candles(df: pd.DataFrame) -> list:
-            """Helper to format a DataFrame of candles into a list of dicts."""
-            # Convert timestamp to UNIX epoch seconds for brevity
-            df['unix_timestamp'] = (df['timestamp'] - pd.Timestamp("1970-01-01", tz='UTC')) // pd.Timedelta('1s')
-            
-            # Select and rename columns for brevity
-            formatted_df = df[['unix_timestamp', 'open', 'high', 'low', 'close', 'volume']].copy()
-            formatted_df.columns = ['t', 'o', 'h', 'l', 'c', 'v']
-            
-            # Convert to list of dicts
-            return formatted_df.to_dict(orient='records')
+        """
+        Serializes the dataset to a structured dictionary for consumption.
+
+        The result is built once from the candle arrays and memoized on the dataset,
+        so repeated calls (logging + prompt building) do not re-serialize the frames.
+        The returned dict is shared between callers and must be treated as read-only.
+        """
+        if self._context_dict_cache is not None:
+            return self._context_dict_cache
 
         context_dict = {
             "symbol": self.symbol,
-            "current_price": float(self.h1_candles.iloc[-1]['close']),
+            "current_price": float(self.h1_candles['close'].iat[-1]),
             "primary_indicators": {
                 "rsi_14": float(self.rsi_14),
                 "ma_20": float(self.ma_20) if self.ma_20 is not None else None,
@@ -292,17 +381,20 @@ class MarketDataSet:
                 "volume_profile": self.volume_profile
             },
             "raw_candles": {
-                "daily": format_candles(self.daily_candles),
-                "h4": format_candles(self.h4_candles),
-                "h1": format_candles(self.h1_candles)
+                "daily": _format_candles(self.daily_candles),
+                "h4": _format_candles(self.h4_candles),
+                "h1": _format_candles(self.h1_candles)
             }
         }
-        
+
+        self._context_dict_cache = context_dict
         return context_dict
 
     def to_json_context(self) -> str:
-        """Serializes the dataset to a compact JSON string for LLM consumption."""
-        return json.dumps(self.to_context_dict())
+        """Serializes the dataset to a compact JSON string for LLM consumption (memoized)."""
+        if self._json_context_cache is None:
+            self._json_context_cache = _CONTEXT_JSON_ENCODER.encode(self.to_context_dict())
+        return self._json_context_cache
 
     
     def _analyze_trend(self, df: pd.DataFrame) -> str:
@@ -334,7 +426,8 @@ class MarketDataSet:
 class MarketDataService:
     """Service for aggregating multi-timeframe cryptocurrency market data."""
     
-    def __init__(self, api_client: BinanceApiClient, logger: MarketDataLogger, sentiment_client: Optional[SentimentApiClient] = None):
+    def __init__(self, api_client: BinanceApiClient, logger: MarketDataLogger, sentiment_client: Optional[SentimentApiClient] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         """
         Initializes the MarketDataService.
 
@@ -342,10 +435,12 @@ class MarketDataService:
             api_client: An instance of BinanceApiClient.
             logger: A configured MarketDataLogger instance.
             sentiment_client: An optional instance of SentimentApiClient.
+            metrics: Metrics registry for stage latency and cache events (global registry by default).
         """
         self.api_client = api_client
         self.logger = logger
         self.sentiment_client = sentiment_client
+        self.metrics = metrics or get_metrics_registry()
         
         # Initialize metrics attributes to prevent AttributeError
         self._operation_metrics: Dict[str, Dict[str, int]] = {}
@@ -357,20 +452,26 @@ class MarketDataService:
         self._btc_cache_timestamp: Optional[datetime] = None
         
     def _should_log(self, level: str) -> bool:
-        """Check if message should be logged based on current log level."""
-        log_levels = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
-        current_level = log_levels.get(self._log_level, 20)  # Default to INFO
-        message_level = log_levels.get(level.upper(), 20)
-        return message_level >= current_level
+        """Check if a message of the given level would be emitted by the service logger."""
+        if not self.logger:
+            return False
+        numeric_level = logging.getLevelName(level.upper())
+        if not isinstance(numeric_level, int):
+            numeric_level = logging.INFO
+        return bool(self.logger.is_enabled_for(numeric_level))
     
     
+    def _record_stage(self, stage: str, start: float) -> float:
+        """Record the latency of a calculation stage; returns it in milliseconds for logging."""
+        return round(self.metrics.observe_ms("market_data_stage_duration_ms", start, stage=stage), 3)
+
     def _get_error_context(self, operation: str, trace_id: str) -> ErrorContext:
         """Creates an ErrorContext for a given operation and trace_id."""
         return ErrorContext(trace_id=trace_id, operation=operation)
 
     def _log_operation_start(self, operation: str, symbol: str = "", level: str = "INFO", trace_id: Optional[str] = None, **kwargs):
         """Direct logging: Log operation start with context and hierarchical tracing."""
-        if self.logger:
+        if self._should_log(level):
             try:
                 self.logger.log_operation_start(
                     operation=operation,
@@ -384,7 +485,7 @@ class MarketDataService:
     
     def _log_operation_success(self, operation: str, symbol: str = "", level: str = "INFO", trace_id: Optional[str] = None, **kwargs):
         """Direct logging: Log successful operation completion with hierarchical tracing."""
-        if self.logger:
+        if self._should_log(level):
             try:
                 self.logger.log_operation_complete(
                     operation=operation,
@@ -416,6 +517,7 @@ class MarketDataService:
                 pass
         
     
+    @profiled("get_market_data")
     def get_market_data(self, symbol: str, trace_id: Optional[str] = None) -> MarketDataSet:
         """
         Get complete multi-timeframe market data for a symbol with structured error handling.
@@ -428,23 +530,27 @@ class MarketDataService:
             MarketDataSet with all timeframes and indicators
         """
         self._log_operation_start("get_market_data", symbol=symbol, trace_id=trace_id)
+        start = time.perf_counter()
         
         try:
             # Validate input parameters - may raise SymbolValidationError
-            self._validate_symbol_input(symbol, trace_id=trace_id)
+            with profile_stage("validation"):
+                self._validate_symbol_input(symbol, trace_id=trace_id)
             
             if not trace_id:
                 raise ValidationError("A trace_id is required for all market data operations.")
             
             # Fetch multi-timeframe data using the API client
-            daily_data_raw = self.api_client.get_klines(symbol, "1d", 180, trace_id=trace_id)
-            h4_data_raw = self.api_client.get_klines(symbol, "4h", 84, trace_id=trace_id)
-            h1_data_raw = self.api_client.get_klines(symbol, "1h", 100, trace_id=trace_id)
+            with profile_stage("network"):
+                daily_data_raw = self.api_client.get_klines(symbol, "1d", 180, trace_id=trace_id)
+                h4_data_raw = self.api_client.get_klines(symbol, "4h", 84, trace_id=trace_id)
+                h1_data_raw = self.api_client.get_klines(symbol, "1h", 100, trace_id=trace_id)
 
             # Convert raw list data to DataFrame
-            daily_data = self._create_dataframe_from_klines(daily_data_raw)
-            h4_data = self._create_dataframe_from_klines(h4_data_raw)
-            h1_data = self._create_dataframe_from_klines(h1_data_raw)
+            with profile_stage("dataframe"):
+                daily_data = self._create_dataframe_from_klines(daily_data_raw)
+                h4_data = self._create_dataframe_from_klines(h4_data_raw)
+                h1_data = self._create_dataframe_from_klines(h1_data_raw)
             
             # Defensive check for empty DataFrames before calculations
             if daily_data.empty or h4_data.empty or h1_data.empty:
@@ -480,41 +586,47 @@ class MarketDataService:
                 support_level = resistance_level - price_buffer
             
             # Calculate technical indicators with graceful degradation
-            rsi = self._calculate_rsi(symbol, h1_data, 14, trace_id=trace_id)
-            macd_signal = self._calculate_macd_signal(symbol, h1_data, trace_id=trace_id)
-            ma_20 = self._calculate_ma(symbol, h1_data, 20, trace_id=trace_id)
-            ma_50 = self._calculate_ma(symbol, h1_data, 50, trace_id=trace_id)
-            ma_trend = self._determine_ma_trend(ma_20, ma_50, trace_id=trace_id)
+            with profile_stage("indicators"):
+                rsi = self._calculate_rsi(symbol, h1_data, 14, trace_id=trace_id)
+                macd_signal = self._calculate_macd_signal(symbol, h1_data, trace_id=trace_id)
+                ma_20 = self._calculate_ma(symbol, h1_data, 20, trace_id=trace_id)
+                ma_50 = self._calculate_ma(symbol, h1_data, 50, trace_id=trace_id)
+                ma_trend = self._determine_ma_trend(ma_20, ma_50, trace_id=trace_id)
             
             # Get market context
-            btc_correlation = self._calculate_btc_correlation(symbol, h1_data, trace_id=trace_id) if symbol != "BTCUSDT" else None
-            volume_profile = self._analyze_volume_profile(symbol, h1_data, trace_id=trace_id)
-            fear_greed_index = self._get_fear_and_greed_index(trace_id=trace_id)
+            with profile_stage("market_context"):
+                btc_correlation = self._calculate_btc_correlation(symbol, h1_data, trace_id=trace_id) if symbol != "BTCUSDT" else None
+                volume_profile = self._analyze_volume_profile(symbol, h1_data, trace_id=trace_id)
+                fear_greed_index = self._get_fear_and_greed_index(trace_id=trace_id)
             
-            market_data_set = MarketDataSet(
-                symbol=symbol,
-                timestamp=datetime.now(timezone.utc),
-                daily_candles=daily_data,
-                h4_candles=h4_data,
-                h1_candles=h1_data,
-                rsi_14=rsi,
-                macd_signal=macd_signal,
-                ma_20=ma_20,
-                ma_50=ma_50,
-                ma_trend=ma_trend,
-                btc_correlation=btc_correlation,
-                fear_greed_index=fear_greed_index,
-                volume_profile=volume_profile,
-                support_level=support_level,
-                resistance_level=resistance_level,
-                trace_id=trace_id
-            )
+            with profile_stage("dataset_validation"):
+                market_data_set = MarketDataSet(
+                    symbol=symbol,
+                    timestamp=datetime.now(timezone.utc),
+                    daily_candles=daily_data,
+                    h4_candles=h4_data,
+                    h1_candles=h1_data,
+                    rsi_14=rsi,
+                    macd_signal=macd_signal,
+                    ma_20=ma_20,
+                    ma_50=ma_50,
+                    ma_trend=ma_trend,
+                    btc_correlation=btc_correlation,
+                    fear_greed_index=fear_greed_index,
+                    volume_profile=volume_profile,
+                    support_level=support_level,
+                    resistance_level=resistance_level,
+                    trace_id=trace_id
+                )
             market_data_set.trace_id = trace_id
             
-            self._log_operation_success("get_market_data", symbol=symbol, level="INFO", data_points=len(h1_data), trace_id=trace_id)
-            
-            if self.logger:
-                self._log_market_analysis_complete(symbol, market_data_set, trace_id=trace_id)
+            processing_time_ms = self._record_stage("get_market_data", start)
+            with profile_stage("logging"):
+                self._log_operation_success("get_market_data", symbol=symbol, level="INFO", data_points=len(h1_data),
+                                            processing_time_ms=processing_time_ms, trace_id=trace_id)
+                
+                if self.logger:
+                    self._log_market_analysis_complete(symbol, market_data_set, trace_id=trace_id)
             
             return market_data_set
             
@@ -549,54 +661,43 @@ class MarketDataService:
     
     def _create_dataframe_from_klines(self, klines_data: list) -> pd.DataFrame:
         """Converts raw kline list data to a pandas DataFrame."""
-        if not klines_data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(klines_data, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col])
-            
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.tz_localize('UTC')
-        
-        return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+        return klines_to_dataframe(klines_data)
 
     def _validate_symbol_input(self, symbol: str, trace_id: Optional[str] = None):
         """Validate symbol input before processing."""
+        def invalid(message: str) -> SymbolValidationError:
+            return SymbolValidationError(message, symbol=str(symbol),
+                                         context=self._get_error_context("symbol_validation", trace_id))
+
         try:
-            error_context = self._get_error_context("symbol_validation", trace_id)
             if not symbol or not isinstance(symbol, str):
-                raise SymbolValidationError("Symbol must be a non-empty string", symbol=str(symbol), context=error_context)
+                raise invalid("Symbol must be a non-empty string")
             if not symbol.endswith("USDT") or len(symbol) < 6:
-                raise SymbolValidationError(f"Invalid symbol format: {symbol}. Expected XXXUSDT format", symbol=symbol, context=error_context)
+                raise invalid(f"Invalid symbol format: {symbol}. Expected XXXUSDT format")
             if len(symbol) > 12:  # Reasonable length limit
-                raise SymbolValidationError(f"Symbol too long: {symbol}", symbol=symbol, context=error_context)
+                raise invalid(f"Symbol too long: {symbol}")
             
             # Extract base currency by removing only the trailing USDT
             if symbol.count("USDT") > 1:
-                raise SymbolValidationError(f"Invalid symbol format: {symbol}. Multiple USDT occurrences not allowed", symbol=symbol, context=error_context)
+                raise invalid(f"Invalid symbol format: {symbol}. Multiple USDT occurrences not allowed")
             
             base_currency = symbol[:-4]  # Remove last 4 characters (USDT)
             if not base_currency or not base_currency.isalpha() or not base_currency.isupper():
-                raise SymbolValidationError(f"Invalid base currency: '{base_currency}'. Must be uppercase letters only", symbol=symbol, context=error_context)
+                raise invalid(f"Invalid base currency: '{base_currency}'. Must be uppercase letters only")
             
             # Validate base currency length (cryptocurrency standards)
             if len(base_currency) < 3:
-                raise SymbolValidationError(f"Base currency too short: '{base_currency}'. Must be at least 3 characters", symbol=symbol, context=error_context)
+                raise invalid(f"Base currency too short: '{base_currency}'. Must be at least 3 characters")
             if len(base_currency) > 5:
-                raise SymbolValidationError(f"Base currency too long: '{base_currency}'. Must be 5 characters or less", symbol=symbol, context=error_context)
+                raise invalid(f"Base currency too long: '{base_currency}'. Must be 5 characters or less")
         except SymbolValidationError:
             # Re-raise SymbolValidationError as-is to maintain rich context
             raise
         except Exception as e:
             # Wrap unexpected errors in SymbolValidationError for consistency
-            raise SymbolValidationError(f"Unexpected error during symbol validation: {str(e)}", symbol=str(symbol), context=error_context)
+            raise invalid(f"Unexpected error during symbol validation: {str(e)}")
     
+    @profiled("enhanced_analysis")
     def get_enhanced_context(self, market_data: MarketDataSet) -> str:
         """Get enhanced market context with a strict 'Fail-Fast' error handling policy."""
         symbol = market_data.symbol
@@ -656,6 +757,7 @@ class MarketDataService:
     
     def _calculate_rsi(self, symbol: str, df: pd.DataFrame, period: int = 14, trace_id: Optional[str] = None) -> Decimal:
         """Calculate RSI indicator with Decimal precision and division by zero protection."""
+        start = time.perf_counter()
         self._log_operation_start(
             "rsi_calculation",
             symbol=symbol,
@@ -668,7 +770,7 @@ class MarketDataService:
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="rsi_calculation",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "insufficient_data",
                         "required_periods": period + 1,
                         "available_periods": len(df),
@@ -677,6 +779,7 @@ class MarketDataService:
                     data_stats={"status": "fallback"},
                     trace_id=trace_id
                 )
+            self._record_stage("rsi_calculation", start)
             return Decimal('50.0')  # Default neutral RSI
         
         closes = df['close']
@@ -707,13 +810,14 @@ class MarketDataService:
         
         # Convert to Decimal with proper precision
         result = Decimal(str(rsi_value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        processing_time_ms = self._record_stage("rsi_calculation", start)
         
-        # Log RSI calculation completion
+        # Log RSI calculation completion (context is built only if INFO is enabled)
         if self.logger:
             self.logger.log_operation_complete(
                 operation="rsi_calculation",
-                processing_time_ms=0,  # Fast calculation
-                context={
+                processing_time_ms=processing_time_ms,
+                context=lambda: {
                     "rsi_value": float(result),
                     "final_gain": float(final_gain),
                     "final_loss": float(final_loss),
@@ -727,6 +831,7 @@ class MarketDataService:
     
     def _calculate_macd_signal(self, symbol: str, df: pd.DataFrame, trace_id: Optional[str] = None) -> str:
         """Calculate MACD signal (bullish/bearish/neutral)."""
+        start = time.perf_counter()
         self._log_operation_start(
             "macd_calculation",
             symbol=symbol,
@@ -738,7 +843,7 @@ class MarketDataService:
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="macd_calculation",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "insufficient_data",
                         "required_periods": 26,
                         "available_periods": len(df),
@@ -747,6 +852,7 @@ class MarketDataService:
                     data_stats={"status": "fallback"},
                     trace_id=trace_id
                 )
+            self._record_stage("macd_calculation", start)
             return "neutral"
         
         closes = df['close']
@@ -764,13 +870,14 @@ class MarketDataService:
             result = "bearish"
         else:
             result = "neutral"
+        processing_time_ms = self._record_stage("macd_calculation", start)
         
-        # Log MACD calculation completion
+        # Log MACD calculation completion (context is built only if INFO is enabled)
         if self.logger:
             self.logger.log_operation_complete(
                 operation="macd_calculation",
-                processing_time_ms=0,  # Fast calculation
-                context={
+                processing_time_ms=processing_time_ms,
+                context=lambda: {
                     "macd_signal": result,
                     "current_macd": float(current_macd),
                     "current_signal": float(current_signal),
@@ -785,6 +892,7 @@ class MarketDataService:
     
     def _calculate_ma(self, symbol: str, df: pd.DataFrame, period: int, trace_id: Optional[str] = None) -> Decimal:
         """Calculate moving average with Decimal precision."""
+        start = time.perf_counter()
         self._log_operation_start(
             "ma_calculation",
             symbol=symbol,
@@ -799,11 +907,12 @@ class MarketDataService:
                 result = Decimal('0.0')
             else:
                 result = Decimal(str(avg_value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            processing_time_ms = self._record_stage("ma_calculation", start)
             
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="ma_calculation",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "insufficient_data_fallback",
                         "required_periods": period,
                         "available_periods": len(df),
@@ -817,8 +926,8 @@ class MarketDataService:
                 # Добавляем логирование завершения операции для fallback случая
                 self.logger.log_operation_complete(
                     operation="ma_calculation",
-                    processing_time_ms=0,  # Быстрый fallback расчет
-                    context={
+                    processing_time_ms=processing_time_ms,
+                    context=lambda: {
                         "period": period,
                         "ma_value": float(result),
                         "data_points_used": len(df),
@@ -838,13 +947,14 @@ class MarketDataService:
                 result = Decimal('0.0')
             else:
                 result = Decimal(str(avg_value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        processing_time_ms = self._record_stage("ma_calculation", start)
         
-        # Log MA calculation completion
+        # Log MA calculation completion (context is built only if INFO is enabled)
         if self.logger:
             self.logger.log_operation_complete(
                 operation="ma_calculation",
-                processing_time_ms=0,  # Fast calculation
-                context={
+                processing_time_ms=processing_time_ms,
+                context=lambda: {
                     "period": period,
                     "ma_value": float(result),
                     "data_points_used": period,
@@ -883,6 +993,7 @@ class MarketDataService:
             data_points=len(df),
             trace_id=trace_id
         )
+        start = time.perf_counter()
         error_context = self._get_error_context("btc_correlation", trace_id)
 
         try:
@@ -894,6 +1005,7 @@ class MarketDataService:
                     len(self._btc_cache) >= len(df)):
                 
                 btc_data = self._btc_cache
+                self.metrics.counter("cache_events_total", cache="btc_data", event="hit").inc()
                 if self.logger:
                     self.logger.log_cache_event(
                         cache_name="btc_data",
@@ -902,6 +1014,7 @@ class MarketDataService:
                         trace_id=trace_id
                     )
             else:
+                self.metrics.counter("cache_events_total", cache="btc_data", event="miss").inc()
                 if self.logger:
                     self.logger.log_cache_event(cache_name="btc_data", event_type="miss", trace_id=trace_id)
                 # Fetch BTC data for correlation calculation, passing the trace_id
@@ -919,7 +1032,7 @@ class MarketDataService:
                 if self.logger:
                     self.logger.log_raw_data(
                         data_type="btc_correlation_calculation",
-                        data_sample={
+                        data_sample=lambda: {
                             "result": "insufficient_data",
                             "btc_data_points": len(btc_data),
                             "symbol_data_points": len(df),
@@ -951,7 +1064,7 @@ class MarketDataService:
                 if self.logger:
                     self.logger.log_raw_data(
                         data_type="btc_correlation_calculation",
-                        data_sample={
+                        data_sample=lambda: {
                             "result": "nan_correlation",
                             "reason": "constant_prices_or_no_variance",
                             "fallback_correlation": 0.0,
@@ -972,12 +1085,15 @@ class MarketDataService:
             elif correlation_decimal < Decimal('-1.0'):
                 correlation_decimal = Decimal('-1.0')
 
+            processing_time_ms = self._record_stage("btc_correlation", start)
+
             # Log BTC correlation calculation completion
             self._log_operation_success(
                 "btc_correlation",
                 symbol=symbol,
                 correlation_value=float(correlation_decimal),
                 data_points_used=min_length,
+                processing_time_ms=processing_time_ms,
                 trace_id=trace_id
             )
 
@@ -1215,7 +1331,7 @@ class MarketDataService:
     
     def _log_market_analysis_complete(self, symbol: str, market_data: MarketDataSet, trace_id: str = None):
         """Log complete market analysis for AI trading strategy optimization."""
-        if not self.logger:
+        if not self._should_log("DEBUG"):
             return
             
         try:
@@ -1297,34 +1413,7 @@ class MarketDataService:
     
     def _get_basic_trading_decision(self, market_data: MarketDataSet) -> str:
         """Get basic trading decision based on technical indicators."""
-        bullish_signals = 0
-        bearish_signals = 0
-        
-        # RSI signals
-        if market_data.rsi_14 < Decimal('30'):
-            bullish_signals += 1  # Oversold
-        elif market_data.rsi_14 > Decimal('70'):
-            bearish_signals += 1  # Overbought
-        
-        # MACD signals
-        if market_data.macd_signal == "bullish":
-            bullish_signals += 1
-        elif market_data.macd_signal == "bearish":
-            bearish_signals += 1
-        
-        # MA trend signals
-        if market_data.ma_trend == "uptrend":
-            bullish_signals += 1
-        elif market_data.ma_trend == "downtrend":
-            bearish_signals += 1
-        
-        # Decision logic
-        if bullish_signals > bearish_signals:
-            return "buy"
-        elif bearish_signals > bullish_signals:
-            return "sell"
-        else:
-            return "hold"
+        return basic_trading_decision(market_data)
     
     
     def _calculate_technical_indicators(self, df: pd.DataFrame) -> dict:
@@ -1436,7 +1525,7 @@ class MarketDataService:
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="volume_analysis",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "insufficient_data",
                         "required_periods": 24,
                         "available_periods": len(df),
@@ -1456,7 +1545,7 @@ class MarketDataService:
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="volume_analysis",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "no_historical_data",
                         "recent_volume": float(recent_volume),
                         "fallback_profile": "normal"
@@ -1473,7 +1562,7 @@ class MarketDataService:
             if self.logger:
                 self.logger.log_raw_data(
                     data_type="volume_analysis",
-                    data_sample={
+                    data_sample=lambda: {
                         "result": "zero_historical_volume",
                         "recent_volume": float(recent_volume),
                         "historical_volume": 0.0,
@@ -0,0 +1,188 @@
+import glob
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+from .oms_repository import HistoryCursor, OmsRepository
+
+_PARTITION_FILE = re.compile(r"orders_(\d{4})_(\d{2})\.db$")
+
+
+def _month_bounds(month: str) -> Tuple[str, str]:
+    """ISO-границы [начало, начало следующего месяца) для месяца вида '2026-01'."""
+    year, number = int(month[:4]), int(month[5:7])
+    start = datetime(year, number, 1, tzinfo=timezone.utc)
+    end = datetime(year + number // 12, number % 12 + 1, 1, tzinfo=timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
+def _sort_key(order: Dict[str, Any]) -> Tuple[str, str]:
+    return order["updated_at"], order["order_id"]
+
+
+class OrderArchive:
+    """
+    Архив завершенных ордеров с помесячным секционированием.
+
+    archive() переносит завершенные (CANCELLED/FILLED) ордера старше порога
+    из горячей таблицы orders в отдельные SQLite-файлы по месяцу updated_at
+    (orders_YYYY_MM.db в archive_dir). Горячая таблица остается размером
+    с активные ордера и недавнюю историю, поэтому загрузка, выборки и
+    резервное копирование не дорожают с ростом истории, а старые месяцы
+    можно сжимать или переносить целыми файлами.
+
+    Перенос идет пачками: сначала запись в архивный файл, затем удаление из
+    горячей таблицы (write_batch). Падение между шагами оставляет копию
+    в обоих местах; повторный archive() доводит перенос до конца, а
+    фасад чтения отдает такой ордер из горячей таблицы.
+
+    Фасад чтения (get, get_orders_page, iter_orders) охватывает горячую
+    таблицу и все секции с тем же интерфейсом, что у OmsRepository.
+    """
+
+    def __init__(self, repository: OmsRepository, archive_dir: str, older_than_days: float = 30,
+                 batch_size: int = 1000, logger: Optional[MarketDataLogger] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Args:
+            repository: Горячий репозиторий ордеров.
+            archive_dir: Каталог помесячных файлов архива.
+            older_than_days: Возраст (по updated_at), после которого завершенный ордер архивируется.
+            batch_size: Ордеров в одной пачке переноса.
+            logger: Экземпляр логгера.
+            metrics: Реестр метрик (по умолчанию глобальный).
+        """
+        self.repository = repository
+        self.archive_dir = archive_dir
+        self.older_than_days = older_than_days
+        self.batch_size = batch_size
+        self.logger = logger
+        self.metrics = metrics or get_metrics_registry()
+        self._partitions: Dict[str, OmsRepository] = {}
+        self._lock = threading.Lock()
+        os.makedirs(archive_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(archive_dir, "orders_*.db")):
+            match = _PARTITION_FILE.search(path)
+            if match:
+                self._partition(f"{match.group(1)}-{match.group(2)}")
+
+    def _partition(self, month: str) -> OmsRepository:
+        """Репозиторий секции месяца (открывается при первом обращении)."""
+        with self._lock:
+            partition = self._partitions.get(month)
+            if partition is None:
+                path = os.path.join(self.archive_dir, f"orders_{month.replace('-', '_')}.db")
+                partition = OmsRepository(path, logger=self.logger, metrics=self.metrics)
+                self._partitions[month] = partition
+            return partition
+
+    @property
+    def months(self) -> List[str]:
+        """Месяцы архивных секций, от новых к старым."""
+        return sorted(self._partitions, reverse=True)
+
+    def close(self):
+        """Закрывает соединения архивных секций (горячий репозиторий не закрывается)."""
+        with self._lock:
+            partitions, self._partitions = list(self._partitions.values()), {}
+        for partition in partitions:
+            partition.close()
+
+    # --- Перенос ---
+
+    def archive(self, before: Optional[str] = None, trace_id: Optional[str] = None) -> int:
+        """
+        Переносит завершенные ордера с updated_at < before в помесячные секции.
+
+        Args:
+            before: Граница (ISO); по умолчанию now - older_than_days.
+
+        Returns:
+            Число перенесенных ордеров.
+        """
+        if before is None:
+            before = (datetime.now(timezone.utc) - timedelta(days=self.older_than_days)).isoformat()
+        if self.logger:
+            self.logger.log_operation_start("oms_archive", trace_id=trace_id, context={"before": before})
+
+        start = time.perf_counter()
+        moved = 0
+        while True:
+            orders = self.repository.get_archivable(before, self.batch_size, trace_id=trace_id)
+            if not orders:
+                break
+            by_month: Dict[str, List[Dict[str, Any]]] = {}
+            for order in orders:
+                by_month.setdefault(order["updated_at"][:7], []).append(order)
+            for month, month_orders in by_month.items():
+                self._partition(month).save_many(month_orders, trace_id=trace_id)
+            self.repository.write_batch([], [order["order_id"] for order in orders], trace_id=trace_id)
+            moved += len(orders)
+            if len(orders) < self.batch_size:
+                break
+
+        self.metrics.counter("oms_archived_orders_total").inc(moved)
+        self.metrics.observe_ms("oms_archive_duration_ms", start)
+        if self.logger:
+            self.logger.log_operation_complete("oms_archive", trace_id=trace_id, context={"archived": moved})
+        return moved
+
+    # --- Чтение по горячей таблице и архиву ---
+
+    def get(self, order_id: str, trace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Ордер по ID: горячая таблица, затем секции от новых к старым."""
+        order = self.repository.get(order_id, trace_id=trace_id)
+        if order is not None:
+            return order
+        for month in self.months:
+            order = self._partitions[month].get(order_id, trace_id=trace_id)
+            if order is not None:
+                return order
+        return None
+
+    def get_orders_page(self, symbol: Optional[str] = None, status: Optional[str] = None,
+                        since: Optional[str] = None, until: Optional[str] = None, limit: int = 100,
+                        cursor: Optional[HistoryCursor] = None,
+                        trace_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[HistoryCursor]]:
+        """
+        Страница ордеров от новых к старым по горячей таблице и архиву
+        (параметры и курсор как в OmsRepository.get_orders_page).
+
+        Секции читаются от новых месяцев к старым и только пока они могут
+        содержать ордера новее последнего ордера уже набранной страницы.
+        """
+        page, _ = self.repository.get_orders_page(symbol, status, since, until, limit, cursor, trace_id)
+        seen = {order["order_id"] for order in page}
+        bounds = [key for key in (until, cursor[0] if cursor else None) if key is not None]
+        upper = min(bounds) if bounds else None
+        for month in self.months:
+            month_start, month_end = _month_bounds(month)
+            if upper is not None and month_start > upper:
+                continue
+            if since is not None and month_end <= since:
+                break
+            if len(page) >= limit and month_end <= page[-1]["updated_at"]:
+                break
+            rows, _ = self._partitions[month].get_orders_page(symbol, status, since, until, limit, cursor, trace_id)
+            page.extend(row for row in rows if row["order_id"] not in seen)
+            page.sort(key=_sort_key, reverse=True)
+            del page[limit:]
+            seen = {order["order_id"] for order in page}
+        next_cursor = _sort_key(page[-1]) if len(page) == limit else None
+        return page, next_cursor
+
+    def iter_orders(self, symbol: Optional[str] = None, status: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None, page_size: int = 500,
+                    trace_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Потоково перебирает горячую историю и архив страницами по page_size (от новых к старым)."""
+        cursor = None
+        while True:
+            rows, cursor = self.get_orders_page(symbol, status, since, until, page_size, cursor, trace_id)
+            yield from rows
+            if cursor is None:
+                return
@@ -0,0 +1,313 @@
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.infrastructure.exceptions import RepositoryError
+from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry
+from .oms_repository import OmsRepository, TERMINAL_STATUSES, _upsert_many
+
+# Максимум параметров в одном IN (...) запросе
+_IN_CHUNK = 500
+
+
+class OrderEventStore(OmsRepository):
+    """
+    Event-sourced хранилище ордеров.
+
+    Каждое изменение ордера дописывается в журнал order_events небольшим
+    событием: "upsert" с полным ордером для нового ордера, "update" только с
+    изменившимися полями, "delete". Запись - один INSERT без перезаписи строки.
+
+    Таблица orders служит снимком: каждые snapshot_every событий (и при
+    snapshot()) хвост журнала сворачивается в нее одной транзакцией, а номер
+    последнего свернутого события хранится в oms_snapshot_meta. Восстановление
+    при старте - снимок плюс проигрывание хвоста, длина которого ограничена
+    snapshot_every, поэтому время старта не зависит от истории.
+
+    События сохраняются после свертки и дают аудит переходов
+    (get_order_events), если не включен prune_events.
+    """
+
+    def __init__(self, db_path: str, logger: Optional[MarketDataLogger] = None,
+                 metrics: Optional[MetricsRegistry] = None, synchronous: str = "NORMAL",
+                 snapshot_every: int = 1000, prune_events: bool = False):
+        """
+        Args:
+            db_path (str): Путь к файлу .db или ':memory:'.
+            logger (Optional[MarketDataLogger]): Экземпляр логгера.
+            metrics (Optional[MetricsRegistry]): Реестр метрик (по умолчанию глобальный).
+            synchronous (str): PRAGMA synchronous файловой базы.
+            snapshot_every (int): Число событий между свертками журнала в снимок.
+            prune_events (bool): Удалять свернутые события (без аудита, меньше места).
+        """
+        self.snapshot_every = snapshot_every
+        self.prune_events = prune_events
+        # Последнее записанное состояние ордеров, для событий с разницей полей
+        self._known: Dict[str, Dict[str, Any]] = {}
+        self._events_since_snapshot = 0
+        super().__init__(db_path, logger=logger, metrics=metrics, synchronous=synchronous)
+        self._events_since_snapshot = self._tail_length()
+
+    def _create_table(self):
+        """Создает таблицу-снимок orders, журнал событий и метаданные снимка."""
+        super()._create_table()
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS order_events (
+                    seq INTEGER PRIMARY KEY,
+                    order_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    payload TEXT,
+                    created_at TEXT NOT NULL
+                );
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_events_order ON order_events(order_id, seq)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS oms_snapshot_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    last_seq INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+            """)
+            cursor.execute("INSERT OR IGNORE INTO oms_snapshot_meta (id, last_seq, created_at) VALUES (1, 0, ?)",
+                           (datetime.now(timezone.utc).isoformat(),))
+            conn.commit()
+        except sqlite3.Error as e:
+            raise RepositoryError(
+                message=f"Failed to create order event tables: {e}",
+                repository_type="sqlite",
+                db_operation="create_table",
+                original_exception=e
+            )
+
+    # --- Запись ---
+
+    def save(self, order: Dict[str, Any], trace_id: Optional[str] = None):
+        """Дописывает событие изменения ордера."""
+        self._append([order], (), "save", trace_id)
+
+    def save_many(self, orders: Sequence[Dict[str, Any]], trace_id: Optional[str] = None):
+        """Дописывает события нескольких ордеров одной транзакцией."""
+        self._append(orders, (), "save_many", trace_id)
+
+    def write_batch(self, orders: List[Dict[str, Any]], deleted_ids: Sequence[str] = (),
+                    trace_id: Optional[str] = None):
+        """Дописывает события сохранения и удаления одной транзакцией."""
+        self._append(orders, deleted_ids, "write_batch", trace_id)
+
+    def delete(self, order_id: str, trace_id: Optional[str] = None):
+        """Дописывает событие удаления ордера."""
+        self._append([], (order_id,), "delete", trace_id)
+
+    def _event(self, order: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+        """(order_id, тип, payload) события; None, если ордер не изменился."""
+        order_id = order["order_id"]
+        previous = self._known.get(order_id)
+        if previous is None:
+            return order_id, "upsert", json.dumps(order)
+        changes = {key: value for key, value in order.items() if previous.get(key) != value or key not in previous}
+        if not changes:
+            return None
+        return order_id, "update", json.dumps(changes)
+
+    def _append(self, orders: Sequence[Dict[str, Any]], deleted_ids: Sequence[str], operation: str,
+                trace_id: Optional[str]):
+        context = {"orders": len(orders), "deleted": len(deleted_ids)}
+        if self.logger:
+            self.logger.log_operation_start(f"repo_{operation}", trace_id=trace_id, context=context)
+
+        start = time.perf_counter()
+        with self._write_lock:
+            try:
+                now = datetime.now(timezone.utc).isoformat()
+                events = [event for event in map(self._event, orders) if event is not None]
+                events.extend((order_id, "delete", None) for order_id in deleted_ids)
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "INSERT INTO order_events (order_id, event_type, payload, created_at) VALUES (?, ?, ?, ?)",
+                        [(*event, now) for event in events]
+                    )
+            except sqlite3.Error as e:
+                self._record(operation, start, "error")
+                if self.logger:
+                    self.logger.log_operation_error(f"repo_{operation}", trace_id=trace_id, error=str(e), context=context)
+                raise RepositoryError(
+                    message=f"Failed to append order events: {e}",
+                    repository_type="sqlite",
+                    db_operation=operation,
+                    original_exception=e
+                )
+            for order in orders:
+                self._remember(order)
+            for order_id in deleted_ids:
+                self._known.pop(order_id, None)
+            self._events_since_snapshot += len(events)
+            self.metrics.counter("oms_order_events_total").inc(len(events))
+            self._record(operation, start)
+            if self._events_since_snapshot >= self.snapshot_every:
+                self.snapshot(trace_id=trace_id)
+
+        if self.logger:
+            self.logger.log_operation_complete(f"repo_{operation}", trace_id=trace_id, context=context)
+
+    def _remember(self, order: Dict[str, Any]):
+        # Завершенные ордера больше не меняются; не держим их в памяти
+        if order.get("status") in TERMINAL_STATUSES:
+            self._known.pop(order["order_id"], None)
+        else:
+            self._known[order["order_id"]] = dict(order)
+
+    # --- Снимки ---
+
+    def _tail_length(self) -> int:
+        conn = self._get_connection()
+        return conn.execute(
+            "SELECT COUNT(*) FROM order_events WHERE seq > (SELECT last_seq FROM oms_snapshot_meta WHERE id = 1)"
+        ).fetchone()[0]
+
+    def _fold_tail(self, conn: sqlite3.Connection, order_ids: Optional[Sequence[str]] = None
+                   ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], int]:
+        """
+        Проигрывает события после снимка поверх строк снимка.
+
+        Returns:
+            ({order_id: состояние или None для удаленных}, номер последнего события)
+        """
+        last_seq = conn.execute("SELECT last_seq FROM oms_snapshot_meta WHERE id = 1").fetchone()[0]
+        sql = "SELECT seq, order_id, event_type, payload FROM order_events WHERE seq > ?"
+        params: List[Any] = [last_seq]
+        if order_ids is not None:
+            sql += f" AND order_id IN ({', '.join('?' * len(order_ids))})"
+            params.extend(order_ids)
+        events = conn.execute(sql + " ORDER BY seq", params).fetchall()
+        if not events:
+            return {}, last_seq
+
+        # Базовые состояния ордеров, которые в хвосте только обновлялись
+        needs_base = []
+        seen = set()
+        for _, order_id, event_type, _ in events:
+            if order_id not in seen:
+                seen.add(order_id)
+                if event_type == "update":
+                    needs_base.append(order_id)
+        state: Dict[str, Optional[Dict[str, Any]]] = {}
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        for i in range(0, len(needs_base), _IN_CHUNK):
+            chunk = needs_base[i:i + _IN_CHUNK]
+            cursor.execute(f"SELECT * FROM orders WHERE order_id IN ({', '.join('?' * len(chunk))})", chunk)
+            for row in cursor.fetchall():
+                state[row["order_id"]] = dict(row)
+
+        for _, order_id, event_type, payload in events:
+            if event_type == "delete":
+                state[order_id] = None
+            elif event_type == "upsert":
+                state[order_id] = json.loads(payload)
+            else:
+                base = state.get(order_id)
+                if base is not None:
+                    base.update(json.loads(payload))
+        return state, events[-1][0]
+
+    def snapshot(self, trace_id: Optional[str] = None) -> int:
+        """
+        Сворачивает хвост журнала в таблицу-снимок orders.
+
+        Returns:
+            Число свернутых ордеров.
+        """
+        start = time.perf_counter()
+        with self._write_lock:
+            try:
+                with self._transaction() as conn:
+                    state, last_seq = self._fold_tail(conn)
+                    if state:
+                        _upsert_many(conn.cursor(), [order for order in state.values() if order is not None])
+                        conn.executemany("DELETE FROM orders WHERE order_id = ?",
+                                         [(order_id,) for order_id, order in state.items() if order is None])
+                        conn.execute("UPDATE oms_snapshot_meta SET last_seq = ?, created_at = ? WHERE id = 1",
+                                     (last_seq, datetime.now(timezone.utc).isoformat()))
+                        if self.prune_events:
+                            conn.execute("DELETE FROM order_events WHERE seq <= ?", (last_seq,))
+            except sqlite3.Error as e:
+                self._record("snapshot", start, "error")
+                if self.logger:
+                    self.logger.log_operation_error("repo_snapshot", trace_id=trace_id, error=str(e))
+                raise RepositoryError(
+                    message=f"Failed to write OMS snapshot: {e}",
+                    repository_type="sqlite",
+                    db_operation="snapshot",
+                    original_exception=e
+                )
+            self._events_since_snapshot = 0
+            self._record("snapshot", start)
+        if self.logger:
+            self.logger.log_operation_complete("repo_snapshot", trace_id=trace_id, context={"orders": len(state)})
+        return len(state)
+
+    # --- Чтение ---
+
+    def load(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Сворачивает хвост и загружает все ордера."""
+        self.snapshot(trace_id=trace_id)
+        return super().load(trace_id=trace_id)
+
+    def load_active(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Восстанавливает активные ордера: активные строки снимка плюс хвост журнала.
+        Хвост не длиннее snapshot_every событий.
+        """
+        orders = super().load_active(trace_id=trace_id)
+        with self._write_lock:
+            state, _ = self._fold_tail(self._get_connection())
+            for order_id, order in state.items():
+                if order is None or order.get("status") in TERMINAL_STATUSES:
+                    orders.pop(order_id, None)
+                else:
+                    orders[order_id] = order
+            for order in orders.values():
+                self._known[order["order_id"]] = dict(order)
+        return orders
+
+    def get(self, order_id: str, trace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Возвращает ордер по ID: строка снимка плюс его события из хвоста."""
+        order = super().get(order_id, trace_id=trace_id)
+        with self._write_lock:
+            state, _ = self._fold_tail(self._get_connection(), [order_id])
+        if order_id not in state:
+            return order
+        # Хвост только с update без строки в снимке оставляет ордер отсутствующим
+        return state[order_id]
+
+    def get_orders_page(self, *args, **kwargs):
+        """Сворачивает хвост и возвращает страницу истории (см. OmsRepository.get_orders_page)."""
+        if self._events_since_snapshot:
+            self.snapshot(trace_id=kwargs.get("trace_id"))
+        return super().get_orders_page(*args, **kwargs)
+
+    def get_archivable(self, before: str, limit: int = 1000,
+                       trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Сворачивает хвост и возвращает кандидатов в архив (см. OmsRepository.get_archivable)."""
+        if self._events_since_snapshot:
+            self.snapshot(trace_id=trace_id)
+        return super().get_archivable(before, limit, trace_id=trace_id)
+
+    def get_order_events(self, order_id: str) -> List[Dict[str, Any]]:
+        """Аудит: события ордера в порядке записи."""
+        with self._write_lock:
+            rows = self._get_connection().execute(
+                "SELECT seq, event_type, payload, created_at FROM order_events WHERE order_id = ? ORDER BY seq",
+                (order_id,)
+            ).fetchall()
+        return [
+            {"seq": seq, "event_type": event_type, "created_at": created_at,
+             "changes": json.loads(payload) if payload else None}
+            for seq, event_type, payload, created_at in rows
+        ]
@@ -1,36 +1,112 @@
+import threading
 import uuid
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timezone
-from .oms_repository import OmsRepository
-from typing import Optional
+from .oms_repository import OmsRepository, TERMINAL_STATUSES
+from .write_behind import WriteBehindPersister
+from .archive import OrderArchive
+from .paper_exchange import ENTRY, Fill, PaperExchange
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 from src.logging_system.logger_config import MarketDataLogger
 from src.infrastructure.exceptions import RepositoryError
 
+
 class OrderManagementSystem:
     """
     Управляет ордерами: создание, отмена, получение статуса.
     Делегирует сохранение и загрузку состояния классу OmsRepository.
+
+    С write_behind изменения ордеров пишутся пакетами в фоне (WriteBehindPersister);
+    durable=True в place_order/cancel_order дожидается коммита перед возвратом.
+
+    Помимо словаря всех ордеров OMS ведет индексы активных ордеров по символу
+    и ордеров по статусу; все смены статуса проходят через _set_status, поэтому
+    get_order_by_symbol и get_orders_by_status работают за O(1) независимо
+    от количества исторических ордеров.
+
+    При старте загружаются только активные ордера; завершенные ордера прошлых
+    сессий читаются из репозитория по запросу (get_order, iter_order_history),
+    поэтому время старта и память не растут с историей торговли. С archive
+    история читается и из помесячного архива (OrderArchive).
+
+    Потокобезопасность: мутации ордера выполняются под блокировкой его символа
+    (lock_stripes блокировок, символ выбирает полосу по хэшу), поэтому циклы
+    разных символов идут параллельно. Общие индексы (_orders, _by_status)
+    меняются под короткой _index_lock, без ввода-вывода. Транзакции БД
+    сериализует репозиторий. place_order_if_no_active атомарно проверяет
+    отсутствие активного ордера и размещает новый.
+
+    С exchange (PaperExchange) активные ордера стоят в книгах симулированной
+    биржи, а исполнения приходят в apply_fills: вход переводит ордер в OPEN,
+    стоп-лосс или тейк-профит - в FILLED с exit_price.
     """
-    def __init__(self, repository: OmsRepository, logger: Optional[MarketDataLogger] = None):
+    def __init__(self, repository: OmsRepository, logger: Optional[MarketDataLogger] = None,
+                 write_behind: Optional[WriteBehindPersister] = None, archive: Optional[OrderArchive] = None,
+                 lock_stripes: int = 64, exchange: Optional[PaperExchange] = None,
+                 clock: Optional[Callable[[], datetime]] = None):
         self.repository = repository
+        self.exchange = exchange
+        # Источник времени created_at/updated_at (бэктест подставляет время бара)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
         self.logger = logger
+        self.write_behind = write_behind
+        self.archive = archive
+        self._writer = write_behind or repository
+        self._history = archive or repository
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._active_by_symbol: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_status: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._symbol_locks = [threading.RLock() for _ in range(lock_stripes)]
+        self._index_lock = threading.Lock()
+        if exchange:
+            exchange.add_listener(self.apply_fills)
         try:
-            self._orders = self.repository.load(trace_id="oms_init")
+            self.reload(trace_id="oms_init")
         except RepositoryError as e:
             if self.logger:
                 self.logger.log_operation_error("oms_init_load", error="Failed to load initial orders from repository", context=e.get_context(), trace_id="oms_init")
-            self._orders = {}
 
-    def place_order(self, symbol: str, order_type: str, margin: float, leverage: int, entry_price: float, stop_loss: Optional[float] = None, take_profit: Optional[float] = None, trace_id: Optional[str] = None):
+    def reload(self, trace_id: Optional[str] = None):
         """
-        Размещает ордер, сохраняет состояние и возвращает его ID.
+        Загружает активные ордера из репозитория и перестраивает индексы.
+        Новое состояние собирается целиком и подменяется одной операцией.
         """
-        order_id = str(uuid.uuid4())
-        if self.logger:
-            self.logger.log_operation_start("place_order", trace_id=trace_id, context={"symbol": symbol, "type": order_type, "margin": margin})
-        now = datetime.now(timezone.utc).isoformat()
-        
-        new_order = {
-            "order_id": order_id,
+        with self._locked(self._symbol_locks):
+            self.flush()
+            orders = self.repository.load_active(trace_id=trace_id)
+            active_by_symbol: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            by_status: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for order_id, order in orders.items():
+                by_status.setdefault(order["status"], {})[order_id] = order
+                if order["status"] not in TERMINAL_STATUSES:
+                    active_by_symbol.setdefault(order["symbol"], {})[order_id] = order
+            with self._index_lock:
+                self._orders, self._active_by_symbol, self._by_status = orders, active_by_symbol, by_status
+            if self.exchange:
+                self.exchange.submit_many(orders.values())
+
+    def symbol_lock(self, symbol: str) -> threading.RLock:
+        """
+        Блокировка полосы символа (реентерабельная). Ее держат все мутации
+        ордеров символа; вызывающий может удерживать ее для своей
+        последовательности проверка-действие.
+        """
+        return self._symbol_locks[hash(symbol) % len(self._symbol_locks)]
+
+    @contextmanager
+    def _locked(self, locks: Iterable[threading.RLock]):
+        """Захватывает блокировки полос в едином порядке (без взаимоблокировок)."""
+        with ExitStack() as stack:
+            for lock in sorted(set(locks), key=self._symbol_locks.index):
+                stack.enter_context(lock)
+            yield
+
+    @staticmethod
+    def _new_order(symbol: str, order_type: str, margin: float, leverage: int, entry_price: float,
+                   stop_loss: Optional[float], take_profit: Optional[float], now: str) -> Dict[str, Any]:
+        """Создает словарь нового ордера в статусе PENDING."""
+        return {
+            "order_id": str(uuid.uuid4()),
             "symbol": symbol,
             "status": "PENDING",
             "order_type": order_type,
@@ -43,36 +119,218 @@ class OrderManagementSystem:
             "created_at": now,
             "updated_at": now,
         }
+
+    def _add_order(self, order: Dict[str, Any]):
+        """Добавляет новый ордер в хранилище и индексы."""
+        order_id = order["order_id"]
+        with self._index_lock:
+            self._orders[order_id] = order
+            self._by_status.setdefault(order["status"], {})[order_id] = order
+            if order["status"] not in TERMINAL_STATUSES:
+                self._active_by_symbol.setdefault(order["symbol"], {})[order_id] = order
+
+    def _set_status(self, order: Dict[str, Any], status: str):
+        """Меняет статус ордера, поддерживая индексы."""
+        order_id, previous = order["order_id"], order["status"]
+        if previous == status:
+            return
+        with self._index_lock:
+            bucket = self._by_status.get(previous)
+            if bucket is not None:
+                bucket.pop(order_id, None)
+                if not bucket:
+                    del self._by_status[previous]
+            self._by_status.setdefault(status, {})[order_id] = order
+            order["status"] = status
+            if status in TERMINAL_STATUSES:
+                active = self._active_by_symbol.get(order["symbol"])
+                if active is not None:
+                    active.pop(order_id, None)
+                    if not active:
+                        del self._active_by_symbol[order["symbol"]]
+            elif previous in TERMINAL_STATUSES:
+                self._active_by_symbol.setdefault(order["symbol"], {})[order_id] = order
+
+    def place_order(self, symbol: str, order_type: str, margin: float, leverage: int, entry_price: float, stop_loss: Optional[float] = None, take_profit: Optional[float] = None, trace_id: Optional[str] = None, durable: bool = False):
+        """
+        Размещает ордер, сохраняет состояние и возвращает его ID.
+        durable=True при write-behind дожидается записи ордера в БД.
+        """
+        if self.logger:
+            self.logger.log_operation_start("place_order", trace_id=trace_id, context={"symbol": symbol, "type": order_type, "margin": margin})
+        new_order = self._new_order(symbol, order_type, margin, leverage, entry_price, stop_loss, take_profit,
+                                    self._clock().isoformat())
+        order_id = new_order["order_id"]
         
-        self._orders[order_id] = new_order
-        try:
-            self.repository.save(new_order, trace_id=trace_id)
-        except RepositoryError as e:
-            if self.logger:
-                self.logger.log_operation_error("place_order_save", error="Failed to save new order", context=e.get_context(), trace_id=trace_id)
-            # In a real system, we might want to handle this more gracefully
-            # For now, we'll re-raise to make the failure visible.
-            raise
+        with self.symbol_lock(symbol):
+            self._add_order(new_order)
+            try:
+                self._writer.save(new_order, trace_id=trace_id)
+                if durable:
+                    self.flush()
+            except RepositoryError as e:
+                if self.logger:
+                    self.logger.log_operation_error("place_order_save", error="Failed to save new order", context=e.get_context(), trace_id=trace_id)
+                # In a real system, we might want to handle this more gracefully
+                # For now, we'll re-raise to make the failure visible.
+                raise
+            if self.exchange:
+                self.exchange.submit(new_order)
         if self.logger:
             self.logger.log_operation_complete("place_order", trace_id=trace_id, context={"order_id": order_id, "status": "success"})
         return order_id
 
-    def cancel_order(self, order_id: str, trace_id: Optional[str] = None):
-        """Отменяет ордер и сохраняет состояние."""
+    def place_order_if_no_active(self, symbol: str, order_type: str, margin: float, leverage: int,
+                                 entry_price: float, stop_loss: Optional[float] = None,
+                                 take_profit: Optional[float] = None, trace_id: Optional[str] = None,
+                                 durable: bool = False) -> Optional[str]:
+        """
+        Атомарно размещает ордер, только если по символу нет активного ордера.
+        Проверка и размещение идут под блокировкой символа, поэтому параллельные
+        вызовы по одному символу откроют не больше одной позиции.
+
+        Returns:
+            ID нового ордера или None, если активный ордер уже есть.
+        """
+        with self.symbol_lock(symbol):
+            if self._active_by_symbol.get(symbol):
+                if self.logger:
+                    self.logger.log_operation_complete("place_order", trace_id=trace_id, context={"symbol": symbol, "status": "skipped_active"})
+                return None
+            return self.place_order(symbol, order_type, margin, leverage, entry_price, stop_loss, take_profit,
+                                    trace_id=trace_id, durable=durable)
+
+    def cancel_order(self, order_id: str, trace_id: Optional[str] = None, durable: bool = False):
+        """Отменяет ордер и сохраняет состояние (durable - см. place_order)."""
         if self.logger:
             self.logger.log_operation_start("cancel_order", trace_id=trace_id, order_id=order_id)
-        if order_id in self._orders:
-            order = self._orders[order_id]
-            order["status"] = "CANCELLED"
-            order["updated_at"] = datetime.now(timezone.utc).isoformat()
+        order = self._orders.get(order_id)
+        if order is None:
+            return False
+        with self.symbol_lock(order["symbol"]):
+            self._set_status(order, "CANCELLED")
+            order["updated_at"] = self._clock().isoformat()
+            if self.exchange:
+                self.exchange.cancel(order_id)
             try:
-                self.repository.save(order, trace_id=trace_id)
+                self._writer.save(order, trace_id=trace_id)
+                if durable:
+                    self.flush()
             except RepositoryError as e:
                 if self.logger:
                     self.logger.log_operation_error("cancel_order_save", error="Failed to save cancelled order", context=e.get_context(), trace_id=trace_id)
                 raise
-            return True
-        return False
+        return True
+
+    def place_orders(self, requests: List[Dict[str, Any]], trace_id: Optional[str] = None,
+                     durable: bool = False) -> List[Dict[str, Any]]:
+        """
+        Размещает несколько ордеров как одну операцию.
+
+        Каждый запрос - словарь с ключами symbol, order_type, margin, leverage,
+        entry_price и необязательными stop_loss, take_profit. Некорректные
+        запросы отклоняются по отдельности; корректные сохраняются одной
+        транзакцией (при ошибке БД не сохраняется ни один и выбрасывается
+        RepositoryError).
+
+        Returns:
+            Результаты в порядке запросов: {"index", "status": "placed"|"rejected",
+            "order_id" | "error"}.
+        """
+        if self.logger:
+            self.logger.log_operation_start("place_orders", trace_id=trace_id, context={"requested": len(requests)})
+        now = self._clock().isoformat()
+        results, new_orders = [], []
+        for index, request in enumerate(requests):
+            error = self._validate_order_request(request)
+            if error:
+                results.append({"index": index, "status": "rejected", "error": error})
+                continue
+            order = self._new_order(request["symbol"], request["order_type"], request["margin"], request["leverage"],
+                                    request["entry_price"], request.get("stop_loss"), request.get("take_profit"), now)
+            new_orders.append(order)
+            results.append({"index": index, "status": "placed", "order_id": order["order_id"]})
+
+        if new_orders:
+            with self._locked(self.symbol_lock(order["symbol"]) for order in new_orders):
+                try:
+                    self._writer.save_many(new_orders, trace_id=trace_id)
+                    if durable:
+                        self.flush()
+                except RepositoryError as e:
+                    if self.logger:
+                        self.logger.log_operation_error("place_orders_save", error="Failed to save new orders", context=e.get_context(), trace_id=trace_id)
+                    raise
+                for order in new_orders:
+                    self._add_order(order)
+                if self.exchange:
+                    self.exchange.submit_many(new_orders)
+        if self.logger:
+            self.logger.log_operation_complete("place_orders", trace_id=trace_id, context={
+                "requested": len(requests), "placed": len(new_orders), "rejected": len(requests) - len(new_orders)})
+        return results
+
+    def cancel_orders(self, order_ids: List[str], trace_id: Optional[str] = None,
+                      durable: bool = False) -> Dict[str, bool]:
+        """
+        Отменяет несколько ордеров, сохраняя изменения одной транзакцией.
+
+        Returns:
+            {order_id: True, если ордер найден и отменен, иначе False}.
+        """
+        if self.logger:
+            self.logger.log_operation_start("cancel_orders", trace_id=trace_id, context={"requested": len(order_ids)})
+        now = self._clock().isoformat()
+        found = {order_id: self._orders.get(order_id) for order_id in order_ids}
+        results = {order_id: order is not None for order_id, order in found.items()}
+        cancelled = [order for order in found.values() if order is not None]
+        if cancelled:
+            with self._locked(self.symbol_lock(order["symbol"]) for order in cancelled):
+                for order in cancelled:
+                    self._set_status(order, "CANCELLED")
+                    order["updated_at"] = now
+                    if self.exchange:
+                        self.exchange.cancel(order["order_id"])
+                try:
+                    self._writer.save_many(cancelled, trace_id=trace_id)
+                    if durable:
+                        self.flush()
+                except RepositoryError as e:
+                    if self.logger:
+                        self.logger.log_operation_error("cancel_orders_save", error="Failed to save cancelled orders", context=e.get_context(), trace_id=trace_id)
+                    raise
+        if self.logger:
+            self.logger.log_operation_complete("cancel_orders", trace_id=trace_id, context={
+                "requested": len(order_ids), "cancelled": len(cancelled)})
+        return results
+
+    @staticmethod
+    def _validate_order_request(request: Dict[str, Any]) -> Optional[str]:
+        """Возвращает описание ошибки запроса на ордер или None."""
+        missing = [key for key in ("symbol", "order_type", "margin", "leverage", "entry_price") if request.get(key) is None]
+        if missing:
+            return f"missing fields: {', '.join(missing)}"
+        if request["order_type"] not in ("BUY", "SELL"):
+            return f"invalid order_type: {request['order_type']}"
+        for key in ("margin", "leverage", "entry_price"):
+            if not isinstance(request[key], (int, float)) or request[key] <= 0:
+                return f"{key} must be positive"
+        return None
+
+    def get_order(self, order_id: str, trace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Возвращает ордер из памяти или, для истории прошлых сессий, из репозитория."""
+        order = self._orders.get(order_id)
+        if order is None:
+            self.flush()
+            order = self._history.get(order_id, trace_id=trace_id)
+        return order
+
+    def iter_order_history(self, symbol: Optional[str] = None, status: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None,
+                           trace_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Потоково перебирает сохраненные ордера (от новых к старым), см. OmsRepository.iter_orders."""
+        self.flush()
+        return self._history.iter_orders(symbol=symbol, status=status, since=since, until=until, trace_id=trace_id)
 
     def get_order_status(self, order_id: str, trace_id: Optional[str] = None):
         """
@@ -80,22 +338,87 @@ class OrderManagementSystem:
         """
         if self.logger:
             self.logger.log_operation_start("get_order_status", trace_id=trace_id, context={"order_id": order_id})
-        if order_id in self._orders:
-            order = self._orders[order_id]
-            # Для симуляции ручного тестирования, мы можем имитировать
-            # исполнение ордера при его проверке.
-            if order["status"] == "PENDING":
-                order["status"] = "FILLED"
+        order = self._orders.get(order_id)
+        if order is None:
+            # Завершенные ордера прошлых сессий в память не загружаются
+            try:
+                historical = self.get_order(order_id, trace_id=trace_id)
+            except RepositoryError as e:
+                if self.logger:
+                    self.logger.log_operation_error("get_order_status_load", error="Failed to load historical order", context=e.get_context(), trace_id=trace_id)
+                historical = None
+            return historical["status"] if historical else "UNKNOWN"
+        # Для симуляции ручного тестирования, мы можем имитировать
+        # исполнение ордера при его проверке. С биржей paper trading
+        # статус меняют только ее исполнения (apply_fills).
+        with self.symbol_lock(order["symbol"]):
+            if order["status"] == "PENDING" and self.exchange is None:
+                self._set_status(order, "FILLED")
                 order["exit_price"] = order["entry_price"] * 1.02 # Simulate 2% profit
-                order["updated_at"] = datetime.now(timezone.utc).isoformat()
+                order["updated_at"] = self._clock().isoformat()
                 try:
-                    self.repository.save(order, trace_id=trace_id)
+                    self._writer.save(order, trace_id=trace_id)
                 except RepositoryError as e:
                     if self.logger:
                         self.logger.log_operation_error("get_order_status_save", error="Failed to save updated order status", context=e.get_context(), trace_id=trace_id)
                     # Do not re-raise here, as getting status is non-critical
             return order["status"]
-        return "UNKNOWN"
+
+    def close_position(self, order_id: str, trace_id: Optional[str] = None) -> bool:
+        """
+        Закрывает открытую (OPEN) позицию по рынку через биржу paper trading;
+        статус станет FILLED, когда придет исполнение (apply_fills).
+
+        Returns:
+            True, если заявка на закрытие принята.
+        """
+        order = self._orders.get(order_id)
+        if order is None or self.exchange is None:
+            return False
+        with self.symbol_lock(order["symbol"]):
+            accepted = order["status"] == "OPEN" and self.exchange.close_position(order_id, self._clock().isoformat())
+        if self.logger:
+            self.logger.log_operation_complete("close_position", trace_id=trace_id, context={"order_id": order_id, "accepted": accepted})
+        return accepted
+
+    def apply_fills(self, fills: List[Fill], trace_id: Optional[str] = None):
+        """
+        Применяет исполнения биржи: вход - PENDING -> OPEN по цене входа,
+        выход по SL/TP - OPEN -> FILLED с exit_price. Исполнения ордеров,
+        отмененных после сопоставления, игнорируются. Изменения сохраняются
+        одной транзакцией.
+        """
+        fills = [fill for fill in fills if fill.order_id in self._orders]
+        if not fills:
+            return
+        changed = {}
+        with self._locked(self.symbol_lock(fill.symbol) for fill in fills):
+            for fill in fills:
+                order = self._orders[fill.order_id]
+                if fill.kind == ENTRY and order["status"] == "PENDING":
+                    self._set_status(order, "OPEN")
+                    order["entry_price"] = fill.price
+                elif fill.kind != ENTRY and order["status"] == "OPEN":
+                    self._set_status(order, "FILLED")
+                    order["exit_price"] = fill.price
+                else:
+                    continue
+                order["updated_at"] = fill.timestamp
+                changed[fill.order_id] = order
+            if changed:
+                try:
+                    self._writer.save_many(list(changed.values()), trace_id=trace_id)
+                except RepositoryError as e:
+                    if self.logger:
+                        self.logger.log_operation_error("apply_fills_save", error="Failed to save filled orders", context=e.get_context(), trace_id=trace_id)
+                    raise
+        if self.logger:
+            self.logger.log_operation_complete("apply_fills", trace_id=trace_id, context={"fills": len(fills), "applied": len(changed)})
+
+    def flush(self, timeout: Optional[float] = None):
+        """Барьер долговечности: ждет записи всех изменений ордеров (no-op без write-behind)."""
+        if self.write_behind:
+            self.write_behind.flush(timeout)
 
     def get_order_by_symbol(self, symbol: str, trace_id: Optional[str] = None):
         """
@@ -104,12 +427,22 @@ class OrderManagementSystem:
         if self.logger:
             self.logger.log_operation_start("get_order_by_symbol", trace_id=trace_id, context={"symbol": symbol})
             
-        for order in self._orders.values():
-            if order['symbol'] == symbol and order['status'] not in ['CANCELLED', 'FILLED']:
-                if self.logger:
-                    self.logger.log_operation_complete("get_order_by_symbol", trace_id=trace_id, context={"status": "found", "order_id": order["order_id"]})
-                return order
+        with self.symbol_lock(symbol):
+            active = self._active_by_symbol.get(symbol)
+            order = next(iter(active.values())) if active else None
+        if order is not None:
+            if self.logger:
+                self.logger.log_operation_complete("get_order_by_symbol", trace_id=trace_id, context={"status": "found", "order_id": order["order_id"]})
+            return order
         
         if self.logger:
             self.logger.log_operation_complete("get_order_by_symbol", trace_id=trace_id, context={"status": "not_found"})
-        return None
\ No newline at end of file
+        return None
+
+    def get_orders_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """
+        Возвращает ордера с указанным статусом в порядке добавления.
+        Для завершенных статусов - только ордера текущей сессии (историю см. iter_order_history).
+        """
+        with self._index_lock:
+            return list(self._by_status.get(status, {}).values())
@@ -1,50 +1,104 @@
 import sqlite3
+import functools
+import itertools
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
 from src.infrastructure.exceptions import RepositoryError
 from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+from src.trading.sqlite_pool import SqliteConnectionPool
+
+# Статусы, после которых ордер больше не является активной позицией
+TERMINAL_STATUSES = frozenset({"CANCELLED", "FILLED"})
+
+_ACTIVE_CONDITION = "status NOT IN ('CANCELLED', 'FILLED')"
+
+
+@functools.lru_cache(maxsize=32)
+def _upsert_sql(columns: Tuple[str, ...]) -> str:
+    """
+    SQL INSERT OR REPLACE для набора колонок. Строка строится один раз, а
+    одинаковый текст запроса попадает в кэш подготовленных выражений соединения.
+    """
+    return f"INSERT OR REPLACE INTO orders ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _upsert_many(cursor: sqlite3.Cursor, orders: Sequence[Dict[str, Any]]):
+    """executemany по подряд идущим ордерам с одинаковым набором колонок (порядок записи сохраняется)."""
+    for columns, group in itertools.groupby(orders, key=lambda order: tuple(order)):
+        cursor.executemany(_upsert_sql(columns), [tuple(order.values()) for order in group])
+
+
+# Курсор постраничной выборки истории: (updated_at, order_id) последнего ордера страницы
+HistoryCursor = Tuple[str, str]
 
 class OmsRepository:
     """
     Отвечает за сохранение и загрузку состояния ордеров (orders)
     в персистентное хранилище (база данных SQLite).
     """
-    def __init__(self, db_path: str, logger: Optional[MarketDataLogger] = None):
+    def __init__(self, db_path: str, logger: Optional[MarketDataLogger] = None,
+                 metrics: Optional[MetricsRegistry] = None, synchronous: str = "NORMAL"):
         """
-        Инициализирует репозиторий. Для :memory: создает постоянное соединение.
+        Инициализирует репозиторий. Соединения долгоживущие (см. SqliteConnectionPool):
+        файловая база работает в режиме WAL с соединением на поток.
 
         Args:
             db_path (str): Путь к файлу .db или ':memory:'.
             logger (Optional[MarketDataLogger]): Экземпляр логгера.
+            metrics (Optional[MetricsRegistry]): Реестр метрик (по умолчанию глобальный).
+            synchronous (str): PRAGMA synchronous файловой базы ("FULL" - fsync на каждый коммит).
         """
         self._db_path = db_path
         self.logger = logger
-        self._conn = None
+        # Сериализует транзакции записи: соединение ':memory:' общее для потоков,
+        # а файловые соединения иначе конкурировали бы за блокировку БД
+        self._write_lock = threading.RLock()
+        self._shared_connection = db_path == ":memory:"
+        self.metrics = metrics or get_metrics_registry()
 
-        if self._db_path == ":memory:":
-            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
-        else:
+        if self._db_path != ":memory:":
             # Убедимся, что директория для файла существует
-            os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+            os.makedirs(os.path.dirname(self._db_path) or ".", exist_ok=True)
+        self._pool = SqliteConnectionPool(self._db_path, synchronous=synchronous)
         
         self._create_table()
 
     def _get_connection(self):
-        """Возвращает существующее соединение или создает новое."""
-        if self._conn:
-            return self._conn
-        return sqlite3.connect(self._db_path)
+        """Возвращает долгоживущее соединение текущего потока."""
+        return self._pool.connection()
+
+    def _record(self, operation: str, start: float, status: str = "ok"):
+        """Записывает латентность и исход операции в реестр метрик."""
+        self.metrics.observe_ms("oms_repository_duration_ms", start, operation=operation)
+        self.metrics.counter("oms_repository_operations_total", operation=operation, status=status).inc()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Транзакция записи под self._write_lock: коммит при выходе,
+        откат при sqlite3.Error (ошибка пробрасывается дальше).
+        """
+        with self._write_lock:
+            conn = self._get_connection()
+            try:
+                yield conn
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
 
     def close(self):
-        """Закрывает постоянное соединение, если оно существует."""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
+        """Закрывает все соединения репозитория."""
+        self._pool.close()
 
     def _create_table(self):
         """Создает таблицу orders в БД, если она не существует."""
-        conn = self._get_connection()
         try:
+            conn = self._get_connection()
             cursor = conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS orders (
@@ -62,6 +116,11 @@ class OmsRepository:
                     updated_at TEXT NOT NULL
                 );
             """)
+            # Частичный индекс держит только активные ордера: стартовая загрузка
+            # не читает историю. Остальные обслуживают выборки истории.
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_orders_active ON orders(symbol) WHERE {_ACTIVE_CONDITION}")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_updated ON orders(updated_at, order_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_symbol_updated ON orders(symbol, updated_at, order_id)")
             conn.commit()
         except sqlite3.Error as e:
             raise RepositoryError(
@@ -70,47 +129,122 @@ class OmsRepository:
                 db_operation="create_table",
                 original_exception=e
             )
-        finally:
-            if not self._conn: # Закрываем только если соединение не постоянное
-                conn.close()
-
-    def load(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
-        """
-        Загружает все ордера из базы данных SQLite.
 
-        Returns:
-            Словарь с состоянием ордеров, где ключ - order_id.
-            Возвращает пустой словарь, если таблица пуста или произошла ошибка.
-        """
+    def _select(self, operation: str, sql: str, params: Sequence[Any] = (),
+                trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Выполняет SELECT по таблице orders и возвращает строки как словари."""
         if self.logger:
-            self.logger.log_operation_start("repo_load", trace_id=trace_id)
-        
-        orders = {}
-        conn = self._get_connection()
+            self.logger.log_operation_start(f"repo_{operation}", trace_id=trace_id)
+
+        start = time.perf_counter()
         try:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM orders")
-            rows = cursor.fetchall()
-            for row in rows:
-                orders[row['order_id']] = dict(row)
-            
+            # Общее соединение ':memory:' не читаем посреди чужой транзакции
+            with self._write_lock if self._shared_connection else nullcontext():
+                cursor = self._get_connection().cursor()
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(sql, params)
+                rows = [dict(row) for row in cursor.fetchall()]
+            self._record(operation, start)
+
             if self.logger:
-                self.logger.log_operation_complete("repo_load", trace_id=trace_id, context={"orders_loaded": len(orders)})
-                
+                self.logger.log_operation_complete(f"repo_{operation}", trace_id=trace_id, context={"orders_loaded": len(rows)})
+
         except sqlite3.Error as e:
+            self._record(operation, start, "error")
             if self.logger:
-                self.logger.log_operation_error("repo_load", trace_id=trace_id, error=str(e))
+                self.logger.log_operation_error(f"repo_{operation}", trace_id=trace_id, error=str(e))
             raise RepositoryError(
                 message=f"Failed to load orders from OMS database: {e}",
                 repository_type="sqlite",
-                db_operation="load",
+                db_operation=operation,
                 original_exception=e
             )
-        finally:
-            if not self._conn:
-                conn.close()
-        return orders
+        return rows
+
+    def load(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Загружает все ордера из базы данных SQLite, включая историю.
+        Для старта OMS используйте load_active().
+
+        Returns:
+            Словарь с состоянием ордеров, где ключ - order_id.
+            Возвращает пустой словарь, если таблица пуста или произошла ошибка.
+        """
+        rows = self._select("load", "SELECT * FROM orders", trace_id=trace_id)
+        return {row["order_id"]: row for row in rows}
+
+    def load_active(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Загружает только активные (не CANCELLED/FILLED) ордера по частичному индексу.
+        Время загрузки не зависит от объема истории.
+        """
+        rows = self._select("load_active", f"SELECT * FROM orders INDEXED BY idx_orders_active WHERE {_ACTIVE_CONDITION}",
+                            trace_id=trace_id)
+        return {row["order_id"]: row for row in rows}
+
+    def get(self, order_id: str, trace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Возвращает ордер по ID (в т.ч. исторический) или None."""
+        rows = self._select("get", "SELECT * FROM orders WHERE order_id = ?", (order_id,), trace_id=trace_id)
+        return rows[0] if rows else None
+
+    def get_orders_page(self, symbol: Optional[str] = None, status: Optional[str] = None,
+                        since: Optional[str] = None, until: Optional[str] = None, limit: int = 100,
+                        cursor: Optional[HistoryCursor] = None,
+                        trace_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[HistoryCursor]]:
+        """
+        Страница ордеров от новых к старым (по updated_at) с keyset-пагинацией.
+
+        Args:
+            symbol: Фильтр по символу.
+            status: Фильтр по статусу.
+            since: Нижняя граница updated_at (ISO, включительно).
+            until: Верхняя граница updated_at (ISO, не включительно).
+            limit: Размер страницы.
+            cursor: Курсор, возвращенный предыдущей страницей.
+
+        Returns:
+            (ордера страницы, курсор следующей страницы или None, если страниц больше нет)
+        """
+        conditions, params = [], []
+        if symbol is not None:
+            conditions.append("symbol = ?")
+            params.append(symbol)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("updated_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("updated_at < ?")
+            params.append(until)
+        if cursor is not None:
+            conditions.append("(updated_at, order_id) < (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT * FROM orders {where} ORDER BY updated_at DESC, order_id DESC LIMIT ?"
+        rows = self._select("history_page", sql, (*params, limit), trace_id=trace_id)
+        next_cursor = (rows[-1]["updated_at"], rows[-1]["order_id"]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def get_archivable(self, before: str, limit: int = 1000,
+                       trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Завершенные ордера с updated_at < before, от старых к новым (по idx_orders_updated)."""
+        statuses = ", ".join(f"'{status}'" for status in sorted(TERMINAL_STATUSES))
+        sql = (f"SELECT * FROM orders WHERE updated_at < ? AND status IN ({statuses}) "
+               "ORDER BY updated_at, order_id LIMIT ?")
+        return self._select("get_archivable", sql, (before, limit), trace_id=trace_id)
+
+    def iter_orders(self, symbol: Optional[str] = None, status: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None, page_size: int = 500,
+                    trace_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Потоково перебирает историю ордеров страницами по page_size (от новых к старым)."""
+        cursor = None
+        while True:
+            rows, cursor = self.get_orders_page(symbol, status, since, until, page_size, cursor, trace_id)
+            yield from rows
+            if cursor is None:
+                return
 
     def save(self, order: Dict[str, Any], trace_id: Optional[str] = None):
         """
@@ -123,25 +257,17 @@ class OmsRepository:
         if self.logger:
             self.logger.log_operation_start("repo_save", trace_id=trace_id, context={"order_id": order.get("order_id")})
             
-        conn = self._get_connection()
+        start = time.perf_counter()
         try:
-            cursor = conn.cursor()
-            
-            columns = ', '.join(order.keys())
-            placeholders = ', '.join('?' * len(order))
-            sql = f"INSERT OR REPLACE INTO orders ({columns}) VALUES ({placeholders})"
-            
-            values = [order.get(key) for key in order.keys()]
-            
-            cursor.execute(sql, values)
-            conn.commit()
+            with self._transaction() as conn:
+                conn.cursor().execute(_upsert_sql(tuple(order)), tuple(order.values()))
+            self._record("save", start)
 
             if self.logger:
                 self.logger.log_operation_complete("repo_save", trace_id=trace_id, context={"order_id": order.get("order_id")})
 
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
+            self._record("save", start, "error")
             if self.logger:
                 self.logger.log_operation_error("repo_save", trace_id=trace_id, error=str(e), context={"order_id": order.get("order_id")})
             raise RepositoryError(
@@ -150,9 +276,75 @@ class OmsRepository:
                 db_operation="save",
                 original_exception=e
             )
-        finally:
-            if not self._conn:
-                conn.close()
+
+
+    def save_many(self, orders: Sequence[Dict[str, Any]], trace_id: Optional[str] = None):
+        """
+        Сохраняет несколько ордеров одной транзакцией (executemany).
+        При ошибке откатывается весь пакет.
+
+        Args:
+            orders: Ордера для INSERT OR REPLACE.
+        """
+        context = {"orders": len(orders)}
+        if self.logger:
+            self.logger.log_operation_start("repo_save_many", trace_id=trace_id, context=context)
+
+        start = time.perf_counter()
+        try:
+            with self._transaction() as conn:
+                _upsert_many(conn.cursor(), orders)
+            self._record("save_many", start)
+
+            if self.logger:
+                self.logger.log_operation_complete("repo_save_many", trace_id=trace_id, context=context)
+
+        except sqlite3.Error as e:
+            self._record("save_many", start, "error")
+            if self.logger:
+                self.logger.log_operation_error("repo_save_many", trace_id=trace_id, error=str(e), context=context)
+            raise RepositoryError(
+                message=f"Failed to save orders to OMS database: {e}",
+                repository_type="sqlite",
+                db_operation="save_many",
+                original_exception=e
+            )
+
+    def write_batch(self, orders: List[Dict[str, Any]], deleted_ids: Sequence[str] = (),
+                    trace_id: Optional[str] = None):
+        """
+        Сохраняет и удаляет несколько ордеров одной транзакцией (group commit).
+
+        Args:
+            orders: Ордера для INSERT OR REPLACE.
+            deleted_ids: ID ордеров для удаления.
+        """
+        context = {"orders": len(orders), "deleted": len(deleted_ids)}
+        if self.logger:
+            self.logger.log_operation_start("repo_write_batch", trace_id=trace_id, context=context)
+
+        start = time.perf_counter()
+        try:
+            with self._transaction() as conn:
+                cursor = conn.cursor()
+                _upsert_many(cursor, orders)
+                if deleted_ids:
+                    cursor.executemany("DELETE FROM orders WHERE order_id = ?", [(order_id,) for order_id in deleted_ids])
+            self._record("write_batch", start)
+
+            if self.logger:
+                self.logger.log_operation_complete("repo_write_batch", trace_id=trace_id, context=context)
+
+        except sqlite3.Error as e:
+            self._record("write_batch", start, "error")
+            if self.logger:
+                self.logger.log_operation_error("repo_write_batch", trace_id=trace_id, error=str(e), context=context)
+            raise RepositoryError(
+                message=f"Failed to write order batch to OMS database: {e}",
+                repository_type="sqlite",
+                db_operation="write_batch",
+                original_exception=e
+            )
 
     def delete(self, order_id: str, trace_id: Optional[str] = None):
         """
@@ -164,18 +356,17 @@ class OmsRepository:
         if self.logger:
             self.logger.log_operation_start("repo_delete", trace_id=trace_id, context={"order_id": order_id})
 
-        conn = self._get_connection()
+        start = time.perf_counter()
         try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
-            conn.commit()
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+            self._record("delete", start)
 
             if self.logger:
                 self.logger.log_operation_complete("repo_delete", trace_id=trace_id, context={"order_id": order_id})
 
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
+            self._record("delete", start, "error")
             if self.logger:
                 self.logger.log_operation_error("repo_delete", trace_id=trace_id, error=str(e), context={"order_id": order_id})
             raise RepositoryError(
@@ -184,6 +375,3 @@ class OmsRepository:
                 db_operation="delete",
                 original_exception=e
             )
-        finally:
-            if not self._conn:
-                conn.close()
\ No newline at end of file
@@ -0,0 +1,357 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+
+# Виды исполнения
+ENTRY = "entry"
+STOP_LOSS = "stop_loss"
+TAKE_PROFIT = "take_profit"
+MARKET_EXIT = "market_exit"
+
+# Приоритет при срабатывании на одном баре: внутри бара порядок цен неизвестен,
+# поэтому стоп-лосс считается сработавшим раньше тейк-профита (консервативно)
+_PRIORITY = {ENTRY: 0, STOP_LOSS: 0, TAKE_PROFIT: 1}
+
+# Триггер: (order_id, вид, цена)
+_Trigger = Tuple[str, str, float]
+
+
+@dataclass
+class Fill:
+    """Исполнение ордера на симулированной бирже."""
+    order_id: str
+    symbol: str
+    kind: str          # ENTRY | STOP_LOSS | TAKE_PROFIT | MARKET_EXIT
+    price: float
+    timestamp: str     # ISO-время открытия бара исполнения
+
+
+@dataclass
+class _Resting:
+    """Ордер в книге: лимитный вход (PENDING) или открытая позиция с SL/TP."""
+    order_id: str
+    side: str          # BUY | SELL
+    entry_price: float
+    stop_loss: Optional[float]
+    take_profit: Optional[float]
+    start_ns: int      # бары раньше этого времени не исполняют ордер
+    opened: bool = False
+
+    def triggers(self) -> Iterable[Tuple[str, float, bool]]:
+        """(вид, цена, срабатывает по low <= цена) для активных триггеров ордера."""
+        buy = self.side == "BUY"
+        if not self.opened:
+            yield ENTRY, self.entry_price, buy
+            return
+        if self.stop_loss is not None:
+            yield STOP_LOSS, self.stop_loss, buy
+        if self.take_profit is not None:
+            yield TAKE_PROFIT, self.take_profit, not buy
+
+
+def _sparse_table(values: np.ndarray, op) -> List[np.ndarray]:
+    """levels[j][i] = op(values[i : i + 2**j]) для запросов минимума/максимума на отрезке."""
+    levels = [values]
+    width = 1
+    while width * 2 <= len(values):
+        previous = levels[-1]
+        levels.append(op(previous[:-width], previous[width:]))
+        width *= 2
+    return levels
+
+
+def _first_hits(levels: List[np.ndarray], starts: np.ndarray, prices: np.ndarray, below: bool) -> np.ndarray:
+    """
+    Для каждого триггера - индекс первого бара >= starts, на котором он срабатывает
+    (low <= цена при below, иначе high >= цена); len(bars), если не срабатывает.
+
+    Двоичный подъем по разреженной таблице: O(log n) векторных шагов на все
+    триггеры сразу, у каждого триггера свой стартовый бар.
+    """
+    n = len(levels[0])
+    pos = starts.copy()
+    for j in range(len(levels) - 1, -1, -1):
+        width = 1 << j
+        valid = pos <= n - width
+        block = levels[j][np.where(valid, pos, 0)]
+        missed = block > prices if below else block < prices
+        pos = np.where(valid & missed, pos + width, pos)
+    return pos
+
+
+class _SymbolBook:
+    """
+    Книга ордеров символа. Триггеры проиндексированы по цене в двух
+    отсортированных массивах: "снизу" (срабатывают при low <= цена: BUY-лимиты,
+    SL длинных и TP коротких позиций) и "сверху" (high >= цена). Пачка баров
+    проверяется только против префикса/суффикса, который вообще достижим
+    в диапазоне [min(low), max(high)] пачки.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, _Resting] = {}
+        self.closing: Dict[str, int] = {}  # order_id -> время заявки на закрытие по рынку (нс)
+        self._index: Optional[Tuple[np.ndarray, List[_Trigger], np.ndarray, List[_Trigger]]] = None
+
+    def put(self, resting: _Resting):
+        self.orders[resting.order_id] = resting
+        self._index = None
+
+    def remove(self, order_id: str) -> bool:
+        removed = self.orders.pop(order_id, None) is not None
+        if removed:
+            self.closing.pop(order_id, None)
+            self._index = None
+        return removed
+
+    def _price_index(self):
+        if self._index is None:
+            below, above = [], []
+            for resting in self.orders.values():
+                for kind, price, is_below in resting.triggers():
+                    (below if is_below else above).append((resting.order_id, kind, price))
+            below.sort(key=lambda trigger: trigger[2])
+            above.sort(key=lambda trigger: trigger[2])
+            self._index = (np.array([t[2] for t in below], dtype=float), below,
+                           np.array([t[2] for t in above], dtype=float), above)
+        return self._index
+
+    def reachable(self, low: float, high: float) -> Tuple[List[_Trigger], List[_Trigger]]:
+        """Триггеры, которые могут сработать в ценовом диапазоне [low, high]."""
+        below_prices, below, above_prices, above = self._price_index()
+        return (below[np.searchsorted(below_prices, low, side="left"):],
+                above[:np.searchsorted(above_prices, high, side="right")])
+
+    def match(self, times: np.ndarray, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+              slippage: float, symbol: str) -> List[Fill]:
+        """Исполняет ордера книги по пачке баров (по возрастанию времени)."""
+        fills: List[Fill] = []
+        if self.closing:
+            # Закрытие по рынку: открытие первого бара, открывшегося не раньше заявки
+            # (повторно проверяемый формирующийся бар уже в прошлом), с проскальзыванием
+            for order_id, requested_ns in list(self.closing.items()):
+                k = int(np.searchsorted(times, requested_ns, side="left"))
+                if k == len(times):
+                    continue
+                resting = self.orders.pop(order_id)
+                del self.closing[order_id]
+                direction = -1 if resting.side == "BUY" else 1
+                fills.append(Fill(order_id, symbol, MARKET_EXIT, float(opens[k]) * (1 + direction * slippage),
+                                  pd.Timestamp(int(times[k]), tz="UTC").isoformat()))
+                self._index = None
+            if not self.orders:
+                return fills
+        n = len(times)
+        low_levels, high_levels = _sparse_table(lows, np.minimum), _sparse_table(highs, np.maximum)
+        below, above = self.reachable(lows.min(), highs.max())
+        opened: List[_Resting] = []
+        # Второй проход нужен только для SL/TP позиций, открытых первым
+        for _ in range(2):
+            best: Dict[str, Tuple[int, str, float]] = {}
+            for triggers, levels, is_below in ((below, low_levels, True), (above, high_levels, False)):
+                if not triggers:
+                    continue
+                starts = np.searchsorted(times, [self.orders[order_id].start_ns for order_id, _, _ in triggers])
+                hits = _first_hits(levels, starts, np.array([price for _, _, price in triggers]), is_below)
+                for (order_id, kind, price), k in zip(triggers, hits.tolist()):
+                    if k < n:
+                        current = best.get(order_id)
+                        if current is None or (k, _PRIORITY[kind]) < (current[0], _PRIORITY[current[1]]):
+                            best[order_id] = (k, kind, price)
+
+            opened = []
+            for order_id, (k, kind, price) in best.items():
+                resting = self.orders[order_id]
+                fill_price = self._fill_price(resting, kind, price, float(opens[k]), slippage)
+                fills.append(Fill(order_id, symbol, kind, fill_price,
+                                  pd.Timestamp(int(times[k]), tz="UTC").isoformat()))
+                if kind == ENTRY:
+                    resting.opened = True
+                    resting.start_ns = int(times[k]) + 1
+                    opened.append(resting)
+                else:
+                    del self.orders[order_id]
+            if best:
+                self._index = None
+            if not opened:
+                break
+            below, above = [], []
+            for resting in opened:
+                for kind, price, is_below in resting.triggers():
+                    (below if is_below else above).append((resting.order_id, kind, price))
+        fills.sort(key=lambda fill: fill.timestamp)
+        return fills
+
+    @staticmethod
+    def _fill_price(resting: _Resting, kind: str, price: float, bar_open: float, slippage: float) -> float:
+        """
+        Лимитные вход и тейк-профит исполняются по своей цене или лучше (гэп
+        открытия бара); стоп-лосс становится рыночным ордером: цена срабатывания
+        или худший гэп, ухудшенные на slippage_tolerance.
+        """
+        buy = resting.side == "BUY"
+        if kind == ENTRY:
+            return min(bar_open, price) if buy else max(bar_open, price)
+        if kind == TAKE_PROFIT:
+            return max(bar_open, price) if buy else min(bar_open, price)
+        if buy:
+            return min(bar_open, price) * (1 - slippage)
+        return max(bar_open, price) * (1 + slippage)
+
+
+class PaperExchange:
+    """
+    Симулированная биржа для paper trading.
+
+    Ордера OMS (submit) стоят в книгах по символам: PENDING-ордер - лимитный
+    вход по entry_price, после входа позиция ждет stop_loss/take_profit.
+    on_bars() сопоставляет книгу с новыми OHLC-барами векторно (numpy) и
+    сообщает исполнения подписчикам (OrderManagementSystem.apply_fills).
+    Ордер исполняется только барами, открывшимися не раньше его создания,
+    а закрытые бары символа обрабатываются один раз, поэтому повторная подача
+    одного и того же окна свечей безопасна. Последний бар (у свечей Binance -
+    еще формирующийся) проверяется повторно при каждой подаче: его high/low
+    могут расшириться, а уже исполненные по нему ордера сменили состояние
+    и второй раз не исполнятся.
+    """
+
+    def __init__(self, slippage_tolerance: float = 0.001, logger: Optional[MarketDataLogger] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Args:
+            slippage_tolerance: Доля проскальзывания рыночных (стоп) исполнений.
+            logger: Экземпляр логгера.
+            metrics: Реестр метрик (по умолчанию глобальный).
+        """
+        self.slippage_tolerance = slippage_tolerance
+        self.logger = logger
+        self.metrics = metrics or get_metrics_registry()
+        self._books: Dict[str, _SymbolBook] = {}
+        self._symbols: Dict[str, str] = {}  # order_id -> symbol
+        self._last_bar_ns: Dict[str, int] = {}
+        self._listeners: List[Callable[[List[Fill]], Any]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback: Callable[[List[Fill]], Any]):
+        """Подписывает callback на пачки исполнений."""
+        self._listeners.append(callback)
+
+    def submit(self, order: Dict[str, Any]):
+        """Ставит активный ордер OMS в книгу (повторная подача заменяет ордер)."""
+        self.submit_many([order])
+
+    def submit_many(self, orders: Iterable[Dict[str, Any]]):
+        """Ставит несколько ордеров в книги за один захват блокировки."""
+        with self._lock:
+            for order in orders:
+                opened = order["status"] == "OPEN"
+                # SL/TP открытой позиции проверяются только после бара входа
+                # (updated_at = время бара исполнения входа, см. apply_fills), как в match()
+                start_ns = (pd.Timestamp(order["updated_at"]).value + 1 if opened
+                            else pd.Timestamp(order["created_at"]).value)
+                resting = _Resting(
+                    order_id=order["order_id"], side=order["order_type"], entry_price=order["entry_price"],
+                    stop_loss=order.get("stop_loss"), take_profit=order.get("take_profit"),
+                    start_ns=start_ns, opened=opened,
+                )
+                self._books.setdefault(order["symbol"], _SymbolBook()).put(resting)
+                self._symbols[resting.order_id] = order["symbol"]
+
+    def cancel(self, order_id: str) -> bool:
+        """Снимает ордер из книги. False, если его там нет (уже исполнен или неизвестен)."""
+        with self._lock:
+            symbol = self._symbols.pop(order_id, None)
+            return symbol is not None and self._books[symbol].remove(order_id)
+
+    def close_position(self, order_id: str, requested_at: Optional[str] = None) -> bool:
+        """
+        Закрывает открытую позицию рыночным ордером: исполнение по открытию
+        первого бара, открывшегося не раньше requested_at (ISO-время заявки;
+        без него - первого нового бара), с проскальзыванием. False, если
+        позиция не открыта.
+        """
+        with self._lock:
+            symbol = self._symbols.get(order_id)
+            if symbol is None:
+                return False
+            book = self._books[symbol]
+            if not book.orders[order_id].opened:
+                return False
+            book.closing[order_id] = pd.Timestamp(requested_at).value if requested_at else np.iinfo(np.int64).min
+            return True
+
+    def resting_orders(self, symbol: str) -> int:
+        """Число ордеров символа в книге."""
+        book = self._books.get(symbol)
+        return len(book.orders) if book else 0
+
+    def on_bars(self, symbol: str, bars: pd.DataFrame) -> List[Fill]:
+        """
+        Сопоставляет книгу символа с барами (DataFrame с колонками timestamp,
+        open, high, low, close; по возрастанию времени). Уже обработанные бары
+        пропускаются.
+
+        Returns:
+            Исполнения в порядке времени (они же переданы подписчикам).
+        """
+        return self.on_bars_many({symbol: bars})
+
+    def on_bars_many(self, bars_by_symbol: Dict[str, pd.DataFrame]) -> List[Fill]:
+        """Обрабатывает бары нескольких символов; подписчики получают одну пачку исполнений."""
+        arrays = {}
+        for symbol, bars in bars_by_symbol.items():
+            if not bars.empty:
+                arrays[symbol] = (bars["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64),
+                                  bars["open"].to_numpy(dtype=float), bars["high"].to_numpy(dtype=float),
+                                  bars["low"].to_numpy(dtype=float))
+        return self._process(arrays)
+
+    def on_bar_arrays(self, symbol: str, times: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+                      lows: np.ndarray) -> List[Fill]:
+        """
+        Как on_bars, но по готовым массивам (время открытия в нс UTC, open, high, low):
+        без построения DataFrame, для побарового воспроизведения истории.
+        """
+        return self._process({symbol: (times, opens, highs, lows)})
+
+    def _process(self, arrays: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]) -> List[Fill]:
+        start = time.perf_counter()
+        fills: List[Fill] = []
+        with self._lock:
+            for symbol, (times, opens, highs, lows) in arrays.items():
+                fills.extend(self._match(symbol, times, opens, highs, lows))
+            for fill in fills:
+                if fill.kind != ENTRY:
+                    self._symbols.pop(fill.order_id, None)
+        self.metrics.observe_ms("paper_exchange_match_duration_ms", start)
+        for fill in fills:
+            self.metrics.counter("paper_exchange_fills_total", kind=fill.kind).inc()
+        if fills:
+            if self.logger:
+                self.logger.log_operation_complete(
+                    "paper_fills", context=lambda: {"fills": len(fills), "kinds": sorted({f.kind for f in fills})})
+            for listener in self._listeners:
+                listener(fills)
+        return fills
+
+    def _match(self, symbol: str, times: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+               lows: np.ndarray) -> List[Fill]:
+        # last - время последнего поданного бара: он мог еще формироваться, поэтому
+        # сопоставляется снова вместе с более новыми барами
+        last = self._last_bar_ns.get(symbol)
+        if last is not None and times[-1] < last:
+            return []
+        fresh = slice(None) if last is None or times[0] >= last else times >= last
+        times = times[fresh]
+        self._last_bar_ns[symbol] = int(times[-1])
+        book = self._books.get(symbol)
+        if not book or not book.orders:
+            return []
+        return book.match(times, opens[fresh], highs[fresh], lows[fresh], self.slippage_tolerance, symbol)
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import weakref
+from typing import List, Optional
+
+
+class _ThreadConnection:
+    """Держатель соединения в threading.local: собирается вместе с данными потока при его завершении."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _release(lock: threading.Lock, connections: List[sqlite3.Connection], conn: sqlite3.Connection):
+    """Закрывает соединение завершившегося потока и убирает его из пула."""
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    conn.close()
+
+
+class SqliteConnectionPool:
+    """
+    Долгоживущие соединения SQLite, по одному на поток.
+
+    Файловые базы открываются один раз на поток в режиме WAL: запись идет в
+    журнал без перезаписи основного файла, читатели не блокируют писателя.
+    При synchronous=NORMAL fsync выполняется только на checkpoint, поэтому
+    коммит стоит микросекунды; база остается целостной при падении процесса,
+    а при потере питания могут пропасть лишь последние транзакции.
+    synchronous=FULL дает fsync на каждый коммит.
+
+    Кэш подготовленных выражений (cached_statements) живет в соединении,
+    поэтому повторные запросы с тем же SQL не компилируются заново.
+
+    ':memory:' обслуживается одним общим соединением: у каждого нового
+    соединения была бы своя пустая база.
+
+    Соединение потока закрывается, когда поток завершается. После close()
+    connection() бросает sqlite3.ProgrammingError.
+    """
+
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path: str, synchronous: str = "NORMAL", busy_timeout_ms: int = 5000,
+                 cached_statements: int = 256):
+        """
+        Args:
+            db_path: Путь к файлу .db или ':memory:'.
+            synchronous: PRAGMA synchronous для файловых баз (OFF/NORMAL/FULL/EXTRA).
+            busy_timeout_ms: Ожидание блокировки другим процессом/потоком.
+            cached_statements: Размер кэша подготовленных выражений на соединение.
+        """
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {', '.join(self.SYNCHRONOUS_MODES)}")
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._shared: Optional[sqlite3.Connection] = None
+        self._closed = False
+        if db_path == ":memory:":
+            self._shared = sqlite3.connect(":memory:", check_same_thread=False,
+                                           cached_statements=cached_statements)
+
+    def connection(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока, открывая его при первом обращении."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection pool.")
+        if self._shared is not None:
+            return self._shared
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = self._open()
+            holder = _ThreadConnection(conn)
+            # Финализатор не ссылается на пул, чтобы не продлевать его жизнь
+            weakref.finalize(holder, _release, self._lock, self._connections, conn)
+            self._local.holder = holder
+        return holder.conn
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread=False только ради close() из другого потока;
+        # запросы по соединению выполняет лишь поток-владелец
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Закрывает все соединения пула (WAL сбрасывается в основной файл при закрытии последнего)."""
+        with self._lock:
+            self._closed = True
+            connections = self._connections[:]
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
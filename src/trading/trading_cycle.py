@@ -1,19 +1,42 @@
 import csv
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Optional
 from src.trading.oms import OrderManagementSystem
+from src.trading.paper_exchange import PaperExchange
 from src.market_data.market_data_service import MarketDataService
+from src.market_data.context_diff import ContextDiffTracker
 from src.infrastructure.exceptions import ApiClientError as MarketDataError
 from src.logging_system import MarketDataLogger
 from src.logging_system.trace_generator import get_trace_id
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+from src.logging_system.profiling import profile_operation, profile_stage
 
 
 class TradingCycle:
     """
     Основной цикл торговой логики.
     """
-    def __init__(self, oms: OrderManagementSystem, market_data_service: MarketDataService):
+    def __init__(self, oms: OrderManagementSystem, market_data_service: MarketDataService,
+                 context_tracker: Optional[ContextDiffTracker] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 paper_exchange: Optional[PaperExchange] = None):
+        """
+        Args:
+            oms: Order management system (source of truth for positions).
+            market_data_service: Market data provider.
+            context_tracker: Optional tracker enabling delta context mode. When set,
+                the prompt carries a full snapshot or a delta against the last
+                context sent for the symbol instead of the full candle history.
+            metrics: Metrics registry for per-stage cycle latency (global registry by default).
+            paper_exchange: Simulated exchange for paper trading. When set, each cycle
+                feeds the fetched 1h candles to it so resting orders fill against real prices.
+        """
         self.oms = oms
         self.market_data_service = market_data_service
+        self.context_tracker = context_tracker
+        self.paper_exchange = paper_exchange
+        self.metrics = metrics or get_metrics_registry()
         self.logger = MarketDataLogger("trading_cycle", service_name="trading_cycle")
 
     def _get_ai_decision(self, market_data, current_position, trace_id: str):
@@ -21,10 +44,15 @@ class TradingCycle:
         Формирует промпт для ИИ и возвращает решение.
         На Фазе 2 возвращает жестко закодированное решение.
         """
-        # Get the context as a dictionary for logging.
-        context_dict = market_data.to_context_dict()
-        # Get the context as a compact JSON string for the LLM.
-        json_context_str = market_data.to_json_context()
+        with profile_stage("serialization"):
+            if self.context_tracker:
+                # Delta mode: send a full snapshot or only what changed since the last decision.
+                context_dict, json_context_str = self.context_tracker.build(market_data, trace_id=trace_id)
+            else:
+                # Get the context as a dictionary for logging.
+                context_dict = market_data.to_context_dict()
+                # Get the context as a compact JSON string for the LLM.
+                json_context_str = market_data.to_json_context()
 
         prompt = f"""
         Market Analysis (JSON): {json_context_str}
@@ -32,7 +60,8 @@ class TradingCycle:
         What is your next action (BUY, SELL, HOLD)?
         """
         # Log the context as a dictionary for proper structured logging.
-        self.logger.log_operation_start("get_ai_decision", trace_id=trace_id, context={"json_context": context_dict})
+        with profile_stage("logging"):
+            self.logger.log_operation_start("get_ai_decision", trace_id=trace_id, context={"json_context": context_dict})
         
         # Заглушка для решения ИИ
         decision = "BUY"
@@ -42,6 +71,19 @@ class TradingCycle:
     def run_cycle(self, symbol: str):
         """Запускает один полный торговый цикл."""
         master_trace_id = get_trace_id()
+        with self.metrics.time("trading_cycle_stage_duration_ms", stage="run_cycle"), \
+                profile_operation("run_cycle", trace_id=master_trace_id):
+            self._run_cycle(symbol, master_trace_id)
+        self.metrics.counter("trading_cycles_total").inc()
+
+    @contextmanager
+    def _stage(self, stage: str):
+        """Latency metric and profiling scope for one cycle stage."""
+        with self.metrics.time("trading_cycle_stage_duration_ms", stage=stage), profile_stage(stage):
+            yield
+
+    def _run_cycle(self, symbol: str, master_trace_id: str):
+        """Шаги торгового цикла; латентность каждого шага пишется в метрики."""
         self.logger.log_operation_start("run_cycle", trace_id=master_trace_id)
         
         # Теперь OMS - единственный источник правды о позициях.
@@ -59,7 +101,8 @@ class TradingCycle:
             
             try:
                 # get_order_status в OMS теперь сам обновляет состояние, если оно изменилось
-                self.oms.get_order_status(order_id, trace_id=master_trace_id)
+                with self._stage("sync_order_status"):
+                    self.oms.get_order_status(order_id, trace_id=master_trace_id)
                 # После проверки, получаем обновленное состояние
                 current_position = self.oms.get_order_by_symbol(symbol, trace_id=master_trace_id)
                 
@@ -75,14 +118,29 @@ class TradingCycle:
  
         # Шаг 2: Получение рыночных данных
         try:
-            market_data = self.market_data_service.get_market_data(symbol, trace_id=master_trace_id)
+            # MarketDataService profiles get_market_data and its sub-stages itself
+            with self.metrics.time("trading_cycle_stage_duration_ms", stage="get_market_data"):
+                market_data = self.market_data_service.get_market_data(symbol, trace_id=master_trace_id)
         except MarketDataError as e:
             self.logger.log_operation_error("get_market_data", error=str(e), trace_id=master_trace_id)
             self.logger.log_operation_error("run_cycle", error="Failed to get market data", trace_id=master_trace_id)
             return
 
+        # Paper trading: новые свечи исполняют ордера симулированной биржи
+        if self.paper_exchange:
+            with self._stage("paper_match"):
+                self.paper_exchange.on_bars(symbol, market_data.h1_candles)
+            current_position = self.oms.get_order_by_symbol(symbol, trace_id=master_trace_id)
+
         # Шаг 3: Взаимодействие с ИИ
-        ai_decision = self._get_ai_decision(market_data, current_position, trace_id=master_trace_id)
+        try:
+            with self._stage("get_ai_decision"):
+                ai_decision = self._get_ai_decision(market_data, current_position, trace_id=master_trace_id)
+        except Exception:
+            # Модель не получила payload: следующий цикл должен отправить полный снимок
+            if self.context_tracker:
+                self.context_tracker.invalidate(symbol)
+            raise
 
         # Шаг 4: Оркестрация и исполнение решения
         if ai_decision == "BUY" and not current_position:
@@ -91,22 +149,32 @@ class TradingCycle:
             
             self.logger.log_operation_start("place_buy_order", context={"symbol": symbol, "quantity": quantity, "price": price}, trace_id=master_trace_id)
             try:
-                # В реальной системе здесь должны быть параметры stop_loss и take_profit
-                self.oms.place_order(
-                    symbol=symbol,
-                    order_type='BUY',
-                    margin=price * quantity,  # Примерный расчет
-                    leverage=10,              # Пример
-                    entry_price=price,
-                    trace_id=master_trace_id
-                )
+                # В реальной системе здесь должны быть параметры stop_loss и take_profit.
+                # Проверка "нет позиции" повторяется атомарно: параллельный цикл по
+                # этому символу мог открыть позицию после чтения current_position.
+                with self._stage("place_order"):
+                    order_id = self.oms.place_order_if_no_active(
+                        symbol=symbol,
+                        order_type='BUY',
+                        margin=price * quantity,  # Примерный расчет
+                        leverage=10,              # Пример
+                        entry_price=price,
+                        trace_id=master_trace_id
+                    )
+                if order_id is None:
+                    # Параллельный цикл по символу уже открыл позицию - ордер не размещается
+                    self.logger.log_operation_complete("place_buy_order", context={"symbol": symbol, "status": "skipped_active"}, trace_id=master_trace_id)
             except Exception as e:
                 self.logger.log_operation_error("place_buy_order", error=str(e), trace_id=master_trace_id)
 
         elif ai_decision == "SELL" and current_position:
             self.logger.log_operation_start("place_sell_order", context={"order_id": current_position.get('order_id')}, trace_id=master_trace_id)
-            # Логика отмены или продажи
-            self.oms.cancel_order(current_position.get('order_id'), trace_id=master_trace_id)
+            # Открытая позиция на бирже paper trading закрывается по рынку
+            # (exit_price придет с исполнением), неисполненный вход отменяется
+            if current_position.get("status") == "OPEN" and self.paper_exchange:
+                self.oms.close_position(current_position.get('order_id'), trace_id=master_trace_id)
+            else:
+                self.oms.cancel_order(current_position.get('order_id'), trace_id=master_trace_id)
         
         elif ai_decision == "HOLD":
             self.logger.info("AI decision is HOLD. No action taken.", trace_id=master_trace_id)
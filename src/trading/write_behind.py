@@ -0,0 +1,280 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.infrastructure.exceptions import RepositoryError
+from src.logging_system.logger_config import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry, get_metrics_registry
+from .oms_repository import OmsRepository
+
+# Размеры пакетов (записей) для гистограммы oms_write_behind_batch_size
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class _Pending:
+    """Несохраненная мутация одного ордера."""
+
+    __slots__ = ("first_seq", "order", "deleted")
+
+    def __init__(self, first_seq: int, order: Optional[Dict[str, Any]], deleted: bool):
+        self.first_seq = first_seq
+        self.order = order
+        self.deleted = deleted
+
+
+class WriteBehindPersister:
+    """
+    Отложенная (write-behind) запись ордеров с групповым коммитом.
+
+    save()/delete() ставят снимок ордера в очередь и сразу возвращают номер
+    мутации. Фоновый поток пишет накопленные мутации одной транзакцией
+    (OmsRepository.write_batch), как только набралось max_batch записей или
+    прошло max_delay_ms с первой из них. Повторные мутации одного ордера до
+    записи схлопываются в последнюю.
+
+    Долговечность по запросу: flush() (или save(..., durable=True)) блокирует
+    вызывающего, пока все мутации, поставленные до вызова, не закоммичены.
+    Неудачный пакет возвращается в очередь и повторяется; ожидающие flush()
+    получают RepositoryError.
+
+    Совместим с OmsRepository по save/save_many/delete/load, поэтому может быть передан
+    в OrderManagementSystem вместо репозитория.
+    """
+
+    def __init__(self, repository: OmsRepository, max_batch: int = 100, max_delay_ms: float = 5.0,
+                 max_pending: int = 10000, retry_delay_ms: float = 100.0,
+                 logger: Optional[MarketDataLogger] = None, metrics: Optional[MetricsRegistry] = None):
+        """
+        Args:
+            repository: Репозиторий, в который пишутся пакеты.
+            max_batch: Максимум записей в одной транзакции.
+            max_delay_ms: Максимальная задержка записи первой мутации пакета.
+            max_pending: Предел очереди; save() блокируется при его достижении.
+            retry_delay_ms: Пауза перед повтором неудачного пакета.
+            logger: Экземпляр логгера.
+            metrics: Реестр метрик (по умолчанию глобальный).
+        """
+        self.repository = repository
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay_ms / 1000
+        self.logger = logger
+        self.metrics = metrics or get_metrics_registry()
+
+        self._pending: Dict[str, _Pending] = {}  # порядок вставки = порядок first_seq
+        self._seq = 0
+        self._committed_seq = 0
+        self._oldest_at: Optional[float] = None
+        self._flush_requested = False
+        self._failures = 0
+        self._last_error: Optional[RepositoryError] = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._queue_depth = self.metrics.gauge("oms_write_behind_queue_depth")
+        self._thread = threading.Thread(target=self._run, name="oms-write-behind", daemon=True)
+        self._thread.start()
+
+    # --- Репозиторный интерфейс ---
+
+    def load(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Сбрасывает очередь и загружает ордера из репозитория."""
+        self.flush()
+        return self.repository.load(trace_id=trace_id)
+
+    def save(self, order: Dict[str, Any], trace_id: Optional[str] = None, durable: bool = False) -> int:
+        """
+        Ставит снимок ордера в очередь записи.
+
+        Args:
+            order: Ордер (копируется, дальнейшие изменения словаря не влияют на запись).
+            durable: Дождаться коммита перед возвратом.
+
+        Returns:
+            Номер мутации.
+        """
+        return self._enqueue(order["order_id"], dict(order), False, durable)
+
+    def save_many(self, orders: List[Dict[str, Any]], trace_id: Optional[str] = None, durable: bool = False) -> int:
+        """Ставит снимки нескольких ордеров в очередь за один захват блокировки."""
+        return self._enqueue_many([(order["order_id"], dict(order), False) for order in orders], durable)
+
+    def delete(self, order_id: str, trace_id: Optional[str] = None, durable: bool = False) -> int:
+        """Ставит удаление ордера в очередь записи."""
+        return self._enqueue(order_id, None, True, durable)
+
+    # --- Управление ---
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Барьер долговечности: ждет коммита всех мутаций, поставленных до вызова.
+
+        Raises:
+            RepositoryError: Запись не удалась или не завершилась за timeout.
+        """
+        with self._cond:
+            self._wait_committed(self._seq, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Записывает оставшиеся мутации и останавливает фоновый поток."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def __enter__(self) -> "WriteBehindPersister":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # --- Внутреннее ---
+
+    def _enqueue(self, order_id: str, order: Optional[Dict[str, Any]], deleted: bool, durable: bool) -> int:
+        return self._enqueue_many([(order_id, order, deleted)], durable)
+
+    def _enqueue_many(self, items: List[Tuple[str, Optional[Dict[str, Any]], bool]], durable: bool) -> int:
+        with self._cond:
+            if self._closed:
+                raise RepositoryError(
+                    message="Write-behind persister is closed",
+                    repository_type="sqlite",
+                    db_operation="write_behind"
+                )
+            for order_id, order, deleted in items:
+                while len(self._pending) >= self.max_pending and order_id not in self._pending:
+                    self._cond.wait()
+                self._seq += 1
+                pending = self._pending.get(order_id)
+                if pending is None:
+                    self._pending[order_id] = _Pending(self._seq, order, deleted)
+                    if self._oldest_at is None:
+                        # Будим писателя, чтобы он отсчитал max_delay_ms от этой мутации
+                        self._oldest_at = time.monotonic()
+                        self._cond.notify_all()
+                else:
+                    # Схлопываем: место в очереди и first_seq сохраняются, данные - последние
+                    pending.order, pending.deleted = order, deleted
+                    self.metrics.counter("oms_write_behind_coalesced_total").inc()
+            self._queue_depth.set(len(self._pending))
+            seq = self._seq
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            if durable:
+                self._wait_committed(seq, None)
+            return seq
+
+    def _wait_committed(self, seq: int, timeout: Optional[float]):
+        """Ждет committed_seq >= seq (вызывается под self._cond)."""
+        if self._committed_seq >= seq:
+            return
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        failures = self._failures
+        self._flush_requested = True
+        self._cond.notify_all()
+        while self._committed_seq < seq:
+            if self._failures != failures:
+                raise self._last_error
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise RepositoryError(
+                    message=f"Timed out waiting for order mutations to be committed ({len(self._pending)} pending)",
+                    repository_type="sqlite",
+                    db_operation="flush"
+                )
+            if self._closed and not self._thread.is_alive():
+                raise RepositoryError(
+                    message="Write-behind persister stopped with uncommitted mutations",
+                    repository_type="sqlite",
+                    db_operation="flush"
+                )
+            self._flush_requested = True
+            self._cond.wait(remaining if remaining is not None else 0.5)
+        self.metrics.observe_ms("oms_write_behind_flush_wait_ms", start)
+
+    def _take_batch(self) -> Tuple[List[Tuple[str, _Pending]], int]:
+        """Забирает до max_batch мутаций из головы очереди (под self._cond)."""
+        batch = []
+        for order_id in list(self._pending)[:self.max_batch]:
+            batch.append((order_id, self._pending.pop(order_id)))
+        # Все мутации с номером ниже first_seq оставшейся головы очереди будут записаны этим пакетом
+        head = next(iter(self._pending.values()), None)
+        watermark = head.first_seq - 1 if head else self._seq
+        self._oldest_at = time.monotonic() if head else None
+        self._queue_depth.set(len(self._pending))
+        return batch, watermark
+
+    def _requeue(self, batch: List[Tuple[str, _Pending]]):
+        """Возвращает неудачный пакет в голову очереди, не затирая более новые мутации (под self._cond)."""
+        restored = {}
+        for order_id, pending in batch:
+            newer = self._pending.pop(order_id, None)
+            if newer is not None:
+                newer.first_seq = pending.first_seq
+                pending = newer
+            restored[order_id] = pending
+        restored.update(self._pending)
+        self._pending = restored
+        self._oldest_at = time.monotonic()
+        self._queue_depth.set(len(self._pending))
+
+    def _should_write(self) -> bool:
+        if not self._pending:
+            return False
+        if self._closed or self._flush_requested or len(self._pending) >= self.max_batch:
+            return True
+        return time.monotonic() - self._oldest_at >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._should_write():
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.max_delay - (time.monotonic() - self._oldest_at))
+                    self._cond.wait(timeout)
+                batch, watermark = self._take_batch()
+                if not self._pending:
+                    self._flush_requested = False
+                self._cond.notify_all()  # освободилось место в очереди
+
+            error = self._write(batch)
+
+            with self._cond:
+                if error is None:
+                    self._committed_seq = max(self._committed_seq, watermark)
+                else:
+                    self._requeue(batch)
+                    self._failures += 1
+                    self._last_error = error
+                self._cond.notify_all()
+                if error is not None:
+                    if self._closed:
+                        return  # при остановке не повторяем бесконечно
+                    self._cond.wait(self.retry_delay)
+
+    def _write(self, batch: List[Tuple[str, _Pending]]) -> Optional[RepositoryError]:
+        orders = [pending.order for _, pending in batch if not pending.deleted]
+        deleted_ids = [order_id for order_id, pending in batch if pending.deleted]
+        try:
+            self.repository.write_batch(orders, deleted_ids)
+        except RepositoryError as e:
+            self.metrics.counter("oms_write_behind_batches_total", status="error").inc()
+            if self.logger:
+                self.logger.log_operation_error("write_behind_flush", error=str(e),
+                                                context={"batch_size": len(batch)})
+            return e
+        self.metrics.counter("oms_write_behind_batches_total", status="ok").inc()
+        self.metrics.histogram("oms_write_behind_batch_size", buckets=BATCH_SIZE_BUCKETS).observe(len(batch))
+        return None
@@ -0,0 +1,147 @@
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting import Backtester, IncrementalIndicators, iter_klines, iter_klines_csv, write_klines_csv
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system.metrics import MetricsRegistry
+from src.market_data.market_data_service import MarketDataService, basic_trading_decision
+from src.trading.paper_exchange import MARKET_EXIT, STOP_LOSS
+
+START = "2026-01-01T00:00:00+00:00"
+
+
+def _bars(rows, start: str = START) -> pd.DataFrame:
+    """rows: (open, high, low, close) per hourly bar."""
+    frame = pd.DataFrame(rows, columns=["open", "high", "low", "close"], dtype=float)
+    frame.insert(0, "timestamp", pd.date_range(start, periods=len(rows), freq="1h"))
+    frame["volume"] = 1.0
+    return frame
+
+
+def _random_walk(count: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    opens = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.004, count))
+    return _bars(np.column_stack([opens, np.maximum(opens, close) * (1 + spread),
+                                  np.minimum(opens, close) * (1 - spread), close]))
+
+
+def _scripted(bars: pd.DataFrame, actions: dict):
+    """Decision returning actions[bar index] ('hold' otherwise)."""
+    index = {int(ts.value): i for i, ts in enumerate(bars["timestamp"])}
+    return lambda snapshot: actions.get(index[snapshot.timestamp], "hold")
+
+
+def _backtester(decision, **kwargs) -> Backtester:
+    options = dict(initial_equity=10000.0, position_fraction=0.1, leverage=10, fee_rate=0.001,
+                   slippage_tolerance=0.001, warmup_bars=0, metrics=MetricsRegistry())
+    options.update(kwargs)
+    return Backtester("BTCUSDT", decision, **options)
+
+
+def test_indicators_match_market_data_service():
+    """Test incremental RSI, MACD signal, MA20/50 and trend against the service on growing windows."""
+    service = MarketDataService(api_client=MagicMock(spec=BinanceApiClient), logger=None, metrics=MetricsRegistry())
+    bars = _random_walk(120)
+    indicators = IncrementalIndicators()
+    snapshots = [indicators.update(int(ts.value), close) for ts, close in zip(bars["timestamp"], bars["close"])]
+
+    for length in (5, 14, 15, 20, 26, 40, 50, 120):
+        window, snapshot = bars.iloc[:length], snapshots[length - 1]
+        assert snapshot.rsi_14 == pytest.approx(float(service._calculate_rsi("X", window)), abs=0.01)
+        assert snapshot.macd_signal == service._calculate_macd_signal("X", window)
+        ma_20, ma_50 = service._calculate_ma("X", window, 20), service._calculate_ma("X", window, 50)
+        assert snapshot.ma_20 == pytest.approx(float(ma_20), abs=0.01)
+        assert snapshot.ma_50 == pytest.approx(float(ma_50), abs=0.01)
+        assert snapshot.ma_trend == service._determine_ma_trend(Decimal(str(snapshot.ma_20)), Decimal(str(snapshot.ma_50)))
+
+
+def test_round_trip_equity_and_trade_log():
+    """Test buy at close -> limit fill next bar -> sell -> market exit at next open, with fees."""
+    bars = _bars([(100, 101, 99, 100), (100, 102, 99, 101), (101, 103, 100, 102), (104, 105, 103, 104)])
+
+    result = _backtester(_scripted(bars, {0: "buy", 2: "sell"})).run(bars)
+
+    trade = result.trades.iloc[0]
+    assert len(result.trades) == 1
+    assert (trade.entry_time, trade.exit_time) == ("2026-01-01T01:00:00+00:00", "2026-01-01T03:00:00+00:00")
+    assert (trade.entry_price, trade.exit_reason, trade.quantity) == (100.0, MARKET_EXIT, pytest.approx(100.0))
+    assert trade.exit_price == pytest.approx(104 * 0.999)
+    assert trade.fees == pytest.approx(10 + 103.896 * 100 * 0.001)
+    assert trade.pnl == pytest.approx(389.6 - trade.fees)
+    assert trade.return_pct == pytest.approx(trade.pnl / 1000 * 100)
+    assert result.equity_curve.tolist() == pytest.approx([10000, 9990 + 100, 9990 + 200, 10000 + trade.pnl])
+    assert result.summary()["final_equity"] == pytest.approx(10000 + trade.pnl)
+
+
+def test_stop_loss_and_cancelled_entry():
+    """Test that a stop loss closes the trade and 'sell' before the fill cancels the entry."""
+    bars = _bars([(100, 100, 99, 99), (99.5, 100, 99.5, 100), (100, 100, 97, 97),
+                  (97, 97, 95, 96), (96, 96, 92, 93), (93, 94, 92, 93)])
+
+    result = _backtester(_scripted(bars, {0: "buy", 1: "sell", 2: "buy"}), stop_loss_pct=0.03).run(bars)
+
+    assert len(result.trades) == 1
+    trade = result.trades.iloc[0]
+    assert (trade.entry_price, trade.exit_reason) == (97.0, STOP_LOSS)
+    assert trade.exit_price == pytest.approx(97 * 0.97 * 0.999)
+    assert result.summary()["max_drawdown_pct"] > 0
+    assert result.summary()["win_rate_pct"] == 0.0
+
+
+def test_chunked_stream_and_no_lookahead():
+    """Test that chunked input gives the same run and that future bars never change past equity."""
+    bars = _random_walk(600)
+    backtester = _backtester(basic_trading_decision, warmup_bars=50, stop_loss_pct=0.02, take_profit_pct=0.03)
+
+    full = backtester.run(bars)
+    chunked = backtester.run(bars.iloc[i:i + 77] for i in range(0, len(bars), 77))
+    truncated = backtester.run(bars.iloc[:400])
+
+    assert len(full.trades) > 0
+    pd.testing.assert_series_equal(full.equity_curve, chunked.equity_curve)
+    pd.testing.assert_frame_equal(full.trades.drop(columns="order_id"), chunked.trades.drop(columns="order_id"))
+    pd.testing.assert_series_equal(full.equity_curve.iloc[:400], truncated.equity_curve)
+
+
+def test_kline_sources(tmp_path):
+    """Test raw kline rows and CSV storage stream into the same bar chunks."""
+    bars = _random_walk(25)
+    klines = [[int(ts.value // 1_000_000), str(o), str(h), str(l), str(c), "1.0", 0, "0", 1, "0", "0", "0"]
+              for ts, o, h, l, c in bars[["timestamp", "open", "high", "low", "close"]].itertuples(index=False)]
+    path = str(tmp_path / "BTCUSDT-1h.csv")
+    write_klines_csv(klines, path)
+
+    from_rows = pd.concat(iter_klines(klines, chunk_size=10), ignore_index=True)
+    from_csv = list(iter_klines_csv(path, chunk_size=10))
+
+    assert [len(chunk) for chunk in from_csv] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(from_csv, ignore_index=True), from_rows, check_dtype=False)
+    pd.testing.assert_series_equal(from_rows["close"], bars["close"])
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestBacktestPerformance:
+    """One year of 1h bars for one symbol replays in a few seconds."""
+
+    def test_one_year_hourly(self):
+        bars = _random_walk(365 * 24, seed=11)
+        backtester = Backtester("BTCUSDT", stop_loss_pct=0.02, take_profit_pct=0.04, metrics=MetricsRegistry())
+
+        start = time.perf_counter()
+        result = backtester.run(bars)
+        elapsed = time.perf_counter() - start
+
+        summary = result.summary()
+        print(f"\nBacktest: {summary['bars']} bars, {summary['trades']} trades, "
+              f"return {summary['total_return_pct']:.1f}% in {elapsed * 1000:.0f}ms")
+        assert summary["bars"] == len(bars)
+        assert summary["trades"] > 0
+        assert elapsed < 5
@@ -6,8 +6,12 @@ Tests for individual exception classes and their functionality:
 - ErrorContext creation and functionality
 - Backward compatibility with ValueError
 - Exception-specific context fields
+- Lazy stack/system info formatting (construction cost is the
+  logging.error_construction benchmark)
 """
 
+import traceback
+
 import pytest
 from unittest.mock import Mock
 from decimal import Decimal
@@ -156,12 +160,63 @@ class TestErrorContext:
         
         required_keys = ['trace_id', 'operation', 'timestamp', 'system_info', 'stack_depth']
         for key in required_keys:
-            assert key in context_dict
-        
+            assert key in context_dict        
         assert context_dict['trace_id'] == "test_123"
         assert context_dict['operation'] == "test_op"
         assert isinstance(context_dict['stack_depth'], int)
         assert context_dict['stack_depth'] > 0
+    
+    def test_stack_and_system_info_are_lazy(self):
+        """Construction must not format the stack or collect system info."""
+        context = ErrorContext(operation="lazy_op")
+        
+        assert context._stack_trace is None
+        assert context._system_info is None
+        
+        context_dict = context.to_dict()
+        assert context_dict["stack_depth"] == len(context.stack_trace)
+        assert context._stack_trace is not None
+        assert context.system_info is context_dict["system_info"]
+    
+    def test_stack_trace_points_to_construction_site(self):
+        """Formatted lazily, the stack still reflects where the context was created."""
+        def create_context():
+            return ErrorContext(operation="site_op")
+        
+        context = create_context()
+        expected_line = create_context.__code__.co_firstlineno + 1
+        
+        assert "exceptions.py" in context.stack_trace[-1]
+        assert "in __init__" in context.stack_trace[-1]
+        assert "create_context" in context.stack_trace[-2]
+        assert f"line {expected_line}" in context.stack_trace[-2]
+        assert "test_stack_trace_points_to_construction_site" in context.stack_trace[-3]
+    
+    def test_stack_depth_matches_format_stack(self):
+        """Depth matches the former eager format_stack()[:-1]: the caller's stack plus __init__ frames."""
+        class SubContext(ErrorContext):
+            def __init__(self):
+                super().__init__(operation="sub_op")
+        
+        context = ErrorContext(operation="depth_op")
+        site_depth = len(traceback.format_stack())
+        subclassed = SubContext()
+        
+        assert context.stack_depth == site_depth + 1
+        assert subclassed.stack_depth == site_depth + 2
+        assert "in __init__" in subclassed.stack_trace[-1]
+        assert "in __init__" in subclassed.stack_trace[-2]
+        assert "test_stack_depth_matches_format_stack" in subclassed.stack_trace[-3]
+    
+    def test_str_renders_stack(self):
+        """__str__ renders trace id, operation and the formatted stack."""
+        context = ErrorContext(trace_id="str_trace", operation="str_op")
+        rendered = str(context)
+        
+        assert "str_trace" in rendered
+        assert "str_op" in rendered
+        assert "test_str_renders_stack" in rendered
+
 
 
 class TestApiClientError:
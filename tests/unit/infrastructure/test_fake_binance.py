@@ -0,0 +1,125 @@
+"""
+Local Binance stand-in tests.
+
+Validates benchmarks.fake_binance against the real BinanceApiClient:
+- Deterministic klines with weight headers
+- 429/418 escalation with Retry-After, and error injection
+- Gap injection and latency models
+- MarketDataService end-to-end over HTTP
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from benchmarks.fake_binance import FakeBinanceServer, LatencyModel, WeightLimiter, klines_weight
+from src.infrastructure.binance_client import BinanceApiClient
+from src.infrastructure.exceptions import APIResponseError, RateLimitError
+from src.logging_system.metrics import MetricsRegistry
+from src.market_data.market_data_service import MarketDataService
+
+END_TIME_MS = 1_704_067_200_000
+
+
+@pytest.fixture
+def server():
+    with FakeBinanceServer(end_time_ms=END_TIME_MS) as fake:
+        yield fake
+
+
+def _client(base_url: str) -> BinanceApiClient:
+    return BinanceApiClient(logger=MagicMock(), base_url=base_url, metrics=MetricsRegistry())
+
+
+class TestFakeBinanceServer:
+    """Endpoints, weights and error behaviour."""
+
+    def test_klines_deterministic_with_weight_header(self, server):
+        url = f"{server.base_url}/klines"
+        params = {"symbol": "ETHUSDT", "interval": "1h", "limit": 100}
+
+        first = requests.get(url, params=params, timeout=5)
+        second = requests.get(url, params=params, timeout=5)
+
+        assert first.status_code == 200
+        assert first.json() == second.json()
+        assert len(first.json()) == 100
+        assert first.json()[-1][6] == END_TIME_MS - 1
+        assert first.headers["X-MBX-USED-WEIGHT-1M"] == "2"
+        assert second.headers["X-MBX-USED-WEIGHT-1M"] == "4"
+
+    def test_invalid_parameters(self, server):
+        client = _client(server.base_url)
+
+        with pytest.raises(APIResponseError) as exc_info:
+            client.get_klines("ETHUSDT", "7m", 10)
+
+        assert exc_info.value.status_code == 400
+        assert server.stats() == {"/klines 400": 1}
+
+    def test_weight_limit_escalates_to_ban(self):
+        with FakeBinanceServer(weight_limit=2, ban_seconds=30) as fake:
+            client = _client(fake.base_url)
+            client.get_klines("BTCUSDT", "1h", 10)
+            client.get_klines("BTCUSDT", "1h", 10)
+
+            with pytest.raises(RateLimitError) as limited:
+                client.get_klines("BTCUSDT", "1h", 10)
+            with pytest.raises(RateLimitError) as banned:
+                client.get_klines("BTCUSDT", "1h", 10)
+
+        assert limited.value.status_code == 429
+        assert int(limited.value.retry_after) >= 1
+        assert banned.value.status_code == 418
+        assert banned.value.limit_type == "ip_ban"
+        assert banned.value.retry_after == "30"
+
+    def test_error_injection(self):
+        with FakeBinanceServer(error_429_rate=1.0, injected_retry_after=3) as fake:
+            response = requests.get(f"{fake.base_url}/ping", timeout=5)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
+
+    def test_gap_injection(self):
+        with FakeBinanceServer(gap_rate=0.1, end_time_ms=END_TIME_MS) as fake:
+            rows = _client(fake.base_url).get_klines("SOLUSDT", "1h", 1000)
+
+        open_times = [row[0] for row in rows]
+        assert 850 < len(rows) < 950
+        assert any(b - a > 3600_000 for a, b in zip(open_times, open_times[1:]))
+
+    def test_market_data_service_end_to_end(self, server):
+        service = MarketDataService(api_client=_client(server.base_url), logger=None, metrics=MetricsRegistry())
+
+        market_data = service.get_market_data("ETHUSDT", trace_id="trd_fake")
+
+        assert market_data.symbol == "ETHUSDT"
+        assert len(market_data.daily_candles) == 180
+        assert server.stats()["/klines 200"] >= 3
+
+
+class TestServerModels:
+    """Latency distributions and weight accounting."""
+
+    def test_latency_specs(self):
+        assert LatencyModel("15").sample_ms() == 15
+        uniform = LatencyModel("uniform:5:10", seed=1)
+        assert all(5 <= uniform.sample_ms() <= 10 for _ in range(100))
+        assert all(LatencyModel("normal:1:5", seed=2).sample_ms() >= 0 for _ in range(100))
+        assert LatencyModel("lognormal:20:0.5", seed=3).sample_ms() > 0
+        with pytest.raises(ValueError):
+            LatencyModel("pareto:1:2")
+
+    def test_klines_weight(self):
+        assert [klines_weight(n) for n in (1, 100, 500, 1000)] == [1, 2, 5, 5]
+
+    def test_limiter_resets_each_minute(self):
+        now = [60.0]
+        limiter = WeightLimiter(limit=5, clock=lambda: now[0])
+
+        assert limiter.acquire(5) == (None, 5, 0)
+        assert limiter.acquire(1) == (429, 6, 60)
+        now[0] = 120.0
+        assert limiter.acquire(1) == (None, 1, 0)
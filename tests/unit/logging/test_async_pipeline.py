@@ -0,0 +1,220 @@
+"""
+Asynchronous log pipeline tests.
+
+Validates the opt-in background logging mode:
+- Overflow policies (block, drop_debug, drop) and drop counters
+- Pending records are flushed on stop/shutdown
+- Flow context is captured in the calling thread
+- configure_ai_logging(async_mode=True) end-to-end
+- Caller-side latency of sync vs async emission
+"""
+
+import io
+import json
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from src.logging_system import (
+    configure_ai_logging, get_ai_logger, reset_logging_state,
+    shutdown_logging, get_async_logging_stats
+)
+from src.logging_system.async_pipeline import AsyncLogPipeline, BoundedQueueHandler
+from src.logging_system.flow_context import flow_operation
+from src.logging_system.json_formatter import AIOptimizedJSONFormatter
+
+
+def _record(level: int = logging.INFO, msg: str = "message") -> logging.LogRecord:
+    return logging.LogRecord("async_test", level, __file__, 1, msg, None, None)
+
+
+class _BlockingHandler(logging.Handler):
+    """Handler that waits on an event, used to keep the listener busy."""
+
+    def __init__(self, release: threading.Event):
+        super().__init__()
+        self.release_event = release
+        self.records = []
+
+    def emit(self, record):
+        self.release_event.wait(timeout=5)
+        self.records.append(record)
+
+
+class _SlowStream(io.StringIO):
+    """Stream with a per-write delay, simulating disk/console I/O jitter."""
+
+    def __init__(self, delay: float = 0.0002):
+        super().__init__()
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, s):
+        time.sleep(self.delay)
+        self.writes += 1
+        return super().write(s)
+
+
+class TestBoundedQueueHandler:
+    """Overflow policy behaviour without a running listener."""
+
+    def test_invalid_policy_rejected(self):
+        with pytest.raises(ValueError):
+            BoundedQueueHandler(queue.Queue(maxsize=10), overflow_policy="spill")
+
+    def test_drop_policy_counts_overflow(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow_policy="drop")
+
+        for _ in range(5):
+            handler.handle(_record(logging.ERROR))
+
+        assert handler.queue.qsize() == 2
+        assert handler.get_dropped_counts() == {"ERROR": 3}
+
+    def test_drop_debug_keeps_headroom_for_info(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=10), overflow_policy="drop_debug",
+                                      debug_high_water=0.5)
+
+        for _ in range(10):
+            handler.handle(_record(logging.DEBUG))
+        for _ in range(5):
+            handler.handle(_record(logging.INFO))
+
+        assert handler.queue.qsize() == 10
+        assert handler.get_dropped_counts() == {"DEBUG": 5}
+
+    def test_block_policy_times_out_and_counts(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), overflow_policy="block", block_timeout=0.01)
+
+        handler.handle(_record())
+        handler.handle(_record())
+
+        assert handler.get_dropped_counts() == {"INFO": 1}
+
+    def test_prepare_merges_args_and_captures_flow(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=10))
+        record = logging.LogRecord("async_test", logging.INFO, __file__, 1, "value=%s", ("42",), None)
+
+        with flow_operation("async_flow_test"):
+            handler.handle(record)
+
+        queued = handler.queue.get_nowait()
+        assert queued.getMessage() == "value=42"
+        assert queued.args is None
+        assert queued.flow
+        assert record.args == ("42",)
+
+
+class TestAsyncLogPipeline:
+    """Listener thread, flushing and statistics."""
+
+    def test_stop_flushes_pending_records(self):
+        stream = io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(AIOptimizedJSONFormatter())
+        pipeline = AsyncLogPipeline([output], queue_size=1000)
+        pipeline.start()
+
+        for i in range(200):
+            pipeline.queue_handler.handle(_record(msg=f"record {i}"))
+        pipeline.stop()
+
+        lines = stream.getvalue().strip().split("\n")
+        assert len(lines) == 200
+        assert json.loads(lines[-1])["message"] == "record 199"
+
+    def test_stats_report_depth_and_drops(self):
+        release = threading.Event()
+        blocking = _BlockingHandler(release)
+        pipeline = AsyncLogPipeline([blocking], queue_size=4, overflow_policy="drop")
+        pipeline.start()
+        try:
+            for _ in range(20):
+                pipeline.queue_handler.handle(_record(logging.WARNING))
+            stats = pipeline.get_stats()
+        finally:
+            release.set()
+            pipeline.stop()
+
+        assert stats["queue_capacity"] == 4
+        assert stats["overflow_policy"] == "drop"
+        assert stats["dropped_total"] > 0
+        assert stats["dropped_total"] + len(blocking.records) == 20
+
+    def test_invalid_queue_size(self):
+        with pytest.raises(ValueError):
+            AsyncLogPipeline([logging.NullHandler()], queue_size=0)
+
+
+class TestAsyncLoggingConfiguration:
+    """configure_ai_logging with async_mode."""
+
+    def setup_method(self):
+        reset_logging_state()
+
+    def teardown_method(self):
+        reset_logging_state()
+
+    def test_async_mode_writes_file_after_shutdown(self, tmp_path):
+        log_file = tmp_path / "async.log"
+        configure_ai_logging(log_level="INFO", log_file=str(log_file), console_output=False,
+                             async_mode=True, queue_size=100)
+        logger = get_ai_logger("async_config_test", service_name="async_config_test")
+
+        with flow_operation("async_config_flow"):
+            logger.info("async record", operation="async_write")
+        assert get_async_logging_stats()["queue_capacity"] == 100
+        shutdown_logging()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        written = [e for e in entries if e.get("operation") == "async_write"]
+        assert len(written) == 1
+        assert written[0]["message"] == "async record"
+        assert get_async_logging_stats() is None
+
+    def test_sync_mode_has_no_async_stats(self, tmp_path):
+        configure_ai_logging(log_level="INFO", log_file=str(tmp_path / "sync.log"), console_output=False)
+        assert get_async_logging_stats() is None
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestAsyncLoggingPerformance:
+    """Caller-side latency of log emission, sync vs async."""
+
+    def _emit_latency_ms(self, handler: logging.Handler, iterations: int) -> float:
+        logger = logging.getLogger("async_perf_test")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        try:
+            start = time.perf_counter()
+            for i in range(iterations):
+                logger.info("order placed", extra={"context": {"order_id": i, "price": 50000.0}})
+            return (time.perf_counter() - start) * 1000 / iterations
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+
+    def test_async_emit_is_cheaper_for_caller(self):
+        iterations = 500
+
+        sync_stream = _SlowStream()
+        sync_handler = logging.StreamHandler(sync_stream)
+        sync_handler.setFormatter(AIOptimizedJSONFormatter())
+        sync_ms = self._emit_latency_ms(sync_handler, iterations)
+
+        async_stream = _SlowStream()
+        async_handler = logging.StreamHandler(async_stream)
+        async_handler.setFormatter(AIOptimizedJSONFormatter())
+        pipeline = AsyncLogPipeline([async_handler], queue_size=iterations * 2, overflow_policy="block")
+        pipeline.start()
+        async_ms = self._emit_latency_ms(pipeline.queue_handler, iterations)
+        pipeline.stop()
+
+        print(f"\nPer-record caller latency with slow I/O (ms): sync={sync_ms:.4f}, async={async_ms:.4f}")
+        assert async_stream.writes == sync_stream.writes
+        assert async_ms * 2 < sync_ms
@@ -0,0 +1,191 @@
+"""
+Compressed log rotation tests.
+
+Validates the compressed rotation mode:
+- Size- and time-based rotation into timestamped archives
+- Background gzip compression and retention by archive count
+- Streaming reader over archives + active file
+- Troubleshooting tools read compressed archives
+- Writer latency at rotation vs. inline compression, and disk footprint
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from src.logging_system import configure_ai_logging, get_ai_logger, reset_logging_state
+from src.logging_system.compressed_rotation import (
+    CompressedRotatingFileHandler, iter_log_lines, list_archives
+)
+from src.logging_system.troubleshooting import analyze_log_errors
+
+
+def _logger_with(handler: logging.Handler, name: str) -> logging.Logger:
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _json_line(i: int) -> str:
+    return json.dumps({"level": "INFO", "operation": "run_cycle", "step": i,
+                       "context": {"symbol": "BTCUSDT", "price": 50000.0 + i, "note": "x" * 80}})
+
+
+class TestCompressedRotatingFileHandler:
+    """Rotation, compression and retention."""
+
+    def test_size_rotation_compresses_archives(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        handler = CompressedRotatingFileHandler(log_file, max_bytes=2000, backup_count=50)
+        logger = _logger_with(handler, "rotation_size_test")
+
+        for i in range(100):
+            logger.info(_json_line(i))
+        handler.wait_for_compression()
+
+        archives = list_archives(log_file)
+        assert len(archives) > 3
+        assert all(path.endswith(".gz") for path in archives)
+        with gzip.open(archives[0], "rt") as f:
+            assert json.loads(f.readline())["step"] == 0
+        handler.close()
+
+    def test_stream_reader_returns_all_lines_in_order(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        handler = CompressedRotatingFileHandler(log_file, max_bytes=2000, backup_count=0)
+        logger = _logger_with(handler, "rotation_reader_test")
+
+        for i in range(100):
+            logger.info(_json_line(i))
+        handler.close()
+
+        steps = [json.loads(line)["step"] for line in iter_log_lines(log_file)]
+        assert steps == list(range(100))
+
+    def test_retention_keeps_backup_count_archives(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        handler = CompressedRotatingFileHandler(log_file, max_bytes=1000, backup_count=3)
+        logger = _logger_with(handler, "rotation_retention_test")
+
+        for i in range(100):
+            logger.info(_json_line(i))
+        handler.close()
+
+        assert len(list_archives(log_file)) == 3
+
+    def test_time_based_rotation(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        handler = CompressedRotatingFileHandler(log_file, rotate_interval_seconds=60, backup_count=5)
+        logger = _logger_with(handler, "rotation_time_test")
+
+        logger.info(_json_line(0))
+        handler._next_rollover_at = time.time() - 1  # interval elapsed
+        logger.info(_json_line(1))
+        handler.close()
+
+        archives = list_archives(log_file)
+        assert len(archives) == 1
+        assert [json.loads(line)["step"] for line in iter_log_lines(log_file)] == [0, 1]
+
+    def test_leftover_plain_archive_compressed_on_start(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        leftover = log_file + ".20260101-120000-000"
+        with open(leftover, "w") as f:
+            f.write(_json_line(0) + "\n")
+
+        handler = CompressedRotatingFileHandler(log_file, max_bytes=1000)
+        handler.wait_for_compression()
+        handler.close()
+
+        assert list_archives(log_file) == [leftover + ".gz"]
+
+    def test_invalid_compression(self, tmp_path):
+        with pytest.raises(ValueError):
+            CompressedRotatingFileHandler(str(tmp_path / "trading.log"), compression="bz2")
+
+
+class TestCompressedRotationIntegration:
+    """Logging configuration and troubleshooting tools."""
+
+    def setup_method(self):
+        reset_logging_state()
+
+    def teardown_method(self):
+        reset_logging_state()
+
+    def test_configure_ai_logging_with_compression(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        configure_ai_logging(log_level="INFO", log_file=log_file, console_output=False,
+                             max_bytes=3000, backup_count=10, compression="gzip")
+        logger = get_ai_logger("compressed_config_test", service_name="compressed_config_test")
+
+        for i in range(60):
+            logger.info(f"cycle {i}", operation="run_cycle", context={"step": i})
+        reset_logging_state()
+
+        messages = [json.loads(line)["message"] for line in iter_log_lines(log_file)]
+        assert messages == [f"cycle {i}" for i in range(60)]
+        assert list_archives(log_file) and all(p.endswith(".gz") for p in list_archives(log_file))
+
+    def test_troubleshooting_reads_compressed_archives(self, tmp_path):
+        log_file = str(tmp_path / "trading.log")
+        handler = CompressedRotatingFileHandler(log_file, max_bytes=500, backup_count=0)
+        logger = _logger_with(handler, "rotation_troubleshooting_test")
+
+        logger.info("CRITICAL: Logging system failed - [Errno 28] No space left on device")
+        for i in range(20):
+            logger.info(_json_line(i))
+        handler.close()
+
+        errors = analyze_log_errors(str(tmp_path))
+        assert any(".gz" in error and "No space left on device" in error for error in errors)
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestCompressedRotationPerformance:
+    """Writer-side rollover latency and disk footprint."""
+
+    def _max_emit_ms(self, logger: logging.Logger, lines) -> float:
+        worst = 0.0
+        for line in lines:
+            start = time.perf_counter()
+            logger.info(line)
+            worst = max(worst, time.perf_counter() - start)
+        return worst * 1000
+
+    def test_rollover_does_not_block_writer(self, tmp_path):
+        lines = [_json_line(i) for i in range(20000)]
+        max_bytes = 1024 * 1024
+
+        inline_file = str(tmp_path / "inline" / "trading.log")
+        os.makedirs(os.path.dirname(inline_file))
+        inline = logging.handlers.RotatingFileHandler(inline_file, maxBytes=max_bytes, backupCount=10)
+
+        def inline_gzip_rotator(source, dest):
+            with open(source, "rb") as src, gzip.open(dest + ".gz", "wb") as dst:
+                dst.write(src.read())
+            os.remove(source)
+        inline.rotator = inline_gzip_rotator
+        inline_ms = self._max_emit_ms(_logger_with(inline, "rotation_perf_inline"), lines)
+        inline.close()
+
+        background_file = str(tmp_path / "background" / "trading.log")
+        os.makedirs(os.path.dirname(background_file))
+        background = CompressedRotatingFileHandler(background_file, max_bytes=max_bytes, backup_count=10)
+        background_ms = self._max_emit_ms(_logger_with(background, "rotation_perf_background"), lines)
+        background.close()
+
+        raw_bytes = sum(len(line) + 1 for line in lines)
+        disk_bytes = sum(os.path.getsize(p) for p in list_archives(background_file)) + os.path.getsize(background_file)
+        print(f"\nWorst emit latency (ms): inline gzip rotation={inline_ms:.2f}, "
+              f"background compression={background_ms:.2f}; disk {disk_bytes} of {raw_bytes} raw bytes")
+        assert background_ms < inline_ms
+        assert disk_bytes * 4 < raw_bytes
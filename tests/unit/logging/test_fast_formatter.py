@@ -0,0 +1,125 @@
+"""
+FastJSONFormatter tests.
+
+Validates the high-throughput formatter mode:
+- Same JSON schema and key order as AIOptimizedJSONFormatter
+- Timestamp derived from record.created, cached per second
+- Optional orjson backend and stdlib fallback
+- Throughput vs the standard formatter is the logging.formatter benchmark
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.logging_system import json_formatter
+from src.logging_system.json_formatter import (
+    AIOptimizedJSONFormatter, FastJSONFormatter, create_formatter
+)
+from src.logging_system.flow_context import flow_operation
+
+BACKENDS = [False] + ([True] if json_formatter.orjson is not None else [])
+
+
+def _record(msg: str = "Order placed", level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("fast_formatter_test", level, __file__, 1, msg, None, None)
+    defaults = {
+        "service_name": "OMS",
+        "operation": "place_order",
+        "context": {"symbol": "BTCUSDT", "price": 50000.5, "quantity": 0.01},
+        "tags": ["order", "execution"],
+        "flow": {},
+        "trace_id": "trd_001_20260101120000_abcdef12",
+    }
+    defaults.update(extra)
+    for key, value in defaults.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestFastJSONFormatter:
+    """Output compatibility with the standard formatter."""
+
+    @pytest.mark.parametrize("use_orjson", BACKENDS)
+    def test_same_schema_and_key_order(self, use_orjson):
+        record = _record(context={"symbol": "BTCUSDT", "parent_trace_id": "parent_1", "qty": 1})
+
+        standard = json.loads(AIOptimizedJSONFormatter().format(record))
+        fast = json.loads(FastJSONFormatter(use_orjson=use_orjson).format(record))
+
+        standard.pop("timestamp")
+        fast_timestamp = fast.pop("timestamp")
+        assert fast == standard
+        assert list(fast) == list(standard)
+        assert fast["parent_trace_id"] == "parent_1"
+        assert "parent_trace_id" not in fast["context"]
+        assert record.context["parent_trace_id"] == "parent_1"
+        assert datetime.fromisoformat(fast_timestamp).tzinfo is not None
+
+    def test_timestamp_uses_record_created(self):
+        formatter = FastJSONFormatter()
+        record = _record()
+        record.created = 1767268800.123456
+
+        entry = json.loads(formatter.format(record))
+
+        expected = datetime.fromtimestamp(record.created, timezone.utc)
+        assert abs(datetime.fromisoformat(entry["timestamp"]) - expected).total_seconds() < 1e-5
+
+    def test_timestamp_matches_isoformat(self):
+        formatter = FastJSONFormatter()
+        for created in (1767268800.0, 1767268800.5, 1767268801.000001, 1767268859.999999):
+            expected = datetime.fromtimestamp(created, timezone.utc).isoformat()
+            assert formatter.format_timestamp(created) == expected
+
+    def test_flow_and_generated_trace_id(self):
+        formatter = FastJSONFormatter()
+        record = _record(trace_id=None)
+
+        with flow_operation("fast_formatter_flow"):
+            entry = json.loads(formatter.format(record))
+
+        assert entry["trace_id"] == record.trace_id
+        assert entry["flow"]["stage"] == "initiation"
+        assert entry["flow"]["trace_id"]
+
+    def test_exception_and_unicode(self):
+        formatter = FastJSONFormatter()
+        try:
+            raise ValueError("ошибка")
+        except ValueError:
+            record = _record(msg="Ордер отклонён", level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+
+        output = formatter.format(record)
+        entry = json.loads(output)
+
+        assert "Ордер отклонён" in output
+        assert entry["exception"]["type"] == "ValueError"
+        assert entry["exception"]["message"] == "ошибка"
+
+    @pytest.mark.parametrize("use_orjson", BACKENDS)
+    def test_numpy_values_serialized(self, use_orjson):
+        record = _record(context={"rsi": np.float64(55.5)})
+
+        entry = json.loads(FastJSONFormatter(use_orjson=use_orjson).format(record))
+
+        assert entry["context"]["rsi"] == 55.5
+
+    def test_unserializable_context_uses_fallback(self):
+        record = _record(context={"obj": object()})
+
+        output = FastJSONFormatter().format(record)
+
+        assert "FALLBACK_LOG" in output
+
+    def test_create_formatter(self):
+        assert type(create_formatter("standard")) is AIOptimizedJSONFormatter
+        assert isinstance(create_formatter("fast"), FastJSONFormatter)
+        with pytest.raises(ValueError):
+            create_formatter("xml")
+
@@ -0,0 +1,163 @@
+"""
+Flow context propagation tests.
+
+Validates the contextvars-based flow context:
+- Isolated flows per asyncio task (no leaks between symbols)
+- Propagation into executor submissions
+- Child task stage changes do not alter the parent flow
+- Cached, read-only flow summary rebuilt only on stage change
+- Summary cost vs. rebuilding the dict per log call
+"""
+
+import asyncio
+import json
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.logging_system import (
+    FlowContextExecutor, advance_to_stage, flow_operation, get_flow_summary,
+    set_flow_context, submit_with_flow_context
+)
+from src.logging_system.flow_context import FlowSummary, _FlowState, _flow_context
+
+
+class TestAsyncioIsolation:
+    """Flows started in concurrent tasks stay separate."""
+
+    def test_tasks_keep_their_own_flow(self):
+        async def process(symbol: str):
+            with flow_operation(symbol, "get_market_data") as trace_id:
+                await asyncio.sleep(0)
+                advance_to_stage(f"collect_{symbol}")
+                await asyncio.sleep(0.01)
+                summary = get_flow_summary()
+                return symbol, trace_id, summary["trace_id"], summary["stage"]
+
+        async def run():
+            return await asyncio.gather(*(process(s) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")))
+
+        results = asyncio.run(run())
+
+        for symbol, trace_id, summary_trace_id, stage in results:
+            assert summary_trace_id == trace_id
+            assert stage == f"collect_{symbol}"
+        assert len({trace_id for _, trace_id, _, _ in results}) == 3
+        assert get_flow_summary() == {}
+
+    def test_child_task_does_not_change_parent_flow(self):
+        async def child():
+            advance_to_stage("child_stage")
+            return get_flow_summary()["stage"]
+
+        async def parent():
+            with flow_operation("BTCUSDT", "run_cycle"):
+                child_stage = await asyncio.create_task(child())
+                return child_stage, get_flow_summary()["stage"]
+
+        assert asyncio.run(parent()) == ("child_stage", "initiation")
+
+
+class TestExecutorPropagation:
+    """Executor submissions see the submitting flow."""
+
+    def _worker(self, symbol: str):
+        set_flow_context("symbol_seen", symbol)
+        return get_flow_summary().get("trace_id")
+
+    def test_submit_with_flow_context(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with flow_operation("BTCUSDT", "get_market_data") as trace_id:
+                propagated = submit_with_flow_context(executor, self._worker, "BTCUSDT").result()
+                plain = executor.submit(self._worker, "BTCUSDT").result()
+
+        assert propagated == trace_id
+        assert plain is None
+
+    def test_flow_context_executor_no_leak_between_symbols(self):
+        def job(symbol: str):
+            with flow_operation(symbol, "get_market_data") as trace_id:
+                time.sleep(0.01)
+                return trace_id, get_flow_summary()["trace_id"]
+
+        with FlowContextExecutor(max_workers=4) as executor:
+            results = list(executor.map(job, ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"] * 3))
+
+        assert all(started == seen for started, seen in results)
+        assert len({started for started, _ in results}) == 12
+
+    def test_flow_context_executor_propagates_parent(self):
+        with FlowContextExecutor(max_workers=1) as executor:
+            with flow_operation("BTCUSDT", "run_cycle") as trace_id:
+                advance_to_stage("analysis")
+                seen = executor.submit(get_flow_summary).result()
+                assert seen["trace_id"] == trace_id
+                assert seen["stage"] == "analysis"
+            assert executor.submit(get_flow_summary).result() == {}
+
+
+class TestCachedSummary:
+    """Summary caching and immutability."""
+
+    def test_summary_reused_until_stage_change(self):
+        with flow_operation("BTCUSDT", "get_market_data"):
+            first = get_flow_summary()
+            assert get_flow_summary() is first
+
+            advance_to_stage("data_collection")
+            second = get_flow_summary()
+
+            assert second is not first
+            assert first["stage"] == "initiation"
+            assert second["stage"] == "data_collection"
+            assert second["stages_completed"] == ["initiation"]
+
+    def test_summary_is_read_only(self):
+        with flow_operation("BTCUSDT", "get_market_data"):
+            summary = get_flow_summary()
+            with pytest.raises(TypeError):
+                summary["stage"] = "tampered"
+            with pytest.raises(TypeError):
+                summary.update(stage="tampered")
+            assert get_flow_summary()["stage"] == "initiation"
+
+    def test_summary_serializes_like_dict(self):
+        with flow_operation("BTCUSDT", "get_market_data"):
+            summary = get_flow_summary()
+            assert isinstance(summary, FlowSummary)
+            assert json.loads(json.dumps(summary)) == dict(summary)
+            assert pickle.loads(pickle.dumps(summary)) == summary
+
+    def test_empty_summary_without_flow(self):
+        _flow_context.clear_flow()
+        summary = get_flow_summary()
+        assert summary == {}
+        summary["x"] = 1  # fresh dict, caller may mutate
+        assert get_flow_summary() == {}
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestFlowSummaryPerformance:
+    """Cached summary vs. building the dict on every log call."""
+
+    def test_cached_summary_cheaper_than_rebuild(self):
+        iterations = 50000
+        with flow_operation("BTCUSDT", "get_market_data"):
+            advance_to_stage("data_collection")
+            flow = _flow_context.current_flow
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                _FlowState(flow).summary()
+            rebuild = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                get_flow_summary()
+            cached = time.perf_counter() - start
+
+        print(f"\nget_flow_summary x{iterations}: rebuild={rebuild * 1000:.1f}ms cached={cached * 1000:.1f}ms")
+        assert cached < rebuild
@@ -0,0 +1,134 @@
+"""
+Level-gated lazy logging tests.
+
+Validates that disabled log levels cost close to nothing:
+- MarketDataLogger methods return before building context when the level is off
+- Lazy context builders are evaluated only for enabled levels
+- MarketDataService._should_log follows the configured logger level
+- Indicator-path context builders are skipped at WARNING and fewer run at INFO than DEBUG
+  (the throughput comparison is the market_data.indicator_logging benchmark)
+"""
+
+import io
+import logging
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.logging_system import MarketDataLogger
+from src.logging_system.json_formatter import AIOptimizedJSONFormatter
+from src.logging_system.logger_config import _resolve
+from src.market_data.market_data_service import MarketDataService
+from src.infrastructure.binance_client import BinanceApiClient
+
+
+@pytest.fixture
+def market_logger():
+    """Real MarketDataLogger writing JSON records into an in-memory buffer."""
+    logger = MarketDataLogger("lazy_logging_test", service_name="lazy_logging_test")
+    stdlib_logger = logger.logger.logger
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(AIOptimizedJSONFormatter())
+    stdlib_logger.addHandler(handler)
+    stdlib_logger.propagate = False
+    previous_level = stdlib_logger.level
+    yield logger
+    stdlib_logger.removeHandler(handler)
+    stdlib_logger.propagate = True
+    stdlib_logger.setLevel(previous_level)
+
+
+def _set_level(market_logger: MarketDataLogger, level: int):
+    market_logger.logger.logger.setLevel(level)
+
+
+class TestLevelGatedLogging:
+    """Unit tests for level guards and lazy context builders."""
+
+    def test_disabled_debug_skips_context_builder(self, market_logger):
+        _set_level(market_logger, logging.INFO)
+        builder = MagicMock(return_value={"value": 1})
+
+        with patch("src.logging_system.logger_config.get_flow_summary") as mock_flow:
+            market_logger.log_raw_data("rsi_calculation", data_sample=builder, data_stats=builder)
+            mock_flow.assert_not_called()
+
+        builder.assert_not_called()
+
+    def test_enabled_debug_evaluates_context_builder(self, market_logger):
+        _set_level(market_logger, logging.DEBUG)
+        builder = MagicMock(return_value={"value": 1})
+
+        with patch.object(market_logger.logger, "debug") as mock_debug:
+            market_logger.log_raw_data("rsi_calculation", data_sample=builder)
+
+        builder.assert_called_once()
+        assert mock_debug.call_args.kwargs["context"]["data_sample"] == {"value": 1}
+
+    def test_disabled_info_skips_operation_logs(self, market_logger):
+        _set_level(market_logger, logging.WARNING)
+        builder = MagicMock(return_value={})
+
+        with patch.object(market_logger.logger, "info") as mock_info:
+            market_logger.log_operation_start("op", context=builder)
+            market_logger.log_operation_complete("op", context=builder)
+
+        mock_info.assert_not_called()
+        builder.assert_not_called()
+
+    def test_plain_dict_context_still_supported(self, market_logger):
+        _set_level(market_logger, logging.INFO)
+
+        with patch.object(market_logger.logger, "info") as mock_info:
+            market_logger.log_operation_complete("op", processing_time_ms=5, context={"a": 1})
+
+        assert mock_info.call_args.kwargs["context"] == {"a": 1, "processing_time_ms": 5}
+
+    def test_service_should_log_follows_logger_level(self, market_logger):
+        service = MarketDataService(api_client=MagicMock(spec=BinanceApiClient), logger=market_logger)
+        _set_level(market_logger, logging.INFO)
+
+        assert service._should_log("INFO")
+        assert service._should_log("ERROR")
+        assert not service._should_log("DEBUG")
+
+    def test_service_should_log_without_logger(self):
+        service = MarketDataService(api_client=MagicMock(spec=BinanceApiClient), logger=None)
+        assert not service._should_log("CRITICAL")
+
+
+class TestIndicatorPathLogging:
+    """Indicator-path context builders at different levels (timing lives in benchmarks/)."""
+
+    def _builder_calls(self, service, df):
+        calls = []
+
+        def counting_resolve(value):
+            if callable(value):
+                calls.append(value)
+            return _resolve(value)
+
+        with patch("src.logging_system.logger_config._resolve", side_effect=counting_resolve):
+            service._calculate_rsi("BTCUSDT", df, 14, trace_id="test")
+            service._calculate_macd_signal("BTCUSDT", df, trace_id="test")
+            service._calculate_ma("BTCUSDT", df, 20, trace_id="test")
+            service._calculate_ma("BTCUSDT", df, 50, trace_id="test")
+            service._analyze_volume_profile("BTCUSDT", df, trace_id="test")
+        return len(calls)
+
+    def test_indicator_context_builders_only_run_for_enabled_levels(self, market_logger):
+        # 10 candles: every indicator takes its fallback branch, which logs raw data at DEBUG
+        df = pd.DataFrame({
+            "close": [50000.0 + (i % 7) * 10 for i in range(10)],
+            "volume": [100.0 + i for i in range(10)],
+        })
+        service = MarketDataService(api_client=MagicMock(spec=BinanceApiClient), logger=market_logger)
+
+        calls = {}
+        for name, level in (("WARNING", logging.WARNING), ("INFO", logging.INFO), ("DEBUG", logging.DEBUG)):
+            _set_level(market_logger, level)
+            calls[name] = self._builder_calls(service, df)
+
+        assert calls["WARNING"] == 0
+        assert 0 < calls["INFO"] < calls["DEBUG"]
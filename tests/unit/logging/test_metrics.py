@@ -0,0 +1,214 @@
+"""
+Metrics registry tests.
+
+Validates the in-process metrics subsystem:
+- Counters, gauges and fixed-bucket histograms with p50/p99 estimates
+- JSON snapshot file and Prometheus text exposition (file and HTTP endpoint)
+- Instrumentation of BinanceApiClient, indicator steps, BTC cache, OmsRepository and TradingCycle
+- Cost of recording an observation
+"""
+
+import json
+import random
+import time
+import urllib.request
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system.metrics import Histogram, MetricsExporter, MetricsRegistry
+from src.market_data.market_data_service import MarketDataService
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.trading_cycle import TradingCycle
+
+
+def _histogram(registry: MetricsRegistry, name: str, **labels) -> dict:
+    for entry in registry.snapshot()["histograms"]:
+        if entry["name"] == name and entry["labels"] == labels:
+            return entry
+    raise AssertionError(f"histogram {name} {labels} not recorded")
+
+
+class TestMetricsRegistry:
+    """Metric types, snapshots and exposition."""
+
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", endpoint="klines").inc()
+        registry.counter("requests_total", endpoint="klines").inc(2)
+        registry.gauge("open_orders").set(3)
+        registry.gauge("open_orders").dec()
+
+        snapshot = registry.snapshot()
+
+        assert snapshot["counters"] == [{"name": "requests_total", "labels": {"endpoint": "klines"}, "value": 3}]
+        assert snapshot["gauges"][0]["value"] == 2
+
+    def test_histogram_percentiles_close_to_exact(self):
+        histogram = Histogram()
+        rng = random.Random(7)
+        values = [rng.lognormvariate(1.5, 0.8) for _ in range(5000)]
+        for value in values:
+            histogram.observe(value)
+
+        ordered = sorted(values)
+        exact_p50, exact_p99 = ordered[2499], ordered[4949]
+
+        assert histogram.count == 5000
+        assert abs(histogram.percentile(50) - exact_p50) / exact_p50 < 0.3
+        assert abs(histogram.percentile(99) - exact_p99) / exact_p99 < 0.3
+        assert histogram.percentile(100) == max(values)
+
+    def test_empty_histogram(self):
+        assert Histogram().percentile(50) is None
+        with pytest.raises(ValueError):
+            Histogram(buckets=[5, 1])
+
+    def test_name_reused_with_other_type(self):
+        registry = MetricsRegistry()
+        registry.counter("stage_total")
+        with pytest.raises(ValueError):
+            registry.histogram("stage_total")
+
+    def test_time_records_on_exception(self):
+        registry = MetricsRegistry()
+        with pytest.raises(RuntimeError):
+            with registry.time("stage_duration_ms", stage="failing"):
+                raise RuntimeError("boom")
+
+        assert _histogram(registry, "stage_duration_ms", stage="failing")["count"] == 1
+
+    def test_render_text_exposition(self):
+        registry = MetricsRegistry()
+        registry.counter("api_requests_total", endpoint="klines", status="ok").inc()
+        registry.histogram("api_request_duration_ms", buckets=[1, 10], endpoint="klines").observe(5)
+
+        text = registry.render_text()
+
+        assert "# TYPE api_requests_total counter" in text
+        assert 'api_requests_total{endpoint="klines",status="ok"} 1' in text
+        assert 'api_request_duration_ms_bucket{endpoint="klines",le="1.0"} 0' in text
+        assert 'api_request_duration_ms_bucket{endpoint="klines",le="10.0"} 1' in text
+        assert 'api_request_duration_ms_bucket{endpoint="klines",le="+Inf"} 1' in text
+        assert 'api_request_duration_ms_count{endpoint="klines"} 1' in text
+
+    def test_render_text_escapes_label_values(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", error='bad "symbol" C:\\path\nnext').inc()
+
+        text = registry.render_text()
+
+        assert 'errors_total{error="bad \\"symbol\\" C:\\\\path\\nnext"} 1' in text
+
+    def test_exporter_writes_snapshot_and_serves_text(self, tmp_path):
+        registry = MetricsRegistry()
+        registry.counter("trading_cycles_total").inc()
+        snapshot_file = str(tmp_path / "metrics" / "metrics.json")
+        exporter = MetricsExporter(registry, snapshot_file=snapshot_file, interval_seconds=60, http_port=0).start()
+        try:
+            host, port = exporter.server_address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                text = response.read().decode()
+        finally:
+            exporter.stop()
+
+        assert "trading_cycles_total 1" in text
+        with open(snapshot_file) as f:
+            assert json.load(f)["counters"][0]["name"] == "trading_cycles_total"
+
+
+class TestInstrumentation:
+    """Components feed the registry."""
+
+    def test_binance_client_records_requests(self):
+        registry = MetricsRegistry()
+        client = BinanceApiClient(logger=MagicMock(), metrics=registry)
+        response = MagicMock(status_code=200)
+        response.json.return_value = [[0] * 12]
+        client.session = MagicMock()
+        client.session.get.return_value = response
+
+        client.get_klines("BTCUSDT", "1h", 1, trace_id="trd_test")
+
+        assert _histogram(registry, "api_request_duration_ms", endpoint="klines")["count"] == 1
+        assert registry.counter("api_requests_total", endpoint="klines", status="ok").value == 1
+
+    def test_indicator_steps_report_real_processing_time(self):
+        registry = MetricsRegistry()
+        logger = MagicMock()
+        service = MarketDataService(api_client=MagicMock(spec=BinanceApiClient), logger=logger, metrics=registry)
+        df = pd.DataFrame({"close": [100.0 + (i % 5) for i in range(60)]})
+
+        service._calculate_rsi("BTCUSDT", df, 14, trace_id="trd_test")
+        service._calculate_macd_signal("BTCUSDT", df, trace_id="trd_test")
+        service._calculate_ma("BTCUSDT", df, 20, trace_id="trd_test")
+
+        for stage in ("rsi_calculation", "macd_calculation", "ma_calculation"):
+            assert _histogram(registry, "market_data_stage_duration_ms", stage=stage)["count"] == 1
+        reported = [c.kwargs["processing_time_ms"] for c in logger.log_operation_complete.call_args_list]
+        assert len(reported) == 3 and all(ms > 0 for ms in reported)
+
+    def test_btc_cache_hits_and_misses_counted(self):
+        registry = MetricsRegistry()
+        api_client = MagicMock(spec=BinanceApiClient)
+        api_client.get_klines.return_value = [
+            [1700000000000 + i * 3600000, "1", "2", "0.5", str(100 + i), "10", 0, "0", 0, "0", "0", "0"]
+            for i in range(30)
+        ]
+        service = MarketDataService(api_client=api_client, logger=None, metrics=registry)
+        df = pd.DataFrame({"close": [50.0 + i * 1.5 for i in range(30)]})
+
+        service._calculate_btc_correlation("ETHUSDT", df, trace_id="trd_test")
+        service._calculate_btc_correlation("ETHUSDT", df, trace_id="trd_test")
+
+        assert registry.counter("cache_events_total", cache="btc_data", event="miss").value == 1
+        assert registry.counter("cache_events_total", cache="btc_data", event="hit").value == 1
+
+    def test_oms_repository_operations_recorded(self):
+        registry = MetricsRegistry()
+        repository = OmsRepository(":memory:", metrics=registry)
+        repository.save({"order_id": "o1", "symbol": "BTCUSDT", "status": "PENDING", "order_type": "BUY",
+                         "margin": 10.0, "leverage": 1, "entry_price": 100.0,
+                         "created_at": "2026-01-01", "updated_at": "2026-01-01"})
+        repository.load()
+        repository.close()
+
+        assert registry.counter("oms_repository_operations_total", operation="save", status="ok").value == 1
+        assert _histogram(registry, "oms_repository_duration_ms", operation="load")["count"] == 1
+
+    def test_trading_cycle_stage_latency(self):
+        registry = MetricsRegistry()
+        oms = MagicMock(spec=OrderManagementSystem)
+        oms.get_order_by_symbol.return_value = None
+        market_data_service = MagicMock(spec=MarketDataService)
+        market_data_service.get_market_data.return_value.h1_candles = pd.DataFrame({"close": [52000.0]})
+        cycle = TradingCycle(oms=oms, market_data_service=market_data_service, metrics=registry)
+        cycle.logger = MagicMock()
+
+        cycle.run_cycle("BTCUSDT")
+
+        for stage in ("run_cycle", "get_market_data", "get_ai_decision", "place_order"):
+            assert _histogram(registry, "trading_cycle_stage_duration_ms", stage=stage)["count"] == 1
+        assert registry.counter("trading_cycles_total").value == 1
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestMetricsPerformance:
+    """Cost of recording latencies on the hot path."""
+
+    def test_observe_cost(self):
+        registry = MetricsRegistry()
+        iterations = 50000
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            registry.histogram("stage_duration_ms", stage="rsi_calculation").observe(i % 50)
+        per_observe_us = (time.perf_counter() - start) * 1e6 / iterations
+
+        print(f"\nHistogram lookup + observe: {per_observe_us:.2f}us")
+        assert per_observe_us < 20
+        assert _histogram(registry, "stage_duration_ms", stage="rsi_calculation")["count"] == iterations
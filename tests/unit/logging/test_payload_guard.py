@@ -0,0 +1,210 @@
+"""
+Payload guard tests.
+
+Validates bounded-size log payloads:
+- String truncation, array summarization (length, head/tail, min/max), dict trimming
+- Input contexts are never mutated
+- Probabilistic sampling of log_raw_data
+- Bytes-saved accounting
+- Record size independent of candle count
+"""
+
+import io
+import json
+import logging
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from src.logging_system import MarketDataLogger, get_payload_stats, reset_logging_state
+from src.logging_system.json_formatter import AIOptimizedJSONFormatter, StructuredLogger
+from src.logging_system.payload_guard import PayloadGuard
+
+
+def _candles(count: int) -> list:
+    return [{"t": 1700000000 + i * 3600, "o": 50000.0 + i, "h": 50100.0 + i,
+             "l": 49900.0 + i, "c": 50050.0 + i, "v": 100.0 + i} for i in range(count)]
+
+
+class TestPayloadGuard:
+    """Unit tests for caps and summaries."""
+
+    def test_small_context_returned_unchanged(self):
+        guard = PayloadGuard()
+        context = {"symbol": "BTCUSDT", "prices": [1.0, 2.0], "nested": {"a": "b"}}
+
+        assert guard.apply(context) is context
+        assert guard.get_stats()["bytes_saved"] == 0
+
+    def test_long_string_truncated(self):
+        guard = PayloadGuard(max_string_chars=10)
+
+        result = guard.apply({"response": "x" * 100})
+
+        assert result["response"].startswith("x" * 10)
+        assert "truncated 90 chars" in result["response"]
+        assert guard.get_stats()["strings_truncated"] == 1
+
+    def test_numeric_array_summarized(self):
+        guard = PayloadGuard(max_list_items=10, edge_items=2)
+        values = [float(v) for v in range(100)]
+
+        result = guard.apply({"closes": values})["closes"]
+
+        assert result == {"_summarized": "list", "length": 100, "head": [0.0, 1.0],
+                          "tail": [98.0, 99.0], "min": 0.0, "max": 99.0}
+
+    def test_numpy_array_summarized(self):
+        guard = PayloadGuard(max_list_items=10, edge_items=1)
+
+        result = guard.apply({"closes": np.arange(50, dtype=np.int64)})["closes"]
+
+        assert result["_summarized"] == "ndarray"
+        assert result["length"] == 50
+        assert (result["min"], result["max"]) == (0, 49)
+        json.dumps(result)
+
+    def test_candle_list_keeps_edges_without_range(self):
+        guard = PayloadGuard(max_list_items=20, edge_items=3)
+        candles = _candles(100)
+        context = {"json_context": {"raw_candles": {"h1": candles}}}
+
+        result = guard.apply(context)
+        summary = result["json_context"]["raw_candles"]["h1"]
+
+        assert summary["length"] == 100
+        assert summary["head"] == candles[:3]
+        assert summary["tail"] == candles[-3:]
+        assert "min" not in summary
+        assert len(context["json_context"]["raw_candles"]["h1"]) == 100
+
+    def test_dict_keys_trimmed(self):
+        guard = PayloadGuard(max_dict_keys=5)
+
+        result = guard.apply({f"k{i}": i for i in range(8)})
+
+        assert list(result)[:5] == ["k0", "k1", "k2", "k3", "k4"]
+        assert result["_omitted_keys"] == 3
+        assert guard.get_stats()["dicts_trimmed"] == 1
+
+    def test_deep_and_circular_nesting_is_bounded(self):
+        guard = PayloadGuard(max_depth=2)
+        context = {"level1": {"level2": {"level3": 1}}}
+        context["self"] = context
+
+        result = guard.apply(context)
+
+        assert result["level1"]["level2"] == "<dict len=1>"
+        assert result["self"]["self"] == "<dict len=2>"
+
+    def test_disabled_guard_passes_through(self):
+        guard = PayloadGuard(enabled=False, max_list_items=2, edge_items=1)
+        context = {"values": [1, 2, 3, 4]}
+
+        assert guard.apply(context) is context
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            PayloadGuard(raw_data_sample_rate=1.5)
+        with pytest.raises(ValueError):
+            PayloadGuard(max_list_items=4, edge_items=3)
+        with pytest.raises(ValueError):
+            PayloadGuard().configure(max_bytes=1)
+
+    def test_bytes_saved_estimate(self):
+        guard = PayloadGuard()
+        context = {"candles": _candles(500)}
+
+        guarded = guard.apply(context)
+
+        actual_saved = len(json.dumps(context)) - len(json.dumps(guarded))
+        estimated = guard.get_stats()["bytes_saved"]
+        assert 0.7 * actual_saved < estimated < 1.3 * actual_saved
+
+
+class TestLoggerIntegration:
+    """Guard wiring in StructuredLogger and MarketDataLogger."""
+
+    def setup_method(self):
+        reset_logging_state()
+
+    def teardown_method(self):
+        reset_logging_state()
+
+    def test_structured_logger_applies_guard(self, caplog):
+        logger = StructuredLogger("payload_guard_test", "payload_guard_test",
+                                  payload_guard=PayloadGuard(max_list_items=4, edge_items=1))
+
+        with caplog.at_level(logging.INFO, logger="payload_guard_test"):
+            logger.info("guarded", context={"values": list(range(10))})
+
+        assert caplog.records[-1].context["values"]["length"] == 10
+
+    def test_disabled_level_skips_guard(self):
+        guard = MagicMock(spec=PayloadGuard)
+        logger = StructuredLogger("payload_guard_disabled", "payload_guard_disabled", payload_guard=guard)
+        logger.logger.setLevel(logging.CRITICAL)
+
+        logger.debug("skipped", context={"values": list(range(10))})
+        logger.info("skipped", context={"values": list(range(10))})
+        logger.error("skipped", context={"values": list(range(10))}, exc_info=True)
+
+        guard.apply.assert_not_called()
+        logger.logger.setLevel(logging.NOTSET)
+
+    def test_market_data_logger_uses_shared_guard(self, caplog):
+        logger = MarketDataLogger("payload_guard_shared", service_name="payload_guard_shared")
+
+        with caplog.at_level(logging.INFO, logger="payload_guard_shared"):
+            logger.log_operation_start("get_ai_decision", context={"json_context": {"candles": _candles(100)}})
+
+        assert caplog.records[-1].context["json_context"]["candles"]["length"] == 100
+        assert get_payload_stats()["sequences_summarized"] == 1
+
+    def test_raw_data_sampling(self):
+        guard = PayloadGuard(raw_data_sample_rate=0.25, seed=42)
+        logger = MarketDataLogger("payload_guard_sampling", service_name="payload_guard_sampling")
+        logger.logger.payload_guard = guard
+        logger.logger.logger.setLevel(logging.DEBUG)
+        built = []
+
+        for i in range(400):
+            logger.log_raw_data("rsi_calculation", data_sample=lambda i=i: built.append(i) or {"i": i})
+
+        assert 50 < len(built) < 150
+        assert guard.get_stats()["raw_data_sampled_out"] == 400 - len(built)
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestPayloadGuardPerformance:
+    """Record size vs. candle count with and without the guard."""
+
+    def _record_bytes(self, guard, candle_count: int) -> int:
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(AIOptimizedJSONFormatter())
+        logger = StructuredLogger("payload_guard_perf", "TradingCycle", payload_guard=guard)
+        logger.logger.addHandler(handler)
+        logger.logger.propagate = False
+        logger.logger.setLevel(logging.INFO)
+        try:
+            context = {"json_context": {"raw_candles": {"h1": _candles(candle_count),
+                                                         "h4": _candles(candle_count // 4)}}}
+            logger.info("get_ai_decision initiated", operation="get_ai_decision", context=context)
+        finally:
+            logger.logger.removeHandler(handler)
+            logger.logger.propagate = True
+        return len(stream.getvalue().encode("utf-8"))
+
+    def test_record_size_bounded_by_candle_count(self):
+        sizes = {}
+        for count in (100, 1000):
+            sizes[("unguarded", count)] = self._record_bytes(None, count)
+            sizes[("guarded", count)] = self._record_bytes(PayloadGuard(), count)
+
+        print("\nRecord bytes: " + ", ".join(f"{mode}/{count}={size}" for (mode, count), size in sizes.items()))
+        assert sizes[("unguarded", 1000)] > 8 * sizes[("unguarded", 100)]
+        assert abs(sizes[("guarded", 1000)] - sizes[("guarded", 100)]) < 200
+        assert sizes[("guarded", 100)] * 5 < sizes[("unguarded", 100)]
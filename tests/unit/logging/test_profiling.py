@@ -0,0 +1,187 @@
+"""
+Stage profiling tests.
+
+Validates opt-in stage profiling:
+- Nested operations/stages aggregate into one per-operation breakdown
+- Allocation tracing with tracemalloc
+- Breakdown logged with the operation trace_id and kept for reports
+- get_market_data / run_cycle stages are instrumented
+- Near-zero cost while disabled
+"""
+
+import logging
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system.profiling import (
+    configure_profiling, get_recent_profiles, profile_operation, profile_stage, profiled, reset_profiling
+)
+from src.market_data.market_data_service import MarketDataService
+from src.trading.oms import OrderManagementSystem
+from src.trading.trading_cycle import TradingCycle
+
+
+def _stages(profile) -> dict:
+    return {stage["stage"]: stage for stage in profile.to_dict()["stages"]}
+
+
+@pytest.fixture(autouse=True)
+def clean_profiler():
+    reset_profiling()
+    yield
+    reset_profiling()
+
+
+class TestStageProfiler:
+    """Profiles, nesting and reports."""
+
+    def test_disabled_records_nothing(self):
+        with profile_operation("run_cycle", trace_id="trd_test"):
+            with profile_stage("network"):
+                pass
+
+        assert get_recent_profiles() == []
+
+    def test_nested_stages_aggregate_by_path(self):
+        configure_profiling(enabled=True)
+
+        with profile_operation("run_cycle", trace_id="trd_test") as profile:
+            with profile_operation("get_market_data"):
+                for _ in range(3):
+                    with profile_stage("network"):
+                        time.sleep(0.002)
+            with profile_stage("get_ai_decision"):
+                pass
+
+        stages = _stages(profile)
+        assert get_recent_profiles() == [profile]
+        assert profile.trace_id == "trd_test"
+        assert stages["get_market_data/network"]["calls"] == 3
+        assert stages["get_market_data/network"]["total_ms"] >= 6
+        assert stages["get_market_data"]["total_ms"] >= stages["get_market_data/network"]["total_ms"]
+        assert "get_ai_decision" in stages
+        assert profile.total_ms >= stages["get_market_data"]["total_ms"]
+
+    def test_stage_outside_profile_is_ignored(self):
+        configure_profiling(enabled=True)
+
+        with profile_stage("network"):
+            pass
+
+        assert get_recent_profiles() == []
+
+    def test_stage_recorded_on_exception(self):
+        configure_profiling(enabled=True)
+
+        with pytest.raises(ValueError):
+            with profile_operation("run_cycle"):
+                with profile_stage("validation"):
+                    raise ValueError("bad symbol")
+
+        assert "validation" in _stages(get_recent_profiles()[-1])
+
+    def test_allocation_tracing(self):
+        configure_profiling(enabled=True, trace_allocations=True)
+
+        with profile_operation("run_cycle") as profile:
+            with profile_stage("dataframe"):
+                data = [bytearray(1024) for _ in range(200)]
+
+        assert _stages(profile)["dataframe"]["alloc_bytes"] > 200 * 1024
+        assert profile.peak_bytes >= 200 * 1024
+        assert "alloc KiB" in profile.format_report()
+        del data
+
+    def test_decorator_uses_trace_id_keyword(self):
+        configure_profiling(enabled=True)
+
+        @profiled("get_market_data")
+        def fetch(symbol, trace_id=None):
+            with profile_stage("network"):
+                return symbol
+
+        assert fetch("BTCUSDT", trace_id="trd_decorated") == "BTCUSDT"
+        profile = get_recent_profiles()[-1]
+        assert profile.trace_id == "trd_decorated"
+        assert "network" in _stages(profile)
+
+    def test_profile_logged_with_trace_id(self, caplog):
+        configure_profiling(enabled=True)
+
+        with caplog.at_level(logging.INFO, logger="profiling"):
+            with profile_operation("run_cycle", trace_id="trd_logged"):
+                with profile_stage("network"):
+                    pass
+
+        record = caplog.records[-1]
+        assert record.trace_id == "trd_logged"
+        assert record.operation == "stage_profile"
+        assert record.context["stages"][0]["stage"] == "network"
+
+
+class TestCycleBreakdown:
+    """Instrumented MarketDataService and TradingCycle stages."""
+
+    def test_run_cycle_breakdown(self):
+        configure_profiling(enabled=True)
+        api_client = MagicMock(spec=BinanceApiClient)
+        api_client.get_klines.return_value = [
+            [1640995200000 + i * 3600000, "50000", "51000", "49000", str(50000 + i % 10), "100",
+             1640995259999, "1", 50, "50000", "0.1", ""] for i in range(180)
+        ]
+        service = MarketDataService(api_client=api_client, logger=None)
+        oms = MagicMock(spec=OrderManagementSystem)
+        oms.get_order_by_symbol.return_value = None
+        cycle = TradingCycle(oms=oms, market_data_service=service)
+        cycle.logger = MagicMock()
+
+        cycle.run_cycle("BTCUSDT")
+
+        profile = get_recent_profiles()[-1]
+        stages = _stages(profile)
+        assert profile.operation == "run_cycle"
+        for path in ("get_market_data", "get_market_data/validation", "get_market_data/network",
+                     "get_market_data/dataframe", "get_market_data/indicators",
+                     "get_market_data/market_context", "get_market_data/dataset_validation",
+                     "get_market_data/logging", "get_ai_decision", "get_ai_decision/serialization",
+                     "get_ai_decision/logging", "place_order"):
+            assert path in stages, path
+        report = profile.format_report()
+        assert "indicators" in report and "(unaccounted)" in report
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestProfilingPerformance:
+    """Overhead of instrumented stages while profiling is disabled."""
+
+    def test_disabled_overhead(self):
+        iterations = 100000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            pass
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with profile_stage("indicators"):
+                pass
+        disabled = time.perf_counter() - start
+
+        configure_profiling(enabled=True)
+        with profile_operation("run_cycle"):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                with profile_stage("indicators"):
+                    pass
+            enabled = time.perf_counter() - start
+
+        per_stage_ns = (disabled - baseline) * 1e9 / iterations
+        print(f"\nProfile stage cost: disabled={per_stage_ns:.0f}ns, "
+              f"enabled={(enabled - baseline) * 1e9 / iterations:.0f}ns")
+        assert per_stage_ns < 1000
+        assert disabled < enabled
@@ -1,8 +1,9 @@
 import unittest
 import re
+import threading
 from datetime import datetime, timezone
 
-from src.logging_system.trace_generator import get_trace_id, reset_trace_counter
+from src.logging_system.trace_generator import TraceGenerator, get_trace_id, reset_trace_counter
 
 class TestTraceGenerator(unittest.TestCase):
 
@@ -47,5 +48,32 @@ class TestTraceGenerator(unittest.TestCase):
         except Exception as e:
             self.fail(f"get_trace_id raised an exception with parent_trace_id: {e}")
 
+    def test_timestamp_prefix_is_current_utc_second(self):
+        """The cached prefix must follow the wall clock."""
+        before = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        trace_id = get_trace_id()
+        after = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        self.assertTrue(before <= trace_id[8:22] <= after)
+
+    def test_unique_across_threads(self):
+        """IDs generated concurrently by many threads are unique."""
+        generator = TraceGenerator()
+        results = [[] for _ in range(8)]
+
+        def worker(bucket):
+            for _ in range(5000):
+                bucket.append(generator.generate_trace_id())
+
+        threads = [threading.Thread(target=worker, args=(bucket,)) for bucket in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_ids = [trace_id for bucket in results for trace_id in bucket]
+        self.assertEqual(len(all_ids), len(set(all_ids)))
+        sequences = sorted(int(trace_id[22:]) for trace_id in all_ids)
+        self.assertEqual(sequences, list(range(1, 40001)))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
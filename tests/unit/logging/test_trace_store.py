@@ -0,0 +1,184 @@
+"""
+Indexed trace store tests.
+
+Validates the trace_id-indexed log sink:
+- Records are returned per trace (including child operations via parent_trace_id)
+- Segment rolling and retention by segment deletion
+- Reopening an existing store
+- TraceStoreHandler / configure_ai_logging integration and the query CLI
+- Lookup latency independent of log volume
+"""
+
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from src.logging_system import (
+    configure_ai_logging, get_ai_logger, reset_logging_state, shutdown_logging
+)
+from src.logging_system.json_formatter import AIOptimizedJSONFormatter
+from src.logging_system.trace_store import TraceStore, TraceStoreHandler, main as trace_store_cli
+
+
+def _line(trace_id: str, message: str, **extra) -> str:
+    return json.dumps({"trace_id": trace_id, "message": message, **extra})
+
+
+class TestTraceStore:
+    """Append, query, rolling and retention."""
+
+    def test_get_trace_returns_only_matching_records(self, tmp_path):
+        store = TraceStore(str(tmp_path))
+        store.append(_line("trace_a", "first"), "trace_a")
+        store.append(_line("trace_b", "other"), "trace_b")
+        store.append(_line("trace_a", "second"), "trace_a")
+
+        records = store.get_trace("trace_a")
+        store.close()
+
+        assert [r["message"] for r in records] == ["first", "second"]
+
+    def test_child_records_belong_to_parent_trace(self, tmp_path):
+        store = TraceStore(str(tmp_path))
+        store.append(_line("master", "cycle started"), "master")
+        store.append(_line("child", "klines fetched"), "child", parent_trace_id="master")
+
+        assert [r["message"] for r in store.get_trace("master")] == ["cycle started", "klines fetched"]
+        assert [r["message"] for r in store.get_trace("child")] == ["klines fetched"]
+        store.close()
+
+    def test_unknown_trace_is_empty(self, tmp_path):
+        store = TraceStore(str(tmp_path))
+        assert store.get_trace("missing") == []
+        store.close()
+
+    def test_segments_roll_and_old_segments_are_deleted(self, tmp_path):
+        store = TraceStore(str(tmp_path), segment_max_bytes=500, max_segments=2)
+        for i in range(60):
+            store.append(_line(f"trace_{i}", "x" * 50), f"trace_{i}")
+
+        segments = store.list_segments()
+        stats = store.get_stats()
+
+        assert len(segments) == 2
+        assert stats["segments"] == 2
+        assert store.get_trace("trace_0") == []
+        assert store.get_trace("trace_59")[0]["trace_id"] == "trace_59"
+        assert stats["indexed_traces"] < 60
+        store.close()
+
+    def test_reopen_continues_active_segment(self, tmp_path):
+        store = TraceStore(str(tmp_path))
+        store.append(_line("trace_a", "before restart"), "trace_a")
+        store.close()
+
+        reopened = TraceStore(str(tmp_path))
+        reopened.append(_line("trace_a", "after restart"), "trace_a")
+
+        assert [r["message"] for r in reopened.get_trace("trace_a")] == ["before restart", "after restart"]
+        assert reopened.list_segments() == [1]
+        reopened.close()
+
+    def test_invalid_settings(self, tmp_path):
+        with pytest.raises(ValueError):
+            TraceStore(str(tmp_path), max_segments=0)
+
+
+class TestTraceStoreLogging:
+    """Handler, logging configuration and CLI."""
+
+    def setup_method(self):
+        reset_logging_state()
+
+    def teardown_method(self):
+        reset_logging_state()
+
+    def test_handler_indexes_formatted_records(self, tmp_path):
+        store = TraceStore(str(tmp_path))
+        handler = TraceStoreHandler(store)
+        handler.setFormatter(AIOptimizedJSONFormatter())
+        logger = logging.getLogger("trace_store_handler_test")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            logger.info("parent", extra={"trace_id": "trd_parent", "context": {}})
+            logger.info("child", extra={"trace_id": "trd_child", "context": {"parent_trace_id": "trd_parent"}})
+            records = store.get_trace("trd_parent")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        assert [r["message"] for r in records] == ["parent", "child"]
+        assert records[1]["parent_trace_id"] == "trd_parent"
+
+    def test_configure_ai_logging_with_trace_store(self, tmp_path, capsys):
+        store_dir = str(tmp_path / "trace_store")
+        configure_ai_logging(log_level="INFO", console_output=False, trace_store={"directory": store_dir})
+        logger = get_ai_logger("trace_store_config_test", service_name="trace_store_config_test")
+
+        logger.info("cycle step", operation="run_cycle", trace_id="trd_cycle_1")
+        logger.info("unrelated", operation="run_cycle", trace_id="trd_cycle_2")
+        shutdown_logging()
+
+        assert trace_store_cli([store_dir, "trd_cycle_1"]) == 0
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["message"] == "cycle step"
+
+        assert trace_store_cli([store_dir, "trd_missing"]) == 2
+        assert trace_store_cli([store_dir, "--stats"]) == 0
+        assert json.loads(capsys.readouterr().out)["indexed_traces"] == 2
+
+    def test_cli_missing_directory(self, tmp_path):
+        assert trace_store_cli([str(tmp_path / "missing"), "trd_x"]) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestTraceStorePerformance:
+    """Trace lookup latency vs. log volume."""
+
+    def _lookup_ms(self, store: TraceStore, trace_id: str) -> float:
+        start = time.perf_counter()
+        for _ in range(20):
+            records = store.get_trace(trace_id)
+        assert len(records) == 10
+        return (time.perf_counter() - start) * 1000 / 20
+
+    def _linear_scan_ms(self, directory: str, trace_id: str) -> float:
+        start = time.perf_counter()
+        found = 0
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".jsonl"):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    for line in f:
+                        if trace_id in line:
+                            found += 1
+        assert found == 10
+        return (time.perf_counter() - start) * 1000
+
+    def test_lookup_independent_of_volume(self, tmp_path):
+        results = {}
+        for traces in (100, 2000):
+            directory = str(tmp_path / f"store_{traces}")
+            store = TraceStore(directory, segment_max_bytes=512 * 1024, max_segments=1000)
+            payload = "x" * 150
+            for i in range(traces):
+                for step in range(10):
+                    store.append(_line(f"trd_{i:06d}", payload, step=step), f"trd_{i:06d}")
+            store.flush()
+            target = f"trd_{traces // 2:06d}"
+            results[traces] = (self._lookup_ms(store, target), self._linear_scan_ms(directory, target))
+            store.close()
+
+        print("\nTrace lookup (ms): " + ", ".join(
+            f"{traces * 10} records: index={index_ms:.3f} scan={scan_ms:.2f}"
+            for traces, (index_ms, scan_ms) in results.items()))
+        small_index, _ = results[100]
+        large_index, large_scan = results[2000]
+        assert large_index < 5
+        assert large_index < large_scan
+        assert large_index < max(small_index * 5, 1.0)
@@ -0,0 +1,168 @@
+"""
+ContextDiffTracker unit tests.
+
+Covers delta/incremental context mode:
+- Full snapshot on first cycle, periodic snapshots, invalidation
+- Delta content: new bars, changed indicators, crossed levels
+- Baseline version tracking
+- Payload size reduction for continuous operation
+"""
+
+import json
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.market_data.market_data_service import MarketDataService, MarketDataSet
+from src.market_data.context_diff import ContextDiffTracker
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system import MarketDataLogger
+
+HOUR_MS = 3600000
+
+
+def _create_klines(count: int, step_ms: int, end_ms: int) -> list:
+    """Helper to create valid, interval-aligned raw klines; prices depend only on the bar time."""
+    last_open_time = end_ms // step_ms * step_ms
+    klines = []
+    for i in range(count):
+        open_time = last_open_time - (count - 1 - i) * step_ms
+        base = 50000 + (open_time // step_ms) % 500
+        klines.append([open_time, f"{base}", f"{base + 100}", f"{base - 100}", f"{base + 50}", "100",
+                       open_time + step_ms - 1, "5005000.00", 1234, "50.00", "2502500.00", "0"])
+    return klines
+
+
+def _build_market_data(end_ms: int, symbol: str = "BTCUSDT", last_close: float = None):
+    """Build a MarketDataSet through the service with deterministic klines."""
+    h1 = _create_klines(100, HOUR_MS, end_ms)
+    if last_close is not None:
+        h1[-1][4] = f"{last_close}"
+        h1[-1][2] = f"{max(float(h1[-1][2]), last_close)}"
+        h1[-1][3] = f"{min(float(h1[-1][3]), last_close)}"
+    klines_by_interval = {
+        "1d": _create_klines(180, 24 * HOUR_MS, end_ms),
+        "4h": _create_klines(84, 4 * HOUR_MS, end_ms),
+        "1h": h1,
+    }
+    api_client = MagicMock(spec=BinanceApiClient)
+    api_client.get_klines.side_effect = lambda symbol, interval, limit, trace_id=None: klines_by_interval[interval][-limit:]
+    service = MarketDataService(api_client=api_client, logger=MagicMock(spec=MarketDataLogger))
+    return service.get_market_data(symbol, trace_id="test_context_diff")
+
+
+@pytest.fixture
+def now_ms() -> int:
+    return int(time.time() * 1000) // HOUR_MS * HOUR_MS
+
+
+class TestContextDiffTracker:
+    """Unit tests for full/delta payload building."""
+
+    def test_first_payload_is_full_snapshot(self, now_ms):
+        tracker = ContextDiffTracker()
+        market_data = _build_market_data(now_ms)
+
+        payload, _ = tracker.build(market_data)
+
+        assert payload["mode"] == "full"
+        assert payload["version"] == 1
+        assert payload["context"] == market_data.to_context_dict()
+        assert tracker.get_baseline_version("BTCUSDT") == 1
+
+    def test_delta_contains_only_new_bars(self, now_ms):
+        tracker = ContextDiffTracker()
+        tracker.build(_build_market_data(now_ms - HOUR_MS))
+        current = _build_market_data(now_ms)
+
+        payload, _ = tracker.build(current)
+
+        assert payload["mode"] == "delta"
+        assert payload["baseline_version"] == 1
+        assert payload["version"] == 2
+        assert "context" not in payload
+        new_h1 = payload["new_candles"]["h1"]
+        assert new_h1[-1] == current.to_context_dict()["raw_candles"]["h1"][-1]
+        assert len(new_h1) < len(current.h1_candles)
+
+    def test_identical_context_produces_empty_delta(self, now_ms):
+        tracker = ContextDiffTracker()
+        market_data = _build_market_data(now_ms)
+        tracker.build(market_data)
+
+        payload, _ = tracker.build(market_data)
+
+        assert payload["mode"] == "delta"
+        assert "new_candles" not in payload
+        assert "changed_indicators" not in payload
+        assert "crossed_levels" not in payload
+
+    def test_changed_indicators_and_crossed_levels(self, now_ms):
+        tracker = ContextDiffTracker()
+        resistance = _build_market_data(now_ms).to_context_dict()["key_levels"]["resistance"]
+        tracker.build(_build_market_data(now_ms, last_close=resistance - 10))
+
+        current = _build_market_data(now_ms, last_close=resistance + 10)
+        payload, _ = tracker.build(current)
+
+        assert "primary_indicators" in payload["changed_indicators"]
+        assert {"level": "resistance", "value": resistance, "direction": "up"} in payload["crossed_levels"]
+
+    def test_periodic_full_snapshot(self, now_ms):
+        tracker = ContextDiffTracker(full_snapshot_interval=2)
+        market_data = _build_market_data(now_ms)
+
+        modes = [tracker.build(market_data)[0]["mode"] for _ in range(5)]
+
+        assert modes == ["full", "delta", "delta", "full", "delta"]
+        assert tracker.get_baseline_version("BTCUSDT") == 5
+
+    def test_invalidate_forces_full_snapshot(self, now_ms):
+        tracker = ContextDiffTracker()
+        market_data = _build_market_data(now_ms)
+        tracker.build(market_data)
+
+        tracker.invalidate("BTCUSDT")
+
+        assert tracker.get_baseline_version("BTCUSDT") is None
+        assert tracker.build(market_data)[0]["mode"] == "full"
+
+    def test_symbols_are_tracked_independently(self, now_ms):
+        tracker = ContextDiffTracker()
+        tracker.build(_build_market_data(now_ms, symbol="BTCUSDT"))
+
+        payload, _ = tracker.build(_build_market_data(now_ms, symbol="ETHUSDT"))
+
+        assert payload["mode"] == "full"
+
+    def test_invalid_snapshot_interval(self):
+        with pytest.raises(ValueError):
+            ContextDiffTracker(full_snapshot_interval=0)
+
+    def test_delta_payload_is_much_smaller(self, now_ms):
+        tracker = ContextDiffTracker(debug_stats=True)
+        tracker.build(_build_market_data(now_ms - HOUR_MS))
+        current = _build_market_data(now_ms)
+
+        _, delta_json = tracker.build(current)
+        stats = tracker.get_stats()
+
+        assert json.loads(delta_json)["mode"] == "delta"
+        assert len(delta_json) * 5 < len(current.to_json_context())
+        assert stats["full_snapshots"] == 1 and stats["deltas"] == 1
+        assert stats["bytes_saved"] > 0
+
+    def test_build_encodes_once_and_skips_full_context_without_debug_stats(self, now_ms):
+        tracker = ContextDiffTracker()
+        market_data = _build_market_data(now_ms)
+
+        with patch.object(MarketDataSet, "to_json_context") as to_json_context, \
+                patch.object(ContextDiffTracker, "encode", wraps=ContextDiffTracker.encode) as encode:
+            payload, payload_json = tracker.build(market_data)
+
+        to_json_context.assert_not_called()
+        encode.assert_called_once()
+        assert json.loads(payload_json) == payload
+        assert tracker.get_stats()["bytes_full_equivalent"] == 0
+        assert "bytes_saved" not in tracker.get_stats()
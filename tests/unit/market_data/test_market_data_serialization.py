@@ -0,0 +1,108 @@
+"""
+MarketDataSet serialization unit tests.
+
+Covers the LLM context serialization path:
+- Output shape and values of to_context_dict / to_json_context
+- No side effects on the candle DataFrames
+- Memoization of the serialized context
+- Full 364-candle dataset (180 1d + 84 4h + 100 1h); timing is in the
+  market_data.dataset_serialization benchmarks
+"""
+
+import json
+import time
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from src.market_data.market_data_service import MarketDataService, MarketDataSet
+from src.infrastructure.binance_client import BinanceApiClient
+from src.logging_system import MarketDataLogger
+
+
+def _create_klines(count: int, step_ms: int) -> list:
+    """Helper to create valid raw klines ending at the current time."""
+    now_ms = int(time.time() * 1000)
+    return [
+        [now_ms - (count - i) * step_ms, f"{50000 + i}", f"{50100 + i}", f"{49900 + i}", f"{50050 + i}",
+         f"{100 + i * 0.5}", now_ms - (count - i) * step_ms + step_ms - 1, "5005000.00", 1234, "50.00", "2502500.00", "0"]
+        for i in range(count)
+    ]
+
+
+def _legacy_format_candles(df: pd.DataFrame) -> list:
+    """Reference implementation of the previous DataFrame.to_dict based serialization."""
+    df = df.copy()
+    df['unix_timestamp'] = (df['timestamp'] - pd.Timestamp("1970-01-01", tz='UTC')) // pd.Timedelta('1s')
+    formatted_df = df[['unix_timestamp', 'open', 'high', 'low', 'close', 'volume']].copy()
+    formatted_df.columns = ['t', 'o', 'h', 'l', 'c', 'v']
+    return formatted_df.to_dict(orient='records')
+
+
+@pytest.fixture
+def market_data() -> MarketDataSet:
+    """A full 364-candle MarketDataSet built through the real service pipeline."""
+    api_client = MagicMock(spec=BinanceApiClient)
+    api_client.get_klines.side_effect = [
+        _create_klines(180, 86400000),
+        _create_klines(84, 14400000),
+        _create_klines(100, 3600000),
+    ]
+    service = MarketDataService(api_client=api_client, logger=MagicMock(spec=MarketDataLogger))
+    return service.get_market_data("BTCUSDT", trace_id="test_serialization")
+
+
+class TestMarketDataSetSerialization:
+    """Correctness tests for MarketDataSet context serialization."""
+
+    def test_context_matches_legacy_format(self, market_data):
+        """Candles are serialized exactly as the previous to_dict(orient='records') path."""
+        context = market_data.to_context_dict()
+
+        assert context["raw_candles"]["daily"] == _legacy_format_candles(market_data.daily_candles)
+        assert context["raw_candles"]["h4"] == _legacy_format_candles(market_data.h4_candles)
+        assert context["raw_candles"]["h1"] == _legacy_format_candles(market_data.h1_candles)
+        assert context["current_price"] == float(market_data.h1_candles.iloc[-1]['close'])
+        assert isinstance(context["raw_candles"]["h1"][0]["t"], int)
+
+    def test_serialization_does_not_mutate_dataframes(self, market_data):
+        """to_context_dict must not add helper columns to the caller's DataFrames."""
+        columns_before = [list(df.columns) for df in (market_data.daily_candles, market_data.h4_candles, market_data.h1_candles)]
+
+        market_data.to_context_dict()
+        market_data.to_json_context()
+
+        columns_after = [list(df.columns) for df in (market_data.daily_candles, market_data.h4_candles, market_data.h1_candles)]
+        assert columns_after == columns_before
+        assert 'unix_timestamp' not in market_data.h1_candles.columns
+
+    def test_context_is_memoized(self, market_data):
+        """Repeated calls return the cached dict and JSON string."""
+        assert market_data.to_context_dict() is market_data.to_context_dict()
+        assert market_data.to_json_context() is market_data.to_json_context()
+
+    def test_json_context_is_compact_and_round_trips(self, market_data):
+        """JSON context is compact and decodes back to the context dict."""
+        json_context = market_data.to_json_context()
+
+        assert ", " not in json_context and ": " not in json_context
+        assert json.loads(json_context) == market_data.to_context_dict()
+
+    def test_cache_fields_excluded_from_equality(self, market_data):
+        """Memoization fields do not leak into repr or equality."""
+        assert "_context_dict_cache" not in repr(market_data)
+        market_data.to_context_dict()
+        assert market_data == market_data
+
+    def test_full_dataset_cached_json_matches_legacy(self, market_data):
+        """A full 364-candle dataset serializes like the legacy path, and repeat calls reuse the cache."""
+        frames = (market_data.daily_candles, market_data.h4_candles, market_data.h1_candles)
+        assert sum(len(df) for df in frames) == 364
+
+        json_context = market_data.to_json_context()
+
+        assert market_data.to_json_context() is json_context
+        assert market_data.to_context_dict() is market_data._context_dict_cache
+        assert json.loads(json_context)["raw_candles"] == json.loads(json.dumps(
+            dict(zip(("daily", "h4", "h1"), (_legacy_format_candles(df) for df in frames)))))
@@ -0,0 +1,75 @@
+"""
+Benchmark suite smoke tests.
+
+Validates the benchmark tooling (not performance numbers):
+- Stub client returns deterministic, valid klines seeded from fixtures
+- A quick run writes a JSON result file with environment metadata
+- Comparison flags regressions against a baseline
+"""
+
+import json
+
+import pytest
+
+from benchmarks.data import StubBinanceClient, benchmark_symbols, load_fixture_candles
+from benchmarks.run import compare, main
+from src.market_data.market_data_service import MarketDataService
+
+
+class TestBenchmarkData:
+    """Synthetic and fixture-seeded klines."""
+
+    def test_klines_are_deterministic_and_fixture_seeded(self):
+        first = StubBinanceClient().get_klines("BTCUSDT", "1h", 100)
+        second = StubBinanceClient().get_klines("BTCUSDT", "1h", 100)
+        fixture = load_fixture_candles()["BTCUSDT"]
+
+        assert first == second
+        assert len(first) == 100
+        assert first[0][4] == fixture[0]["close"]
+
+    def test_symbols_pass_service_validation(self):
+        service = MarketDataService(api_client=StubBinanceClient(), logger=None)
+        symbols = benchmark_symbols(50)
+
+        assert len(set(symbols)) == 50
+        for symbol in symbols[:5]:
+            assert service.get_market_data(symbol, trace_id="trd_benchmark").symbol == symbol
+
+
+class TestBenchmarkRunner:
+    """Result files and comparison."""
+
+    def test_quick_run_writes_results(self, tmp_path):
+        output = tmp_path / "results.json"
+
+        assert main(["--quick", "--only", "logging,oms", "--symbols", "1", "--output", str(output)]) == 0
+
+        data = json.loads(output.read_text())
+        assert data["meta"]["symbol_counts"] == [1]
+        names = {result["name"] for result in data["results"]}
+        assert {"logging.formatter", "oms.repository_save", "oms.repository_load"} <= names
+
+    def test_compare_flags_regressions(self, tmp_path):
+        baseline = [{"name": "oms.repository_load", "params": {"symbols": 10}, "median_ms": 1.0}]
+        current = [{"name": "oms.repository_load", "params": {"symbols": 10}, "median_ms": 1.5}]
+
+        rows = compare(current, baseline, threshold=0.2)
+
+        assert rows == [{"benchmark": "oms.repository_load[symbols=10]", "baseline_ms": 1.0,
+                         "current_ms": 1.5, "ratio": 1.5, "status": "regression"}]
+
+    def test_fail_on_regression_exit_code(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"meta": {}, "results": [
+            {"name": "oms.repository_load", "params": {"symbols": 1}, "median_ms": 1e-9}
+        ]}))
+
+        exit_code = main(["--quick", "--only", "oms", "--symbols", "1", "--output", str(tmp_path / "r.json"),
+                          "--compare", str(baseline), "--fail-on-regression"])
+
+        assert exit_code == 1
+
+    def test_unknown_suite_rejected(self):
+        with pytest.raises(SystemExit):
+            main(["--only", "gpu"])
@@ -0,0 +1,77 @@
+import pytest
+
+from src.infrastructure.exceptions import RepositoryError
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.write_behind import WriteBehindPersister
+
+
+def _request(symbol: str, **overrides) -> dict:
+    request = {"symbol": symbol, "order_type": "BUY", "margin": 100.0, "leverage": 5, "entry_price": 100.0}
+    request.update(overrides)
+    return request
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = OmsRepository(str(tmp_path / "oms.db"), metrics=MetricsRegistry())
+    yield repo
+    repo.close()
+
+
+def test_place_orders_single_transaction_with_per_order_results(repository, mocker):
+    """Test that valid requests are persisted in one save_many call and invalid ones rejected."""
+    oms = OrderManagementSystem(repository)
+    save_many = mocker.spy(repository, "save_many")
+    save = mocker.spy(repository, "save")
+
+    results = oms.place_orders([
+        _request("BTCUSDT"),
+        _request("ETHUSDT", margin=-1),
+        _request("SOLUSDT", order_type="HOLD"),
+        {"symbol": "XRPUSDT"},
+        _request("ADAUSDT", stop_loss=90.0),
+    ])
+
+    assert [r["status"] for r in results] == ["placed", "rejected", "rejected", "rejected", "placed"]
+    assert results[1]["error"] == "margin must be positive"
+    assert "missing fields" in results[3]["error"]
+    save_many.assert_called_once()
+    save.assert_not_called()
+    assert set(repository.load_active()) == {results[0]["order_id"], results[4]["order_id"]}
+    assert oms.get_order_by_symbol("ADAUSDT")["stop_loss"] == 90.0
+
+
+def test_place_orders_is_all_or_nothing_on_db_error(repository, mocker):
+    """Test that a failed transaction raises and leaves no order behind."""
+    oms = OrderManagementSystem(repository)
+    mocker.patch.object(repository, "save_many",
+                        side_effect=RepositoryError("disk full", repository_type="sqlite", db_operation="save_many"))
+
+    with pytest.raises(RepositoryError):
+        oms.place_orders([_request("BTCUSDT"), _request("ETHUSDT")])
+
+    assert oms.get_order_by_symbol("BTCUSDT") is None
+
+
+def test_cancel_orders(repository):
+    """Test bulk cancellation results and persistence."""
+    oms = OrderManagementSystem(repository)
+    placed = [r["order_id"] for r in oms.place_orders([_request("BTCUSDT"), _request("ETHUSDT")])]
+
+    results = oms.cancel_orders(placed + ["missing"])
+
+    assert results == {placed[0]: True, placed[1]: True, "missing": False}
+    assert repository.load_active() == {}
+    assert oms.get_order_by_symbol("ETHUSDT") is None
+
+
+def test_bulk_with_write_behind(repository):
+    """Test that bulk placement goes through the write-behind queue."""
+    with WriteBehindPersister(repository, max_delay_ms=1000) as persister:
+        oms = OrderManagementSystem(repository, write_behind=persister)
+        results = oms.place_orders([_request(f"S{i}USDT") for i in range(20)], durable=True)
+
+        assert len(repository.load_active()) == 20
+        assert all(r["status"] == "placed" for r in results)
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.write_behind import WriteBehindPersister
+
+
+@pytest.fixture(params=["memory", "file"])
+def repository(request, tmp_path):
+    db_path = ":memory:" if request.param == "memory" else str(tmp_path / "oms.db")
+    repo = OmsRepository(db_path, metrics=MetricsRegistry())
+    yield repo
+    repo.close()
+
+
+def _run_threads(target, count: int):
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            target(n)
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_check_then_place_is_atomic(repository):
+    """Test that concurrent place_order_if_no_active calls open one position per symbol."""
+    oms = OrderManagementSystem(repository)
+    placed = []
+
+    _run_threads(lambda n: placed.append(oms.place_order_if_no_active("BTCUSDT", "BUY", 100.0, 10, 50000.0)), 16)
+
+    assert len([order_id for order_id in placed if order_id is not None]) == 1
+    assert len(repository.load()) == 1
+
+
+def test_parallel_symbols_keep_memory_and_db_consistent(repository):
+    """Test that per-symbol workers placing, filling and cancelling in parallel leave consistent state."""
+    oms = OrderManagementSystem(repository)
+
+    def cycle(n):
+        symbol = f"S{n}USDT"
+        for i in range(25):
+            order_id = oms.place_order_if_no_active(symbol, "BUY", 100.0, 10, 50000.0)
+            assert order_id is not None
+            if i % 2:
+                assert oms.get_order_status(order_id) == "FILLED"
+            else:
+                assert oms.cancel_order(order_id)
+            assert oms.get_order_by_symbol(symbol) is None
+
+    _run_threads(cycle, 8)
+
+    stored = repository.load()
+    assert len(stored) == 200
+    assert len(oms.get_orders_by_status("FILLED")) + len(oms.get_orders_by_status("CANCELLED")) == 200
+    assert all(stored[order_id]["status"] == order["status"] for order_id, order in oms._orders.items())
+
+
+def test_bulk_and_single_mutations_race_safely(repository):
+    """Test that place_orders/cancel_orders interleave with single calls without lost index entries."""
+    persister = WriteBehindPersister(repository, max_delay_ms=1)
+    oms = OrderManagementSystem(repository, write_behind=persister)
+    symbols = [f"S{i}USDT" for i in range(10)]
+
+    def worker(n):
+        if n % 2:
+            results = oms.place_orders([{"symbol": symbol, "order_type": "BUY", "margin": 100.0,
+                                         "leverage": 10, "entry_price": 50000.0} for symbol in symbols])
+            oms.cancel_orders([result["order_id"] for result in results])
+        else:
+            for symbol in symbols:
+                oms.place_order_if_no_active(symbol, "SELL", 100.0, 10, 50000.0)
+
+    _run_threads(worker, 6)
+    oms.flush()
+
+    active = {order["order_id"] for orders in oms._active_by_symbol.values() for order in orders.values()}
+    assert active == {order_id for order_id, order in oms._orders.items() if order["status"] == "PENDING"}
+    assert set(repository.load_active()) == active
+    persister.close()
+
+
+def test_symbols_do_not_block_each_other(repository):
+    """Test that holding one symbol's lock does not block mutations of a symbol on another stripe."""
+    oms = OrderManagementSystem(repository, lock_stripes=8)
+    other = next(f"S{i}USDT" for i in range(100) if oms.symbol_lock(f"S{i}USDT") is not oms.symbol_lock("BTCUSDT"))
+    placed = threading.Event()
+
+    with oms.symbol_lock("BTCUSDT"):
+        thread = threading.Thread(target=lambda: (oms.place_order(other, "BUY", 100.0, 10, 50000.0), placed.set()))
+        thread.start()
+        assert placed.wait(timeout=5)
+    thread.join()
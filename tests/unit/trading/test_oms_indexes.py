@@ -0,0 +1,96 @@
+import time
+import uuid
+
+import pytest
+
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+
+
+def _stored_order(symbol: str, status: str, order_id: str = None) -> dict:
+    return {
+        "order_id": order_id or str(uuid.uuid4()), "symbol": symbol, "status": status, "order_type": "BUY",
+        "margin": 100.0, "leverage": 10, "entry_price": 100.0, "exit_price": None,
+        "stop_loss": None, "take_profit": None,
+        "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.fixture
+def repository():
+    repo = OmsRepository(":memory:", metrics=MetricsRegistry())
+    yield repo
+    repo.close()
+
+
+def test_indexes_built_from_loaded_orders(repository):
+    """Test that active orders loaded at startup are indexed by symbol and status."""
+    repository.save(_stored_order("BTCUSDT", "FILLED", "old"))
+    repository.save(_stored_order("BTCUSDT", "PENDING", "live"))
+    repository.save(_stored_order("ETHUSDT", "CANCELLED", "gone"))
+
+    oms = OrderManagementSystem(repository)
+
+    assert oms.get_order_by_symbol("BTCUSDT")["order_id"] == "live"
+    assert oms.get_order_by_symbol("ETHUSDT") is None
+    assert [o["order_id"] for o in oms.get_orders_by_status("PENDING")] == ["live"]
+
+
+def test_transitions_update_indexes(repository):
+    """Test that place, fill and cancel keep symbol and status indexes in sync."""
+    oms = OrderManagementSystem(repository)
+    first = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0)
+    second = oms.place_order("BTCUSDT", "SELL", 100.0, 10, 50000.0)
+
+    assert oms.get_order_by_symbol("BTCUSDT")["order_id"] == first
+    assert len(oms.get_orders_by_status("PENDING")) == 2
+
+    assert oms.get_order_status(first) == "FILLED"
+    assert oms.get_order_by_symbol("BTCUSDT")["order_id"] == second
+
+    assert oms.cancel_order(second)
+    assert oms.get_order_by_symbol("BTCUSDT") is None
+    assert oms.get_orders_by_status("PENDING") == []
+    assert [o["order_id"] for o in oms.get_orders_by_status("CANCELLED")] == [second]
+
+
+def test_reload_replaces_indexes(repository):
+    """Test that reload() rebuilds indexes from the repository state."""
+    oms = OrderManagementSystem(repository)
+    order_id = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0)
+    repository.save(dict(oms.get_order_by_symbol("BTCUSDT"), status="CANCELLED"))
+    repository.save(_stored_order("ETHUSDT", "PENDING", "eth"))
+
+    oms.reload()
+
+    assert oms.get_order_by_symbol("BTCUSDT") is None
+    assert oms.get_order_by_symbol("ETHUSDT")["order_id"] == "eth"
+    assert oms.get_orders_by_status("CANCELLED") == []
+    assert oms.get_order_status(order_id) == "CANCELLED"
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestOmsIndexPerformance:
+    """Symbol lookup cost does not grow with order history."""
+
+    def _lookup_us(self, history: int) -> float:
+        repository = OmsRepository(":memory:", metrics=MetricsRegistry())
+        for i in range(history):
+            repository.save(_stored_order(f"S{i % 50}USDT", "FILLED"))
+        repository.save(_stored_order("BTCUSDT", "PENDING"))
+        oms = OrderManagementSystem(repository)
+        iterations = 20000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            oms.get_order_by_symbol("BTCUSDT")
+        repository.close()
+        return (time.perf_counter() - start) * 1e6 / iterations
+
+    def test_lookup_constant_in_history(self):
+        small = self._lookup_us(10)
+        large = self._lookup_us(20000)
+
+        print(f"\nget_order_by_symbol: history=10 {small:.2f}us, history=20000 {large:.2f}us")
+        assert large < small * 5 + 1
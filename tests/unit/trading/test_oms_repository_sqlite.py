@@ -164,4 +164,148 @@ def test_load_returns_empty_dict_on_corrupt_db_file(db_path):
         
     # Проверяем, что при инициализации с поврежденным файлом выбрасывается исключение
     with pytest.raises(RepositoryError, match="Failed to create 'orders' table"):
-        OmsRepository(str(db_path))
\ No newline at end of file
+        OmsRepository(str(db_path))
+
+def test_file_db_uses_wal_and_reuses_connection(db_path, sample_order):
+    """Test that a file database keeps one WAL-mode connection per thread."""
+    repo = OmsRepository(str(db_path))
+    conn = repo._get_connection()
+
+    repo.save(sample_order)
+    repo.load()
+
+    assert repo._get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    repo.close()
+
+def test_connections_are_per_thread(db_path, sample_order):
+    """Test that worker threads get their own connection and see committed writes."""
+    import threading
+
+    repo = OmsRepository(str(db_path))
+    repo.save(sample_order)
+    seen = {}
+
+    def worker():
+        seen["conn"] = repo._get_connection()
+        seen["orders"] = repo.load()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen["conn"] is not repo._get_connection()
+    assert "order1" in seen["orders"]
+    repo.close()
+
+def test_finished_thread_connection_is_released(db_path):
+    """Test that a worker thread's connection is closed and dropped from the pool when the thread ends."""
+    import gc
+    import threading
+
+    repo = OmsRepository(str(db_path))
+    seen = {}
+
+    def worker():
+        seen["conn"] = repo._get_connection()
+
+    for _ in range(3):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert repo._pool._connections == [repo._get_connection()]
+    with pytest.raises(sqlite3.ProgrammingError):
+        seen["conn"].execute("SELECT 1")
+    repo.close()
+
+@pytest.mark.parametrize("path", [":memory:", "file"])
+def test_connection_after_close_raises(db_path, path):
+    """Test that a closed repository does not silently open a new (empty) database."""
+    repo = OmsRepository(":memory:" if path == ":memory:" else str(db_path))
+    repo.close()
+
+    with pytest.raises(RepositoryError, match="closed"):
+        repo.load()
+
+def test_data_survives_close_and_reopen(db_path, sample_order):
+    """Test that committed orders are in the database file after close."""
+    repo = OmsRepository(str(db_path), synchronous="FULL")
+    repo.save(sample_order)
+    repo.close()
+
+    reopened = OmsRepository(str(db_path))
+    assert reopened.load()["order1"]["symbol"] == "BTCUSDT"
+    reopened.close()
+
+def test_invalid_synchronous_mode(db_path):
+    """Test that an unknown synchronous pragma value is rejected."""
+    with pytest.raises(ValueError):
+        OmsRepository(str(db_path), synchronous="SOMETIMES")
+
+def _history(repo, count, symbols=("BTCUSDT", "ETHUSDT")):
+    for i in range(count):
+        repo.save({
+            "order_id": f"h{i:04d}", "symbol": symbols[i % len(symbols)], "status": "FILLED",
+            "order_type": "BUY", "margin": 10.0, "leverage": 1, "entry_price": 100.0,
+            "created_at": f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}",
+            "updated_at": f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}",
+        })
+
+def test_load_active_skips_history(db_path, sample_order):
+    """Test that load_active returns only non-terminal orders through the partial index."""
+    repo = OmsRepository(str(db_path))
+    _history(repo, 50)
+    repo.save(sample_order)
+
+    assert list(repo.load_active()) == ["order1"]
+    plan = repo._get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM orders INDEXED BY idx_orders_active "
+        "WHERE status NOT IN ('CANCELLED', 'FILLED')"
+    ).fetchall()
+    assert "idx_orders_active" in str(plan)
+    assert repo.get("h0007")["status"] == "FILLED"
+    assert repo.get("missing") is None
+
+def test_history_pages_newest_first(db_path):
+    """Test keyset pagination over historical orders with filters."""
+    repo = OmsRepository(str(db_path))
+    _history(repo, 25)
+
+    page, cursor = repo.get_orders_page(symbol="BTCUSDT", limit=5)
+    assert [o["order_id"] for o in page] == ["h0024", "h0022", "h0020", "h0018", "h0016"]
+    page, cursor = repo.get_orders_page(symbol="BTCUSDT", limit=5, cursor=cursor)
+    assert page[0]["order_id"] == "h0014"
+
+    streamed = [o["order_id"] for o in repo.iter_orders(page_size=4)]
+    assert len(streamed) == 25 and len(set(streamed)) == 25
+    assert streamed[0] == "h0024" and streamed[-1] == "h0000"
+
+    recent = list(repo.iter_orders(since="2025-01-01T00:00:20", status="FILLED"))
+    assert [o["order_id"] for o in recent] == ["h0024", "h0023", "h0022", "h0021", "h0020"]
+
+def test_save_many_mixed_columns(db_path, sample_order):
+    """Test that save_many persists orders with different column sets in one call."""
+    repo = OmsRepository(str(db_path))
+    minimal = {key: value for key, value in sample_order.items() if value is not None}
+    orders = [dict(sample_order, order_id=f"a{i}") for i in range(3)] + [dict(minimal, order_id="b0")]
+
+    repo.save_many(orders)
+
+    loaded = repo.load()
+    assert set(loaded) == {"a0", "a1", "a2", "b0"}
+    assert loaded["b0"]["exit_price"] is None
+
+def test_save_many_rolls_back_on_error(db_path, sample_order):
+    """Test that one invalid order rolls back the whole batch."""
+    repo = OmsRepository(str(db_path))
+    broken = dict(sample_order, order_id="bad")
+    del broken["symbol"]
+
+    with pytest.raises(RepositoryError) as excinfo:
+        repo.save_many([sample_order, broken])
+
+    assert excinfo.value.db_operation == "save_many"
+    assert repo.load() == {}
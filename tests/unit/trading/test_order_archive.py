@@ -0,0 +1,141 @@
+import os
+import time
+
+import pytest
+
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.archive import OrderArchive
+from src.trading.event_store import OrderEventStore
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+
+
+def _order(order_id: str, status: str, updated_at: str, symbol: str = "BTCUSDT") -> dict:
+    return {
+        "order_id": order_id, "symbol": symbol, "status": status, "order_type": "BUY",
+        "margin": 100.0, "leverage": 10, "entry_price": 50000.0, "exit_price": None,
+        "stop_loss": None, "take_profit": None,
+        "created_at": updated_at, "updated_at": updated_at,
+    }
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = OmsRepository(str(tmp_path / "oms.db"), metrics=MetricsRegistry())
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def archive(repository, tmp_path):
+    order_archive = OrderArchive(repository, str(tmp_path / "archive"), batch_size=2, metrics=MetricsRegistry())
+    yield order_archive
+    order_archive.close()
+
+
+def _seed(repository):
+    repository.save_many([
+        _order("jan_filled", "FILLED", "2026-01-10T00:00:00+00:00"),
+        _order("jan_live", "PENDING", "2026-01-11T00:00:00+00:00"),
+        _order("feb_cancelled", "CANCELLED", "2026-02-05T00:00:00+00:00", "ETHUSDT"),
+        _order("feb_filled", "FILLED", "2026-02-20T00:00:00+00:00"),
+        _order("mar_filled", "FILLED", "2026-03-15T00:00:00+00:00"),
+    ])
+
+
+def test_archive_moves_old_terminal_orders_into_month_files(repository, archive, tmp_path):
+    """Test that terminal orders before the cutoff leave the hot table, grouped by month."""
+    _seed(repository)
+
+    assert archive.archive(before="2026-03-01T00:00:00+00:00") == 3
+
+    assert set(repository.load()) == {"jan_live", "mar_filled"}
+    assert sorted(name for name in os.listdir(tmp_path / "archive") if name.endswith(".db")) == \
+        ["orders_2026_01.db", "orders_2026_02.db"]
+    assert archive.months == ["2026-02", "2026-01"]
+    assert archive.archive(before="2026-03-01T00:00:00+00:00") == 0
+
+
+def test_facade_reads_span_hot_and_archive(repository, archive):
+    """Test get and paginated history across the hot table and archive partitions."""
+    _seed(repository)
+    archive.archive(before="2026-03-01T00:00:00+00:00")
+
+    assert archive.get("feb_filled")["status"] == "FILLED"
+    assert archive.get("jan_live")["status"] == "PENDING"
+    assert archive.get("missing") is None
+
+    ids, cursor = [], None
+    while True:
+        page, cursor = archive.get_orders_page(limit=2, cursor=cursor)
+        ids.extend(order["order_id"] for order in page)
+        if cursor is None:
+            break
+    assert ids == ["mar_filled", "feb_filled", "feb_cancelled", "jan_live", "jan_filled"]
+
+    assert [o["order_id"] for o in archive.iter_orders(symbol="BTCUSDT", since="2026-01-11T00:00:00+00:00",
+                                                        until="2026-03-01T00:00:00+00:00")] == ["feb_filled", "jan_live"]
+
+
+def test_reopened_archive_discovers_partitions(repository, tmp_path):
+    """Test that existing month files are found after a restart."""
+    _seed(repository)
+    with_archive = OrderArchive(repository, str(tmp_path / "archive"), metrics=MetricsRegistry())
+    with_archive.archive(before="2026-02-01T00:00:00+00:00")
+    with_archive.close()
+
+    reopened = OrderArchive(repository, str(tmp_path / "archive"), metrics=MetricsRegistry())
+    assert reopened.get("jan_filled")["order_id"] == "jan_filled"
+    reopened.close()
+
+
+def test_archive_from_event_store(tmp_path):
+    """Test that unfolded events are snapshotted before archiving from the event store."""
+    store = OrderEventStore(str(tmp_path / "oms.db"), metrics=MetricsRegistry(), snapshot_every=1000)
+    _seed(store)
+    order_archive = OrderArchive(store, str(tmp_path / "archive"), metrics=MetricsRegistry())
+
+    assert order_archive.archive(before="2026-03-01T00:00:00+00:00") == 3
+    assert set(store.load()) == {"jan_live", "mar_filled"}
+    assert order_archive.get("jan_filled")["status"] == "FILLED"
+    order_archive.close()
+    store.close()
+
+
+def test_oms_history_reads_archive(repository, archive):
+    """Test that OMS order lookup falls back to archived orders."""
+    _seed(repository)
+    archive.archive(before="2026-03-01T00:00:00+00:00")
+    oms = OrderManagementSystem(repository, archive=archive)
+
+    assert oms.get_order_status("feb_cancelled") == "CANCELLED"
+    assert len(list(oms.iter_order_history())) == 5
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestArchivePerformance:
+    """Hot-table reads stay flat once history is archived."""
+
+    def test_hot_load_after_archival(self, tmp_path):
+        repository = OmsRepository(str(tmp_path / "oms.db"), metrics=MetricsRegistry())
+        repository.save_many([_order(f"h{i}", "FILLED", f"2026-01-{1 + i % 28:02d}T00:00:00+00:00")
+                              for i in range(20000)])
+        repository.save_many([_order(f"live{i}", "PENDING", "2026-03-01T00:00:00+00:00") for i in range(100)])
+
+        start = time.perf_counter()
+        repository.load()
+        before_ms = (time.perf_counter() - start) * 1000
+
+        order_archive = OrderArchive(repository, str(tmp_path / "archive"), batch_size=5000,
+                                     metrics=MetricsRegistry())
+        assert order_archive.archive(before="2026-02-01T00:00:00+00:00") == 20000
+        start = time.perf_counter()
+        orders = repository.load()
+        after_ms = (time.perf_counter() - start) * 1000
+        order_archive.close()
+        repository.close()
+
+        print(f"\nload(): 20100 rows {before_ms:.1f}ms, after archival {len(orders)} rows {after_ms:.1f}ms")
+        assert len(orders) == 100
+        assert after_ms < before_ms
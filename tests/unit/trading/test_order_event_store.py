@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.event_store import OrderEventStore
+from src.trading.oms import OrderManagementSystem
+from src.trading.write_behind import WriteBehindPersister
+
+
+def _order(order_id: str, status: str = "PENDING", symbol: str = "BTCUSDT") -> dict:
+    return {
+        "order_id": order_id, "symbol": symbol, "status": status, "order_type": "BUY",
+        "margin": 100.0, "leverage": 10, "entry_price": 50000.0, "exit_price": None,
+        "stop_loss": None, "take_profit": None,
+        "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "oms.db")
+
+
+def _count(db_path: str, table: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_transitions_append_events_with_changed_fields(db_path):
+    """Test that a new order is one full event and later transitions carry only changes."""
+    store = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=100)
+    order = _order("o1")
+    store.save(order)
+    store.save(dict(order, status="FILLED", exit_price=51000.0))
+
+    events = store.get_order_events("o1")
+    assert [event["event_type"] for event in events] == ["upsert", "update"]
+    assert events[0]["changes"] == order
+    assert events[1]["changes"] == {"status": "FILLED", "exit_price": 51000.0}
+    assert _count(db_path, "orders") == 0  # not folded yet
+    store.close()
+
+
+def test_recovery_replays_tail_over_snapshot(db_path):
+    """Test that a restarted store recovers snapshot rows plus unfolded events."""
+    store = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=3)
+    store.save_many([_order("o1"), _order("o2", symbol="ETHUSDT"), _order("o3", symbol="XRPUSDT")])
+    assert _count(db_path, "orders") == 3  # snapshot_every reached
+    store.save(dict(_order("o1"), status="CANCELLED"))
+    store.delete("o2")
+    store.save(_order("o4", symbol="SOLUSDT"))
+    store.close()
+
+    restarted = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=100)
+    active = restarted.load_active()
+
+    assert set(active) == {"o3", "o4"}
+    assert restarted.get("o1")["status"] == "CANCELLED"
+    assert restarted.get("o2") is None
+    restarted.close()
+
+
+def test_snapshot_folds_tail_and_keeps_audit(db_path):
+    """Test that snapshot() writes folded state and keeps events unless pruning."""
+    store = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=1000)
+    store.save(_order("o1"))
+    store.save(dict(_order("o1"), status="FILLED"))
+
+    assert store.snapshot() == 1
+    assert store.load() == {"o1": dict(_order("o1"), status="FILLED")}
+    assert len(store.get_order_events("o1")) == 2
+    store.close()
+
+    pruning = OrderEventStore(db_path, metrics=MetricsRegistry(), prune_events=True)
+    pruning.save(_order("o2"))
+    pruning.snapshot()
+    assert _count(db_path, "order_events") == 0
+    assert set(pruning.load()) == {"o1", "o2"}
+    pruning.close()
+
+
+def test_history_page_sees_unfolded_events(db_path):
+    """Test that paginated history includes orders still in the event tail."""
+    store = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=1000)
+    store.save(dict(_order("o1"), status="FILLED"))
+
+    page, _ = store.get_orders_page(symbol="BTCUSDT")
+
+    assert [order["order_id"] for order in page] == ["o1"]
+    store.close()
+
+
+def test_oms_on_event_store_with_write_behind(db_path):
+    """Test OMS recovery when transitions go through write-behind into the event log."""
+    store = OrderEventStore(db_path, metrics=MetricsRegistry(), snapshot_every=1000)
+    persister = WriteBehindPersister(store, max_delay_ms=1)
+    oms = OrderManagementSystem(store, write_behind=persister)
+    kept = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0)
+    cancelled = oms.place_order("ETHUSDT", "BUY", 100.0, 10, 3000.0)
+    oms.cancel_order(cancelled)
+    persister.close()
+    store.close()
+
+    restarted = OrderEventStore(db_path, metrics=MetricsRegistry())
+    recovered = OrderManagementSystem(restarted)
+
+    assert recovered.get_order_by_symbol("BTCUSDT")["order_id"] == kept
+    assert recovered.get_order_by_symbol("ETHUSDT") is None
+    assert recovered.get_order_status(cancelled) == "CANCELLED"
+    restarted.close()
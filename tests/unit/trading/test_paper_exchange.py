@@ -0,0 +1,207 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.logging_system import MarketDataLogger
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.paper_exchange import ENTRY, MARKET_EXIT, STOP_LOSS, TAKE_PROFIT, PaperExchange, _first_hits, _sparse_table
+
+CREATED = "2026-01-01T00:00:00+00:00"
+
+
+def _bars(rows, start: str = CREATED) -> pd.DataFrame:
+    """rows: (open, high, low, close) per hourly bar."""
+    frame = pd.DataFrame(rows, columns=["open", "high", "low", "close"])
+    frame.insert(0, "timestamp", pd.date_range(start, periods=len(rows), freq="1h"))
+    frame["volume"] = 1.0
+    return frame
+
+
+def _order(order_id: str, side: str = "BUY", entry: float = 100.0, stop_loss=None, take_profit=None,
+           symbol: str = "BTCUSDT", created_at: str = CREATED) -> dict:
+    return {
+        "order_id": order_id, "symbol": symbol, "status": "PENDING", "order_type": side,
+        "margin": 100.0, "leverage": 10, "entry_price": entry, "exit_price": None,
+        "stop_loss": stop_loss, "take_profit": take_profit, "created_at": created_at, "updated_at": created_at,
+    }
+
+
+@pytest.fixture
+def exchange():
+    return PaperExchange(slippage_tolerance=0.01, metrics=MetricsRegistry())
+
+
+def test_limit_entry_fills_at_limit_or_better(exchange):
+    """Test that a BUY limit fills on the first bar trading through it, at the open on a gap."""
+    exchange.submit(_order("a", entry=100.0))
+    exchange.submit(_order("b", entry=95.0))
+
+    fills = exchange.on_bars("BTCUSDT", _bars([(103, 104, 101, 102), (102, 102, 99, 100), (90, 92, 89, 91)]))
+
+    assert [(f.order_id, f.kind, f.price, f.timestamp) for f in fills] == [
+        ("a", ENTRY, 100.0, "2026-01-01T01:00:00+00:00"),
+        ("b", ENTRY, 90.0, "2026-01-01T02:00:00+00:00"),
+    ]
+
+
+def test_exits_after_entry_in_same_batch(exchange):
+    """Test that SL/TP are armed after the entry bar and stop loss wins a same-bar tie with slippage."""
+    exchange.submit(_order("tp", entry=100.0, stop_loss=90.0, take_profit=110.0))
+    exchange.submit(_order("tie", entry=100.0, stop_loss=95.0, take_profit=105.0, symbol="ETHUSDT"))
+
+    fills = exchange.on_bars("BTCUSDT", _bars([(101, 111, 99, 110), (109, 112, 105, 111)]))
+    assert [(f.kind, f.price) for f in fills] == [(ENTRY, 100.0), (TAKE_PROFIT, 110.0)]
+
+    fills = exchange.on_bars("ETHUSDT", _bars([(100, 101, 99, 100), (100, 106, 94, 100)]))
+    assert [(f.kind, f.price) for f in fills] == [(ENTRY, 100.0), (STOP_LOSS, pytest.approx(95.0 * 0.99))]
+    assert exchange.resting_orders("BTCUSDT") == exchange.resting_orders("ETHUSDT") == 0
+
+
+def test_short_position_triggers(exchange):
+    """Test SELL entry above the market, then a gapped stop loss filled at the worse open."""
+    exchange.submit(_order("s", side="SELL", entry=100.0, stop_loss=105.0, take_profit=90.0))
+
+    fills = exchange.on_bars("BTCUSDT", _bars([(98, 101, 97, 99), (108, 109, 107, 108)]))
+
+    assert [(f.kind, f.price) for f in fills] == [(ENTRY, 100.0), (STOP_LOSS, pytest.approx(108 * 1.01))]
+
+
+def test_only_new_bars_after_creation_are_matched(exchange):
+    """Test that bars before the order and bars already processed never fill it."""
+    exchange.submit(_order("a", entry=100.0, created_at="2026-01-01T02:00:00+00:00"))
+    bars = _bars([(100, 100, 90, 95), (95, 96, 91, 95), (105, 106, 104, 105)])
+
+    assert exchange.on_bars("BTCUSDT", bars) == []
+    assert exchange.on_bars("BTCUSDT", bars) == []
+    assert [f.order_id for f in exchange.on_bars("BTCUSDT", _bars([(101, 101, 99, 100)],
+                                                                   "2026-01-01T03:00:00+00:00"))] == ["a"]
+
+
+def test_forming_last_bar_is_rechecked(exchange):
+    """Test that the last (still forming) candle fills once a later feed extends its range."""
+    exchange.submit(_order("a", entry=100.0, take_profit=105.0))
+    window = [(102, 103, 101, 102), (102, 102, 101, 101)]
+
+    assert exchange.on_bars("BTCUSDT", _bars(window)) == []
+    window[-1] = (102, 102, 99, 100)
+    assert [(f.kind, f.timestamp) for f in exchange.on_bars("BTCUSDT", _bars(window))] == [
+        (ENTRY, "2026-01-01T01:00:00+00:00")]
+    assert exchange.on_bars("BTCUSDT", _bars(window)) == []  # the same bar does not fill it twice
+
+
+def test_resubmitted_open_position_ignores_bars_before_entry(exchange):
+    """Test that an OPEN order restored on restart checks SL/TP only after its entry bar."""
+    order = dict(_order("a", entry=100.0, take_profit=105.0), status="OPEN",
+                 updated_at="2026-01-01T04:00:00+00:00")
+    exchange.submit(order)
+
+    fills = exchange.on_bars("BTCUSDT", _bars([(100, 101, 99, 100), (100, 111, 99, 110), (100, 101, 99, 100),
+                                               (100, 101, 99, 100), (100, 101, 99, 100), (104, 106, 103, 105)]))
+
+    assert [(f.kind, f.timestamp) for f in fills] == [(TAKE_PROFIT, "2026-01-01T05:00:00+00:00")]
+
+
+def test_market_exit_fills_at_first_bar_after_request(exchange):
+    """Test that close_position fills at the open of the first bar opened after the request, not a re-checked one."""
+    exchange.submit(_order("a", entry=100.0))
+    window = [(100, 101, 99, 100), (101, 102, 100, 101)]
+    assert [f.kind for f in exchange.on_bars("BTCUSDT", _bars(window))] == [ENTRY]
+
+    assert exchange.close_position("a", requested_at="2026-01-01T01:30:00+00:00")
+    assert exchange.on_bars("BTCUSDT", _bars(window)) == []
+    fills = exchange.on_bars("BTCUSDT", _bars(window + [(103, 104, 102, 103)]))
+
+    assert [(f.kind, f.price, f.timestamp) for f in fills] == [
+        (MARKET_EXIT, pytest.approx(103 * 0.99), "2026-01-01T02:00:00+00:00")]
+    assert exchange.resting_orders("BTCUSDT") == 0
+
+
+def test_cancelled_order_does_not_fill(exchange):
+    """Test that cancel() removes the order from the book."""
+    exchange.submit(_order("a"))
+    assert exchange.cancel("a")
+    assert not exchange.cancel("a")
+
+    assert exchange.on_bars("BTCUSDT", _bars([(100, 100, 50, 60)])) == []
+
+
+def test_first_hits_match_bar_by_bar_scan():
+    """Test the vectorized first-hit search against a plain loop on random data."""
+    rng = np.random.default_rng(7)
+    lows = rng.uniform(0, 100, 257)
+    prices = rng.uniform(0, 100, 500)
+    starts = rng.integers(0, 258, 500)
+
+    hits = _first_hits(_sparse_table(lows, np.minimum), starts, prices, below=True)
+
+    expected = [next((k for k in range(s, len(lows)) if lows[k] <= p), len(lows)) for s, p in zip(starts, prices)]
+    assert hits.tolist() == expected
+
+
+def test_oms_paper_trading_lifecycle():
+    """Test OMS orders filled by the exchange: PENDING -> OPEN -> FILLED, persisted."""
+    repository = OmsRepository(":memory:", metrics=MetricsRegistry())
+    exchange = PaperExchange(slippage_tolerance=0.001, metrics=MetricsRegistry())
+    oms = OrderManagementSystem(repository, exchange=exchange)
+    order_id = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0, stop_loss=49000.0, take_profit=52000.0)
+    created = oms.get_order(order_id)["created_at"]
+    start = pd.Timestamp(created).ceil("1h")
+
+    assert oms.get_order_status(order_id) == "PENDING"  # no simulated fill
+    exchange.on_bars("BTCUSDT", _bars([(50100, 50200, 49900, 50000)], start.isoformat()))
+    assert oms.get_order_by_symbol("BTCUSDT")["status"] == "OPEN"
+
+    exchange.on_bars("BTCUSDT", _bars([(51000, 52500, 50900, 52400)], (start + pd.Timedelta("1h")).isoformat()))
+    assert oms.get_order_by_symbol("BTCUSDT") is None
+    stored = repository.get(order_id)
+    assert (stored["status"], stored["entry_price"], stored["exit_price"]) == ("FILLED", 50000.0, 52000.0)
+    repository.close()
+
+
+def test_fills_reach_oms_with_real_logger():
+    """Test that fill logging through a real MarketDataLogger does not stop listeners from updating the OMS."""
+    repository = OmsRepository(":memory:", metrics=MetricsRegistry())
+    exchange = PaperExchange(logger=MarketDataLogger("PaperExchange", service_name="PaperExchange"),
+                             metrics=MetricsRegistry())
+    oms = OrderManagementSystem(repository, exchange=exchange)
+    order_id = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0)
+    start = pd.Timestamp(oms.get_order(order_id)["created_at"]).ceil("1h")
+
+    fills = exchange.on_bars("BTCUSDT", _bars([(50100, 50200, 49900, 50000)], start.isoformat()))
+
+    assert [fill.kind for fill in fills] == [ENTRY]
+    assert oms.get_order_status(order_id) == "OPEN"
+    assert repository.get(order_id)["status"] == "OPEN"
+    repository.close()
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestPaperExchangePerformance:
+    """Matching many symbols against a long bar history stays vectorized."""
+
+    def test_many_symbols_and_bars(self):
+        exchange = PaperExchange(metrics=MetricsRegistry())
+        rng = np.random.default_rng(1)
+        symbols, bars_per_symbol, orders_per_symbol = 200, 2000, 20
+        bars = {}
+        for s in range(symbols):
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars_per_symbol)))
+            bars[f"S{s}USDT"] = _bars(np.column_stack([close, close * 1.005, close * 0.995, close]))
+            for i in range(orders_per_symbol):
+                entry = close[0] * rng.uniform(0.8, 1.2)
+                exchange.submit(_order(f"{s}-{i}", entry=entry, stop_loss=entry * 0.9, take_profit=entry * 1.1,
+                                       symbol=f"S{s}USDT"))
+
+        start = time.perf_counter()
+        fills = exchange.on_bars_many(bars)
+        elapsed = time.perf_counter() - start
+
+        print(f"\nPaperExchange: {symbols} symbols x {bars_per_symbol} bars, "
+              f"{symbols * orders_per_symbol} orders -> {len(fills)} fills in {elapsed * 1000:.0f}ms")
+        assert fills
+        assert elapsed < 5
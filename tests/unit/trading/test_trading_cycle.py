@@ -3,6 +3,9 @@ from unittest.mock import MagicMock, call, ANY
 from src.trading.trading_cycle import TradingCycle
 from src.trading.oms import OrderManagementSystem
 from src.market_data.market_data_service import MarketDataService
+from src.market_data.context_diff import ContextDiffTracker
+from src.trading.paper_exchange import PaperExchange
+from src.logging_system import MarketDataLogger
 
 @pytest.fixture
 def mock_oms():
@@ -47,7 +50,7 @@ def test_run_cycle_no_active_order_buy_decision(trading_cycle, mock_oms):
     
     # 2. Проверить, что был размещен новый ордер
     # 2. Проверить, что был размещен новый ордер, соответствуя реальной сигнатуре вызова
-    mock_oms.place_order.assert_called_once_with(
+    mock_oms.place_order_if_no_active.assert_called_once_with(
         symbol="BTCUSDT",
         order_type='BUY',
         margin=520.0,  # 0.01 * 52000.0
@@ -79,7 +82,7 @@ def test_run_cycle_with_pending_order_syncs_it(trading_cycle, mock_oms):
     mock_oms.get_order_status.assert_called_once_with('pending-order-456', trace_id=ANY)
 
     # 2. Проверить, что новый ордер НЕ размещался, так как цикл был занят синхронизацией
-    mock_oms.place_order.assert_not_called()
+    mock_oms.place_order_if_no_active.assert_not_called()
 
 def test_run_cycle_with_filled_order_does_nothing(trading_cycle, mock_oms):
     """
@@ -101,4 +104,94 @@ def test_run_cycle_with_filled_order_does_nothing(trading_cycle, mock_oms):
     mock_oms.get_order_status.assert_not_called()
 
     # 2. Проверить, что новый ордер НЕ размещался
-    mock_oms.place_order.assert_not_called()
\ No newline at end of file
+    mock_oms.place_order_if_no_active.assert_not_called()
+
+def test_run_cycle_uses_context_tracker_in_delta_mode(mock_oms, mock_market_data_service):
+    """
+    Тест 4: Проверяет, что при заданном ContextDiffTracker промпт строится из его payload.
+    """
+    tracker = MagicMock(spec=ContextDiffTracker)
+    payload = {"mode": "delta", "symbol": "BTCUSDT", "version": 2}
+    tracker.build.return_value = (payload, '{"mode":"delta"}')
+    cycle = TradingCycle(oms=mock_oms, market_data_service=mock_market_data_service, context_tracker=tracker)
+    cycle.logger = MagicMock()
+    mock_oms.get_order_by_symbol.return_value = None
+
+    cycle.run_cycle(symbol="BTCUSDT")
+
+    market_data = mock_market_data_service.get_market_data.return_value
+    tracker.build.assert_called_once_with(market_data, trace_id=ANY)
+    tracker.encode.assert_not_called()
+    market_data.to_json_context.assert_not_called()
+    cycle.logger.log_operation_start.assert_any_call(
+        "get_ai_decision", trace_id=ANY, context={"json_context": payload}
+    )
+
+def test_run_cycle_invalidates_context_when_decision_fails(mock_oms, mock_market_data_service):
+    """
+    Тест 5: Проверяет, что при ошибке шага решения базовый контекст символа
+    сбрасывается и следующий цикл отправит полный снимок.
+    """
+    tracker = MagicMock(spec=ContextDiffTracker)
+    cycle = TradingCycle(oms=mock_oms, market_data_service=mock_market_data_service, context_tracker=tracker)
+    cycle.logger = MagicMock()
+    cycle._get_ai_decision = MagicMock(side_effect=RuntimeError("LLM unavailable"))
+    mock_oms.get_order_by_symbol.return_value = None
+
+    with pytest.raises(RuntimeError):
+        cycle.run_cycle(symbol="BTCUSDT")
+
+    tracker.invalidate.assert_called_once_with("BTCUSDT")
+    mock_oms.place_order_if_no_active.assert_not_called()
+
+def test_run_cycle_feeds_candles_to_paper_exchange(mock_oms, mock_market_data_service):
+    """
+    Тест 6: Проверяет, что в режиме paper trading свечи цикла передаются бирже
+    и позиция перечитывается после исполнений.
+    """
+    exchange = MagicMock(spec=PaperExchange)
+    cycle = TradingCycle(oms=mock_oms, market_data_service=mock_market_data_service, paper_exchange=exchange)
+    cycle.logger = MagicMock()
+    mock_oms.get_order_by_symbol.return_value = None
+
+    cycle.run_cycle(symbol="BTCUSDT")
+
+    market_data = mock_market_data_service.get_market_data.return_value
+    exchange.on_bars.assert_called_once_with("BTCUSDT", market_data.h1_candles)
+    assert mock_oms.get_order_by_symbol.call_count == 2
+
+def test_run_cycle_sell_closes_open_paper_position(mock_oms, mock_market_data_service):
+    """
+    Тест 7: Проверяет, что SELL по открытой позиции paper trading закрывает ее
+    по рынку, а неисполненный вход (PENDING) отменяет.
+    """
+    cycle = TradingCycle(oms=mock_oms, market_data_service=mock_market_data_service,
+                         paper_exchange=MagicMock(spec=PaperExchange))
+    cycle.logger = MagicMock()
+    cycle._get_ai_decision = MagicMock(return_value="SELL")
+
+    mock_oms.get_order_by_symbol.return_value = {'order_id': 'open-order-1', 'status': 'OPEN'}
+    cycle.run_cycle(symbol="BTCUSDT")
+    mock_oms.close_position.assert_called_once_with('open-order-1', trace_id=ANY)
+    mock_oms.cancel_order.assert_not_called()
+
+    mock_oms.get_order_by_symbol.return_value = {'order_id': 'pending-order-2', 'status': 'PENDING'}
+    cycle.run_cycle(symbol="BTCUSDT")
+    mock_oms.cancel_order.assert_called_once_with('pending-order-2', trace_id=ANY)
+    assert mock_oms.close_position.call_count == 1
+
+def test_run_cycle_buy_skipped_when_order_appeared_concurrently(trading_cycle, mock_oms):
+    """
+    Тест 8: Проверяет, что пропуск BUY из-за параллельно открытой позиции
+    логируется как пропуск, а не как ошибка размещения.
+    """
+    mock_oms.get_order_by_symbol.return_value = None
+    mock_oms.place_order_if_no_active.return_value = None
+    trading_cycle.logger = MagicMock(spec=MarketDataLogger)
+
+    trading_cycle.run_cycle(symbol="BTCUSDT")
+
+    trading_cycle.logger.log_operation_error.assert_not_called()
+    trading_cycle.logger.log_operation_complete.assert_any_call(
+        "place_buy_order", context={"symbol": "BTCUSDT", "status": "skipped_active"}, trace_id=ANY
+    )
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.infrastructure.exceptions import RepositoryError
+from src.logging_system.metrics import MetricsRegistry
+from src.trading.oms import OrderManagementSystem
+from src.trading.oms_repository import OmsRepository
+from src.trading.write_behind import WriteBehindPersister
+
+
+def _order(order_id: str, status: str = "PENDING", symbol: str = "BTCUSDT") -> dict:
+    return {
+        "order_id": order_id, "symbol": symbol, "status": status, "order_type": "BUY",
+        "margin": 100.0, "leverage": 10, "entry_price": 50000.0, "exit_price": None,
+        "stop_loss": None, "take_profit": None,
+        "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = OmsRepository(str(tmp_path / "oms.db"), metrics=MetricsRegistry())
+    yield repo
+    repo.close()
+
+
+def _rows(repository) -> dict:
+    conn = sqlite3.connect(repository._db_path)
+    try:
+        return {row[0]: row[1] for row in conn.execute("SELECT order_id, status FROM orders")}
+    finally:
+        conn.close()
+
+
+def test_mutations_are_group_committed(repository):
+    """Test that a burst of saves becomes a few transactions."""
+    metrics = MetricsRegistry()
+    with WriteBehindPersister(repository, max_batch=50, max_delay_ms=1000, metrics=metrics) as persister:
+        for i in range(120):
+            persister.save(_order(f"o{i}"))
+        persister.flush()
+
+        assert len(_rows(repository)) == 120
+        batches = metrics.counter("oms_write_behind_batches_total", status="ok").value
+        assert 1 <= batches <= 4
+        assert persister.queue_depth == 0
+
+
+def test_writes_after_max_delay_without_flush(repository):
+    """Test that queued mutations are written once max_delay_ms elapses."""
+    with WriteBehindPersister(repository, max_batch=1000, max_delay_ms=5) as persister:
+        persister.save(_order("o1"))
+        deadline = time.monotonic() + 2
+        while "o1" not in _rows(repository) and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    assert _rows(repository) == {"o1": "PENDING"}
+
+
+def test_repeated_mutations_coalesce_to_latest(repository):
+    """Test that several updates of one order before a commit write the last state."""
+    metrics = MetricsRegistry()
+    with WriteBehindPersister(repository, max_delay_ms=1000, metrics=metrics) as persister:
+        order = _order("o1")
+        persister.save(order)
+        order["status"] = "FILLED"
+        persister.save(order)
+        order["status"] = "CANCELLED"  # not saved; the queued snapshot must not change
+
+        persister.flush()
+
+    assert _rows(repository) == {"o1": "FILLED"}
+    assert metrics.counter("oms_write_behind_coalesced_total").value == 1
+
+
+def test_delete_is_ordered_with_saves(repository):
+    """Test that a delete queued after a save removes the order."""
+    with WriteBehindPersister(repository, max_delay_ms=1000) as persister:
+        persister.save(_order("o1"))
+        persister.save(_order("o2"))
+        persister.delete("o1", durable=True)
+
+    assert _rows(repository) == {"o2": "PENDING"}
+
+
+def test_failed_batch_raises_on_flush_and_is_retried(repository, mocker):
+    """Test that flush surfaces a failed commit and the batch is written on retry."""
+    original = repository.write_batch
+    calls = []
+
+    def flaky(orders, deleted_ids=(), trace_id=None):
+        calls.append(len(orders))
+        if len(calls) == 1:
+            raise RepositoryError(message="disk I/O error", repository_type="sqlite", db_operation="write_batch")
+        return original(orders, deleted_ids, trace_id)
+
+    mocker.patch.object(repository, "write_batch", side_effect=flaky)
+    with WriteBehindPersister(repository, max_delay_ms=1000, retry_delay_ms=10) as persister:
+        persister.save(_order("o1"))
+
+        with pytest.raises(RepositoryError, match="disk I/O error"):
+            persister.flush()
+        persister.flush(timeout=5)
+
+    assert _rows(repository) == {"o1": "PENDING"}
+
+
+def test_close_commits_pending_and_rejects_new_writes(repository):
+    """Test that close() drains the queue."""
+    persister = WriteBehindPersister(repository, max_delay_ms=10000)
+    persister.save(_order("o1"))
+    persister.close()
+
+    assert _rows(repository) == {"o1": "PENDING"}
+    with pytest.raises(RepositoryError):
+        persister.save(_order("o2"))
+
+
+def test_concurrent_durable_saves(repository):
+    """Test that durable saves from many threads are all committed when they return."""
+    with WriteBehindPersister(repository, max_delay_ms=2) as persister:
+        def worker(n):
+            for i in range(20):
+                persister.save(_order(f"t{n}_{i}"), durable=True)
+                assert f"t{n}_{i}" in persister.repository.load()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(_rows(repository)) == 80
+
+
+def test_oms_with_write_behind(repository):
+    """Test OMS mutations through the write-behind persister."""
+    metrics = MetricsRegistry()
+    persister = WriteBehindPersister(repository, max_delay_ms=1000, metrics=metrics)
+    oms = OrderManagementSystem(repository, write_behind=persister)
+
+    order_id = oms.place_order("BTCUSDT", "BUY", 100.0, 10, 50000.0)
+    assert metrics.gauge("oms_write_behind_queue_depth").value == 1
+    oms.cancel_order(order_id, durable=True)
+    persister.close()
+
+    assert _rows(repository) == {order_id: "CANCELLED"}
+    assert metrics.gauge("oms_write_behind_queue_depth").value == 0